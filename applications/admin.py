@@ -10,7 +10,11 @@ from django.utils.safestring import mark_safe
 
 from applications import models
 from ecommerce.models import Order
-from main.admin import TimestampedModelAdmin
+from main.admin import (
+    EstimatedCountModelAdmin,
+    TimestampedModelAdmin,
+    UserSearchModelAdmin,
+)
 from main.utils import get_field_names
 
 
@@ -89,7 +93,9 @@ class OrderInline(admin.StackedInline):
         return False
 
 
-class BootcampApplicationAdmin(TimestampedModelAdmin):
+class BootcampApplicationAdmin(
+    UserSearchModelAdmin, EstimatedCountModelAdmin, TimestampedModelAdmin
+):
     """Admin for BootcampApplication"""
 
     model = models.BootcampApplication
@@ -271,11 +277,14 @@ class ApplicationStepSubmissionForm(forms.ModelForm):
         return object_id
 
 
-class ApplicationStepSubmissionAdmin(TimestampedModelAdmin):
+class ApplicationStepSubmissionAdmin(
+    UserSearchModelAdmin, EstimatedCountModelAdmin, TimestampedModelAdmin
+):
     """Admin for ApplicationStepSubmission"""
 
     model = models.ApplicationStepSubmission
     form = ApplicationStepSubmissionForm
+    user_search_path = "bootcamp_application__user"
     list_display = (
         "id",
         "get_user_email",
@@ -345,10 +354,12 @@ class ApplicationStepSubmissionAdmin(TimestampedModelAdmin):
     get_run_display_title.admin_order_field = "bootcamp_run__title"
 
 
-class ApplicantLetterAdmin(TimestampedModelAdmin):
+class ApplicantLetterAdmin(UserSearchModelAdmin, TimestampedModelAdmin):
     """Admin for ApplicantLetter"""
 
     model = models.ApplicantLetter
+    user_search_path = "application__user"
+    list_select_related = ("application__user", "application__bootcamp_run__bootcamp")
     list_display = ("id", "letter_type", "get_user_email", "get_run_display_title")
     list_filter = ("letter_type",)
     raw_id_fields = ("application",)
@@ -1,11 +1,19 @@
 """API for bootcamp applications app"""
+from datetime import timedelta
+import logging
+
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Coalesce
 
 from applications.constants import (
     AppStates,
+    REVIEW_COMPLETED_APP_STATES,
     REVIEW_STATUS_REJECTED,
     REVIEW_STATUS_PENDING,
+    SUBMISSION_STATUS_PENDING,
     SUBMISSION_VIDEO,
 )
 from applications.models import (
@@ -15,10 +23,13 @@ from applications.models import (
     VideoInterviewSubmission,
 )
 from applications import tasks
-from jobma.api import create_interview_in_jobma
+from jobma.api import create_interview_in_jobma, create_interviews_in_jobma
 from jobma.models import Interview, Job
+from main.utils import group_into_dict, now_in_utc
 from profiles.api import is_user_info_complete
 
+log = logging.getLogger(__name__)
+
 
 def get_or_create_bootcamp_application(user, bootcamp_run_id):
     """
@@ -136,3 +147,90 @@ def populate_interviews_in_jobma(application):
                 ),
             },
         )
+
+
+def get_stale_interviews(now):
+    """
+    Returns interviews which need a new link in Jobma. These are interviews for pending video interview submissions
+    whose link is older than the Jobma link expiration and which belong to a run which hasn't started, along with
+    any submitted interviews that never got a link. A link was issued when the submission was created, or when the
+    interview was last refreshed.
+
+    Args:
+        now (datetime.datetime): The current time
+
+    Returns:
+        django.db.models.query.QuerySet: A queryset of Interview objects
+    """
+    cutoff_date = now - timedelta(days=settings.JOBMA_LINK_EXPIRATION_DAYS)
+    stale_interview_ids = (
+        ApplicationStepSubmission.objects.exclude(
+            Q(bootcamp_application__state__in=REVIEW_COMPLETED_APP_STATES)
+            | Q(bootcamp_application__bootcamp_run__start_date__lte=now)
+        )
+        .filter(submission_status=SUBMISSION_STATUS_PENDING)
+        .annotate(
+            link_issued_on=Coalesce(
+                "videointerviews__interview__link_refreshed_on",
+                "videointerviews__created_on",
+            )
+        )
+        .filter(link_issued_on__lte=cutoff_date)
+        .values("videointerviews__interview")
+    )
+    return Interview.objects.filter(
+        Q(id__in=stale_interview_ids)
+        | Q(interview_url__isnull=True, videointerviewsubmission__isnull=False)
+    ).select_related("job", "applicant__profile", "applicant__legal_address")
+
+
+def refresh_interviews_in_jobma(interviews):
+    """
+    Creates new Jobma interviews for existing Interview objects, one job at a time, and records when their links
+    were refreshed so they won't be considered stale again until the new links expire.
+
+    Args:
+        interviews (iterable of Interview): Interviews with job and applicant data loaded
+
+    Returns:
+        list of Interview: The interviews which were refreshed
+    """
+    refreshed = []
+    for job_id, job_interviews in group_into_dict(
+        interviews, key_fn=lambda interview: interview.job_id
+    ).items():
+        try:
+            updated, failed = create_interviews_in_jobma(job_interviews)
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Unable to refresh interviews for job %d in Jobma", job_id)
+            continue
+        Interview.objects.filter(id__in=[interview.id for interview in updated]).update(
+            link_refreshed_on=now_in_utc()
+        )
+        refreshed.extend(updated)
+        log.info(
+            "Refreshed %d interviews for job %d in Jobma (%d failed)",
+            len(updated),
+            job_id,
+            len(failed),
+        )
+    return refreshed
+
+
+def get_applications_missing_video_submissions():
+    """
+    Returns applications for runs with a video interview step which don't have a video interview submission
+
+    Returns:
+        django.db.models.query.QuerySet: A queryset of BootcampApplication objects
+    """
+    return (
+        BootcampApplication.objects.filter(
+            bootcamp_run__application_steps__application_step__submission_type=SUBMISSION_VIDEO
+        )
+        .exclude(
+            submissions__run_application_step__application_step__submission_type=SUBMISSION_VIDEO
+        )
+        .select_related("user__profile", "user__legal_address", "bootcamp_run")
+        .distinct()
+    )
@@ -1,4 +1,5 @@
 """Tests for applications API functionality"""
+from datetime import timedelta
 from decimal import Decimal
 
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -8,13 +9,16 @@ from applications.api import (
     get_or_create_bootcamp_application,
     derive_application_state,
     get_required_submission_type,
+    get_stale_interviews,
     populate_interviews_in_jobma,
+    refresh_interviews_in_jobma,
 )
 from applications.constants import (
     AppStates,
     REVIEW_STATUS_APPROVED,
     REVIEW_STATUS_REJECTED,
     SUBMISSION_QUIZ,
+    SUBMISSION_STATUS_PENDING,
     SUBMISSION_VIDEO,
 )
 from applications.factories import (
@@ -22,6 +26,7 @@ from applications.factories import (
     BootcampApplicationFactory,
     BootcampRunApplicationStepFactory,
     ApplicationStepSubmissionFactory,
+    VideoInterviewSubmissionFactory,
 )
 from applications.models import ApplicationStepSubmission, VideoInterviewSubmission
 from ecommerce.factories import LineFactory
@@ -229,3 +234,57 @@ def test_populate_interviews_in_jobma(
         assert step_submission.content_object == video_submission
     else:
         create_interview.assert_not_called()
+
+
+def test_get_stale_interviews(settings):
+    """Interviews should be stale once their link was issued, at submission or at a refresh, before it expired"""
+    settings.JOBMA_LINK_EXPIRATION_DAYS = 29
+    now = now_in_utc()
+    expired, refreshed, recently_refreshed = [
+        ApplicationStepSubmissionFactory.create(
+            bootcamp_application__state=AppStates.AWAITING_USER_SUBMISSIONS.value,
+            bootcamp_application__bootcamp_run__start_date=now + timedelta(days=10),
+            submission_status=SUBMISSION_STATUS_PENDING,
+        ).content_object.interview
+        for _ in range(3)
+    ]
+    VideoInterviewSubmission.objects.update(created_on=now - timedelta(days=60))
+    Interview.objects.filter(id=refreshed.id).update(
+        link_refreshed_on=now - timedelta(days=30)
+    )
+    Interview.objects.filter(id=recently_refreshed.id).update(
+        link_refreshed_on=now - timedelta(days=1)
+    )
+    assert set(get_stale_interviews(now)) == {expired, refreshed}
+
+
+def test_refresh_interviews_in_jobma(mocker):
+    """refresh_interviews_in_jobma should record when the links were refreshed, and leave the submissions alone"""
+    submission = VideoInterviewSubmissionFactory.create()
+    created_on = submission.created_on
+    mocker.patch(
+        "applications.api.create_interviews_in_jobma",
+        side_effect=lambda interviews: (interviews, []),
+    )
+    now = now_in_utc()
+    mocker.patch("applications.api.now_in_utc", return_value=now)
+    assert refresh_interviews_in_jobma([submission.interview]) == [submission.interview]
+    submission.refresh_from_db()
+    assert submission.created_on == created_on
+    assert submission.interview.link_refreshed_on == now
+
+
+def test_refresh_interviews_in_jobma_error(mocker):
+    """refresh_interviews_in_jobma should keep refreshing the other jobs if one of them fails"""
+    failing_interview, interview = InterviewFactory.create_batch(2)
+
+    def _create_interviews(interviews):
+        """Fail for the first job"""
+        if interviews == [failing_interview]:
+            raise Exception("error")
+        return interviews, []
+
+    mocker.patch(
+        "applications.api.create_interviews_in_jobma", side_effect=_create_interviews
+    )
+    assert refresh_interviews_in_jobma([failing_interview, interview]) == [interview]
@@ -1,7 +1,9 @@
 """Applications filters"""
 from django_filters import FilterSet, NumberFilter
+from rest_framework.filters import BaseFilterBackend
 
 from applications.models import ApplicationStepSubmission
+from profiles.api import get_user_search_rank, search_users
 
 
 class ApplicationStepSubmissionFilterSet(FilterSet):
@@ -14,3 +16,23 @@ class ApplicationStepSubmissionFilterSet(FilterSet):
     class Meta:
         model = ApplicationStepSubmission
         fields = {"review_status": ["exact", "in"]}
+
+
+class ApplicantSearchFilter(BaseFilterBackend):
+    """
+    Filters submissions by the applicant's email, username or name, and lists the best matches first. This
+    should come after any ordering filter so that the ranking takes precedence.
+    """
+
+    search_param = "q"
+    user_path = "bootcamp_application__user"
+
+    def filter_queryset(self, request, queryset, view):
+        search_text = request.query_params.get(self.search_param, "").strip()
+        if not search_text:
+            return queryset
+        return (
+            queryset.filter(**{f"{self.user_path}__in": search_users(search_text)})
+            .annotate(search_rank=get_user_search_rank(search_text, self.user_path))
+            .order_by("-search_rank", *queryset.query.order_by)
+        )
@@ -8,7 +8,7 @@ from applications.management.utils import (
     has_same_application_steps,
 )
 from applications.models import BootcampApplication
-from profiles.api import fetch_user
+from profiles.api import fetch_users
 
 
 class Command(BaseCommand):
@@ -68,13 +68,7 @@ class Command(BaseCommand):
         from_run = fetch_bootcamp_run(from_run_property)
         to_run = fetch_bootcamp_run(to_run_property)
         users_property = options["users"]
-        users = (
-            None
-            if not users_property
-            else [
-                fetch_user(user_property) for user_property in users_property.split(",")
-            ]
-        )
+        users = None if not users_property else fetch_users(users_property.split(","))
 
         application_filter = dict(bootcamp_run=from_run)
         if users:
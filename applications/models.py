@@ -37,6 +37,7 @@ from main import features
 from main.models import TimestampedModel, ValidateOnSaveMixin
 from main.utils import now_in_utc
 from novoed import tasks as novoed_tasks
+from outbox.api import enqueue_task
 
 
 class ApplicationStep(models.Model):
@@ -210,8 +211,10 @@ class BootcampApplication(TimestampedModel):
         from applications.tasks import create_and_send_applicant_letter
 
         if self.is_ready_for_payment():
-            create_and_send_applicant_letter.delay(
-                application_id=self.id, letter_type=LETTER_TYPE_APPROVED
+            enqueue_task(
+                create_and_send_applicant_letter,
+                kwargs={"application_id": self.id, "letter_type": LETTER_TYPE_APPROVED},
+                aggregate=self,
             )
             return AppStates.AWAITING_PAYMENT.value
         else:
@@ -234,8 +237,10 @@ class BootcampApplication(TimestampedModel):
         """Reject application submission"""
         from applications.tasks import create_and_send_applicant_letter
 
-        create_and_send_applicant_letter.delay(
-            application_id=self.id, letter_type=LETTER_TYPE_REJECTED
+        enqueue_task(
+            create_and_send_applicant_letter,
+            kwargs={"application_id": self.id, "letter_type": LETTER_TYPE_REJECTED},
+            aggregate=self,
         )
 
     @transition(
@@ -257,7 +262,7 @@ class BootcampApplication(TimestampedModel):
     )
     def complete(self):
         """Mark the application as completed"""
-        BootcampRunEnrollment.objects.update_or_create(
+        run_enrollment, _ = BootcampRunEnrollment.objects.update_or_create(
             user=self.user,
             bootcamp_run=self.bootcamp_run,
             defaults={"active": True, "change_status": None},
@@ -266,9 +271,13 @@ class BootcampApplication(TimestampedModel):
             features.is_enabled(features.NOVOED_INTEGRATION)
             and self.bootcamp_run.novoed_course_stub
         ):
-            novoed_tasks.enroll_users_in_novoed_course.delay(
-                user_ids=[self.user.id],
-                novoed_course_stub=self.bootcamp_run.novoed_course_stub,
+            enqueue_task(
+                novoed_tasks.enroll_users_in_novoed_course,
+                kwargs={
+                    "user_ids": [self.user.id],
+                    "novoed_course_stub": self.bootcamp_run.novoed_course_stub,
+                },
+                aggregate=run_enrollment,
             )
 
     @transition(
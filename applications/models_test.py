@@ -22,6 +22,7 @@ from applications.factories import (
     BootcampApplicationFactory,
 )
 from applications.constants import AppStates
+from applications.tasks import create_and_send_applicant_letter
 from ecommerce.test_utils import create_test_application, create_test_order
 from klasses.constants import ENROLL_CHANGE_STATUS_REFUNDED
 from klasses.factories import (
@@ -64,6 +65,12 @@ def patched_novoed_tasks(mocker):
     return mocker.patch("applications.models.novoed_tasks")
 
 
+@pytest.fixture()
+def patched_enqueue_task(mocker):
+    """Patched function to write tasks to the outbox"""
+    return mocker.patch("applications.models.enqueue_task")
+
+
 PAYMENT = 123
 
 
@@ -127,7 +134,9 @@ def test_bootcamp_application_resume_file_validation(file_name, state, expected)
         assert bootcamp_application.state == state
 
 
-def test_bootcamp_application_complete(settings, patched_novoed_tasks):
+def test_bootcamp_application_complete(
+    settings, patched_novoed_tasks, patched_enqueue_task
+):
     """
     BootcampApplication.complete should create an enrollment and call a task to enroll the user in the course on
     NovoEd
@@ -139,13 +148,18 @@ def test_bootcamp_application_complete(settings, patched_novoed_tasks):
         bootcamp_run__novoed_course_stub=novoed_course_stub,
     )
     bootcamp_application.complete()
-    assert BootcampRunEnrollment.objects.filter(
+    run_enrollment = BootcampRunEnrollment.objects.get(
         user=bootcamp_application.user,
         bootcamp_run=bootcamp_application.bootcamp_run,
         active=True,
-    ).exists()
-    patched_novoed_tasks.enroll_users_in_novoed_course.delay.assert_called_once_with(
-        user_ids=[bootcamp_application.user.id], novoed_course_stub=novoed_course_stub
+    )
+    patched_enqueue_task.assert_called_once_with(
+        patched_novoed_tasks.enroll_users_in_novoed_course,
+        kwargs={
+            "user_ids": [bootcamp_application.user.id],
+            "novoed_course_stub": novoed_course_stub,
+        },
+        aggregate=run_enrollment,
     )
 
 
@@ -321,13 +335,12 @@ def test_is_paid_in_full(mocker, application, price, total_paid, expected_fully_
 
 
 @pytest.mark.parametrize("ready_for_payment", [True, False])
-def test_applicant_letter_approved(mocker, application, ready_for_payment):
+def test_applicant_letter_approved(
+    mocker, application, patched_enqueue_task, ready_for_payment
+):
     """If all submissions are approved, an applicant letter should be sent"""
     application.state = AppStates.AWAITING_SUBMISSION_REVIEW.value
     application.save()
-    create_patched = mocker.patch(
-        "applications.tasks.create_and_send_applicant_letter.delay"
-    )
     ready_patched = mocker.patch(
         "applications.models.BootcampApplication.is_ready_for_payment",
         return_value=ready_for_payment,
@@ -335,21 +348,25 @@ def test_applicant_letter_approved(mocker, application, ready_for_payment):
     application.approve_submission()
     ready_patched.assert_called_once_with()
     if ready_for_payment:
-        create_patched.assert_called_once_with(
-            application_id=application.id, letter_type=LETTER_TYPE_APPROVED
+        patched_enqueue_task.assert_called_once_with(
+            create_and_send_applicant_letter,
+            kwargs={
+                "application_id": application.id,
+                "letter_type": LETTER_TYPE_APPROVED,
+            },
+            aggregate=application,
         )
     else:
-        assert create_patched.called is False
+        assert patched_enqueue_task.called is False
 
 
-def test_applicant_letter_rejected(mocker, application):
+def test_applicant_letter_rejected(application, patched_enqueue_task):
     """If any submission is rejected, an applicant letter should be sent"""
     application.state = AppStates.AWAITING_SUBMISSION_REVIEW.value
     application.save()
-    create_patched = mocker.patch(
-        "applications.tasks.create_and_send_applicant_letter.delay"
-    )
     application.reject_submission()
-    create_patched.assert_called_once_with(
-        application_id=application.id, letter_type=LETTER_TYPE_REJECTED
+    patched_enqueue_task.assert_called_once_with(
+        create_and_send_applicant_letter,
+        kwargs={"application_id": application.id, "letter_type": LETTER_TYPE_REJECTED},
+        aggregate=application,
     )
@@ -17,6 +17,7 @@ from ecommerce.serializers import ApplicationOrderSerializer
 from klasses.models import BootcampRunCertificate
 from klasses.serializers import BootcampRunSerializer, BootcampRunEnrollmentSerializer
 from main.utils import now_in_utc, first_or_none
+from profiles.api import get_serialized_user
 from profiles.serializers import UserSerializer
 
 
@@ -109,7 +110,11 @@ class BootcampApplicationDetailSerializer(serializers.ModelSerializer):
     submissions = SubmissionSerializer(many=True, read_only=True)
     orders = ApplicationOrderSerializer(many=True, read_only=True)
     bootcamp_run = BootcampRunSerializer(read_only=True)
-    user = UserSerializer()
+    user = serializers.SerializerMethodField()
+
+    def get_user(self, bootcamp_application):
+        """Gets the serialized user, from the cache if possible"""
+        return get_serialized_user(bootcamp_application.user)
 
     def get_resume_url(self, bootcamp_application):
         """Gets the resume url if one exists"""
@@ -12,23 +12,21 @@ pytestmark = pytest.mark.django_db
 
 
 @pytest.fixture
-def mock_hubspot_on_commit(mocker):
+def mock_hubspot_sync(mocker):
     """ Mock sync_hubspot_application"""
-    return mocker.patch("applications.signals.on_commit")
+    return mocker.patch("applications.signals.sync_hubspot_application")
 
 
-def test_application_signal(mock_hubspot_on_commit):
+def test_application_signal(mock_hubspot_sync):
     """Test that hubspot is synced whenever a BootcampApplication is created/updated"""
 
     application = BootcampApplicationFactory.create()
     application.save()
     application.save()
-    assert (
-        mock_hubspot_on_commit.call_count == 2
-    )  # None for creation, twice for updates
+    assert mock_hubspot_sync.call_count == 2  # None for creation, twice for updates
 
 
-def test_submission_signal(mock_hubspot_on_commit):
+def test_submission_signal(mock_hubspot_sync):
     """ Test that hubspot is synced whenever an ApplicationStepSubmission is created"""
 
     submission = ApplicationStepSubmissionFactory.create()
@@ -37,4 +35,4 @@ def test_submission_signal(mock_hubspot_on_commit):
     )
     submission.save()
     submission.save()
-    assert mock_hubspot_on_commit.call_count == 1  # Once for submission creation
+    assert mock_hubspot_sync.call_count == 1  # Once for submission creation
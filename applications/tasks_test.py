@@ -109,12 +109,11 @@ def test_create_and_send_applicant_letter(
     ],
 )  # pylint:disable=too-many-locals
 def test_refresh_pending_interview_links(  # pylint:disable=too-many-arguments,redefined-outer-name
-    mocker, settings, state, status, old_link, old_run, recreated, mock_jobma_client
+    settings, state, status, old_link, old_run, recreated, mock_jobma_client
 ):
     """ Test that refresh_pending_interview_links updates links only when appropriate """
     now = now_in_utc()
     settings.JOBMA_LINK_EXPIRATION_DAYS = 0 if old_link else 30
-    mock_log = mocker.patch("applications.tasks.log.debug")
 
     run = BootcampRunFactory.create(
         start_date=(now + timedelta(days=(-10 if old_run else 10)))
@@ -139,21 +138,24 @@ def test_refresh_pending_interview_links(  # pylint:disable=too-many-arguments,r
         submission_status=status,
     )
     assert submission.videointerviews.first() == interview_submission
+    created_on = interview_submission.created_on
     refresh_pending_interview_links()
 
-    new_interview = Interview.objects.get(applicant=bootcamp_app.user)
+    refreshed_interview = Interview.objects.get(applicant=bootcamp_app.user)
+    interview_submission.refresh_from_db()
+    assert refreshed_interview.id == interview.id
     if recreated:
-        assert mock_jobma_client.call_count == 1
-        assert new_interview.id != interview.id
-        mock_log.assert_called_once_with(
-            "Interview recreated for submission %d, application %d, user %s",
-            submission.id,
-            bootcamp_app.id,
-            bootcamp_app.user.email,
-        )
+        assert mock_jobma_client.return_value.post.call_count == 1
+        assert refreshed_interview.interview_url == "http://fake.interview.link"
+        assert refreshed_interview.interview_token == "foo"
+        assert refreshed_interview.link_refreshed_on is not None
+        assert refreshed_interview.interviewaudit_set.count() == 1
     else:
-        mock_log.assert_not_called()
-        assert new_interview.id == interview.id
+        mock_jobma_client.return_value.post.assert_not_called()
+        assert refreshed_interview.interview_url == interview.interview_url
+        assert refreshed_interview.interview_token == interview.interview_token
+        assert refreshed_interview.link_refreshed_on is None
+    assert interview_submission.created_on == created_on
 
 
 def test_refresh_pending_interview_links_bad_interviews(  # pylint:disable=too-many-arguments,redefined-outer-name
@@ -187,7 +189,7 @@ def test_refresh_pending_interview_links_bad_interviews(  # pylint:disable=too-m
         submission_status=SUBMISSION_STATUS_PENDING,
     )
     refresh_pending_interview_links()
-    assert mock_jobma_client.call_count == 1
+    assert mock_jobma_client.return_value.post.call_count == 1
     mock_log.assert_called_once_with(
         "Exception processing application %d", applications[0].id, exc_info=True
     )
@@ -1,7 +1,15 @@
 """Views for bootcamp applications"""
 from collections import OrderedDict
 
-from django.db.models import Count, Subquery, OuterRef, IntegerField, Prefetch, Q
+from django.db.models import (
+    Count,
+    Subquery,
+    OuterRef,
+    IntegerField,
+    Prefetch,
+    Q,
+    prefetch_related_objects,
+)
 from django.shortcuts import get_object_or_404
 from django.views.generic import TemplateView
 from django_filters.rest_framework import DjangoFilterBackend
@@ -22,11 +30,15 @@ from applications.serializers import (
     SubmissionReviewSerializer,
 )
 from applications.api import get_or_create_bootcamp_application
-from applications.filters import ApplicationStepSubmissionFilterSet
+from applications.filters import (
+    ApplicantSearchFilter,
+    ApplicationStepSubmissionFilterSet,
+)
 from applications.models import (
     ApplicantLetter,
     ApplicationStepSubmission,
     BootcampApplication,
+    VideoInterviewSubmission,
 )
 from cms.models import LetterTemplatePage
 from ecommerce.models import Order
@@ -51,7 +63,11 @@ class BootcampApplicationViewset(
 
     def get_queryset(self):
         if self.action == "retrieve":
-            return BootcampApplication.objects.prefetch_state_data()
+            return (
+                BootcampApplication.objects.prefetch_state_data()
+                .select_related("bootcamp_run__bootcamp", "user__legal_address")
+                .prefetch_related("orders__receipt_set", "submissions__content_object")
+            )
         else:
             return (
                 BootcampApplication.objects.prefetch_related(
@@ -60,8 +76,14 @@ class BootcampApplicationViewset(
                     )
                 )
                 .filter(user=self.request.user)
-                .select_related("bootcamp_run__bootcamprunpage", "user")
-                .prefetch_related("bootcamp_run__certificates", "user__enrollments")
+                .select_related(
+                    "bootcamp_run__bootcamprunpage", "bootcamp_run__bootcamp", "user"
+                )
+                .prefetch_related(
+                    "bootcamp_run__certificates",
+                    "bootcamp_run__installment_set",
+                    "user__enrollments",
+                )
                 .order_by("-created_on")
             )
 
@@ -173,11 +195,25 @@ class ReviewSubmissionViewSet(
         .prefetch_related("content_object")
     )
     filterset_class = ApplicationStepSubmissionFilterSet
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, ApplicantSearchFilter]
     pagination_class = ReviewSubmissionPagination
     ordering_fields = ["created_on"]
     ordering = "created_on"
 
+    def paginate_queryset(self, queryset):
+        """Paginate the queryset, then load the interviews for the video submissions on the page in one query"""
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            prefetch_related_objects(
+                [
+                    submission.content_object
+                    for submission in page
+                    if isinstance(submission.content_object, VideoInterviewSubmission)
+                ],
+                "interview",
+            )
+        return page
+
 
 class UploadResumeView(GenericAPIView):
     """
@@ -256,6 +256,30 @@ def test_review_submission_list_expired(admin_drf_client, bootcamp_run_submissio
     }
 
 
+def test_review_submission_list_search(admin_drf_client):
+    """
+    The review submission list view should filter submissions by the applicant's email, username or name,
+    best matches first
+    """
+    matches = [
+        ApplicationStepSubmissionFactory.create(
+            is_review_ready=True, bootcamp_application__user__profile__name=name
+        )
+        for name in ["Janet Smith", "Jane"]
+    ]
+    ApplicationStepSubmissionFactory.create(
+        is_review_ready=True, bootcamp_application__user__profile__name="Nobody"
+    )
+    url = reverse("submissions_api-list")
+    resp = admin_drf_client.get(url, {"q": "jane"})
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.json()["count"] == 2
+    assert [result["id"] for result in resp.json()["results"]] == [
+        matches[1].id,
+        matches[0].id,
+    ]
+
+
 def test_review_submission_list_query_bootcamp_run_id(admin_drf_client):
     """
     The review submission list view should return a list of submissions filtered by bootcamp run id
@@ -0,0 +1,35 @@
+"""
+Admin views for archival
+"""
+
+from django.contrib import admin
+
+from archive.models import ArchiveFile
+from main.utils import get_field_names
+
+
+class ArchiveFileAdmin(admin.ModelAdmin):
+    """Admin for ArchiveFile"""
+
+    model = ArchiveFile
+
+    list_display = (
+        "id",
+        "model_label",
+        "row_count",
+        "first_id",
+        "last_id",
+        "oldest_created_on",
+        "newest_created_on",
+    )
+    list_filter = ("model_label",)
+    readonly_fields = get_field_names(ArchiveFile)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(ArchiveFile, ArchiveFileAdmin)
@@ -0,0 +1,199 @@
+"""API for archiving old rows from append-only tables"""
+from collections import namedtuple
+import gzip
+import json
+import logging
+import tempfile
+
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+
+from archive.models import ArchiveFile
+from compliance.models import ExportsInquiryLog
+from ecommerce.models import OrderAudit, Receipt, WireTransferReceipt
+from jobma.models import InterviewAudit
+
+log = logging.getLogger(__name__)
+
+# Key for the postgres advisory lock which ensures that only one process archives rows at a time
+ARCHIVE_LOCK_ID = 7_210_335
+# The number of rows fetched from the server-side cursor at a time while an archive file is written
+ARCHIVE_FETCH_SIZE = 500
+
+# keep_latest_by: Rows which are the newest for this field are never archived
+# keep: Rows matching this filter are never archived
+ArchivePolicy = namedtuple("ArchivePolicy", ["model", "keep_latest_by", "keep"])
+
+
+def get_archive_policies():
+    """
+    Returns:
+        list of ArchivePolicy: The models which are archived, and the rows of each which are kept regardless of age
+    """
+    return [
+        ArchivePolicy(OrderAudit, keep_latest_by=None, keep=None),
+        ArchivePolicy(InterviewAudit, keep_latest_by=None, keep=None),
+        # The latest receipt for an order is used to show its payment method, and unprocessed receipts haven't
+        # been applied to their order yet
+        ArchivePolicy(
+            Receipt, keep_latest_by="order", keep=Q(processed_on__isnull=True)
+        ),
+        # Wire transfers are looked up by id to find changes whenever the spreadsheet is imported again
+        ArchivePolicy(
+            WireTransferReceipt, keep_latest_by="wire_transfer_id", keep=None
+        ),
+        # The latest inquiry for a user decides whether they passed the export compliance check
+        ArchivePolicy(ExportsInquiryLog, keep_latest_by="user", keep=None),
+    ]
+
+
+def get_archivable_rows(policy, cutoff):
+    """
+    Get the rows of a model which can be archived
+
+    Args:
+        policy (ArchivePolicy): The archive policy for the model
+        cutoff (datetime.datetime): Rows created before this are archived
+
+    Returns:
+        QuerySet: The rows which can be archived, in id order
+    """
+    model = policy.model
+    queryset = model.objects.filter(created_on__lt=cutoff)
+    if policy.keep_latest_by:
+        field = policy.keep_latest_by
+        newer_rows = model.objects.filter(
+            **{field: OuterRef(field), "id__gt": OuterRef("id")}
+        )
+        queryset = queryset.annotate(has_newer=Exists(newer_rows)).filter(
+            Q(**{f"{field}__isnull": True}) | Q(has_newer=True)
+        )
+    if policy.keep is not None:
+        queryset = queryset.exclude(policy.keep)
+    return queryset.order_by("id")
+
+
+def archive_batch(
+    policy, cutoff, batch_size, after_id=0
+):  # pylint: disable=too-many-locals
+    """
+    Move the next batch of old rows for a model into an archive file. Rows are streamed from a server-side cursor
+    into a gzipped temporary file, and the file is saved to storage in the same transaction which deletes the
+    rows, so rows are only deleted once their archive has been written.
+
+    Args:
+        policy (ArchivePolicy): The archive policy for the model
+        cutoff (datetime.datetime): Rows created before this are archived
+        batch_size (int): The maximum number of rows to archive
+        after_id (int): Only rows with a greater id are archived
+
+    Returns:
+        ArchiveFile: The archive which was written, or None if there was nothing to archive or another process
+            is archiving rows
+    """
+    model = policy.model
+    model_label = model._meta.label_lower  # pylint: disable=protected-access
+    field_names = [
+        field.attname
+        for field in model._meta.concrete_fields  # pylint: disable=protected-access
+    ]
+    with transaction.atomic(), tempfile.TemporaryFile() as temp:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [ARCHIVE_LOCK_ID])
+            if not cursor.fetchone()[0]:
+                return None
+
+        rows = (
+            get_archivable_rows(policy, cutoff)
+            .filter(id__gt=after_id)
+            .values(*field_names)[:batch_size]
+        )
+        ids = []
+        created_ons = []
+        with gzip.GzipFile(fileobj=temp, mode="wb") as archive_data:
+            for row in rows.iterator(chunk_size=ARCHIVE_FETCH_SIZE):
+                ids.append(row["id"])
+                created_ons.append(row["created_on"])
+                archive_data.write(json.dumps(row, cls=DjangoJSONEncoder).encode())
+                archive_data.write(b"\n")
+        if not ids:
+            return None
+
+        temp.seek(0)
+        archive = ArchiveFile(
+            model_label=model_label,
+            row_count=len(ids),
+            first_id=ids[0],
+            last_id=ids[-1],
+            oldest_created_on=min(created_ons),
+            newest_created_on=max(created_ons),
+        )
+        file_name = f"{model_label}/{ids[0]}-{ids[-1]}.jsonl.gz"
+        archive.file.save(file_name, File(temp, name=file_name), save=False)
+        archive.save()
+        model.objects.filter(id__in=ids).delete()
+    return archive
+
+
+def archive_rows(policy, cutoff, batch_size):
+    """
+    Archive all of the old rows for a model, one batch at a time
+
+    Args:
+        policy (ArchivePolicy): The archive policy for the model
+        cutoff (datetime.datetime): Rows created before this are archived
+        batch_size (int): The maximum number of rows in each archive file
+
+    Returns:
+        int: The number of rows archived
+    """
+    archived = 0
+    after_id = 0
+    archive = archive_batch(policy, cutoff, batch_size, after_id=after_id)
+    while archive is not None:
+        archived += archive.row_count
+        after_id = archive.last_id
+        archive = archive_batch(policy, cutoff, batch_size, after_id=after_id)
+    return archived
+
+
+def read_archive(archive):
+    """
+    Read the rows in an archive file
+
+    Args:
+        archive (ArchiveFile): The archive
+
+    Yields:
+        dict: Each row, in id order
+    """
+    with archive.file.open("rb") as archive_file, gzip.GzipFile(
+        fileobj=archive_file
+    ) as archive_data:
+        for line in archive_data:
+            yield json.loads(line)
+
+
+def get_archived_row(model, row_id):
+    """
+    Find a row which was moved into an archive. Rows which haven't been archived are still in the model's table.
+
+    Args:
+        model (class of Model): The model the row belonged to
+        row_id (int): The id of the row
+
+    Returns:
+        dict: The archived row, with dates as ISO 8601 strings, or None if it wasn't archived
+    """
+    archives = ArchiveFile.objects.filter(
+        model_label=model._meta.label_lower,  # pylint: disable=protected-access
+        first_id__lte=row_id,
+        last_id__gte=row_id,
+    )
+    for archive in archives:
+        for row in read_archive(archive):
+            if row["id"] == row_id:
+                return row
+    return None
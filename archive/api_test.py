@@ -0,0 +1,120 @@
+"""Tests for archival"""
+# pylint: disable=redefined-outer-name
+from datetime import timedelta
+
+import pytest
+
+from archive.api import (
+    ArchivePolicy,
+    archive_rows,
+    get_archive_policies,
+    get_archivable_rows,
+    get_archived_row,
+    read_archive,
+)
+from archive.models import ArchiveFile
+from compliance.factories import ExportsInquiryLogFactory
+from compliance.models import ExportsInquiryLog
+from ecommerce.factories import OrderFactory, ReceiptFactory
+from ecommerce.models import OrderAudit, Receipt
+from main.utils import now_in_utc
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def cutoff():
+    """The time before which rows are archived"""
+    return now_in_utc() - timedelta(days=30)
+
+
+def get_policy(model):
+    """Returns the archive policy for a model"""
+    return next(policy for policy in get_archive_policies() if policy.model == model)
+
+
+def make_old(model, rows):
+    """Set the created_on date for some rows to before the cutoff"""
+    model.objects.filter(id__in=[row.id for row in rows]).update(
+        created_on=now_in_utc() - timedelta(days=60)
+    )
+
+
+def test_archive_rows(cutoff):
+    """archive_rows should move old rows into archive files in batches"""
+    order = OrderFactory.create()
+    audits = [
+        OrderAudit.objects.create(order=order, data_after={"index": index})
+        for index in range(5)
+    ]
+    make_old(OrderAudit, audits[:3])
+    policy = ArchivePolicy(OrderAudit, keep_latest_by=None, keep=None)
+
+    assert archive_rows(policy, cutoff, batch_size=2) == 3
+    assert list(OrderAudit.objects.order_by("id").values_list("id", flat=True)) == [
+        audit.id for audit in audits[3:]
+    ]
+    archives = list(ArchiveFile.objects.order_by("first_id"))
+    assert [
+        (archive.model_label, archive.first_id, archive.last_id, archive.row_count)
+        for archive in archives
+    ] == [
+        ("ecommerce.orderaudit", audits[0].id, audits[1].id, 2),
+        ("ecommerce.orderaudit", audits[2].id, audits[2].id, 1),
+    ]
+    rows = [row for archive in archives for row in read_archive(archive)]
+    assert [row["data_after"] for row in rows] == [
+        {"index": index} for index in range(3)
+    ]
+    assert {row["order_id"] for row in rows} == {order.id}
+    assert get_archived_row(OrderAudit, audits[1].id) == rows[1]
+    assert get_archived_row(OrderAudit, audits[4].id) is None
+
+
+def test_archive_rows_storage_error(mocker, cutoff):
+    """Rows shouldn't be deleted if their archive file can't be saved"""
+    mocker.patch(
+        "django.db.models.fields.files.FieldFile.save", side_effect=OSError("full")
+    )
+    order = OrderFactory.create()
+    audit = OrderAudit.objects.create(order=order)
+    make_old(OrderAudit, [audit])
+
+    with pytest.raises(OSError):
+        archive_rows(
+            ArchivePolicy(OrderAudit, keep_latest_by=None, keep=None),
+            cutoff,
+            batch_size=10,
+        )
+    assert OrderAudit.objects.filter(id=audit.id).exists()
+    assert ArchiveFile.objects.count() == 0
+
+
+def test_get_archivable_receipts(settings, cutoff):
+    """The latest receipt for each order and unprocessed receipts shouldn't be archived"""
+    settings.CYBERSOURCE_SECURITY_KEY = "fake"
+    first_order, second_order = OrderFactory.create_batch(2)
+    superseded, _ = ReceiptFactory.create_batch(
+        2, order=first_order, processed_on=now_in_utc()
+    )
+    ReceiptFactory.create(order=second_order, processed_on=None)
+    ReceiptFactory.create(order=second_order, processed_on=now_in_utc())
+    orderless = ReceiptFactory.create(order=None, processed_on=now_in_utc())
+    make_old(Receipt, Receipt.objects.all())
+    ReceiptFactory.create(order=None, processed_on=now_in_utc())
+
+    assert list(get_archivable_rows(get_policy(Receipt), cutoff)) == [
+        superseded,
+        orderless,
+    ]
+
+
+def test_get_archivable_inquiries(cutoff):
+    """The latest export inquiry for each user shouldn't be archived"""
+    older, latest = ExportsInquiryLogFactory.create_batch(2)
+    latest.user = older.user
+    latest.save()
+    only = ExportsInquiryLogFactory.create()
+    make_old(ExportsInquiryLog, [older, latest, only])
+
+    assert list(get_archivable_rows(get_policy(ExportsInquiryLog), cutoff)) == [older]
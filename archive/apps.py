@@ -0,0 +1,8 @@
+"""App config for archival"""
+from django.apps import AppConfig
+
+
+class ArchiveConfig(AppConfig):
+    """AppConfig for archive"""
+
+    name = "archive"
@@ -0,0 +1,43 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchiveFile",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+                ("updated_on", models.DateTimeField(auto_now=True)),
+                ("model_label", models.CharField(max_length=255)),
+                ("file", models.FileField(max_length=500, upload_to="archive/")),
+                ("row_count", models.PositiveIntegerField()),
+                ("first_id", models.BigIntegerField()),
+                ("last_id", models.BigIntegerField()),
+                ("oldest_created_on", models.DateTimeField()),
+                ("newest_created_on", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="archivefile",
+            index=models.Index(
+                fields=["model_label", "first_id", "last_id"],
+                name="archive_file_id_range_idx",
+            ),
+        ),
+    ]
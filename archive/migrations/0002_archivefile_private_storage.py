@@ -0,0 +1,21 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+import archive.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("archive", "0001_initial")]
+
+    operations = [
+        migrations.AlterField(
+            model_name="archivefile",
+            name="file",
+            field=models.FileField(
+                max_length=500,
+                storage=archive.storage.ArchiveStorage(),
+                upload_to="archive/",
+            ),
+        )
+    ]
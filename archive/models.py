@@ -0,0 +1,35 @@
+"""Models for archival"""
+from django.db import models
+
+from archive.storage import ArchiveStorage
+from main.models import TimestampedModel
+
+
+class ArchiveFile(TimestampedModel):
+    """
+    A gzipped file of rows which were moved out of a table because they were old. Each line of the file is
+    one row serialized as JSON, and the rows are in id order.
+    """
+
+    # The label of the model the rows were taken from, e.g. "ecommerce.orderaudit"
+    model_label = models.CharField(max_length=255)
+    # Archived rows include personal and payment details, so they're kept out of the public media storage
+    file = models.FileField(
+        upload_to="archive/", max_length=500, storage=ArchiveStorage()
+    )
+    row_count = models.PositiveIntegerField()
+    first_id = models.BigIntegerField()
+    last_id = models.BigIntegerField()
+    oldest_created_on = models.DateTimeField()
+    newest_created_on = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["model_label", "first_id", "last_id"],
+                name="archive_file_id_range_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"Archive of {self.row_count} {self.model_label} rows ({self.first_id}-{self.last_id})"
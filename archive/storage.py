@@ -0,0 +1,43 @@
+"""Storage for archive files, which is private and separate from the public media storage"""
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import cached_property
+from storages.backends.s3boto3 import S3Boto3Storage
+
+
+def get_archive_storage():
+    """
+    Returns:
+        django.core.files.storage.Storage: On S3, a private bucket whose files are only readable with signed
+            URLs. Otherwise a directory outside of MEDIA_ROOT, so the files aren't served.
+    """
+    if settings.BOOTCAMP_ECOMMERCE_USE_S3:
+        return S3Boto3Storage(
+            bucket_name=settings.ARCHIVE_STORAGE_BUCKET_NAME,
+            default_acl="private",
+            bucket_acl="private",
+            querystring_auth=True,
+            querystring_expire=settings.ARCHIVE_URL_EXPIRE_SECONDS,
+            file_overwrite=False,
+        )
+    return FileSystemStorage(location=settings.ARCHIVE_ROOT)
+
+
+@deconstructible
+class ArchiveStorage:
+    """
+    Delegates to the storage from get_archive_storage, which is created the first time it's used. Migrations
+    refer to this class, so they don't depend on the storage settings of the environment they were made in.
+    """
+
+    @cached_property
+    def _storage(self):
+        """The storage which does the work"""
+        return get_archive_storage()
+
+    def __getattr__(self, name):
+        # Protocol lookups from copy and pickle shouldn't create the storage
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self._storage, name)
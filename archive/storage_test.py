@@ -0,0 +1,53 @@
+"""Tests for archive file storage"""
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from storages.backends.s3boto3 import S3Boto3Storage
+
+from archive.models import ArchiveFile
+from archive.storage import ArchiveStorage, get_archive_storage
+
+
+def test_get_archive_storage_s3(settings):
+    """On S3, archive files should be kept in their own private bucket and read with signed URLs"""
+    settings.BOOTCAMP_ECOMMERCE_USE_S3 = True
+    settings.AWS_STORAGE_BUCKET_NAME = "public-media"
+    settings.ARCHIVE_STORAGE_BUCKET_NAME = "private-archive"
+    settings.ARCHIVE_URL_EXPIRE_SECONDS = 60
+    storage = get_archive_storage()
+    assert isinstance(storage, S3Boto3Storage)
+    assert storage.bucket_name == "private-archive"
+    assert storage.default_acl == "private"
+    assert storage.bucket_acl == "private"
+    assert storage.querystring_auth is True
+    assert storage.querystring_expire == 60
+    assert storage.file_overwrite is False
+
+
+def test_get_archive_storage_local(settings, tmp_path):
+    """Without S3, archive files should be kept in a directory outside of MEDIA_ROOT"""
+    settings.BOOTCAMP_ECOMMERCE_USE_S3 = False
+    settings.ARCHIVE_ROOT = str(tmp_path)
+    storage = get_archive_storage()
+    assert isinstance(storage, FileSystemStorage)
+    assert storage.location == str(tmp_path)
+
+
+def test_archive_storage(mocker, tmp_path):
+    """ArchiveStorage should create the storage the first time it's used and delegate to it"""
+    patched_get_storage = mocker.patch(
+        "archive.storage.get_archive_storage",
+        return_value=FileSystemStorage(location=str(tmp_path)),
+    )
+    storage = ArchiveStorage()
+    patched_get_storage.assert_not_called()
+    name = storage.save("archive/rows.jsonl.gz", ContentFile(b"data"))
+    assert storage.exists(name)
+    assert (tmp_path / name).read_bytes() == b"data"
+    patched_get_storage.assert_called_once_with()
+
+
+def test_archive_file_storage():
+    """ArchiveFile should use the archive storage, and migrations shouldn't depend on its settings"""
+    storage = ArchiveFile._meta.get_field("file").storage
+    assert isinstance(storage, ArchiveStorage)
+    assert storage.deconstruct() == ("archive.storage.ArchiveStorage", (), {})
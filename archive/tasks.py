@@ -0,0 +1,26 @@
+"""Tasks for archival"""
+from datetime import timedelta
+import logging
+
+from django.conf import settings
+
+from archive import api
+from main.celery import app
+from main.utils import now_in_utc
+
+log = logging.getLogger(__name__)
+
+
+@app.task
+def archive_old_rows():
+    """Move old rows out of the append-only audit, receipt and compliance tables into archive files"""
+    if not settings.ARCHIVE_ENABLED:
+        return
+    cutoff = now_in_utc() - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+    for policy in api.get_archive_policies():
+        archived = api.archive_rows(policy, cutoff, settings.ARCHIVE_BATCH_SIZE)
+        log.info(
+            "Archived %d %s rows",
+            archived,
+            policy.model._meta.label_lower,  # pylint: disable=protected-access
+        )
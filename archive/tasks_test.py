@@ -0,0 +1,29 @@
+"""Tests for archival tasks"""
+from datetime import timedelta
+
+import pytest
+
+from archive.tasks import archive_old_rows
+from main.utils import now_in_utc
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_archive_old_rows(mocker, settings, enabled):
+    """archive_old_rows should archive rows for each policy when archival is enabled"""
+    settings.ARCHIVE_ENABLED = enabled
+    settings.ARCHIVE_AFTER_DAYS = 10
+    settings.ARCHIVE_BATCH_SIZE = 100
+    now = now_in_utc()
+    mocker.patch("archive.tasks.now_in_utc", return_value=now)
+    policies = [mocker.Mock(), mocker.Mock()]
+    mocker.patch("archive.tasks.api.get_archive_policies", return_value=policies)
+    archive_mock = mocker.patch("archive.tasks.api.archive_rows", return_value=3)
+
+    archive_old_rows.delay()
+
+    if enabled:
+        assert archive_mock.call_args_list == [
+            mocker.call(policy, now - timedelta(days=10), 100) for policy in policies
+        ]
+    else:
+        archive_mock.assert_not_called()
@@ -0,0 +1,270 @@
+"""Verification of reCAPTCHA responses with Google's siteverify API"""
+from collections import Counter, namedtuple
+from functools import lru_cache
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+import requests
+from requests.adapters import HTTPAdapter
+
+log = logging.getLogger(__name__)
+
+SITEVERIFY_URL = "https://www.google.com/recaptcha/api/siteverify"
+ERROR_UNAVAILABLE = "recaptcha-unavailable"
+# Upper bounds of the latency histogram buckets. Anything larger goes into the "+Inf" bucket.
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000)
+INF_BUCKET = "+Inf"
+
+RecaptchaResult = namedtuple("RecaptchaResult", ["success", "response", "available"])
+
+
+class CircuitBreaker:
+    """
+    Stops calling a service for a while after it fails several times in a row, so requests don't wait on
+    timeouts while it's down. Once the reset period has passed a single trial request is let through, and
+    the breaker closes again if it succeeds.
+    """
+
+    def __init__(self, failure_threshold, reset_seconds):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def is_open(self):
+        """True if requests are currently being blocked"""
+        return self._opened_at is not None
+
+    def allow_request(self):
+        """
+        Returns:
+            bool: True if a request to the service should be made
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if (
+                self._trial_running
+                or time.monotonic() - self._opened_at < self.reset_seconds
+            ):
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        """Record that a request to the service succeeded"""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        """Record that a request to the service failed"""
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is None and self._failures < self.failure_threshold:
+                return
+            if self._opened_at is None:
+                log.warning(
+                    "reCAPTCHA verification failed %d times in a row, pausing requests for %d seconds",
+                    self._failures,
+                    self.reset_seconds,
+                )
+            self._opened_at = time.monotonic()
+
+
+class VerifierStats:  # pylint: disable=too-many-instance-attributes
+    """
+    Counts and latencies of the verification requests made by this process. If a log interval is set they're
+    logged once per interval and then reset, so each log line covers the requests since the previous one.
+    """
+
+    def __init__(self, log_interval_seconds=0):
+        self.log_interval_seconds = log_interval_seconds
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.short_circuits = 0
+        self.total_ms = 0.0
+        self.buckets = Counter()
+        self._started_at = time.monotonic()
+
+    def _reset(self):
+        """Start counting again. The caller must hold the lock."""
+        self.requests = 0
+        self.errors = 0
+        self.short_circuits = 0
+        self.total_ms = 0.0
+        self.buckets = Counter()
+        self._started_at = time.monotonic()
+
+    def record_request(self, elapsed_ms, error=False):
+        """Record a request to the siteverify API"""
+        bucket = next(
+            (str(bound) for bound in LATENCY_BUCKETS_MS if elapsed_ms <= bound),
+            INF_BUCKET,
+        )
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.total_ms += elapsed_ms
+            self.buckets[bucket] += 1
+        self._log_if_due()
+
+    def record_short_circuit(self):
+        """Record a verification which was skipped because the circuit breaker was open"""
+        with self._lock:
+            self.short_circuits += 1
+        self._log_if_due()
+
+    def _summarize(self):
+        """Returns the stats as a dict. The caller must hold the lock."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "short_circuits": self.short_circuits,
+            "mean_ms": self.total_ms / self.requests if self.requests else None,
+            "buckets": {
+                bucket: self.buckets[bucket]
+                for bucket in [str(bound) for bound in LATENCY_BUCKETS_MS]
+                + [INF_BUCKET]
+            },
+        }
+
+    def as_dict(self):
+        """
+        Returns:
+            dict: The counts, mean latency and latency histogram
+        """
+        with self._lock:
+            return self._summarize()
+
+    def _log_if_due(self):
+        """Log the stats and reset them if the log interval has passed since they were last logged"""
+        if not self.log_interval_seconds:
+            return
+        with self._lock:
+            elapsed = time.monotonic() - self._started_at
+            if elapsed < self.log_interval_seconds:
+                return
+            summary = self._summarize()
+            self._reset()
+        log.info(
+            "reCAPTCHA verification stats for the last %d seconds: %s",
+            elapsed,
+            json.dumps(summary),
+        )
+
+
+class RecaptchaVerifier:
+    """
+    Verifies reCAPTCHA responses over a pooled HTTP session with strict timeouts. While Google is failing,
+    verifications are answered without a request, and pass or fail depending on fail_open.
+    """
+
+    def __init__(
+        self,
+        *,
+        secret_key,
+        connect_timeout,
+        read_timeout,
+        fail_open,
+        breaker,
+        pool_size,
+        stats_log_seconds=0,
+    ):  # pylint: disable=too-many-arguments
+        self.secret_key = secret_key
+        self.timeout = (connect_timeout, read_timeout)
+        self.fail_open = fail_open
+        self.breaker = breaker
+        self.stats = VerifierStats(stats_log_seconds)
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=pool_size))
+
+    def _unavailable_result(self):
+        """Returns the result for a verification which couldn't be checked with Google"""
+        return RecaptchaResult(
+            success=self.fail_open,
+            response={"success": self.fail_open, "error-codes": [ERROR_UNAVAILABLE]},
+            available=False,
+        )
+
+    def verify(self, response_token, remote_ip=None):
+        """
+        Check a reCAPTCHA response token
+
+        Args:
+            response_token (str): The token submitted by the user's browser
+            remote_ip (Optional[str]): The user's IP address
+
+        Returns:
+            RecaptchaResult: The outcome of the verification
+        """
+        if not self.breaker.allow_request():
+            self.stats.record_short_circuit()
+            return self._unavailable_result()
+
+        data = {"secret": self.secret_key, "response": response_token}
+        if remote_ip:
+            data["remoteip"] = remote_ip
+        start = time.perf_counter()
+        try:
+            resp = self.session.post(SITEVERIFY_URL, data=data, timeout=self.timeout)
+            resp.raise_for_status()
+            response = resp.json()
+        except (requests.RequestException, ValueError):
+            self.stats.record_request((time.perf_counter() - start) * 1000, error=True)
+            self.breaker.record_failure()
+            log.warning("Unable to verify reCAPTCHA response", exc_info=True)
+            return self._unavailable_result()
+
+        self.stats.record_request((time.perf_counter() - start) * 1000)
+        self.breaker.record_success()
+        return RecaptchaResult(
+            success=bool(response.get("success")), response=response, available=True
+        )
+
+
+class StubRecaptchaVerifier:
+    """A verifier for tests which returns a fixed response without calling Google"""
+
+    def __init__(self, response=None, available=True):
+        self.response = response if response is not None else {"success": True}
+        self.available = available
+        self.tokens = []
+
+    def verify(self, response_token, remote_ip=None):  # pylint: disable=unused-argument
+        """Record the token and return the fixed response"""
+        self.tokens.append(response_token)
+        return RecaptchaResult(
+            success=bool(self.response.get("success")),
+            response=self.response,
+            available=self.available,
+        )
+
+
+@lru_cache(maxsize=None)
+def get_recaptcha_verifier():
+    """
+    Returns:
+        RecaptchaVerifier: The verifier shared by every request in this process
+    """
+    return RecaptchaVerifier(
+        secret_key=settings.RECAPTCHA_SECRET_KEY,
+        connect_timeout=settings.RECAPTCHA_CONNECT_TIMEOUT_MS / 1000,
+        read_timeout=settings.RECAPTCHA_READ_TIMEOUT_MS / 1000,
+        fail_open=settings.RECAPTCHA_FAIL_OPEN,
+        breaker=CircuitBreaker(
+            settings.RECAPTCHA_BREAKER_FAILURE_THRESHOLD,
+            settings.RECAPTCHA_BREAKER_RESET_SECONDS,
+        ),
+        pool_size=settings.RECAPTCHA_POOL_SIZE,
+        stats_log_seconds=settings.RECAPTCHA_STATS_LOG_SECONDS,
+    )
@@ -0,0 +1,174 @@
+"""Tests for reCAPTCHA verification"""
+import json
+from urllib.parse import parse_qs
+
+import pytest
+import requests
+
+from authentication.recaptcha import (
+    CircuitBreaker,
+    ERROR_UNAVAILABLE,
+    RecaptchaResult,
+    RecaptchaVerifier,
+    SITEVERIFY_URL,
+    VerifierStats,
+    get_recaptcha_verifier,
+)
+
+
+def make_verifier(fail_open=False, failure_threshold=2, reset_seconds=30):
+    """Create a verifier with a small breaker threshold"""
+    return RecaptchaVerifier(
+        secret_key="secret",
+        connect_timeout=1,
+        read_timeout=3,
+        fail_open=fail_open,
+        breaker=CircuitBreaker(failure_threshold, reset_seconds),
+        pool_size=2,
+    )
+
+
+@pytest.mark.parametrize("success", [True, False])
+def test_verify(mocked_responses, success):
+    """verify should post the token and client IP to Google and return its verdict"""
+    body = {"success": success}
+    if not success:
+        body["error-codes"] = ["invalid-input-response"]
+    mocked_responses.add(mocked_responses.POST, SITEVERIFY_URL, json=body)
+    verifier = make_verifier()
+
+    assert verifier.verify("token", remote_ip="1.2.3.4") == RecaptchaResult(
+        success=success, response=body, available=True
+    )
+    assert parse_qs(mocked_responses.calls[0].request.body) == {
+        "secret": ["secret"],
+        "response": ["token"],
+        "remoteip": ["1.2.3.4"],
+    }
+    stats = verifier.stats.as_dict()
+    assert stats["requests"] == 1
+    assert stats["errors"] == 0
+
+
+@pytest.mark.parametrize("fail_open", [True, False])
+@pytest.mark.parametrize(
+    "response_kwargs",
+    [
+        {"body": requests.exceptions.ReadTimeout()},
+        {"status": 500, "json": {}},
+        {"body": "not json"},
+    ],
+)
+def test_verify_unavailable(mocked_responses, fail_open, response_kwargs):
+    """verify should return an unavailable result which passes only if the verifier fails open"""
+    mocked_responses.add(mocked_responses.POST, SITEVERIFY_URL, **response_kwargs)
+    verifier = make_verifier(fail_open=fail_open)
+
+    assert verifier.verify("token") == RecaptchaResult(
+        success=fail_open,
+        response={"success": fail_open, "error-codes": [ERROR_UNAVAILABLE]},
+        available=False,
+    )
+    assert verifier.stats.as_dict()["errors"] == 1
+
+
+def test_verify_circuit_breaker(mocker, mocked_responses):
+    """After repeated failures verify should stop calling Google until the reset period has passed"""
+    now = mocker.patch("authentication.recaptcha.time.monotonic", return_value=100)
+    mocked_responses.add(
+        mocked_responses.POST, SITEVERIFY_URL, body=requests.exceptions.ConnectTimeout()
+    )
+    verifier = make_verifier(failure_threshold=2, reset_seconds=30)
+
+    for _ in range(4):
+        assert verifier.verify("token").available is False
+    assert len(mocked_responses.calls) == 2
+    assert verifier.breaker.is_open is True
+    assert verifier.stats.as_dict()["short_circuits"] == 2
+
+    # After the reset period a trial request is made, and a success closes the breaker
+    now.return_value = 131
+    mocked_responses.replace(
+        mocked_responses.POST, SITEVERIFY_URL, json={"success": True}
+    )
+    assert verifier.verify("token").success is True
+    assert verifier.breaker.is_open is False
+    assert verifier.verify("token").success is True
+    assert len(mocked_responses.calls) == 4
+
+
+def test_circuit_breaker_trial_failure(mocker):
+    """A failed trial request should keep the breaker open for another reset period"""
+    now = mocker.patch("authentication.recaptcha.time.monotonic", return_value=100)
+    breaker = CircuitBreaker(1, 30)
+    breaker.record_failure()
+    assert breaker.allow_request() is False
+
+    now.return_value = 130
+    assert breaker.allow_request() is True
+    # Only one trial request is allowed at a time
+    assert breaker.allow_request() is False
+    breaker.record_failure()
+    assert breaker.allow_request() is False
+
+    now.return_value = 160
+    assert breaker.allow_request() is True
+
+
+def test_verifier_stats_logged(mocker):
+    """The stats should be logged and reset once the log interval has passed"""
+    now = mocker.patch("authentication.recaptcha.time.monotonic", return_value=100)
+    patched_log = mocker.patch("authentication.recaptcha.log")
+    stats = VerifierStats(log_interval_seconds=60)
+    stats.record_request(40)
+    stats.record_short_circuit()
+    patched_log.info.assert_not_called()
+
+    now.return_value = 160
+    stats.record_request(300, error=True)
+    patched_log.info.assert_called_once()
+    logged = json.loads(patched_log.info.call_args[0][2])
+    assert logged["requests"] == 2
+    assert logged["errors"] == 1
+    assert logged["short_circuits"] == 1
+    assert logged["mean_ms"] == 170
+    assert logged["buckets"]["50"] == 1
+    assert logged["buckets"]["500"] == 1
+    assert stats.as_dict()["requests"] == 0
+
+    stats.record_request(40)
+    patched_log.info.assert_called_once()
+
+
+def test_verifier_stats_not_logged(mocker):
+    """The stats shouldn't be logged or reset if there's no log interval"""
+    now = mocker.patch("authentication.recaptcha.time.monotonic", return_value=100)
+    patched_log = mocker.patch("authentication.recaptcha.log")
+    stats = VerifierStats()
+    now.return_value = 100_000
+    stats.record_request(40)
+    patched_log.info.assert_not_called()
+    assert stats.as_dict()["requests"] == 1
+
+
+def test_get_recaptcha_verifier(settings):
+    """get_recaptcha_verifier should build a single verifier from the settings"""
+    get_recaptcha_verifier.cache_clear()
+    settings.RECAPTCHA_SECRET_KEY = "secret"
+    settings.RECAPTCHA_CONNECT_TIMEOUT_MS = 500
+    settings.RECAPTCHA_READ_TIMEOUT_MS = 2000
+    settings.RECAPTCHA_FAIL_OPEN = True
+    settings.RECAPTCHA_BREAKER_FAILURE_THRESHOLD = 3
+    settings.RECAPTCHA_BREAKER_RESET_SECONDS = 10
+    settings.RECAPTCHA_STATS_LOG_SECONDS = 120
+    try:
+        verifier = get_recaptcha_verifier()
+        assert get_recaptcha_verifier() is verifier
+        assert verifier.secret_key == "secret"
+        assert verifier.timeout == (0.5, 2)
+        assert verifier.fail_open is True
+        assert verifier.breaker.failure_threshold == 3
+        assert verifier.breaker.reset_seconds == 10
+        assert verifier.stats.log_interval_seconds == 120
+    finally:
+        get_recaptcha_verifier.cache_clear()
@@ -1,11 +1,9 @@
 """Authentication views"""
-from urllib.parse import quote
 
-import requests
 from django.conf import settings
-from django.core import mail as django_mail
 from django.contrib.auth import get_user_model, update_session_auth_hash
 from django.shortcuts import render
+from ipware import get_client_ip
 from social_core.backends.email import EmailAuth
 from social_django.models import UserSocialAuth
 from social_django.utils import load_backend
@@ -14,7 +12,6 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from anymail.message import AnymailMessage
 from djoser.views import (
     PasswordResetView as DjoserPasswordResetView,
     PasswordResetConfirmView as DjoserPasswordResetConfirmView,
@@ -23,6 +20,7 @@ from djoser.views import (
 from djoser.utils import ActionViewMixin
 from djoser.email import PasswordResetEmail as DjoserPasswordResetEmail
 
+from authentication.recaptcha import get_recaptcha_verifier
 from authentication.serializers import (
     LoginEmailSerializer,
     LoginPasswordSerializer,
@@ -33,7 +31,8 @@ from authentication.serializers import (
     RegisterComplianceSerializer,
 )
 from authentication.utils import load_drf_strategy
-from mail.v2.api import render_email_templates, send_messages
+from mail.v2.api import queue_template_email
+from mail.v2.constants import EMAIL_PW_RESET
 
 User = get_user_model()
 
@@ -95,15 +94,17 @@ class RegisterEmailView(SocialAuthAPIView):
         if request.session.get("is_hijacked_user", False):
             return Response(status=status.HTTP_403_FORBIDDEN)
         if settings.RECAPTCHA_SITE_KEY:
-            r = requests.post(
-                "https://www.google.com/recaptcha/api/siteverify?secret={key}&response={captcha}".format(
-                    key=quote(settings.RECAPTCHA_SECRET_KEY),
-                    captcha=quote(request.data["recaptcha"]),
-                )
+            client_ip, _ = get_client_ip(request)
+            result = get_recaptcha_verifier().verify(
+                request.data.get("recaptcha", ""), remote_ip=client_ip
             )
-            response = r.json()
-            if not response["success"]:
-                return Response(response, status=status.HTTP_400_BAD_REQUEST)
+            if not result.success:
+                return Response(
+                    result.response,
+                    status=status.HTTP_400_BAD_REQUEST
+                    if result.available
+                    else status.HTTP_503_SERVICE_UNAVAILABLE,
+                )
         return super().post(request, backend_name=backend_name)
 
 
@@ -161,26 +162,17 @@ class CustomPasswordResetEmail(DjoserPasswordResetEmail):
 
     def send(self, to, *args, **kwargs):
         """
-        Overrides djoser.email.PasswordResetEmail#send to use our mail API.
+        Overrides djoser.email.PasswordResetEmail#send to use our mail API. Only the values the template
+        needs are passed on, since the djoser context includes the user object.
         """
         context = self.get_context_data()
         context.update(self.context)
-        with django_mail.get_connection(
-            settings.NOTIFICATION_EMAIL_BACKEND
-        ) as connection:
-            subject, text_body, html_body = render_email_templates(
-                "password_reset", context
-            )
-            msg = AnymailMessage(
-                subject=subject,
-                body=text_body,
-                to=to,
-                from_email=settings.MAILGUN_FROM_EMAIL,
-                connection=connection,
-                headers={"Reply-To": settings.BOOTCAMP_REPLY_TO_ADDRESS},
+        for recipient in to:
+            queue_template_email(
+                EMAIL_PW_RESET,
+                recipient,
+                {"uid": context["uid"], "token": context["token"]},
             )
-            msg.attach_alternative(html_body, "text/html")
-            send_messages([msg])
 
     def get_context_data(self):
         """Adds base_url to the template context"""
@@ -27,6 +27,7 @@ import responses
 from rest_framework import status
 from social_core.backends.email import EmailAuth
 
+from authentication.recaptcha import ERROR_UNAVAILABLE, StubRecaptchaVerifier
 from authentication.serializers import PARTIAL_PIPELINE_TOKEN_KEY
 from authentication.utils import SocialAuthState
 from compliance.constants import RESULT_DENIED, RESULT_SUCCESS
@@ -39,7 +40,7 @@ from compliance.test_utils import (
 from profiles.factories import UserFactory, UserSocialAuthFactory
 from profiles.serializers import UserSerializer
 from main import features
-from main.test_utils import any_instance_of, MockResponse
+from main.test_utils import any_instance_of
 
 pytestmark = [pytest.mark.django_db]
 
@@ -140,10 +141,8 @@ class AuthStateMachine(RuleBasedStateMachine):
     LoginPasswordAbandonedAuthStates = Bundle("login-password-abandoned")
 
     recaptcha_patcher = patch(
-        "authentication.views.requests.post",
-        return_value=MockResponse(
-            content='{"success": true}', status_code=status.HTTP_200_OK
-        ),
+        "authentication.views.get_recaptcha_verifier",
+        return_value=StubRecaptchaVerifier(),
     )
     email_send_patcher = patch(
         "mail.v2.verification_api.send_verification_email", autospec=True
@@ -272,10 +271,9 @@ class AuthStateMachine(RuleBasedStateMachine):
         """Yield a function for this step"""
         self.flow_started = True
         with patch(
-            "authentication.views.requests.post",
-            return_value=MockResponse(
-                content='{"success": false, "error-codes": ["bad-request"]}',
-                status_code=status.HTTP_200_OK,
+            "authentication.views.get_recaptcha_verifier",
+            return_value=StubRecaptchaVerifier(
+                response={"success": False, "error-codes": ["bad-request"]}
             ),
         ) as mock_recaptcha_failure, override_settings(
             **{"RECAPTCHA_SITE_KEY": "fakse"}
@@ -835,6 +833,36 @@ def test_register_email_hijacked(client, user, admin_user):
     assert response.status_code == 403
 
 
+@pytest.mark.parametrize("fail_open", [True, False])
+def test_register_email_recaptcha_unavailable(
+    settings, mocker, mock_email_send, client, fail_open
+):
+    """Registration should be rejected with a 503 while reCAPTCHA can't be verified, unless it fails open"""
+    settings.RECAPTCHA_SITE_KEY = "site-key"
+    verifier = StubRecaptchaVerifier(
+        response={"success": fail_open, "error-codes": [ERROR_UNAVAILABLE]},
+        available=False,
+    )
+    mocker.patch("authentication.views.get_recaptcha_verifier", return_value=verifier)
+    response = client.post(
+        reverse("psa-register-email"),
+        {
+            "flow": SocialAuthState.FLOW_REGISTER,
+            "email": NEW_EMAIL,
+            "recaptcha": "token",
+        },
+    )
+    assert verifier.tokens == ["token"]
+    if fail_open:
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["state"] == SocialAuthState.STATE_REGISTER_CONFIRM_SENT
+        mock_email_send.assert_called_once()
+    else:
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json() == {"success": False, "error-codes": [ERROR_UNAVAILABLE]}
+        mock_email_send.assert_not_called()
+
+
 class DjoserViewTests:
     """Tests for views that modify Djoser views"""
 
@@ -6,6 +6,7 @@ from fixtures.autouse import *
 from fixtures.cybersource import *
 
 TEST_MEDIA_ROOT = "/var/media/test_media_root"
+TEST_ARCHIVE_ROOT = "/var/media/test_archive_root"
 
 
 def pytest_addoption(parser):
@@ -15,6 +16,11 @@ def pytest_addoption(parser):
         action="store_true",
         help="Run tests only (no cov, no pylint, warning output silenced)",
     )
+    parser.addoption(
+        "--update-perf-baselines",
+        action="store_true",
+        help="Record the query counts, timings and payload sizes of the endpoint budget tests as new baselines",
+    )
 
 
 def pytest_cmdline_main(config):
@@ -31,6 +37,7 @@ def pytest_configure(config):
     # fixture can't be used here, and an environment variable can't be used because we don't yet have a way to define
     # env vars that will be set exclusively for the test suite when Docker containers are spun up.
     settings.MEDIA_ROOT = TEST_MEDIA_ROOT
+    settings.ARCHIVE_ROOT = TEST_ARCHIVE_ROOT
     if getattr(config.option, "simple") is True:
         # NOTE: These plugins are already configured by the time the pytest_cmdline_main hook is run, so we can't
         #       simply add/alter the command line options in that hook. This hook is being used to
@@ -0,0 +1,2 @@
+"""Initialize ecommerce app"""
+default_app_config = "ecommerce.apps.EcommerceConfig"
@@ -6,9 +6,20 @@ from django.contrib import admin
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 
-from main.admin import TimestampedModelAdmin
+from main.admin import (
+    EstimatedCountModelAdmin,
+    TimestampedModelAdmin,
+    UserSearchModelAdmin,
+)
 from main.utils import get_field_names
-from ecommerce.models import Line, Order, OrderAudit, Receipt, WireTransferReceipt
+from ecommerce.models import (
+    BootcampRunRevenue,
+    Line,
+    Order,
+    OrderAudit,
+    Receipt,
+    WireTransferReceipt,
+)
 from applications import models as application_models
 
 
@@ -27,7 +38,7 @@ class LineAdmin(TimestampedModelAdmin):
         return False
 
 
-class OrderAdmin(TimestampedModelAdmin):
+class OrderAdmin(UserSearchModelAdmin, EstimatedCountModelAdmin, TimestampedModelAdmin):
     """Admin for Order"""
 
     model = Order
@@ -89,7 +100,7 @@ class OrderAdmin(TimestampedModelAdmin):
     application_link.short_description = "Application"
 
 
-class OrderAuditAdmin(admin.ModelAdmin):
+class OrderAuditAdmin(EstimatedCountModelAdmin):
     """Admin for OrderAudit"""
 
     model = OrderAudit
@@ -102,7 +113,7 @@ class OrderAuditAdmin(admin.ModelAdmin):
         return False
 
 
-class ReceiptAdmin(TimestampedModelAdmin):
+class ReceiptAdmin(EstimatedCountModelAdmin, TimestampedModelAdmin):
     """Admin for Receipt"""
 
     model = Receipt
@@ -213,6 +224,30 @@ class WireTransferReceiptAdmin(TimestampedModelAdmin):
     order_link.short_description = "Order"
 
 
+class BootcampRunRevenueAdmin(TimestampedModelAdmin):
+    """Admin for BootcampRunRevenue"""
+
+    model = BootcampRunRevenue
+    include_timestamps_in_list = True
+    readonly_fields = get_field_names(BootcampRunRevenue)
+    list_display = (
+        "bootcamp_run",
+        "paid",
+        "refunded",
+        "expected_revenue",
+        "outstanding_balance",
+    )
+    list_select_related = ("bootcamp_run",)
+    search_fields = ("bootcamp_run__title",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(BootcampRunRevenue, BootcampRunRevenueAdmin)
 admin.site.register(Line, LineAdmin)
 admin.site.register(Order, OrderAdmin)
 admin.site.register(OrderAudit, OrderAuditAdmin)
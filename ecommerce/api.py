@@ -1,8 +1,9 @@
+# pylint: disable=too-many-lines
 """
 Functions for ecommerce
 """
 from base64 import b64encode
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 import csv
 from datetime import datetime, timedelta
 from decimal import Decimal
@@ -16,8 +17,20 @@ from dateutil.parser import parse as parse_datetime
 from django.core.management.base import CommandError
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import transaction
-from django.db.models import Q
+from django.db import connection, transaction
+from django.db.models import (
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Prefetch,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, Greatest, Least
 from django.utils.timezone import is_naive, make_aware
 from django_fsm import TransitionNotAllowed
 import pytz
@@ -28,7 +41,16 @@ from applications.models import BootcampApplication
 from applications.serializers import BootcampApplicationDetailSerializer
 from ecommerce import tasks
 from ecommerce.constants import (
+    CYBERSOURCE_DECISION_ACCEPT,
     CYBERSOURCE_DECISION_CANCEL,
+    PERSONAL_PRICE_EMAIL,
+    PERSONAL_PRICE_HEADER_FIELDS,
+    PERSONAL_PRICE_PRICE,
+    PERSONAL_PRICE_RUN_KEY,
+    REFUND_AMOUNT,
+    REFUND_EMAIL,
+    REFUND_HEADER_FIELDS,
+    REFUND_RUN_KEY,
     WIRE_TRANSFER_AMOUNT,
     WIRE_TRANSFER_ID,
     WIRE_TRANSFER_LEARNER_EMAIL,
@@ -37,22 +59,67 @@ from ecommerce.constants import (
     WIRE_TRANSFER_BOOTCAMP_NAME,
 )
 from ecommerce.exceptions import (
+    BatchRefundException,
     EcommerceException,
     ParseException,
+    PersonalPriceImportException,
     WireTransferImportException,
 )
-from ecommerce.models import Line, Order, WireTransferReceipt
+from ecommerce.models import (
+    BootcampRunRevenue,
+    InstallmentReminder,
+    Line,
+    Order,
+    OrderAudit,
+    Receipt,
+    WireTransferReceipt,
+)
+from hubspot.task_helpers import (
+    sync_hubspot_application_from_order,
+    sync_hubspot_applications,
+)
 from klasses.api import deactivate_run_enrollment
 from klasses.constants import ENROLL_CHANGE_STATUS_REFUNDED
-from klasses.models import BootcampRun
+from klasses.models import (
+    BootcampRun,
+    BootcampRunEnrollment,
+    Installment,
+    PersonalPrice,
+)
 from klasses.serializers import InstallmentSerializer
+from mail import tasks as mail_tasks
 from mail.api import MailgunClient
 from mail.v2 import api as mail_api
-from mail.v2.constants import EMAIL_RECEIPT
-from main.utils import remove_html_tags
+from mail.v2.constants import EMAIL_INSTALLMENT_REMINDER, EMAIL_RECEIPT
+from main import features
+from main.utils import (
+    chunks,
+    group_into_dict,
+    now_in_utc,
+    remove_html_tags,
+    serialize_model_object,
+)
+from novoed import tasks as novoed_tasks
+from outbox.api import enqueue_task
+from profiles.api import find_users
 
 User = get_user_model()
 ISO_8601_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+# Applications in these states have been admitted, so the price of their run is expected to be paid
+REVENUE_APP_STATES = [AppStates.AWAITING_PAYMENT.value, AppStates.COMPLETE.value]
+_MONEY_FIELD = DecimalField(max_digits=20, decimal_places=2)
+# Key for the postgres advisory lock which ensures that only one process sends installment reminders at a time
+INSTALLMENT_REMINDER_LOCK_ID = 7_210_336
+# The number of application state changes applied at a time by a personal price import
+PERSONAL_PRICE_BATCH_SIZE = 100
+# The number of refunds whose applications and enrollments are updated at a time by a batch refund
+BATCH_REFUND_SIZE = 100
+# Applications in these states can be refunded, as in BootcampApplication.refund
+REFUNDABLE_APP_STATES = [
+    AppStates.COMPLETE.value,
+    AppStates.AWAITING_PAYMENT.value,
+    AppStates.REFUNDED.value,
+]
 log = logging.getLogger(__name__)
 _REFERENCE_NUMBER_PREFIX = "BOOTCAMP-"
 
@@ -366,7 +433,9 @@ def complete_successful_order(order, send_receipt=True):
             )
 
     if send_receipt is True:
-        tasks.send_receipt_email.delay(application.id)
+        enqueue_task(
+            tasks.send_receipt_email, args=[application.id], aggregate=application
+        )
 
 
 def handle_rejected_order(*, order, decision):
@@ -401,6 +470,73 @@ def handle_rejected_order(*, order, decision):
             )
 
 
+def save_receipt(data):
+    """
+    Save the message from CyberSource in a receipt. Messages that CyberSource resends for the same
+    transaction are matched to the receipt which was already saved.
+
+    Args:
+        data (dict): The message from CyberSource
+
+    Returns:
+        (Receipt, bool): The receipt paired with a flag indicating whether it was newly created
+    """
+    transaction_uuid = data.get("req_transaction_uuid")
+    if not transaction_uuid:
+        return Receipt.objects.create(data=data), True
+    return Receipt.objects.get_or_create(
+        transaction_uuid=transaction_uuid, defaults={"data": data}
+    )
+
+
+def fulfill_receipt(receipt_id):
+    """
+    Fulfill or reject the order for a CyberSource receipt. Receipts which were already processed are skipped,
+    and the order row is locked so that concurrent workers can't fulfill the same order twice.
+
+    Args:
+        receipt_id (int): The id of a Receipt
+    """
+    receipt = Receipt.objects.get(id=receipt_id)
+    if receipt.processed_on is not None:
+        log.info("Receipt %d was already processed", receipt.id)
+        return
+
+    # Link the order with the receipt if we can parse it
+    order = get_new_order_by_reference_number(receipt.data["req_reference_number"])
+    receipt.order = order
+    receipt.save()
+
+    decision = receipt.data["decision"]
+    with transaction.atomic():
+        order = (
+            Order.objects.select_for_update(of=("self",))
+            .select_related("application")
+            .get(id=order.id)
+        )
+        if Receipt.objects.filter(id=receipt.id, processed_on__isnull=False).exists():
+            log.info("Receipt %d was already processed", receipt.id)
+            return
+
+        if order.status == Order.FAILED and decision == CYBERSOURCE_DECISION_CANCEL:
+            # This is a duplicate message, ignore since it's already handled
+            Receipt.objects.filter(id=receipt.id).update(processed_on=now_in_utc())
+            return
+        elif order.status != Order.CREATED:
+            raise EcommerceException(
+                "Order {} is expected to have status 'created'".format(order.id)
+            )
+
+        if decision != CYBERSOURCE_DECISION_ACCEPT:
+            handle_rejected_order(order=order, decision=decision)
+        else:
+            complete_successful_order(order)
+        Receipt.objects.filter(id=receipt.id).update(processed_on=now_in_utc())
+
+    # Sync order data with hubspot
+    sync_hubspot_application_from_order(order)
+
+
 def serialize_user_bootcamp_runs(user):
     """
     Returns serialized bootcamp run and payment details for a user.
@@ -411,12 +547,50 @@ def serialize_user_bootcamp_runs(user):
     Returns:
         list: list of dictionaries describing a bootcamp run and payments for it by the user
     """
-    return [
-        serialize_user_bootcamp_run(user, bootcamp_run)
-        for bootcamp_run in BootcampRun.objects.filter(applications__user=user)
+    bootcamp_runs = (
+        BootcampRun.objects.filter(applications__user=user)
         .select_related("bootcamp")
+        .prefetch_related(
+            "installment_set",
+            Prefetch(
+                "personal_prices",
+                queryset=PersonalPrice.objects.filter(user=user),
+                to_attr="user_personal_prices",
+            ),
+        )
         .order_by("run_key")
-    ]
+    )
+    lines_by_run = group_into_dict(
+        Line.fulfilled_for_user(user)
+        .select_related("order", "bootcamp_run")
+        .order_by("order__created_on"),
+        key_fn=lambda line: line.bootcamp_run_id,
+    )
+
+    serialized_runs = []
+    for bootcamp_run in bootcamp_runs:
+        # Computed from the prefetched rows to avoid several queries for every run
+        installments = sorted(
+            bootcamp_run.installment_set.all(),
+            key=lambda installment: installment.deadline,
+        )
+        if bootcamp_run.user_personal_prices:
+            price = bootcamp_run.user_personal_prices[0].price
+        elif installments:
+            price = sum(installment.amount for installment in installments)
+        else:
+            price = None
+        lines = lines_by_run.get(bootcamp_run.id, [])
+        serialized_runs.append(
+            _serialize_user_bootcamp_run(
+                bootcamp_run,
+                price=price,
+                total_paid=sum(line.price for line in lines),
+                lines=lines,
+                installments=installments,
+            )
+        )
+    return serialized_runs
 
 
 def serialize_user_bootcamp_run(user, bootcamp_run):
@@ -430,7 +604,31 @@ def serialize_user_bootcamp_run(user, bootcamp_run):
     Returns:
         dict: a dictionary describing a bootcamp run and payments for it by the user
     """
+    return _serialize_user_bootcamp_run(
+        bootcamp_run,
+        price=bootcamp_run.personal_price(user),
+        total_paid=Line.total_paid_for_bootcamp_run(user, bootcamp_run).get("total"),
+        lines=Line.for_user_bootcamp_run(user, bootcamp_run),
+        installments=bootcamp_run.installment_set.order_by("deadline"),
+    )
+
+
+def _serialize_user_bootcamp_run(
+    bootcamp_run, *, price, total_paid, lines, installments
+):
+    """
+    Serialize a bootcamp run along with payment details which were already looked up for a user
+
+    Args:
+        bootcamp_run (klasses.models.BootcampRun): a bootcamp run
+        price (Decimal): the price of the run for the user
+        total_paid (Decimal): the total the user paid for the run, or None if they haven't paid anything
+        lines (iterable of Line): lines for the user's fulfilled orders for the run
+        installments (iterable of klasses.models.Installment): installments for the run, ordered by deadline
 
+    Returns:
+        dict: a dictionary describing a bootcamp run and payments for it by the user
+    """
     from ecommerce.serializers import LineSerializer
 
     return {
@@ -439,15 +637,10 @@ def serialize_user_bootcamp_run(user, bootcamp_run):
         "display_title": bootcamp_run.display_title,
         "start_date": bootcamp_run.start_date,
         "end_date": bootcamp_run.end_date,
-        "price": bootcamp_run.personal_price(user),
-        "total_paid": Line.total_paid_for_bootcamp_run(user, bootcamp_run).get("total")
-        or Decimal("0.00"),
-        "payments": LineSerializer(
-            Line.for_user_bootcamp_run(user, bootcamp_run), many=True
-        ).data,
-        "installments": InstallmentSerializer(
-            bootcamp_run.installment_set.order_by("deadline"), many=True
-        ).data,
+        "price": price,
+        "total_paid": total_paid or Decimal("0.00"),
+        "payments": LineSerializer(lines, many=True).data,
+        "installments": InstallmentSerializer(installments, many=True).data,
     }
 
 
@@ -685,3 +878,833 @@ def import_wire_transfers(csv_path, force_flag=False):
                 raise WireTransferImportException(
                     f"Error while importing row with Id column={wire_transfer.id}"
                 )
+
+
+def annotate_application_balances(queryset):
+    """
+    Annotate bootcamp applications with the price of the run for the user, the amount they've paid and their
+    balance. These are worked out the same way as for the user's bootcamp run payment details, but in subqueries
+    so they can be filtered and aggregated in a single query.
+
+    Args:
+        queryset (QuerySet): A queryset of BootcampApplication
+
+    Returns:
+        QuerySet: The queryset annotated with run_price, amount_paid and balance. These don't use the names of
+            the price and total_paid properties of BootcampApplication, which can't be set.
+    """
+    personal_price = PersonalPrice.objects.filter(
+        bootcamp_run=OuterRef("bootcamp_run"), user=OuterRef("user")
+    ).values("price")[:1]
+    installment_total = (
+        Installment.objects.filter(bootcamp_run=OuterRef("bootcamp_run"))
+        .order_by()
+        .values("bootcamp_run")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    total_paid = (
+        Line.objects.filter(
+            bootcamp_run=OuterRef("bootcamp_run"),
+            order__user=OuterRef("user"),
+            order__status=Order.FULFILLED,
+        )
+        .order_by()
+        .values("bootcamp_run")
+        .annotate(total=Sum("price"))
+        .values("total")
+    )
+    return queryset.annotate(
+        run_price=Coalesce(
+            Subquery(personal_price, output_field=_MONEY_FIELD),
+            Subquery(installment_total, output_field=_MONEY_FIELD),
+        ),
+        amount_paid=Coalesce(
+            Subquery(total_paid, output_field=_MONEY_FIELD),
+            Value(0),
+            output_field=_MONEY_FIELD,
+        ),
+        balance=ExpressionWrapper(
+            F("run_price") - F("amount_paid"), output_field=_MONEY_FIELD
+        ),
+    )
+
+
+def request_run_revenue_update(bootcamp_run_id):
+    """
+    Request a task to recalculate the revenue totals for a bootcamp run once the current transaction commits.
+    Requests for a run which is already waiting to be updated are ignored.
+
+    Args:
+        bootcamp_run_id (int): The id of the bootcamp run
+    """
+    enqueue_task(
+        tasks.update_run_revenue,
+        kwargs={"bootcamp_run_id": bootcamp_run_id},
+        deduplicate=True,
+    )
+
+
+@transaction.atomic
+def update_run_revenue(bootcamp_run_id):
+    """
+    Recalculate the revenue totals for a bootcamp run. Only the rows for the run are read, so this is run for
+    each run affected by a payment, refund, price change or application state change.
+
+    Args:
+        bootcamp_run_id (int): The id of the bootcamp run
+
+    Returns:
+        BootcampRunRevenue: The updated totals, or None if the run doesn't exist
+    """
+    if not BootcampRun.objects.filter(id=bootcamp_run_id).exists():
+        return None
+    revenue, _ = BootcampRunRevenue.objects.get_or_create(
+        bootcamp_run_id=bootcamp_run_id
+    )
+    # Lock the row so that concurrent updates for a run are applied one at a time, each reading the latest data
+    revenue = BootcampRunRevenue.objects.select_for_update().get(id=revenue.id)
+
+    payments = Line.objects.filter(
+        bootcamp_run_id=bootcamp_run_id, order__status=Order.FULFILLED
+    ).aggregate(
+        paid=Sum("price", filter=Q(price__gt=0)),
+        refunded=Sum("price", filter=Q(price__lt=0)),
+    )
+    applications = BootcampApplication.objects.filter(bootcamp_run_id=bootcamp_run_id)
+    balances = annotate_application_balances(
+        applications.filter(state__in=REVENUE_APP_STATES)
+    ).aggregate(
+        expected_revenue=Sum("run_price"),
+        outstanding_balance=Sum(
+            Greatest("balance", Value(0), output_field=_MONEY_FIELD)
+        ),
+    )
+
+    revenue.paid = payments["paid"] or 0
+    revenue.refunded = -(payments["refunded"] or 0)
+    revenue.expected_revenue = balances["expected_revenue"] or 0
+    revenue.outstanding_balance = balances["outstanding_balance"] or 0
+    revenue.application_state_counts = dict(
+        applications.order_by().values_list("state").annotate(count=Count("id"))
+    )
+    revenue.save()
+    return revenue
+
+
+def rebuild_run_revenue():
+    """
+    Recalculate the revenue totals for every bootcamp run
+
+    Returns:
+        int: The number of bootcamp runs which were updated
+    """
+    run_ids = list(BootcampRun.objects.order_by("id").values_list("id", flat=True))
+    for bootcamp_run_id in run_ids:
+        update_run_revenue(bootcamp_run_id)
+    return len(run_ids)
+
+
+def get_upcoming_installments(now, days):
+    """
+    Get the next installment for every bootcamp run which has one due within a number of days
+
+    Args:
+        now (datetime.datetime): The current time
+        days (int): The number of days to look ahead
+
+    Returns:
+        QuerySet: Installments annotated with total_due, the sum of the run's installments up to and including it
+    """
+    total_due = (
+        Installment.objects.filter(
+            bootcamp_run=OuterRef("bootcamp_run"), deadline__lte=OuterRef("deadline")
+        )
+        .order_by()
+        .values("bootcamp_run")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    return (
+        Installment.objects.filter(
+            deadline__gte=now, deadline__lte=now + timedelta(days=days)
+        )
+        .order_by("bootcamp_run_id", "deadline")
+        .distinct("bootcamp_run_id")
+        .select_related("bootcamp_run")
+        .annotate(total_due=Subquery(total_due, output_field=_MONEY_FIELD))
+    )
+
+
+def get_applications_to_remind(installment):
+    """
+    Get the applications awaiting payment for an installment's bootcamp run where the applicant has paid less
+    than is due by its deadline, and who haven't been reminded about it yet
+
+    Args:
+        installment (Installment): An installment annotated with total_due
+
+    Returns:
+        QuerySet: Applications annotated with run_price, amount_paid and amount_due
+    """
+    applications = BootcampApplication.objects.filter(
+        bootcamp_run_id=installment.bootcamp_run_id,
+        state=AppStates.AWAITING_PAYMENT.value,
+    ).exclude(installment_reminders__installment=installment)
+    return (
+        annotate_application_balances(applications)
+        .annotate(
+            # Applicants with a personal price lower than the installments never owe more than that price
+            amount_due=Least(
+                Value(installment.total_due, output_field=_MONEY_FIELD),
+                F("run_price"),
+                output_field=_MONEY_FIELD,
+            )
+        )
+        .filter(amount_paid__lt=F("amount_due"))
+        .select_related("user__profile")
+        .order_by("id")
+    )
+
+
+def send_installment_reminders(now=None):
+    """
+    Remind applicants who haven't paid enough for the next installment of their bootcamp run. Each applicant is
+    reminded at most once per installment. The reminders and their emails are written to the outbox in one
+    transaction, and the emails are sent by a worker which retries them if the ESP is unavailable.
+
+    Args:
+        now (Optional[datetime.datetime]): The current time
+
+    Returns:
+        int: The number of reminders queued, or None if another process is sending reminders
+    """
+    now = now or now_in_utc()
+    reminder_count = 0
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_try_advisory_xact_lock(%s)", [INSTALLMENT_REMINDER_LOCK_ID]
+            )
+            if not cursor.fetchone()[0]:
+                return None
+
+        for installment in get_upcoming_installments(
+            now, settings.INSTALLMENT_REMINDER_DAYS
+        ):
+            applications = list(get_applications_to_remind(installment))
+            InstallmentReminder.objects.bulk_create(
+                [
+                    InstallmentReminder(
+                        installment=installment,
+                        application=application,
+                        amount_due=application.amount_due,
+                    )
+                    for application in applications
+                ]
+            )
+            for application in applications:
+                for recipient, _ in mail_api.safe_format_recipients([application.user]):
+                    enqueue_task(
+                        mail_tasks.send_template_email,
+                        args=[
+                            EMAIL_INSTALLMENT_REMINDER,
+                            recipient,
+                            _get_installment_reminder_context(installment, application),
+                        ],
+                        aggregate=application,
+                    )
+            reminder_count += len(applications)
+
+    log.info("Queued %d installment reminders", reminder_count)
+    return reminder_count
+
+
+def _get_installment_reminder_context(installment, application):
+    """Returns the email context for an installment reminder, which is serialized for the mail task"""
+    return {
+        "name": application.user.profile.name,
+        "bootcamp_run_title": installment.bootcamp_run.title,
+        "deadline": installment.deadline.strftime(ISO_8601_FORMAT),
+        "amount_due": str(application.amount_due),
+        "total_paid": str(application.amount_paid),
+        "balance_due": str(application.amount_due - application.amount_paid),
+    }
+
+
+PersonalPriceChange = namedtuple("PersonalPriceChange", ["email", "run_key", "price"])
+# application, old_state and new_state are None if the user hasn't applied to the run
+PersonalPriceDiff = namedtuple(
+    "PersonalPriceDiff",
+    [
+        "user",
+        "bootcamp_run",
+        "old_price",
+        "new_price",
+        "application",
+        "old_state",
+        "new_state",
+    ],
+)
+
+
+def parse_personal_price_rows(rows):
+    """
+    Convert rows of a personal price import to PersonalPriceChange objects
+
+    Args:
+        rows (iterable of dict): Rows with email, run_key and price values
+
+    Returns:
+        list of PersonalPriceChange: The personal prices to set
+    """
+    changes = []
+    for index, row in enumerate(rows):
+        try:
+            price = Decimal(str(row[PERSONAL_PRICE_PRICE]))
+            change = PersonalPriceChange(
+                email=str(row[PERSONAL_PRICE_EMAIL]).strip(),
+                run_key=int(row[PERSONAL_PRICE_RUN_KEY]),
+                price=price,
+            )
+        except (KeyError, TypeError, ValueError, ArithmeticError) as exc:
+            raise PersonalPriceImportException(
+                f"Invalid personal price in row {index + 1}"
+            ) from exc
+        if not price.is_finite() or price < 0:
+            raise PersonalPriceImportException(
+                f"Invalid personal price in row {index + 1}"
+            )
+        changes.append(change)
+    return changes
+
+
+def parse_personal_price_csv(csv_file):
+    """
+    Read a CSV file of personal prices
+
+    Args:
+        csv_file (file): A text file with email, run_key and price columns
+
+    Returns:
+        list of PersonalPriceChange: The personal prices to set
+    """
+    reader = csv.DictReader(csv_file)
+    for field in PERSONAL_PRICE_HEADER_FIELDS:
+        if field not in (reader.fieldnames or []):
+            raise PersonalPriceImportException(f"Unable to find column header {field}")
+    return parse_personal_price_rows(reader)
+
+
+def _get_new_state(application, new_price):
+    """
+    Returns the state an application should be in for a new price, using the same rules as
+    adjust_app_state_for_new_price
+    """
+    needs_payment = application.amount_paid < new_price
+    if needs_payment and application.state == AppStates.COMPLETE.value:
+        return AppStates.AWAITING_PAYMENT.value
+    if not needs_payment and application.state == AppStates.AWAITING_PAYMENT.value:
+        return AppStates.COMPLETE.value
+    return application.state
+
+
+def _get_users_and_runs(rows, exception_class):
+    """
+    Look up the user and bootcamp run for each row of an import, with one query for the users and one for
+    the runs
+
+    Args:
+        rows (list of namedtuple): Rows with email and run_key values
+        exception_class (class of Exception): The exception raised for unknown emails or run keys
+
+    Returns:
+        list of (User, BootcampRun): The user and bootcamp run for each row
+    """
+    users, missing_emails = find_users([row.email for row in rows])
+    if missing_emails:
+        raise exception_class(
+            f"Could not find users with emails: {', '.join(sorted(missing_emails))}"
+        )
+    users_by_email = {user.email.lower(): user for user in users}
+    run_keys = {row.run_key for row in rows}
+    runs_by_key = {
+        bootcamp_run.run_key: bootcamp_run
+        for bootcamp_run in BootcampRun.objects.filter(run_key__in=run_keys)
+    }
+    missing_run_keys = run_keys - set(runs_by_key)
+    if missing_run_keys:
+        raise exception_class(
+            f"Could not find bootcamp runs with run keys: {sorted(missing_run_keys)}"
+        )
+    return [
+        (users_by_email[row.email.lower()], runs_by_key[row.run_key]) for row in rows
+    ]
+
+
+def preview_personal_prices(changes):
+    """
+    Work out the effect of setting personal prices without changing anything. The users, runs, current prices
+    and applications for all of the changes are each looked up in a single query.
+
+    Args:
+        changes (list of PersonalPriceChange): The personal prices to set
+
+    Returns:
+        list of PersonalPriceDiff: The current and new price and application state for each change
+    """
+    if not changes:
+        return []
+    pairs = _get_users_and_runs(changes, PersonalPriceImportException)
+    pair_ids = [(user.id, bootcamp_run.id) for user, bootcamp_run in pairs]
+    if len(set(pair_ids)) < len(pair_ids):
+        raise PersonalPriceImportException(
+            "Each user can only have one personal price per bootcamp run"
+        )
+    user_ids = {user_id for user_id, _ in pair_ids}
+    run_ids = {run_id for _, run_id in pair_ids}
+    old_prices = {
+        (price.user_id, price.bootcamp_run_id): price.price
+        for price in PersonalPrice.objects.filter(
+            user_id__in=user_ids, bootcamp_run_id__in=run_ids
+        )
+    }
+    applications = {
+        (application.user_id, application.bootcamp_run_id): application
+        for application in annotate_application_balances(
+            BootcampApplication.objects.filter(
+                user_id__in=user_ids, bootcamp_run_id__in=run_ids
+            ).select_related("user", "bootcamp_run")
+        )
+    }
+
+    diffs = []
+    for change, (user, bootcamp_run), pair_id in zip(changes, pairs, pair_ids):
+        application = applications.get(pair_id)
+        diffs.append(
+            PersonalPriceDiff(
+                user=user,
+                bootcamp_run=bootcamp_run,
+                old_price=old_prices.get(pair_id),
+                new_price=change.price,
+                application=application,
+                old_state=application.state if application else None,
+                new_state=_get_new_state(application, change.price)
+                if application
+                else None,
+            )
+        )
+    return diffs
+
+
+def _upsert_personal_prices(diffs):
+    """Insert or update the personal prices for some changes in a single statement"""
+    table = PersonalPrice._meta.db_table  # pylint: disable=protected-access
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (bootcamp_run_id, user_id, price, application_stage)
+            SELECT bootcamp_run_id, user_id, price, ''
+            FROM unnest(%s::integer[], %s::integer[], %s::numeric[]) AS prices(bootcamp_run_id, user_id, price)
+            ON CONFLICT (bootcamp_run_id, user_id) DO UPDATE SET price = EXCLUDED.price
+            """,
+            [
+                [diff.bootcamp_run.id for diff in diffs],
+                [diff.user.id for diff in diffs],
+                [diff.new_price for diff in diffs],
+            ],
+        )
+
+
+def _apply_state_changes(diffs):
+    """
+    Apply the application state changes for a batch of personal price changes. The transitions run as usual,
+    but the new states are saved with one update per state instead of saving each application.
+    """
+    application_ids_by_state = defaultdict(list)
+    for diff in diffs:
+        application = diff.application
+        if diff.new_state == AppStates.COMPLETE.value:
+            application.complete()
+        else:
+            application.await_further_payment()
+        application_ids_by_state[application.state].append(application.id)
+    for state, application_ids in application_ids_by_state.items():
+        BootcampApplication.objects.filter(id__in=application_ids).update(state=state)
+
+
+@transaction.atomic
+def import_personal_prices(changes):
+    """
+    Set many personal prices at once. Prices are written in a single statement, and the application state
+    changes are applied in batches, rather than each price going through the PersonalPrice signals. One
+    HubSpot sync is requested for all of the affected applications.
+
+    Args:
+        changes (list of PersonalPriceChange): The personal prices to set
+
+    Returns:
+        list of PersonalPriceDiff: The personal prices which changed
+    """
+    diffs = [
+        diff
+        for diff in preview_personal_prices(changes)
+        if diff.old_price != diff.new_price
+    ]
+    if not diffs:
+        return []
+
+    _upsert_personal_prices(diffs)
+    for batch in chunks(
+        [diff for diff in diffs if diff.new_state != diff.old_state],
+        chunk_size=PERSONAL_PRICE_BATCH_SIZE,
+    ):
+        _apply_state_changes(batch)
+
+    for bootcamp_run_id in sorted({diff.bootcamp_run.id for diff in diffs}):
+        request_run_revenue_update(bootcamp_run_id)
+    sync_hubspot_applications([diff.application for diff in diffs if diff.application])
+    log.info("Imported %d personal prices", len(diffs))
+    return diffs
+
+
+def serialize_personal_price_diff(diff):
+    """
+    Returns:
+        dict: A description of a personal price change for a preview or the import results
+    """
+    return {
+        "email": diff.user.email,
+        "run_key": diff.bootcamp_run.run_key,
+        "bootcamp_run_title": diff.bootcamp_run.title,
+        "old_price": diff.old_price,
+        "new_price": diff.new_price,
+        "application_id": diff.application.id if diff.application else None,
+        "old_state": diff.old_state,
+        "new_state": diff.new_state,
+    }
+
+
+RefundRequest = namedtuple("RefundRequest", ["email", "run_key", "amount"])
+# application is None if the user didn't apply to the run
+BatchRefund = namedtuple(
+    "BatchRefund", ["user", "bootcamp_run", "amount", "total_paid", "application"]
+)
+BatchRefundSummary = namedtuple(
+    "BatchRefundSummary",
+    [
+        "refunds",
+        "total_amount",
+        "applications_refunded",
+        "enrollments_deactivated",
+        "novoed_unenrollments",
+    ],
+)
+
+
+def parse_refund_rows(rows):
+    """
+    Convert rows of a batch refund to RefundRequest objects
+
+    Args:
+        rows (iterable of dict): Rows with email, run_key and amount values
+
+    Returns:
+        list of RefundRequest: The refunds to make
+    """
+    refund_requests = []
+    for index, row in enumerate(rows):
+        try:
+            amount = Decimal(str(row[REFUND_AMOUNT]))
+            refund_request = RefundRequest(
+                email=str(row[REFUND_EMAIL]).strip(),
+                run_key=int(row[REFUND_RUN_KEY]),
+                amount=amount,
+            )
+        except (KeyError, TypeError, ValueError, ArithmeticError) as exc:
+            raise BatchRefundException(f"Invalid refund in row {index + 1}") from exc
+        if not amount.is_finite() or amount <= 0:
+            raise BatchRefundException(f"Invalid refund in row {index + 1}")
+        refund_requests.append(refund_request)
+    return refund_requests
+
+
+def parse_refund_csv(csv_file):
+    """
+    Read a CSV file of refunds
+
+    Args:
+        csv_file (file): A text file with email, run_key and amount columns
+
+    Returns:
+        list of RefundRequest: The refunds to make
+    """
+    reader = csv.DictReader(csv_file)
+    for field in REFUND_HEADER_FIELDS:
+        if field not in (reader.fieldnames or []):
+            raise BatchRefundException(f"Unable to find column header {field}")
+    return parse_refund_rows(reader)
+
+
+def get_run_refund_requests(bootcamp_run):
+    """
+    Get a full refund for everyone who has paid for a bootcamp run, for example when the run is cancelled
+
+    Args:
+        bootcamp_run (BootcampRun): The bootcamp run
+
+    Returns:
+        list of RefundRequest: A refund of the total paid by each user, ordered by email
+    """
+    totals = (
+        Line.objects.filter(bootcamp_run=bootcamp_run, order__status=Order.FULFILLED)
+        .values("order__user__email")
+        .annotate(total=Sum("price"))
+        .filter(total__gt=0)
+        .order_by("order__user__email")
+    )
+    return [
+        RefundRequest(
+            email=row["order__user__email"],
+            run_key=bootcamp_run.run_key,
+            amount=row["total"],
+        )
+        for row in totals
+    ]
+
+
+def _get_paid_totals(user_ids, run_ids):
+    """
+    Returns:
+        dict: The total paid by each user for each bootcamp run, keyed by (user id, bootcamp run id)
+    """
+    totals = (
+        Line.objects.filter(
+            order__status=Order.FULFILLED,
+            order__user_id__in=user_ids,
+            bootcamp_run_id__in=run_ids,
+        )
+        .values("order__user_id", "bootcamp_run_id")
+        .annotate(total=Sum("price"))
+        .order_by()
+    )
+    return {
+        (row["order__user_id"], row["bootcamp_run_id"]): row["total"] for row in totals
+    }
+
+
+def preview_batch_refunds(refund_requests):
+    """
+    Check that many refunds can be made without making them. The users, runs, paid totals and applications for
+    all of the refunds are each looked up in a single query, and every problem is reported at once.
+
+    Args:
+        refund_requests (list of RefundRequest): The refunds to make
+
+    Returns:
+        list of BatchRefund: The refunds, with the total each user has paid for the run
+    """
+    if not refund_requests:
+        return []
+    pairs = _get_users_and_runs(refund_requests, BatchRefundException)
+    pair_ids = [(user.id, bootcamp_run.id) for user, bootcamp_run in pairs]
+    if len(set(pair_ids)) < len(pair_ids):
+        raise BatchRefundException(
+            "Each user can only have one refund per bootcamp run"
+        )
+    user_ids = {user_id for user_id, _ in pair_ids}
+    run_ids = {run_id for _, run_id in pair_ids}
+    paid_totals = _get_paid_totals(user_ids, run_ids)
+    applications = {
+        (application.user_id, application.bootcamp_run_id): application
+        for application in BootcampApplication.objects.filter(
+            user_id__in=user_ids, bootcamp_run_id__in=run_ids
+        )
+    }
+
+    refunds = []
+    errors = []
+    for refund_request, (user, bootcamp_run), pair_id in zip(
+        refund_requests, pairs, pair_ids
+    ):
+        total_paid = paid_totals.get(pair_id, Decimal(0))
+        application = applications.get(pair_id)
+        if refund_request.amount > total_paid:
+            errors.append(
+                f"{user.email} in {bootcamp_run.title}: Refund exceeds total payment of ${total_paid}"
+            )
+        elif application and application.state not in REFUNDABLE_APP_STATES:
+            errors.append(
+                f"{user.email} in {bootcamp_run.title}: Application in state {application.state} can't be refunded"
+            )
+        refunds.append(
+            BatchRefund(
+                user=user,
+                bootcamp_run=bootcamp_run,
+                amount=refund_request.amount,
+                total_paid=total_paid,
+                application=application,
+            )
+        )
+    if errors:
+        raise BatchRefundException("\n".join(errors))
+    return refunds
+
+
+def _create_refund_orders(refunds):
+    """
+    Create the refund orders for some refunds, with their lines and audit rows, in three inserts. The orders
+    are the same as the ones create_refund_order makes.
+    """
+    orders = Order.objects.bulk_create(
+        [
+            Order(
+                status=Order.FULFILLED,
+                total_price_paid=-refund.amount,
+                user=refund.user,
+                application=refund.application,
+                payment_type=Order.REFUND_TYPE,
+            )
+            for refund in refunds
+        ]
+    )
+    lines = Line.objects.bulk_create(
+        [
+            Line(
+                order=order,
+                description="Refund for {}".format(refund.bootcamp_run.title),
+                price=order.total_price_paid,
+                bootcamp_run=refund.bootcamp_run,
+            )
+            for order, refund in zip(orders, refunds)
+        ]
+    )
+    OrderAudit.objects.bulk_create(
+        [
+            OrderAudit(
+                order=order,
+                acting_user=order.user,
+                data_before=None,
+                data_after={
+                    **serialize_model_object(order),
+                    "lines": [serialize_model_object(line)],
+                },
+            )
+            for order, line in zip(orders, lines)
+        ]
+    )
+    return orders
+
+
+def _refund_applications(refunds):
+    """
+    Move the applications for a batch of refunds to the refunded state with one update
+
+    Returns:
+        int: The number of applications which changed state
+    """
+    applications = [
+        refund.application
+        for refund in refunds
+        if refund.application and refund.application.state != AppStates.REFUNDED.value
+    ]
+    BootcampApplication.objects.filter(
+        id__in=[application.id for application in applications]
+    ).update(state=AppStates.REFUNDED.value)
+    for application in applications:
+        application.state = AppStates.REFUNDED.value
+    return len(applications)
+
+
+def _deactivate_refunded_enrollments(refunds):
+    """
+    Deactivate the enrollments for a batch of refunds with one update
+
+    Returns:
+        list of (int, int): The user id and bootcamp run id of each enrollment which was deactivated
+    """
+    pair_ids = {(refund.user.id, refund.bootcamp_run.id) for refund in refunds}
+    candidates = BootcampRunEnrollment.objects.filter(
+        user_id__in={user_id for user_id, _ in pair_ids},
+        bootcamp_run_id__in={run_id for _, run_id in pair_ids},
+    ).values_list("id", "user_id", "bootcamp_run_id")
+    enrollments = [
+        (enrollment_id, user_id, bootcamp_run_id)
+        for enrollment_id, user_id, bootcamp_run_id in candidates
+        if (user_id, bootcamp_run_id) in pair_ids
+    ]
+    BootcampRunEnrollment.objects.filter(
+        id__in=[enrollment_id for enrollment_id, _, _ in enrollments]
+    ).update(active=False, change_status=ENROLL_CHANGE_STATUS_REFUNDED)
+    return [(user_id, bootcamp_run_id) for _, user_id, bootcamp_run_id in enrollments]
+
+
+def _request_novoed_unenrollments(runs_by_id, user_ids_by_run):
+    """
+    Request one task per NovoEd course to unenroll the users whose enrollments were deactivated
+
+    Returns:
+        int: The number of users who will be unenrolled from NovoEd
+    """
+    if not features.is_enabled(features.NOVOED_INTEGRATION):
+        return 0
+    unenrollments = 0
+    for bootcamp_run_id, user_ids in sorted(user_ids_by_run.items()):
+        bootcamp_run = runs_by_id[bootcamp_run_id]
+        if not bootcamp_run.novoed_course_stub:
+            continue
+        enqueue_task(
+            novoed_tasks.unenroll_users_from_novoed_course,
+            kwargs={
+                "user_ids": sorted(user_ids),
+                "novoed_course_stub": bootcamp_run.novoed_course_stub,
+            },
+            aggregate=bootcamp_run,
+        )
+        unenrollments += len(user_ids)
+    return unenrollments
+
+
+@transaction.atomic
+def process_batch_refunds(refund_requests):
+    """
+    Make many refunds at once, for example for everyone in a cancelled bootcamp run. This does the same as
+    process_refund for each refund, but the refund orders, lines and audit rows are bulk inserted, the
+    applications and enrollments are updated in batches, and the NovoEd unenrollments, revenue updates and
+    HubSpot sync are each requested once.
+
+    Args:
+        refund_requests (list of RefundRequest): The refunds to make
+
+    Returns:
+        BatchRefundSummary: The refunds which were made and the number of records changed
+    """
+    refunds = preview_batch_refunds(refund_requests)
+    applications_refunded = 0
+    user_ids_by_run = defaultdict(set)
+    if refunds:
+        _create_refund_orders(refunds)
+    for batch in chunks(refunds, chunk_size=BATCH_REFUND_SIZE):
+        applications_refunded += _refund_applications(batch)
+        for user_id, bootcamp_run_id in _deactivate_refunded_enrollments(batch):
+            user_ids_by_run[bootcamp_run_id].add(user_id)
+
+    runs_by_id = {refund.bootcamp_run.id: refund.bootcamp_run for refund in refunds}
+    novoed_unenrollments = _request_novoed_unenrollments(runs_by_id, user_ids_by_run)
+    for bootcamp_run_id in sorted(runs_by_id):
+        request_run_revenue_update(bootcamp_run_id)
+    sync_hubspot_applications(
+        [refund.application for refund in refunds if refund.application]
+    )
+
+    summary = BatchRefundSummary(
+        refunds=refunds,
+        total_amount=sum((refund.amount for refund in refunds), Decimal(0)),
+        applications_refunded=applications_refunded,
+        enrollments_deactivated=sum(
+            len(user_ids) for user_ids in user_ids_by_run.values()
+        ),
+        novoed_unenrollments=novoed_unenrollments,
+    )
+    log.info("Refunded %d users for a total of $%s", len(refunds), summary.total_amount)
+    return summary
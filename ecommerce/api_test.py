@@ -5,11 +5,14 @@ Test for ecommerce functions
 from base64 import b64encode
 from datetime import datetime, timedelta
 from decimal import Decimal
+from email.utils import formataddr
 import hashlib
 import hmac
+import io
 from pathlib import Path
 from types import SimpleNamespace
 
+from celery.exceptions import Retry
 from django.contrib.auth import get_user_model
 from django.core.mail import EmailMessage
 from django.core.management.base import CommandError
@@ -20,30 +23,57 @@ from rest_framework.exceptions import ValidationError
 from applications.constants import AppStates
 from applications.factories import BootcampApplicationFactory
 from applications.models import BootcampApplication
+from ecommerce import tasks
 from ecommerce.api import (
     generate_cybersource_sa_payload,
     generate_cybersource_sa_signature,
     get_new_order_by_reference_number,
+    import_personal_prices,
     import_wire_transfers,
     import_wire_transfer,
     ISO_8601_FORMAT,
     make_reference_id,
+    parse_personal_price_csv,
+    parse_personal_price_rows,
     parse_wire_transfer_csv,
+    PersonalPriceChange,
+    preview_personal_prices,
     serialize_user_bootcamp_run,
     serialize_user_bootcamp_runs,
     send_receipt_email,
     create_refund_order,
     complete_successful_order,
+    fulfill_receipt,
+    get_run_refund_requests,
+    parse_refund_csv,
+    preview_batch_refunds,
+    process_batch_refunds,
     process_refund,
+    rebuild_run_revenue,
+    RefundRequest,
+    request_run_revenue_update,
+    save_receipt,
+    send_installment_reminders,
+    update_run_revenue,
     WireTransfer,
 )
 from ecommerce.exceptions import (
+    BatchRefundException,
     EcommerceException,
     ParseException,
+    PersonalPriceImportException,
     WireTransferImportException,
 )
 from ecommerce.factories import LineFactory, OrderFactory
-from ecommerce.models import Line, Order, WireTransferReceipt
+from ecommerce.models import (
+    BootcampRunRevenue,
+    InstallmentReminder,
+    Line,
+    Order,
+    OrderAudit,
+    Receipt,
+    WireTransferReceipt,
+)
 from ecommerce.serializers import LineSerializer
 from ecommerce.test_utils import create_test_application, create_test_order
 from klasses.constants import ENROLL_CHANGE_STATUS_REFUNDED
@@ -51,10 +81,14 @@ from klasses.factories import (
     BootcampRunFactory,
     InstallmentFactory,
     BootcampRunEnrollmentFactory,
+    PersonalPriceFactory,
 )
-from klasses.models import BootcampRun, BootcampRunEnrollment
+from klasses.models import BootcampRun, BootcampRunEnrollment, PersonalPrice
 from klasses.serializers import InstallmentSerializer
+from mail import tasks as mail_tasks
+from mail.v2.exceptions import TransientEmailError
 from main.test_utils import any_instance_of
+from outbox.api import relay_messages
 from profiles.factories import ProfileFactory
 
 
@@ -564,6 +598,51 @@ def test_complete_successful_order(paid_order_elements, enrollment_exists):
     assert enrollment.change_status is None
 
 
+def test_save_receipt():
+    """save_receipt should only save one receipt per CyberSource transaction"""
+    data = {"req_transaction_uuid": "abc", "decision": "ACCEPT"}
+    receipt, created = save_receipt(data)
+    assert created is True
+    assert receipt.transaction_uuid == "abc"
+    duplicate, created = save_receipt({**data, "extra": "field"})
+    assert created is False
+    assert duplicate == receipt
+    assert Receipt.objects.get(id=receipt.id).data == data
+
+    _, created = save_receipt({"decision": "ACCEPT"})
+    assert created is True
+    assert Receipt.objects.count() == 2
+
+
+def test_fulfill_receipt(mocker, paid_order_elements):
+    """fulfill_receipt should fulfill the order once and mark the receipt as processed"""
+    mock_tasks = mocker.patch("ecommerce.api.tasks")
+    patched_enqueue_task = mocker.patch("ecommerce.api.enqueue_task")
+    order = paid_order_elements.order
+    receipt, _ = save_receipt(
+        {
+            "req_transaction_uuid": "abc",
+            "req_reference_number": make_reference_id(order),
+            "decision": "ACCEPT",
+        }
+    )
+    fulfill_receipt(receipt.id)
+    fulfill_receipt(receipt.id)
+
+    order.refresh_from_db()
+    receipt.refresh_from_db()
+    assert order.status == Order.FULFILLED
+    assert receipt.order == order
+    assert receipt.processed_on is not None
+    assert order.orderaudit_set.count() == 1
+    # Revenue updates for the run are enqueued too
+    patched_enqueue_task.assert_any_call(
+        mock_tasks.send_receipt_email,
+        args=[paid_order_elements.application.id],
+        aggregate=paid_order_elements.application,
+    )
+
+
 @pytest.mark.parametrize(
     "feature_flag,has_stub",
     [[True, True], [True, False], [False, True], [False, False]],
@@ -575,18 +654,23 @@ def test_complete_successful_order_novoed(
     complete_successful_order should call a task that enrolls the given user in a NovoEd course
     """
     patched_novoed_tasks = mocker.patch("applications.models.novoed_tasks")
+    patched_enqueue_task = mocker.patch("applications.models.enqueue_task")
     settings.FEATURES["NOVOED_INTEGRATION"] = feature_flag
     if not has_stub:
         paid_order_elements.run.novoed_course_stub = None
         paid_order_elements.run.save()
     complete_successful_order(paid_order_elements.order)
     if feature_flag and has_stub:
-        patched_novoed_tasks.enroll_users_in_novoed_course.delay.assert_called_once_with(
-            user_ids=[paid_order_elements.user.id],
-            novoed_course_stub=paid_order_elements.run.novoed_course_stub,
+        patched_enqueue_task.assert_called_once_with(
+            patched_novoed_tasks.enroll_users_in_novoed_course,
+            kwargs={
+                "user_ids": [paid_order_elements.user.id],
+                "novoed_course_stub": paid_order_elements.run.novoed_course_stub,
+            },
+            aggregate=any_instance_of(BootcampRunEnrollment),
         )
     else:
-        patched_novoed_tasks.enroll_users_in_novoed_course.delay.assert_not_called()
+        patched_enqueue_task.assert_not_called()
 
 
 @pytest.mark.parametrize(
@@ -594,8 +678,8 @@ def test_complete_successful_order_novoed(
     [[True, True], [True, False], [False, True], [False, False]],
 )
 def test_refund_novoed(
-    settings, paid_order_elements, patched_novoed_tasks, feature_flag, has_stub
-):
+    mocker, settings, paid_order_elements, patched_novoed_tasks, feature_flag, has_stub
+):  # pylint: disable=too-many-arguments
     """
     process_refund should call a task that unenrolls the user from a NovoEd course
     """
@@ -603,9 +687,10 @@ def test_refund_novoed(
     if not has_stub:
         paid_order_elements.run.novoed_course_stub = None
         paid_order_elements.run.save()
+    patched_enqueue_task = mocker.patch("klasses.api.enqueue_task")
     paid_order_elements.order.status = Order.FULFILLED
     paid_order_elements.order.save()
-    BootcampRunEnrollmentFactory.create(
+    run_enrollment = BootcampRunEnrollmentFactory.create(
         user=paid_order_elements.user, bootcamp_run=paid_order_elements.run
     )
     process_refund(
@@ -614,12 +699,16 @@ def test_refund_novoed(
         amount=paid_order_elements.line.price,
     )
     if feature_flag and has_stub:
-        patched_novoed_tasks.unenroll_user_from_novoed_course.delay.assert_called_once_with(
-            user_id=paid_order_elements.user.id,
-            novoed_course_stub=paid_order_elements.run.novoed_course_stub,
+        patched_enqueue_task.assert_called_once_with(
+            patched_novoed_tasks.unenroll_user_from_novoed_course,
+            kwargs={
+                "user_id": paid_order_elements.user.id,
+                "novoed_course_stub": paid_order_elements.run.novoed_course_stub,
+            },
+            aggregate=run_enrollment,
         )
     else:
-        patched_novoed_tasks.unenroll_user_from_novoed_course.delay.assert_not_called()
+        patched_enqueue_task.assert_not_called()
 
 
 def test_parse_wire_transfer_csv():
@@ -859,7 +948,7 @@ def test_import_wire_transfers_missing_application():
 
 def test_import_wire_transfers_update_receipt(mocker):
     """ check for update receipt """
-    mocker.patch("ecommerce.api.tasks.send_receipt_email")
+    mocker.patch("ecommerce.api.enqueue_task")
     doof_email = "hdoof@odl.mit.edu"
     user = User.objects.create(email=doof_email)
     run = BootcampRunFactory.create(
@@ -882,7 +971,7 @@ def test_import_wire_transfers_update_receipt(mocker):
 
 def test_import_wire_transfers_update_existing_order_amount(mocker):
     """ check for update order amount and receipt """
-    mocker.patch("ecommerce.api.tasks.send_receipt_email")
+    mocker.patch("ecommerce.api.enqueue_task")
     doof_email = "hdoof@odl.mit.edu"
     user = User.objects.create(email=doof_email)
     run = BootcampRunFactory.create(
@@ -918,7 +1007,7 @@ def test_import_wire_transfers_update_existing_order_amount(mocker):
 
 def test_import_wire_transfers_update_existing_order_user(mocker):
     """ check for update order user and receipt """
-    mocker.patch("ecommerce.api.tasks.send_receipt_email")
+    mocker.patch("ecommerce.api.enqueue_task")
     doof_email = "hdoof@odl.mit.edu"
     pretty_platypus_email = "pplatypus@odl.mit.edu"
     user = User.objects.create(email=doof_email)
@@ -959,7 +1048,7 @@ def test_import_wire_transfers_update_existing_order_user(mocker):
 
 def test_import_wire_transfers_update_existing_order_bootcamp(mocker):
     """ check for update order bootcamp and receipt """
-    mocker.patch("ecommerce.api.tasks.send_receipt_email")
+    mocker.patch("ecommerce.api.enqueue_task")
     doof_email = "hdoof@odl.mit.edu"
     user = User.objects.create(email=doof_email)
     run = BootcampRunFactory.create(
@@ -1013,3 +1102,560 @@ def test_import_wire_transfers_error(mocker):
     csv_path = Path(__file__).parent / "testdata" / "example_wire_transfers.csv"
     with pytest.raises(WireTransferImportException):
         import_wire_transfers(csv_path)
+
+
+def _create_payment(application, amount, status=Order.FULFILLED):
+    """Create an order and line paying for an application"""
+    return LineFactory.create(
+        bootcamp_run=application.bootcamp_run,
+        price=amount,
+        order__user=application.user,
+        order__application=application,
+        order__status=status,
+        order__total_price_paid=amount,
+    )
+
+
+def test_update_run_revenue():
+    """update_run_revenue should total the payments, refunds and balances for a bootcamp run"""
+    installment = InstallmentFactory.create(amount=300)
+    bootcamp_run = installment.bootcamp_run
+    InstallmentFactory.create(bootcamp_run=bootcamp_run, amount=200)
+    awaiting_payment, complete, rejected = [
+        BootcampApplicationFactory.create(bootcamp_run=bootcamp_run, state=state.value)
+        for state in [
+            AppStates.AWAITING_PAYMENT,
+            AppStates.COMPLETE,
+            AppStates.REJECTED,
+        ]
+    ]
+    PersonalPriceFactory.create(
+        bootcamp_run=bootcamp_run, user=complete.user, price=400
+    )
+    _create_payment(awaiting_payment, 120)
+    _create_payment(awaiting_payment, 75, status=Order.CREATED)
+    _create_payment(complete, 450)
+    _create_payment(complete, -50)
+    # Payments for other runs shouldn't be included
+    _create_payment(BootcampApplicationFactory.create(), 1000)
+
+    revenue = update_run_revenue(bootcamp_run.id)
+    assert revenue == BootcampRunRevenue.objects.get(bootcamp_run=bootcamp_run)
+    assert revenue.paid == Decimal(570)
+    assert revenue.refunded == Decimal(50)
+    # The rejected application isn't expected to pay
+    assert revenue.expected_revenue == Decimal(900)
+    assert revenue.outstanding_balance == Decimal(380)
+    assert revenue.application_state_counts == {
+        AppStates.AWAITING_PAYMENT.value: 1,
+        AppStates.COMPLETE.value: 1,
+        AppStates.REJECTED.value: 1,
+    }
+
+    rejected.state = AppStates.AWAITING_PAYMENT.value
+    rejected.save()
+    revenue = update_run_revenue(bootcamp_run.id)
+    assert BootcampRunRevenue.objects.count() == 1
+    assert revenue.expected_revenue == Decimal(1400)
+    assert revenue.outstanding_balance == Decimal(880)
+    assert revenue.application_state_counts == {
+        AppStates.AWAITING_PAYMENT.value: 2,
+        AppStates.COMPLETE.value: 1,
+    }
+
+
+def test_request_run_revenue_update(mocker):
+    """request_run_revenue_update should request a deduplicated task for the run"""
+    mock_enqueue = mocker.patch("ecommerce.api.enqueue_task")
+    request_run_revenue_update(12)
+    mock_enqueue.assert_called_once_with(
+        tasks.update_run_revenue, kwargs={"bootcamp_run_id": 12}, deduplicate=True
+    )
+
+
+def test_update_run_revenue_missing_run():
+    """update_run_revenue should do nothing for a bootcamp run which doesn't exist"""
+    assert update_run_revenue(12345) is None
+    assert BootcampRunRevenue.objects.count() == 0
+
+
+def test_rebuild_run_revenue():
+    """rebuild_run_revenue should update the revenue totals for every bootcamp run"""
+    bootcamp_runs = BootcampRunFactory.create_batch(3)
+    assert rebuild_run_revenue() == BootcampRun.objects.count()
+    assert set(
+        BootcampRunRevenue.objects.values_list("bootcamp_run_id", flat=True)
+    ) == set(BootcampRun.objects.values_list("id", flat=True))
+    assert BootcampRunRevenue.objects.get(bootcamp_run=bootcamp_runs[0]).paid == 0
+
+
+def test_send_installment_reminders(settings, mailoutbox):
+    """Applicants who haven't paid enough for the next installment should be reminded once"""
+    settings.INSTALLMENT_REMINDER_DAYS = 7
+    now = datetime(2026, 10, 19, tzinfo=pytz.UTC)
+    past_installment = InstallmentFactory.create(
+        amount=100, deadline=now - timedelta(days=30)
+    )
+    bootcamp_run = past_installment.bootcamp_run
+    next_installment = InstallmentFactory.create(
+        bootcamp_run=bootcamp_run, amount=200, deadline=now + timedelta(days=3)
+    )
+    InstallmentFactory.create(
+        bootcamp_run=bootcamp_run, amount=500, deadline=now + timedelta(days=30)
+    )
+    # A run whose next installment isn't due soon
+    InstallmentFactory.create(deadline=now + timedelta(days=20))
+    unpaid, paid, discounted, complete = [
+        BootcampApplicationFactory.create(bootcamp_run=bootcamp_run, state=state.value)
+        for state in [
+            AppStates.AWAITING_PAYMENT,
+            AppStates.AWAITING_PAYMENT,
+            AppStates.AWAITING_PAYMENT,
+            AppStates.COMPLETE,
+        ]
+    ]
+    _create_payment(unpaid, 50)
+    _create_payment(paid, 300)
+    PersonalPriceFactory.create(
+        bootcamp_run=bootcamp_run, user=discounted.user, price=150
+    )
+    _create_payment(discounted, 100)
+
+    assert send_installment_reminders(now=now) == 2
+    assert {
+        (reminder.application, reminder.amount_due)
+        for reminder in InstallmentReminder.objects.filter(installment=next_installment)
+    } == {(unpaid, Decimal(300)), (discounted, Decimal(150))}
+    assert not InstallmentReminder.objects.filter(application=complete).exists()
+    assert len(mailoutbox) == 0
+    relay_messages(settings.OUTBOX_BATCH_SIZE)
+    messages = {message.to[0]: message for message in mailoutbox}
+    for application, balance_due in [(unpaid, "$250.00"), (discounted, "$50.00")]:
+        user = application.user
+        assert balance_due in messages[formataddr((user.profile.name, user.email))].body
+
+    # Applicants are only reminded once for each installment
+    assert send_installment_reminders(now=now) == 0
+    assert len(mailoutbox) == 2
+    assert InstallmentReminder.objects.count() == 2
+
+
+def test_send_installment_reminders_send_error(mocker, settings, mailoutbox):
+    """If the ESP is unavailable, the reminder email should be retried instead of being dropped"""
+    settings.INSTALLMENT_REMINDER_DAYS = 7
+    now = datetime(2026, 10, 19, tzinfo=pytz.UTC)
+    installment = InstallmentFactory.create(
+        amount=200, deadline=now + timedelta(days=3)
+    )
+    BootcampApplicationFactory.create(
+        bootcamp_run=installment.bootcamp_run, state=AppStates.AWAITING_PAYMENT.value
+    )
+    mocker.patch("mail.v2.api.AnymailMessage.send", side_effect=ConnectionError)
+    patched_retry = mocker.patch.object(
+        mail_tasks.send_template_email, "retry", side_effect=Retry
+    )
+
+    assert send_installment_reminders(now=now) == 1
+    relay_messages(settings.OUTBOX_BATCH_SIZE)
+    patched_retry.assert_called_once()
+    assert isinstance(patched_retry.call_args[1]["exc"], TransientEmailError)
+    assert len(mailoutbox) == 0
+
+
+def test_send_installment_reminders_locked(mocker):
+    """send_installment_reminders should do nothing if another process is sending reminders"""
+    mock_cursor = mocker.patch("ecommerce.api.connection.cursor")
+    mock_cursor.return_value.__enter__.return_value.fetchone.return_value = [False]
+    mock_get_installments = mocker.patch("ecommerce.api.get_upcoming_installments")
+    assert send_installment_reminders() is None
+    mock_get_installments.assert_not_called()
+
+
+def test_parse_personal_price_csv():
+    """parse_personal_price_csv should read the email, run key and price from each row"""
+    csv_file = io.StringIO(
+        "email,run_key,price,notes\nA@example.com ,12,1500.50,scholarship\n"
+    )
+    assert parse_personal_price_csv(csv_file) == [
+        PersonalPriceChange(email="A@example.com", run_key=12, price=Decimal("1500.50"))
+    ]
+
+
+@pytest.mark.parametrize(
+    "content, message",
+    [
+        ("email,price\na@example.com,100\n", "Unable to find column header run_key"),
+        ("email,run_key,price\na@example.com,x,100\n", "row 1"),
+        ("email,run_key,price\na@example.com,1,100\nb@example.com,1,-5\n", "row 2"),
+        ("email,run_key,price\na@example.com,1,NaN\n", "row 1"),
+    ],
+)
+def test_parse_personal_price_csv_invalid(content, message):
+    """parse_personal_price_csv should raise an exception for missing columns or invalid values"""
+    with pytest.raises(PersonalPriceImportException) as exc:
+        parse_personal_price_csv(io.StringIO(content))
+    assert message in str(exc.value)
+
+
+@pytest.fixture
+def personal_price_import():
+    """A bootcamp run and the applications affected by a personal price import"""
+    bootcamp_run = InstallmentFactory.create(amount=1000).bootcamp_run
+    complete, awaiting_payment = [
+        BootcampApplicationFactory.create(bootcamp_run=bootcamp_run, state=state.value)
+        for state in [AppStates.COMPLETE, AppStates.AWAITING_PAYMENT]
+    ]
+    PersonalPriceFactory.create(
+        bootcamp_run=bootcamp_run, user=complete.user, price=800
+    )
+    _create_payment(complete, 800)
+    _create_payment(awaiting_payment, 500)
+    unchanged_price = PersonalPriceFactory.create(bootcamp_run=bootcamp_run, price=300)
+    not_applied = ProfileFactory.create().user
+    changes = parse_personal_price_rows(
+        [
+            {
+                "email": complete.user.email,
+                "run_key": bootcamp_run.run_key,
+                "price": 900,
+            },
+            {
+                "email": awaiting_payment.user.email.upper(),
+                "run_key": bootcamp_run.run_key,
+                "price": "500",
+            },
+            {
+                "email": unchanged_price.user.email,
+                "run_key": bootcamp_run.run_key,
+                "price": "300.00",
+            },
+            {"email": not_applied.email, "run_key": bootcamp_run.run_key, "price": 700},
+        ]
+    )
+    return SimpleNamespace(
+        bootcamp_run=bootcamp_run,
+        complete=complete,
+        awaiting_payment=awaiting_payment,
+        unchanged_price=unchanged_price,
+        not_applied=not_applied,
+        changes=changes,
+    )
+
+
+def test_preview_personal_prices(django_assert_max_num_queries, personal_price_import):
+    """preview_personal_prices should describe each change with a fixed number of queries"""
+    with django_assert_max_num_queries(4):
+        diffs = preview_personal_prices(personal_price_import.changes)
+    assert [
+        (
+            diff.user,
+            diff.old_price,
+            diff.new_price,
+            diff.application,
+            diff.old_state,
+            diff.new_state,
+        )
+        for diff in diffs
+    ] == [
+        (
+            personal_price_import.complete.user,
+            Decimal(800),
+            Decimal(900),
+            personal_price_import.complete,
+            AppStates.COMPLETE.value,
+            AppStates.AWAITING_PAYMENT.value,
+        ),
+        (
+            personal_price_import.awaiting_payment.user,
+            None,
+            Decimal(500),
+            personal_price_import.awaiting_payment,
+            AppStates.AWAITING_PAYMENT.value,
+            AppStates.COMPLETE.value,
+        ),
+        (
+            personal_price_import.unchanged_price.user,
+            Decimal(300),
+            Decimal(300),
+            None,
+            None,
+            None,
+        ),
+        (personal_price_import.not_applied, None, Decimal(700), None, None, None),
+    ]
+    assert PersonalPrice.objects.get(
+        user=personal_price_import.complete.user
+    ).price == Decimal(800)
+
+
+@pytest.mark.parametrize(
+    "change, message",
+    [
+        (PersonalPriceChange("missing@example.com", 1, 100), "Could not find users"),
+        (PersonalPriceChange(None, 12345, 100), "Could not find bootcamp runs"),
+        (PersonalPriceChange(None, None, 100), "only have one personal price"),
+    ],
+)
+def test_preview_personal_prices_invalid(personal_price_import, change, message):
+    """preview_personal_prices should reject unknown users and runs, and duplicate changes"""
+    existing = personal_price_import.changes[0]
+    change = change._replace(
+        email=change.email or existing.email, run_key=change.run_key or existing.run_key
+    )
+    with pytest.raises(PersonalPriceImportException) as exc:
+        preview_personal_prices([existing, change])
+    assert message in str(exc.value)
+
+
+def test_import_personal_prices(mocker, personal_price_import):
+    """import_personal_prices should set the prices, apply state changes and request one HubSpot sync"""
+    mock_sync_hubspot = mocker.patch("ecommerce.api.sync_hubspot_applications")
+    mock_revenue_update = mocker.patch("ecommerce.api.request_run_revenue_update")
+    bootcamp_run = personal_price_import.bootcamp_run
+
+    diffs = import_personal_prices(personal_price_import.changes)
+    assert [diff.user for diff in diffs] == [
+        personal_price_import.complete.user,
+        personal_price_import.awaiting_payment.user,
+        personal_price_import.not_applied,
+    ]
+    assert {
+        price.user: price.price
+        for price in PersonalPrice.objects.filter(bootcamp_run=bootcamp_run)
+    } == {
+        personal_price_import.complete.user: Decimal(900),
+        personal_price_import.awaiting_payment.user: Decimal(500),
+        personal_price_import.unchanged_price.user: Decimal(300),
+        personal_price_import.not_applied: Decimal(700),
+    }
+    for application, state in [
+        (personal_price_import.complete, AppStates.AWAITING_PAYMENT.value),
+        (personal_price_import.awaiting_payment, AppStates.COMPLETE.value),
+    ]:
+        application.refresh_from_db()
+        assert application.state == state
+    assert BootcampRunEnrollment.objects.get(
+        user=personal_price_import.awaiting_payment.user, bootcamp_run=bootcamp_run
+    ).active
+    mock_revenue_update.assert_called_once_with(bootcamp_run.id)
+    mock_sync_hubspot.assert_called_once_with(
+        [personal_price_import.complete, personal_price_import.awaiting_payment]
+    )
+
+    # Importing the same prices again changes nothing
+    mock_sync_hubspot.reset_mock()
+    assert import_personal_prices(personal_price_import.changes) == []
+    mock_sync_hubspot.assert_not_called()
+
+
+def test_parse_refund_csv():
+    """parse_refund_csv should read the email, run key and amount from each row"""
+    csv_file = io.StringIO("email,run_key,amount\nA@example.com ,12,1500.50\n")
+    assert parse_refund_csv(csv_file) == [
+        RefundRequest(email="A@example.com", run_key=12, amount=Decimal("1500.50"))
+    ]
+
+
+@pytest.mark.parametrize(
+    "content, message",
+    [
+        ("email,amount\na@example.com,100\n", "Unable to find column header run_key"),
+        ("email,run_key,amount\na@example.com,x,100\n", "row 1"),
+        ("email,run_key,amount\na@example.com,1,100\nb@example.com,1,0\n", "row 2"),
+        ("email,run_key,amount\na@example.com,1,Infinity\n", "row 1"),
+    ],
+)
+def test_parse_refund_csv_invalid(content, message):
+    """parse_refund_csv should raise an exception for missing columns or invalid amounts"""
+    with pytest.raises(BatchRefundException) as exc:
+        parse_refund_csv(io.StringIO(content))
+    assert message in str(exc.value)
+
+
+@pytest.fixture
+def run_refunds():
+    """A cancelled bootcamp run with the payments and enrollments to refund"""
+    bootcamp_run = BootcampRunFactory.create(novoed_course_stub="cancelled-run")
+    complete, awaiting_payment = [
+        BootcampApplicationFactory.create(bootcamp_run=bootcamp_run, state=state.value)
+        for state in [AppStates.COMPLETE, AppStates.AWAITING_PAYMENT]
+    ]
+    _create_payment(complete, 800)
+    _create_payment(awaiting_payment, 300)
+    no_application = LineFactory.create(
+        bootcamp_run=bootcamp_run,
+        price=100,
+        order__application=None,
+        order__status=Order.FULFILLED,
+        order__total_price_paid=100,
+    ).order.user
+    already_refunded = BootcampApplicationFactory.create(
+        bootcamp_run=bootcamp_run, state=AppStates.REFUNDED.value
+    )
+    _create_payment(already_refunded, 200)
+    _create_payment(already_refunded, -200)
+    _create_payment(
+        BootcampApplicationFactory.create(
+            bootcamp_run=bootcamp_run, state=AppStates.AWAITING_PAYMENT.value
+        ),
+        500,
+        status=Order.FAILED,
+    )
+    for user in [complete.user, awaiting_payment.user, no_application]:
+        BootcampRunEnrollmentFactory.create(bootcamp_run=bootcamp_run, user=user)
+    return SimpleNamespace(
+        bootcamp_run=bootcamp_run,
+        complete=complete,
+        awaiting_payment=awaiting_payment,
+        no_application=no_application,
+    )
+
+
+def test_get_run_refund_requests(run_refunds):
+    """get_run_refund_requests should refund the total paid by each user who has paid for the run"""
+    bootcamp_run = run_refunds.bootcamp_run
+    expected = sorted(
+        [
+            (run_refunds.complete.user.email, Decimal(800)),
+            (run_refunds.awaiting_payment.user.email, Decimal(300)),
+            (run_refunds.no_application.email, Decimal(100)),
+        ]
+    )
+    assert get_run_refund_requests(bootcamp_run) == [
+        RefundRequest(email=email, run_key=bootcamp_run.run_key, amount=amount)
+        for email, amount in expected
+    ]
+
+
+def test_preview_batch_refunds(django_assert_max_num_queries, run_refunds):
+    """preview_batch_refunds should look up the paid totals and applications with a fixed number of queries"""
+    refund_requests = get_run_refund_requests(run_refunds.bootcamp_run)
+    with django_assert_max_num_queries(4):
+        refunds = preview_batch_refunds(refund_requests)
+    applications = {
+        run_refunds.complete.user: run_refunds.complete,
+        run_refunds.awaiting_payment.user: run_refunds.awaiting_payment,
+    }
+    assert [
+        (refund.user, refund.amount, refund.total_paid, refund.application)
+        for refund in refunds
+    ] == [
+        (
+            User.objects.get(email=refund_request.email),
+            refund_request.amount,
+            refund_request.amount,
+            applications.get(User.objects.get(email=refund_request.email)),
+        )
+        for refund_request in refund_requests
+    ]
+
+
+def test_preview_batch_refunds_invalid(run_refunds):
+    """preview_batch_refunds should report every refund which can't be made"""
+    bootcamp_run = run_refunds.bootcamp_run
+    rejected = BootcampApplicationFactory.create(
+        bootcamp_run=bootcamp_run, state=AppStates.REJECTED.value
+    )
+    _create_payment(rejected, 50)
+    with pytest.raises(BatchRefundException) as exc:
+        preview_batch_refunds(
+            [
+                RefundRequest(
+                    run_refunds.complete.user.email, bootcamp_run.run_key, Decimal(900)
+                ),
+                RefundRequest(
+                    run_refunds.awaiting_payment.user.email,
+                    bootcamp_run.run_key,
+                    Decimal(300),
+                ),
+                RefundRequest(rejected.user.email, bootcamp_run.run_key, Decimal(10)),
+            ]
+        )
+    assert str(exc.value).split("\n") == [
+        f"{run_refunds.complete.user.email} in {bootcamp_run.title}: Refund exceeds total payment of $800.00",
+        f"{rejected.user.email} in {bootcamp_run.title}: Application in state {AppStates.REJECTED.value} can't be refunded",
+    ]
+
+
+def test_process_batch_refunds(
+    mocker, settings, run_refunds
+):  # pylint: disable=too-many-locals
+    """process_batch_refunds should refund every user and request one NovoEd unenrollment for the run"""
+    settings.FEATURES["NOVOED_INTEGRATION"] = True
+    mock_enqueue_task = mocker.patch("ecommerce.api.enqueue_task")
+    mock_novoed_tasks = mocker.patch("ecommerce.api.novoed_tasks")
+    mock_revenue_update = mocker.patch("ecommerce.api.request_run_revenue_update")
+    mock_sync_hubspot = mocker.patch("ecommerce.api.sync_hubspot_applications")
+    bootcamp_run = run_refunds.bootcamp_run
+    users = [
+        run_refunds.complete.user,
+        run_refunds.awaiting_payment.user,
+        run_refunds.no_application,
+    ]
+
+    summary = process_batch_refunds(get_run_refund_requests(bootcamp_run))
+    assert len(summary.refunds) == 3
+    assert summary.total_amount == Decimal(1200)
+    assert summary.applications_refunded == 2
+    assert summary.enrollments_deactivated == 3
+    assert summary.novoed_unenrollments == 3
+
+    refund_orders = Order.objects.filter(payment_type=Order.REFUND_TYPE)
+    assert {
+        (order.user, order.application, order.total_price_paid)
+        for order in refund_orders
+    } == {
+        (run_refunds.complete.user, run_refunds.complete, Decimal(-800)),
+        (
+            run_refunds.awaiting_payment.user,
+            run_refunds.awaiting_payment,
+            Decimal(-300),
+        ),
+        (run_refunds.no_application, None, Decimal(-100)),
+    }
+    for order in refund_orders:
+        assert order.status == Order.FULFILLED
+        line = order.line_set.get()
+        assert line.bootcamp_run == bootcamp_run
+        assert line.price == order.total_price_paid
+        assert line.description == f"Refund for {bootcamp_run.title}"
+        audit = OrderAudit.objects.get(order=order)
+        assert audit.acting_user == order.user
+        assert audit.data_before is None
+        assert audit.data_after["id"] == order.id
+        assert audit.data_after["lines"][0]["id"] == line.id
+
+    for application in [run_refunds.complete, run_refunds.awaiting_payment]:
+        application.refresh_from_db()
+        assert application.state == AppStates.REFUNDED.value
+    for enrollment in BootcampRunEnrollment.objects.filter(bootcamp_run=bootcamp_run):
+        assert enrollment.active is False
+        assert enrollment.change_status == ENROLL_CHANGE_STATUS_REFUNDED
+    mock_enqueue_task.assert_called_once_with(
+        mock_novoed_tasks.unenroll_users_from_novoed_course,
+        kwargs={
+            "user_ids": sorted(user.id for user in users),
+            "novoed_course_stub": "cancelled-run",
+        },
+        aggregate=bootcamp_run,
+    )
+    mock_revenue_update.assert_called_once_with(bootcamp_run.id)
+    mock_sync_hubspot.assert_called_once()
+    assert set(mock_sync_hubspot.call_args[0][0]) == {
+        run_refunds.complete,
+        run_refunds.awaiting_payment,
+    }
+    assert get_run_refund_requests(bootcamp_run) == []
+
+
+def test_process_batch_refunds_novoed_disabled(mocker, settings, run_refunds):
+    """process_batch_refunds shouldn't request NovoEd unenrollments if the integration is disabled"""
+    settings.FEATURES["NOVOED_INTEGRATION"] = False
+    mock_enqueue_task = mocker.patch("ecommerce.api.enqueue_task")
+    mocker.patch("ecommerce.api.request_run_revenue_update")
+    mocker.patch("ecommerce.api.sync_hubspot_applications")
+
+    summary = process_batch_refunds(get_run_refund_requests(run_refunds.bootcamp_run))
+    assert summary.enrollments_deactivated == 3
+    assert summary.novoed_unenrollments == 0
+    mock_enqueue_task.assert_not_called()
@@ -48,3 +48,17 @@ WIRE_TRANSFER_HEADER_FIELDS = [
     WIRE_TRANSFER_BOOTCAMP_NAME,
     WIRE_TRANSFER_BOOTCAMP_START_DATE,
 ]
+
+PERSONAL_PRICE_EMAIL = "email"
+PERSONAL_PRICE_RUN_KEY = "run_key"
+PERSONAL_PRICE_PRICE = "price"
+PERSONAL_PRICE_HEADER_FIELDS = [
+    PERSONAL_PRICE_EMAIL,
+    PERSONAL_PRICE_RUN_KEY,
+    PERSONAL_PRICE_PRICE,
+]
+
+REFUND_EMAIL = "email"
+REFUND_RUN_KEY = "run_key"
+REFUND_AMOUNT = "amount"
+REFUND_HEADER_FIELDS = [REFUND_EMAIL, REFUND_RUN_KEY, REFUND_AMOUNT]
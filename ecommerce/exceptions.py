@@ -25,3 +25,15 @@ class WireTransferImportException(Exception):
     """
     Exception regarding importing wire transfer CSV files
     """
+
+
+class PersonalPriceImportException(Exception):
+    """
+    Exception regarding importing personal prices
+    """
+
+
+class BatchRefundException(Exception):
+    """
+    Exception regarding refunding many users at once
+    """
@@ -0,0 +1,272 @@
+"""Bulk exports of application, order and payment data for finance and admissions staff"""
+from collections import namedtuple
+import csv
+import json
+import zlib
+
+from django.contrib.postgres.fields.jsonb import KeyTextTransform
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F
+
+from applications.models import BootcampApplication
+from ecommerce.api import annotate_application_balances
+from ecommerce.models import Line, Order, Receipt
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_JSONL = "jsonl"
+EXPORT_FORMATS = [EXPORT_FORMAT_CSV, EXPORT_FORMAT_JSONL]
+EXPORT_CONTENT_TYPES = {
+    EXPORT_FORMAT_CSV: "text/csv",
+    EXPORT_FORMAT_JSONL: "application/x-ndjson",
+}
+# The number of rows fetched from the server-side cursor at a time
+EXPORT_FETCH_SIZE = 2000
+# Rows are sent in chunks of about this many bytes rather than one at a time
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# get_queryset: Returns the queryset for the export, with any columns which aren't model fields annotated
+# columns: The names of the exported columns, in order
+# run_field: The lookup which filters the export to a bootcamp run
+ExportDefinition = namedtuple(
+    "ExportDefinition", ["get_queryset", "columns", "run_field"]
+)
+
+
+def _get_applications():
+    """Returns the queryset for the applications export"""
+    return BootcampApplication.objects.annotate(
+        email=F("user__email"),
+        name=F("user__profile__name"),
+        run_title=F("bootcamp_run__title"),
+        bootcamp_title=F("bootcamp_run__bootcamp__title"),
+    )
+
+
+def _get_orders():
+    """Returns the queryset for the orders export"""
+    return Order.objects.annotate(
+        email=F("user__email"), bootcamp_run_id=F("application__bootcamp_run_id")
+    )
+
+
+def _get_lines():
+    """Returns the queryset for the lines export"""
+    return Line.objects.annotate(
+        user_id=F("order__user_id"),
+        email=F("order__user__email"),
+        order_status=F("order__status"),
+        payment_type=F("order__payment_type"),
+    )
+
+
+def _get_receipts():
+    """Returns the queryset for the receipts export"""
+    return Receipt.objects.annotate(
+        email=F("order__user__email"),
+        decision=KeyTextTransform("decision", "data"),
+        amount=KeyTextTransform("req_amount", "data"),
+        payment_method=KeyTextTransform("req_payment_method", "data"),
+        card_type=KeyTextTransform("req_card_type", "data"),
+        card_number=KeyTextTransform("req_card_number", "data"),
+    )
+
+
+def _get_balances():
+    """Returns the queryset for the balances export"""
+    return annotate_application_balances(
+        BootcampApplication.objects.annotate(
+            email=F("user__email"), run_title=F("bootcamp_run__title")
+        )
+    ).annotate(price=F("run_price"), total_paid=F("amount_paid"))
+
+
+EXPORTS = {
+    "applications": ExportDefinition(
+        get_queryset=_get_applications,
+        columns=[
+            "id",
+            "user_id",
+            "email",
+            "name",
+            "bootcamp_run_id",
+            "run_title",
+            "bootcamp_title",
+            "state",
+            "created_on",
+            "updated_on",
+        ],
+        run_field="bootcamp_run_id",
+    ),
+    "orders": ExportDefinition(
+        get_queryset=_get_orders,
+        columns=[
+            "id",
+            "user_id",
+            "email",
+            "application_id",
+            "bootcamp_run_id",
+            "status",
+            "payment_type",
+            "total_price_paid",
+            "created_on",
+            "updated_on",
+        ],
+        run_field="application__bootcamp_run_id",
+    ),
+    "lines": ExportDefinition(
+        get_queryset=_get_lines,
+        columns=[
+            "id",
+            "order_id",
+            "user_id",
+            "email",
+            "bootcamp_run_id",
+            "order_status",
+            "payment_type",
+            "price",
+            "description",
+            "created_on",
+        ],
+        run_field="bootcamp_run_id",
+    ),
+    "receipts": ExportDefinition(
+        get_queryset=_get_receipts,
+        columns=[
+            "id",
+            "order_id",
+            "email",
+            "transaction_uuid",
+            "decision",
+            "amount",
+            "payment_method",
+            "card_type",
+            "card_number",
+            "created_on",
+            "processed_on",
+        ],
+        run_field="order__application__bootcamp_run_id",
+    ),
+    "balances": ExportDefinition(
+        get_queryset=_get_balances,
+        columns=[
+            "id",
+            "user_id",
+            "email",
+            "bootcamp_run_id",
+            "run_title",
+            "state",
+            "price",
+            "total_paid",
+            "balance",
+        ],
+        run_field="bootcamp_run_id",
+    ),
+}
+
+
+def get_export_rows(name, run_id=None):
+    """
+    Get the rows for an export. They're read from a server-side cursor a batch at a time, so memory use doesn't
+    grow with the size of the export.
+
+    Args:
+        name (str): The name of the export
+        run_id (Optional[int]): If set, only rows for this bootcamp run are exported
+
+    Yields:
+        dict: The rows, in id order
+    """
+    export = EXPORTS[name]
+    queryset = export.get_queryset()
+    if run_id is not None:
+        queryset = queryset.filter(**{export.run_field: run_id})
+    # The cursor is only declared WITH HOLD outside of a transaction, and a held cursor doesn't survive pgbouncer
+    # handing the connection to another client between fetches. Keep every fetch in one transaction instead.
+    with transaction.atomic():
+        # values() puts annotations after model fields, but values_list() keeps the columns in the order given
+        for row in (
+            queryset.order_by("id")
+            .values_list(*export.columns)
+            .iterator(chunk_size=EXPORT_FETCH_SIZE)
+        ):
+            yield dict(zip(export.columns, row))
+
+
+class _LineBuffer:
+    """A file-like object for csv.writer which returns each line rather than storing it"""
+
+    def write(self, value):  # pylint: disable=no-self-use
+        """Return the value which was written"""
+        return value
+
+
+def _format_csv(columns, rows):
+    """Yields the header and each row as a line of CSV"""
+    writer = csv.DictWriter(_LineBuffer(), fieldnames=columns)
+    yield writer.writerow(dict(zip(columns, columns)))
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _format_jsonl(rows):
+    """Yields each row as a line of JSON"""
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+def _join_chunks(lines):
+    """Encodes lines and joins them into chunks of about EXPORT_CHUNK_BYTES"""
+    chunk = []
+    size = 0
+    for line in lines:
+        encoded = line.encode()
+        chunk.append(encoded)
+        size += len(encoded)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield b"".join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield b"".join(chunk)
+
+
+def _gzip_chunks(chunks):
+    """Compresses chunks of bytes into a gzip stream"""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_export(name, file_format, run_id=None, compress=False):
+    """
+    Stream an export as CSV or JSON lines
+
+    Args:
+        name (str): The name of the export
+        file_format (str): EXPORT_FORMAT_CSV or EXPORT_FORMAT_JSONL
+        run_id (Optional[int]): If set, only rows for this bootcamp run are exported
+        compress (bool): If True, the export is gzipped
+
+    Returns:
+        iterable of bytes: The contents of the export
+    """
+    rows = get_export_rows(name, run_id=run_id)
+    if file_format == EXPORT_FORMAT_CSV:
+        lines = _format_csv(EXPORTS[name].columns, rows)
+    else:
+        lines = _format_jsonl(rows)
+    chunks = _join_chunks(lines)
+    return _gzip_chunks(chunks) if compress else chunks
+
+
+def get_export_filename(name, file_format, run_id=None, compress=False):
+    """
+    Returns:
+        str: The file name for an export, e.g. "balances-run-12.csv.gz"
+    """
+    run_part = f"-run-{run_id}" if run_id is not None else ""
+    return f"{name}{run_part}.{file_format}{'.gz' if compress else ''}"
@@ -0,0 +1,137 @@
+"""Tests for bulk exports"""
+# pylint: disable=redefined-outer-name
+import csv
+from decimal import Decimal
+import gzip
+import io
+import json
+
+import pytest
+from django.db import connection
+
+from applications.factories import BootcampApplicationFactory
+from ecommerce.exports import (
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_JSONL,
+    EXPORTS,
+    get_export_filename,
+    get_export_rows,
+    stream_export,
+)
+from ecommerce.factories import LineFactory
+from ecommerce.models import Order
+from klasses.factories import InstallmentFactory, PersonalPriceFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def applications(mocker):
+    """Two applications for the same run, one of which has a personal price"""
+    mocker.patch("applications.models.novoed_tasks")
+    installment = InstallmentFactory.create(amount=300)
+    run = installment.bootcamp_run
+    InstallmentFactory.create(bootcamp_run=run, amount=200)
+    application, priced_application = BootcampApplicationFactory.create_batch(
+        2, bootcamp_run=run
+    )
+    PersonalPriceFactory.create(
+        bootcamp_run=run, user=priced_application.user, price=400
+    )
+    LineFactory.create(
+        bootcamp_run=run,
+        order__user=application.user,
+        order__application=application,
+        order__status=Order.FULFILLED,
+        order__total_price_paid=120,
+    )
+    LineFactory.create(
+        bootcamp_run=run,
+        order__user=application.user,
+        order__application=application,
+        order__status=Order.CREATED,
+        order__total_price_paid=75,
+    )
+    return application, priced_application
+
+
+def test_get_export_rows_balances(applications):
+    """The balances export should match the price and amount paid for each application"""
+    application, priced_application = applications
+    rows = list(get_export_rows("balances"))
+    assert [row["id"] for row in rows] == [application.id, priced_application.id]
+    for row, app in zip(rows, applications):
+        assert list(row) == EXPORTS["balances"].columns
+        assert row["price"] == app.price
+        assert row["total_paid"] == app.total_paid
+    assert rows[0]["balance"] == Decimal(380)
+    assert rows[1]["balance"] == Decimal(400)
+
+
+def test_get_export_rows_run_id(applications):
+    """Only rows for the bootcamp run should be exported if run_id is set"""
+    other_application = BootcampApplicationFactory.create()
+    assert [row["id"] for row in get_export_rows("applications")] == [
+        applications[0].id,
+        applications[1].id,
+        other_application.id,
+    ]
+    assert [
+        row["id"]
+        for row in get_export_rows(
+            "applications", run_id=other_application.bootcamp_run_id
+        )
+    ] == [other_application.id]
+
+
+def test_get_export_rows_transaction(mocker, applications):
+    """The rows should be fetched in several batches from a cursor which is only open inside one transaction"""
+    mocker.patch("ecommerce.exports.EXPORT_FETCH_SIZE", 1)
+    other_application = BootcampApplicationFactory.create()
+    savepoints = len(connection.savepoint_ids)
+    rows = get_export_rows("applications")
+    ids = [next(rows)["id"]]
+    assert len(connection.savepoint_ids) == savepoints + 1
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT is_holdable FROM pg_cursors WHERE name LIKE %s", ["_django_curs_%"]
+        )
+        assert cursor.fetchall() == [(False,)]
+    ids.extend(row["id"] for row in rows)
+    assert ids == [applications[0].id, applications[1].id, other_application.id]
+    assert len(connection.savepoint_ids) == savepoints
+
+
+@pytest.mark.parametrize("name", sorted(EXPORTS))
+def test_stream_export_csv(applications, name):
+    """Each export should stream a header followed by a row of CSV per record"""
+    content = b"".join(stream_export(name, EXPORT_FORMAT_CSV)).decode()
+    rows = list(csv.reader(io.StringIO(content)))
+    assert rows[0] == EXPORTS[name].columns
+    assert len(rows) == 1 + len(list(get_export_rows(name)))
+
+
+def test_stream_export_jsonl_gzip(applications):
+    """A compressed JSON lines export should decompress to one JSON object per row"""
+    content = gzip.decompress(
+        b"".join(stream_export("balances", EXPORT_FORMAT_JSONL, compress=True))
+    )
+    rows = [json.loads(line) for line in content.decode().splitlines()]
+    assert [row["id"] for row in rows] == [app.id for app in applications]
+    assert rows[0]["balance"] == "380.00"
+
+
+@pytest.mark.parametrize(
+    "run_id, compress, expected",
+    [
+        (None, False, "orders.csv"),
+        (12, False, "orders-run-12.csv"),
+        (12, True, "orders-run-12.csv.gz"),
+    ],
+)
+def test_get_export_filename(run_id, compress, expected):
+    """get_export_filename should describe the export"""
+    assert (
+        get_export_filename("orders", "csv", run_id=run_id, compress=compress)
+        == expected
+    )
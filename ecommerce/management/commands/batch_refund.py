@@ -0,0 +1,77 @@
+"""Refund many users at once, such as everyone in a cancelled bootcamp run"""
+import sys
+
+from django.core.management import BaseCommand
+
+from ecommerce.api import (
+    get_run_refund_requests,
+    parse_refund_csv,
+    preview_batch_refunds,
+    process_batch_refunds,
+)
+from ecommerce.exceptions import BatchRefundException
+from klasses.api import fetch_bootcamp_run
+
+
+class Command(BaseCommand):
+    """Refund everyone who paid for a bootcamp run, or the refunds in a CSV with email, run_key and amount columns"""
+
+    help = "Refund everyone who paid for a bootcamp run, or the refunds in a CSV with email, run_key and amount columns"
+
+    def add_arguments(self, parser):
+        """Handle arguments"""
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument(
+            "--run",
+            type=str,
+            help="The id, title, or display title of a bootcamp run. Everyone who paid for it is refunded in full",
+        )
+        source.add_argument(
+            "--csv",
+            dest="csv_path",
+            type=str,
+            help="Path to a CSV with email, run_key and amount columns",
+        )
+        parser.add_argument(
+            "--preview",
+            action="store_true",
+            help="Check the refunds and show them without making them",
+        )
+
+    def handle(self, *args, **options):
+        """Refund the users"""
+        try:
+            if options["run"]:
+                refund_requests = get_run_refund_requests(
+                    fetch_bootcamp_run(options["run"])
+                )
+            else:
+                with open(options["csv_path"], encoding="utf-8-sig") as csv_file:
+                    refund_requests = parse_refund_csv(csv_file)
+            if options["preview"]:
+                refunds = preview_batch_refunds(refund_requests)
+                summary = None
+            else:
+                summary = process_batch_refunds(refund_requests)
+                refunds = summary.refunds
+        except BatchRefundException as exc:
+            self.stderr.write(str(exc))
+            sys.exit(1)
+
+        for refund in refunds:
+            self.stdout.write(
+                f"{refund.user.email} in {refund.bootcamp_run.title}: "
+                f"${refund.amount} of ${refund.total_paid} paid"
+            )
+        total_amount = sum(refund.amount for refund in refunds)
+        if summary is None:
+            self.stdout.write(
+                f"Previewed {len(refunds)} refunds totalling ${total_amount}"
+            )
+            return
+        self.stdout.write(
+            f"Refunded {len(refunds)} users totalling ${total_amount}\n"
+            f"Applications refunded: {summary.applications_refunded}\n"
+            f"Enrollments deactivated: {summary.enrollments_deactivated}\n"
+            f"NovoEd unenrollments requested: {summary.novoed_unenrollments}"
+        )
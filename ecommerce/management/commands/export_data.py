@@ -0,0 +1,55 @@
+"""Export application, order and payment data"""
+import sys
+
+from django.core.management import BaseCommand
+
+from ecommerce.exports import EXPORT_FORMAT_CSV, EXPORT_FORMATS, EXPORTS, stream_export
+
+
+class Command(BaseCommand):
+    """Export application, order and payment data as CSV or JSON lines"""
+
+    help = "Export application, order and payment data as CSV or JSON lines"
+
+    def add_arguments(self, parser):
+        """Handle arguments"""
+        parser.add_argument("name", choices=sorted(EXPORTS), help="The data to export")
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=EXPORT_FORMATS,
+            default=EXPORT_FORMAT_CSV,
+            help="The format of the export",
+        )
+        parser.add_argument(
+            "--run-id",
+            dest="run_id",
+            type=int,
+            help="Only export rows for this bootcamp run",
+        )
+        parser.add_argument(
+            "--gzip", action="store_true", help="Compress the export with gzip"
+        )
+        parser.add_argument(
+            "-o",
+            "--output",
+            dest="output",
+            help="The file to write the export to. If not set, it's written to stdout.",
+        )
+
+    def handle(self, *args, **options):
+        """Write the export"""
+        chunks = stream_export(
+            options["name"],
+            options["file_format"],
+            run_id=options["run_id"],
+            compress=options["gzip"],
+        )
+        if options["output"]:
+            with open(options["output"], "wb") as output:
+                for chunk in chunks:
+                    output.write(chunk)
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
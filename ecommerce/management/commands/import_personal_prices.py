@@ -0,0 +1,53 @@
+"""Import a spreadsheet of personal prices"""
+import sys
+
+from django.core.management import BaseCommand
+
+from ecommerce.api import (
+    import_personal_prices,
+    parse_personal_price_csv,
+    preview_personal_prices,
+)
+from ecommerce.exceptions import PersonalPriceImportException
+
+
+class Command(BaseCommand):
+    """Import a CSV of personal prices with email, run_key and price columns"""
+
+    help = "Import a CSV of personal prices with email, run_key and price columns"
+
+    def add_arguments(self, parser):
+        """Handle arguments"""
+        parser.add_argument("csv_path", type=str, help="Path to the CSV")
+        parser.add_argument(
+            "--preview",
+            action="store_true",
+            help="Show the changes which would be made without making them",
+        )
+
+    def handle(self, *args, **options):
+        """Import CSV of personal prices"""
+        try:
+            with open(options["csv_path"], encoding="utf-8-sig") as csv_file:
+                changes = parse_personal_price_csv(csv_file)
+            if options["preview"]:
+                diffs = preview_personal_prices(changes)
+            else:
+                diffs = import_personal_prices(changes)
+        except PersonalPriceImportException as exc:
+            self.stderr.write(str(exc))
+            sys.exit(1)
+
+        for diff in diffs:
+            state_change = (
+                f", application {diff.old_state} -> {diff.new_state}"
+                if diff.old_state != diff.new_state
+                else ""
+            )
+            self.stdout.write(
+                f"{diff.user.email} in {diff.bootcamp_run.title}: "
+                f"{diff.old_price} -> {diff.new_price}{state_change}"
+            )
+        self.stdout.write(
+            f"{'Previewed' if options['preview'] else 'Imported'} {len(diffs)} personal prices"
+        )
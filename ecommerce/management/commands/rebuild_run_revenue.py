@@ -0,0 +1,29 @@
+"""Recalculate the revenue totals for bootcamp runs"""
+from django.core.management import BaseCommand
+
+from ecommerce.api import rebuild_run_revenue, update_run_revenue
+from klasses.api import fetch_bootcamp_run
+
+
+class Command(BaseCommand):
+    """Recalculate the revenue totals for every bootcamp run, or a single run"""
+
+    help = "Recalculate the revenue totals for every bootcamp run, or a single run"
+
+    def add_arguments(self, parser):
+        """Handle arguments"""
+        parser.add_argument(
+            "--run",
+            type=str,
+            help="The id, title, or display title of a bootcamp run to update",
+        )
+
+    def handle(self, *args, **options):
+        """Recalculate revenue totals"""
+        if options["run"]:
+            bootcamp_run = fetch_bootcamp_run(options["run"])
+            update_run_revenue(bootcamp_run.id)
+            self.stdout.write(f"Updated revenue for {bootcamp_run.title}")
+        else:
+            count = rebuild_run_revenue()
+            self.stdout.write(f"Updated revenue for {count} bootcamp runs")
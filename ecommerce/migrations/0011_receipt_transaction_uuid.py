@@ -0,0 +1,30 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+def mark_existing_receipts_processed(apps, schema_editor):
+    """Receipts from before asynchronous fulfillment were processed when they were received"""
+    Receipt = apps.get_model("ecommerce", "Receipt")
+    Receipt.objects.update(processed_on=models.F("created_on"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("ecommerce", "0010_wire_transfers")]
+
+    operations = [
+        migrations.AddField(
+            model_name="receipt",
+            name="transaction_uuid",
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name="receipt",
+            name="processed_on",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(
+            mark_existing_receipts_processed, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("klasses", "0023_bootcamprunenrollment_user_certificate_is_blocked"),
+        ("ecommerce", "0011_receipt_transaction_uuid"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BootcampRunRevenue",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+                ("updated_on", models.DateTimeField(auto_now=True)),
+                (
+                    "paid",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=20),
+                ),
+                (
+                    "refunded",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=20),
+                ),
+                (
+                    "expected_revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=20),
+                ),
+                (
+                    "outstanding_balance",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=20),
+                ),
+                (
+                    "application_state_counts",
+                    django.contrib.postgres.fields.jsonb.JSONField(default=dict),
+                ),
+                (
+                    "bootcamp_run",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="revenue",
+                        to="klasses.BootcampRun",
+                    ),
+                ),
+            ],
+            options={"abstract": False},
+        )
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("applications", "0014_application_refund_status"),
+        ("klasses", "0023_bootcamprunenrollment_user_certificate_is_blocked"),
+        ("ecommerce", "0012_bootcamprunrevenue"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InstallmentReminder",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+                ("updated_on", models.DateTimeField(auto_now=True)),
+                ("amount_due", models.DecimalField(decimal_places=2, max_digits=20)),
+                (
+                    "application",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="installment_reminders",
+                        to="applications.BootcampApplication",
+                    ),
+                ),
+                (
+                    "installment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="klasses.Installment",
+                    ),
+                ),
+            ],
+            options={"unique_together": {("installment", "application")}},
+        )
+    ]
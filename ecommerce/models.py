@@ -4,9 +4,11 @@ from django.contrib.postgres.fields import JSONField
 from django.db.models import (
     CharField,
     CASCADE,
+    DateTimeField,
     DecimalField,
     ForeignKey,
     IntegerField,
+    OneToOneField,
     SET_NULL,
     PROTECT,
     TextField,
@@ -172,6 +174,8 @@ class Receipt(TimestampedModel):
 
     order = ForeignKey(Order, null=True, on_delete=CASCADE)
     data = JSONField()
+    transaction_uuid = CharField(max_length=255, unique=True, null=True, blank=True)
+    processed_on = DateTimeField(null=True, blank=True)
 
     @property
     def payment_method(self):
@@ -209,3 +213,41 @@ class WireTransferReceipt(TimestampedModel):
             return f"Wire transfer receipt for order {self.order.id}"
         else:
             return "Wire transfer receipt with no attached order"
+
+
+class BootcampRunRevenue(TimestampedModel):
+    """
+    Totals of the money paid and owed for a bootcamp run, updated as orders, prices and applications change
+    """
+
+    bootcamp_run = OneToOneField(BootcampRun, on_delete=CASCADE, related_name="revenue")
+    paid = DecimalField(decimal_places=2, max_digits=20, default=0)
+    refunded = DecimalField(decimal_places=2, max_digits=20, default=0)
+    expected_revenue = DecimalField(decimal_places=2, max_digits=20, default=0)
+    outstanding_balance = DecimalField(decimal_places=2, max_digits=20, default=0)
+    application_state_counts = JSONField(default=dict)
+
+    def __str__(self):
+        """Description of BootcampRunRevenue"""
+        return f"Revenue for bootcamp run {self.bootcamp_run_id}"
+
+
+class InstallmentReminder(TimestampedModel):
+    """
+    A record that an applicant was reminded to pay before an installment deadline
+    """
+
+    installment = ForeignKey("klasses.Installment", on_delete=CASCADE)
+    application = ForeignKey(
+        "applications.BootcampApplication",
+        on_delete=CASCADE,
+        related_name="installment_reminders",
+    )
+    amount_due = DecimalField(decimal_places=2, max_digits=20)
+
+    class Meta:
+        unique_together = ("installment", "application")
+
+    def __str__(self):
+        """Description of InstallmentReminder"""
+        return f"Reminder for installment {self.installment_id}, application {self.application_id}"
@@ -46,7 +46,10 @@ class ApplicationOrderSerializer(serializers.ModelSerializer):
         if order.payment_type == Order.CYBERSOURCE_TYPE:
             # There should only be one receipt for an order most of the time, but it's possible
             # there is a duplicate or a Cybersource error in one of the receipts.
-            receipt = order.receipt_set.order_by("id").last()
+            # Using ".all()" so that receipts prefetched by the view are used
+            receipt = max(
+                order.receipt_set.all(), key=lambda receipt: receipt.id, default=None
+            )
             return receipt.payment_method if receipt is not None else None
         elif order.payment_type == Order.WIRE_TRANSFER_TYPE:
             return "Wire Transfer"
@@ -104,9 +107,10 @@ class CheckoutDataSerializer(serializers.ModelSerializer):
 
     def get_payments(self, application):
         """Serialized payments made by the user"""
+        # Using ".all()" to allow for query optimization via prefetch
         return LineSerializer(
             (
-                order.line_set.first()
+                min(order.line_set.all(), key=lambda line: line.id, default=None)
                 for order in application.orders.all()
                 if order.status == Order.FULFILLED
             ),
@@ -116,7 +120,11 @@ class CheckoutDataSerializer(serializers.ModelSerializer):
     def get_installments(self, application):
         """Installments with prices and due dates"""
         return InstallmentSerializer(
-            application.bootcamp_run.installment_set.order_by("deadline"), many=True
+            sorted(
+                application.bootcamp_run.installment_set.all(),
+                key=lambda installment: installment.deadline,
+            ),
+            many=True,
         ).data
 
     class Meta:
@@ -0,0 +1,44 @@
+"""Signals for ecommerce models"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from applications.models import BootcampApplication
+from ecommerce.api import request_run_revenue_update
+from ecommerce.models import Line, Order
+from klasses.models import Installment, PersonalPrice
+
+# pylint:disable=unused-argument
+
+
+@receiver(post_save, sender=Order, dispatch_uid="order_revenue_post_save")
+def order_post_save(sender, instance, created, **kwargs):
+    """Update revenue when an order is fulfilled, fails or is refunded"""
+    if created:
+        # The lines for a new order are created after it and handled by line_post_save
+        return
+    for bootcamp_run_id in set(
+        instance.line_set.values_list("bootcamp_run_id", flat=True)
+    ):
+        request_run_revenue_update(bootcamp_run_id)
+
+
+@receiver(post_save, sender=Line, dispatch_uid="line_revenue_post_save")
+@receiver(post_delete, sender=Line, dispatch_uid="line_revenue_post_delete")
+@receiver(
+    post_save, sender=PersonalPrice, dispatch_uid="personal_price_revenue_post_save"
+)
+@receiver(
+    post_delete, sender=PersonalPrice, dispatch_uid="personal_price_revenue_post_delete"
+)
+@receiver(post_save, sender=Installment, dispatch_uid="installment_revenue_post_save")
+@receiver(
+    post_delete, sender=Installment, dispatch_uid="installment_revenue_post_delete"
+)
+@receiver(
+    post_save,
+    sender=BootcampApplication,
+    dispatch_uid="bootcamp_application_revenue_post_save",
+)
+def bootcamp_run_post_change(sender, instance, **kwargs):
+    """Update revenue when a payment, a price or the state of an application changes for a bootcamp run"""
+    request_run_revenue_update(instance.bootcamp_run_id)
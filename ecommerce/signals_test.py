@@ -0,0 +1,57 @@
+"""Tests for ecommerce signals"""
+import pytest
+
+from applications.constants import AppStates
+from applications.factories import BootcampApplicationFactory
+from ecommerce.factories import LineFactory
+from ecommerce.models import Order
+from klasses.factories import (
+    BootcampRunFactory,
+    InstallmentFactory,
+    PersonalPriceFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture
+def mock_request_update(mocker):
+    """Mock request_run_revenue_update"""
+    return mocker.patch("ecommerce.signals.request_run_revenue_update")
+
+
+def test_order_signals(mock_request_update):
+    """The revenue for a run should be updated when its orders or lines change"""
+    line = LineFactory.create(order__status=Order.CREATED)
+    mock_request_update.reset_mock()
+    line.order.status = Order.FULFILLED
+    line.order.save()
+    mock_request_update.assert_called_once_with(line.bootcamp_run_id)
+
+    mock_request_update.reset_mock()
+    line.delete()
+    mock_request_update.assert_any_call(line.bootcamp_run_id)
+
+
+def test_price_signals(mock_request_update):
+    """The revenue for a run should be updated when its prices change"""
+    bootcamp_run = BootcampRunFactory.create()
+    InstallmentFactory.create(bootcamp_run=bootcamp_run)
+    personal_price = PersonalPriceFactory.create(bootcamp_run=bootcamp_run)
+    personal_price.delete()
+    assert mock_request_update.call_count == 3
+    mock_request_update.assert_called_with(bootcamp_run.id)
+
+
+def test_application_signal(mocker, mock_request_update):
+    """The revenue for a run should be updated when an application changes state"""
+    mocker.patch("applications.models.novoed_tasks")
+    application = BootcampApplicationFactory.create(
+        state=AppStates.AWAITING_PAYMENT.value
+    )
+    mock_request_update.reset_mock()
+    application.state = AppStates.COMPLETE.value
+    application.save()
+    mock_request_update.assert_called_once_with(application.bootcamp_run_id)
@@ -7,3 +7,21 @@ from main.celery import app
 def send_receipt_email(application_id):
     """Task to send a receipt email for an application"""
     api.send_receipt_email(application_id)
+
+
+@app.task(acks_late=True)
+def fulfill_order(receipt_id):
+    """Task to fulfill or reject the order for a CyberSource receipt"""
+    api.fulfill_receipt(receipt_id)
+
+
+@app.task(acks_late=True)
+def update_run_revenue(bootcamp_run_id):
+    """Task to recalculate the revenue totals for a bootcamp run"""
+    api.update_run_revenue(bootcamp_run_id)
+
+
+@app.task
+def send_installment_reminders():
+    """Task to remind applicants who haven't paid enough for the next installment of their bootcamp run"""
+    api.send_installment_reminders()
@@ -1,5 +1,5 @@
 """Ecommerce task tests"""
-from ecommerce.tasks import send_receipt_email
+from ecommerce.tasks import fulfill_order, send_receipt_email
 
 
 def test_send_receipt_email(mocker):
@@ -7,3 +7,10 @@ def test_send_receipt_email(mocker):
     mock_api = mocker.patch("ecommerce.tasks.api")
     send_receipt_email.delay(123)
     mock_api.send_receipt_email.assert_called_once_with(123)
+
+
+def test_fulfill_order(mocker):
+    """Test fulfill_order"""
+    mock_api = mocker.patch("ecommerce.tasks.api")
+    fulfill_order.delay(123)
+    mock_api.fulfill_receipt.assert_called_once_with(123)
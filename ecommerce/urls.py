@@ -6,8 +6,10 @@ from django.urls import path
 
 from ecommerce.views import (
     CheckoutDataView,
+    ExportView,
     OrderFulfillmentView,
     PaymentView,
+    PersonalPriceImportView,
     UserBootcampRunDetail,
     UserBootcampRunList,
     UserBootcampRunStatement,
@@ -39,4 +41,14 @@ urlpatterns = [
     ),
     url(r"api/orders/(?P<pk>[0-9]+)/$", OrderView.as_view(), name="order-api"),
     path("api/checkout/", CheckoutDataView.as_view(), name="checkout-data-detail"),
+    url(
+        r"^api/v0/exports/(?P<name>[a-z_]+)\.(?P<file_format>csv|jsonl)$",
+        ExportView.as_view(),
+        name="export",
+    ),
+    url(
+        r"^api/v0/personal_prices/import/$",
+        PersonalPriceImportView.as_view(),
+        name="personal-price-import",
+    ),
 ]
@@ -1,17 +1,18 @@
 """Views for ecommerce"""
 from decimal import Decimal
+import io
 import logging
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.http.response import Http404
+from django.http.response import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from ipware import get_client_ip
 from rest_framework import status as statuses
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.generics import CreateAPIView, GenericAPIView, RetrieveAPIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.renderers import TemplateHTMLRenderer
 from rest_framework.response import Response
 from rest_framework.validators import ValidationError
@@ -20,18 +21,27 @@ from rest_framework.views import APIView
 from applications.constants import AppStates
 from applications.models import BootcampApplication
 from backends.edxorg import EdxOrgOAuth2
+from ecommerce import tasks
 from ecommerce.api import (
-    complete_successful_order,
     create_unfulfilled_order,
     generate_cybersource_sa_payload,
-    get_new_order_by_reference_number,
-    handle_rejected_order,
+    import_personal_prices,
+    parse_personal_price_csv,
+    parse_personal_price_rows,
+    preview_personal_prices,
+    save_receipt,
+    serialize_personal_price_diff,
     serialize_user_bootcamp_run,
     serialize_user_bootcamp_runs,
 )
-from ecommerce.constants import CYBERSOURCE_DECISION_ACCEPT, CYBERSOURCE_DECISION_CANCEL
-from ecommerce.exceptions import EcommerceException
-from ecommerce.models import Line, Order, Receipt
+from ecommerce.exceptions import PersonalPriceImportException
+from ecommerce.exports import (
+    EXPORT_CONTENT_TYPES,
+    EXPORTS,
+    get_export_filename,
+    stream_export,
+)
+from ecommerce.models import Line, Order
 from ecommerce.permissions import IsSignedByCyberSource
 from ecommerce.serializers import (
     CheckoutDataSerializer,
@@ -110,34 +120,12 @@ class OrderFulfillmentView(APIView):
 
     def post(self, request, *args, **kwargs):  # pylint: disable=unused-argument
         """
-        Confirmation from CyberSource which fulfills an existing Order.
+        Confirmation from CyberSource which fulfills an existing Order. The receipt is saved and the order is
+        fulfilled asynchronously so that CyberSource gets a response right away.
         """
-        # First, save this information in a receipt
-        receipt = Receipt.objects.create(data=request.data)
-
-        # Link the order with the receipt if we can parse it
-        reference_number = request.data["req_reference_number"]
-        order = get_new_order_by_reference_number(reference_number)
-        receipt.order = order
-        receipt.save()
-
-        decision = request.data["decision"]
-        if order.status == Order.FAILED and decision == CYBERSOURCE_DECISION_CANCEL:
-            # This is a duplicate message, ignore since it's already handled
-            return Response(status=statuses.HTTP_200_OK)
-        elif order.status != Order.CREATED:
-            raise EcommerceException(
-                "Order {} is expected to have status 'created'".format(order.id)
-            )
-
-        if decision != CYBERSOURCE_DECISION_ACCEPT:
-            handle_rejected_order(order=order, decision=decision)
-        else:
-            # import pdb; pdb.set_trace()
-            complete_successful_order(order)
-
-        # Sync order data with hubspot
-        sync_hubspot_application_from_order(order)
+        receipt, created = save_receipt(request.data)
+        if created or receipt.processed_on is None:
+            tasks.fulfill_order.delay(receipt.id)
 
         # The response does not matter to CyberSource
         return Response(status=statuses.HTTP_200_OK)
@@ -236,12 +224,12 @@ class CheckoutDataView(RetrieveAPIView):
             BootcampApplication.objects.filter(
                 user=self.request.user, state=AppStates.AWAITING_PAYMENT.value
             )
-            .select_related("bootcamp_run")
+            .select_related("bootcamp_run__bootcamp")
             .prefetch_related(
                 "bootcamp_run__personal_prices",
                 "bootcamp_run__installment_set",
                 "orders",
-                "orders__line_set",
+                "orders__line_set__bootcamp_run",
             )
             .order_by("id")
         )
@@ -259,3 +247,70 @@ class OrderView(RetrieveAPIView):
     serializer_class = OrderSerializer
     queryset = Order.objects.all()
     owner_field = "user"
+
+
+class ExportView(APIView):
+    """
+    Staff-only streaming export of application, order and payment data as CSV or JSON lines. Pass run_id to
+    export a single bootcamp run, and gzip=true to compress the file.
+    """
+
+    authentication_classes = (SessionAuthentication,)
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, name, file_format):
+        """Stream the export"""
+        if name not in EXPORTS:
+            raise Http404
+        run_id = request.query_params.get("run_id")
+        if run_id is not None:
+            if not run_id.isdigit():
+                raise ValidationError({"run_id": "Must be an integer"})
+            run_id = int(run_id)
+        compress = request.query_params.get("gzip", "").lower() in ("1", "true")
+
+        response = StreamingHttpResponse(
+            stream_export(name, file_format, run_id=run_id, compress=compress),
+            content_type="application/gzip"
+            if compress
+            else EXPORT_CONTENT_TYPES[file_format],
+        )
+        filename = get_export_filename(
+            name, file_format, run_id=run_id, compress=compress
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class PersonalPriceImportView(APIView):
+    """
+    Staff-only bulk import of personal prices, from a CSV file uploaded as "file" or a list of "prices" with
+    email, run_key and price values. If "preview" is true the changes are described but not made.
+    """
+
+    authentication_classes = (SessionAuthentication,)
+    permission_classes = (IsAdminUser,)
+
+    def post(self, request):
+        """Preview or import the personal prices"""
+        preview = str(request.data.get("preview", "")).lower() in ("1", "true")
+        try:
+            if "file" in request.FILES:
+                content = request.FILES["file"].read().decode("utf-8-sig")
+                changes = parse_personal_price_csv(io.StringIO(content))
+            else:
+                changes = parse_personal_price_rows(request.data.get("prices") or [])
+            diffs = (
+                preview_personal_prices(changes)
+                if preview
+                else import_personal_prices(changes)
+            )
+        except PersonalPriceImportException as exc:
+            raise ValidationError({"errors": [str(exc)]})
+        return Response(
+            data={
+                "preview": preview,
+                "changes": [serialize_personal_price_diff(diff) for diff in diffs],
+            },
+            status=statuses.HTTP_200_OK,
+        )
@@ -1,6 +1,9 @@
 """Tests for ecommerce views"""
+import gzip
+import json
 from unittest.mock import PropertyMock
 
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import resolve, reverse
 import faker
 import pytest
@@ -21,7 +24,8 @@ from ecommerce.serializers import (
 from ecommerce.test_utils import create_test_application, create_test_order
 from ecommerce.views import OrderView
 from klasses.factories import BootcampRunFactory
-from klasses.models import BootcampRunEnrollment
+from klasses.models import BootcampRunEnrollment, PersonalPrice
+from main.utils import now_in_utc
 from profiles.factories import ProfileFactory, UserFactory
 
 
@@ -189,6 +193,7 @@ def test_order_fulfilled(client, mocker, application, bootcamp_run, user, has_pa
     )
     send_email = mocker.patch("ecommerce.api.MailgunClient.send_individual_email")
     mock_tasks = mocker.patch("ecommerce.api.tasks")
+    patched_enqueue_task = mocker.patch("ecommerce.api.enqueue_task")
     paid_in_full_mock = mocker.patch(
         "applications.models.BootcampApplication.is_paid_in_full",
         new_callable=PropertyMock,
@@ -222,7 +227,40 @@ def test_order_fulfilled(client, mocker, application, bootcamp_run, user, has_pa
         is has_paid
     )
 
-    mock_tasks.send_receipt_email.delay.assert_called_once_with(order.application.id)
+    # Revenue updates for the run are enqueued too
+    patched_enqueue_task.assert_any_call(
+        mock_tasks.send_receipt_email,
+        args=[order.application.id],
+        aggregate=order.application,
+    )
+
+
+def test_order_fulfilled_duplicate(client, mocker, application):
+    """
+    A message which CyberSource resends for the same transaction should not be saved or processed twice
+    """
+    order = create_test_order(application, 123, fulfilled=False)
+    data = {
+        "req_reference_number": make_reference_id(order),
+        "req_transaction_uuid": "abc123",
+        "decision": "ACCEPT",
+    }
+    mocker.patch(
+        "ecommerce.views.IsSignedByCyberSource.has_permission", return_value=True
+    )
+    fulfill_mock = mocker.patch("ecommerce.views.tasks.fulfill_order.delay")
+
+    resp = client.post(reverse("order-fulfillment"), data=data)
+    assert resp.status_code == statuses.HTTP_200_OK
+    receipt = Receipt.objects.get()
+    fulfill_mock.assert_called_once_with(receipt.id)
+
+    receipt.processed_on = now_in_utc()
+    receipt.save()
+    resp = client.post(reverse("order-fulfillment"), data=data)
+    assert resp.status_code == statuses.HTTP_200_OK
+    assert Receipt.objects.count() == 1
+    assert fulfill_mock.call_count == 1
 
 
 def test_missing_fields(client, mocker):
@@ -568,3 +606,115 @@ def test_order_view_permissions(client, user):
 def test_order_view_serializer():
     """The OrderView should use the expected serializer"""
     assert OrderView.serializer_class == OrderSerializer
+
+
+@pytest.mark.parametrize("is_staff", [True, False])
+def test_export_permissions(client, user, is_staff):
+    """Only staff should be able to download exports"""
+    user.is_staff = is_staff
+    user.save()
+    client.force_login(user)
+    resp = client.get(
+        reverse("export", kwargs={"name": "applications", "file_format": "csv"})
+    )
+    assert resp.status_code == (
+        statuses.HTTP_200_OK if is_staff else statuses.HTTP_403_FORBIDDEN
+    )
+
+
+@pytest.mark.parametrize(
+    "query, content_type, filename",
+    [
+        ("", "application/x-ndjson", "balances.jsonl"),
+        ("?gzip=true", "application/gzip", "balances.jsonl.gz"),
+    ],
+)
+def test_export(client, application, query, content_type, filename):
+    """The export should be streamed as a file download"""
+    client.force_login(UserFactory.create(is_staff=True))
+    resp = client.get(
+        reverse("export", kwargs={"name": "balances", "file_format": "jsonl"}) + query
+    )
+    assert resp.status_code == statuses.HTTP_200_OK
+    assert resp.streaming is True
+    assert resp["Content-Type"] == content_type
+    assert resp["Content-Disposition"] == f'attachment; filename="{filename}"'
+    content = b"".join(resp.streaming_content)
+    if query:
+        content = gzip.decompress(content)
+    assert [json.loads(line)["id"] for line in content.decode().splitlines()] == [
+        application.id
+    ]
+
+
+@pytest.mark.parametrize(
+    "name, query, status",
+    [
+        ("unknown", "", statuses.HTTP_404_NOT_FOUND),
+        ("orders", "?run_id=abc", statuses.HTTP_400_BAD_REQUEST),
+    ],
+)
+def test_export_invalid(client, name, query, status):
+    """Unknown exports and invalid run ids should be rejected"""
+    client.force_login(UserFactory.create(is_staff=True))
+    resp = client.get(
+        reverse("export", kwargs={"name": name, "file_format": "csv"}) + query
+    )
+    assert resp.status_code == status
+
+
+@pytest.mark.parametrize("is_staff", [True, False])
+def test_personal_price_import_permissions(client, user, is_staff):
+    """Only staff should be able to import personal prices"""
+    user.is_staff = is_staff
+    user.save()
+    client.force_login(user)
+    resp = client.post(
+        reverse("personal-price-import"),
+        {"preview": True, "prices": []},
+        content_type="application/json",
+    )
+    assert resp.status_code == (
+        statuses.HTTP_200_OK if is_staff else statuses.HTTP_403_FORBIDDEN
+    )
+
+
+@pytest.mark.parametrize("preview", [True, False])
+def test_personal_price_import_csv(client, application, preview):
+    """A CSV of personal prices should be previewed or imported"""
+    client.force_login(UserFactory.create(is_staff=True))
+    run_key = application.bootcamp_run.run_key
+    content = f"email,run_key,price\n{application.user.email},{run_key},0\n"
+    csv_file = SimpleUploadedFile("prices.csv", content.encode())
+    resp = client.post(
+        reverse("personal-price-import"), {"file": csv_file, "preview": preview}
+    )
+    assert resp.status_code == statuses.HTTP_200_OK
+    assert resp.json() == {
+        "preview": preview,
+        "changes": [
+            {
+                "email": application.user.email,
+                "run_key": application.bootcamp_run.run_key,
+                "bootcamp_run_title": application.bootcamp_run.title,
+                "old_price": None,
+                "new_price": 0,
+                "application_id": application.id,
+                "old_state": AppStates.AWAITING_PAYMENT.value,
+                "new_state": AppStates.COMPLETE.value,
+            }
+        ],
+    }
+    assert PersonalPrice.objects.filter(user=application.user).exists() is not preview
+
+
+def test_personal_price_import_invalid(client):
+    """Invalid personal prices should be rejected"""
+    client.force_login(UserFactory.create(is_staff=True))
+    resp = client.post(
+        reverse("personal-price-import"),
+        {"prices": [{"email": "missing@example.com", "run_key": 1, "price": 10}]},
+        content_type="application/json",
+    )
+    assert resp.status_code == statuses.HTTP_400_BAD_REQUEST
+    assert "Could not find users" in resp.json()["errors"][0]
@@ -6,3 +6,9 @@ import pytest
 def disable_hubspot_api(settings):
     """Disable Hubspot API by default for tests"""
     settings.HUBSPOT_API_KEY = None
+
+
+@pytest.fixture(autouse=True)
+def disable_user_cache(settings):
+    """Disable the serialized user cache by default for tests"""
+    settings.USER_CACHE_TIMEOUT = 0
@@ -5,6 +5,7 @@ from types import SimpleNamespace
 import pytest
 import responses
 
+from django.core.cache.backends.locmem import LocMemCache
 from django.test.client import Client
 from rest_framework.test import APIClient
 from wagtail.core.models import Site
@@ -135,3 +136,10 @@ def awaiting_submission_app():
     return SimpleNamespace(
         application=application, run_steps=run_steps, installment=installment
     )
+
+
+@pytest.fixture
+def user_cache(settings, mocker):
+    """Enable the serialized user cache, backed by an in-memory cache"""
+    settings.USER_CACHE_TIMEOUT = 60
+    return mocker.patch("profiles.api.cache", LocMemCache("user_cache", {}))
@@ -4,6 +4,10 @@ Hubspot Ecommerce Bridge API sync utilities
 https://developers.hubspot.com/docs/methods/ecomm-bridge/ecomm-bridge-overview
 """
 from builtins import hasattr
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
 import logging
 import re
 from urllib.parse import urljoin, urlencode
@@ -16,6 +20,7 @@ from django.utils import timezone
 from applications.constants import INTEGRATION_PREFIX
 from applications.models import BootcampApplication
 from hubspot.decorators import try_again
+from hubspot.models import HubspotSyncFingerprint
 from hubspot.serializers import (
     HubspotProductSerializer,
     HubspotDealSerializer,
@@ -25,6 +30,29 @@ from klasses.models import BootcampRun
 
 HUBSPOT_API_BASE_URL = "https://api.hubapi.com"
 
+PROPERTY_CHANGE_CREATE = "create"
+PROPERTY_CHANGE_UPDATE = "update"
+PROPERTY_CHANGE_DELETE = "delete"
+KIND_GROUP = "group"
+KIND_PROPERTY = "property"
+# The attributes compared with Hubspot. Hubspot returns many others (displayOrder, createdAt, etc) which
+# aren't set here, so they're ignored rather than reported as changes on every run.
+MANAGED_GROUP_FIELDS = ("name", "displayName")
+MANAGED_PROPERTY_FIELDS = (
+    "name",
+    "label",
+    "description",
+    "groupName",
+    "type",
+    "fieldType",
+    "options",
+)
+
+PropertyChange = namedtuple(
+    "PropertyChange",
+    ["action", "object_type", "kind", "name", "body", "changed_fields"],
+)
+
 log = logging.getLogger()
 
 
@@ -145,6 +173,99 @@ def make_sync_message(object_id, properties):
     }
 
 
+def hash_sync_message(message):
+    """
+    Hash the properties in a sync message
+
+    Args:
+        message (dict): A sync message
+
+    Returns:
+        str: The hash of the message's properties
+    """
+    serialized = json.dumps(
+        message["propertyNameToValues"], sort_keys=True, default=str
+    )
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def filter_changed_sync_messages(object_type, messages):
+    """
+    Remove sync messages for objects whose properties are the same as the last time they were sent to Hubspot
+
+    Args:
+        object_type (str): one of "CONTACT", "DEAL", "PRODUCT", "LINE_ITEM"
+        messages (list of dict): Sync messages
+
+    Returns:
+        list of dict: The sync messages for objects which have changed
+    """
+    sent_hashes = dict(
+        HubspotSyncFingerprint.objects.filter(
+            object_type=object_type,
+            integrator_object_id__in=[
+                message["integratorObjectId"] for message in messages
+            ],
+        ).values_list("integrator_object_id", "properties_hash")
+    )
+    return [
+        message
+        for message in messages
+        if sent_hashes.get(message["integratorObjectId"]) != hash_sync_message(message)
+    ]
+
+
+def record_sync_fingerprints(object_type, messages):
+    """
+    Store hashes of the properties which were sent to Hubspot so unchanged objects can be skipped next time
+
+    Args:
+        object_type (str): one of "CONTACT", "DEAL", "PRODUCT", "LINE_ITEM"
+        messages (list of dict): Sync messages which were sent successfully
+    """
+    now = timezone.now()
+    hashes = {
+        message["integratorObjectId"]: hash_sync_message(message)
+        for message in messages
+    }
+    existing = list(
+        HubspotSyncFingerprint.objects.filter(
+            object_type=object_type, integrator_object_id__in=list(hashes)
+        )
+    )
+    for fingerprint in existing:
+        fingerprint.properties_hash = hashes.pop(fingerprint.integrator_object_id)
+        fingerprint.synced_on = now
+    HubspotSyncFingerprint.objects.bulk_update(
+        existing, ["properties_hash", "synced_on"]
+    )
+    HubspotSyncFingerprint.objects.bulk_create(
+        [
+            HubspotSyncFingerprint(
+                object_type=object_type,
+                integrator_object_id=integrator_object_id,
+                properties_hash=properties_hash,
+                synced_on=now,
+            )
+            for integrator_object_id, properties_hash in hashes.items()
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def clear_sync_fingerprint(object_type, integrator_object_id):
+    """
+    Forget the properties last sent to Hubspot for an object, so that it's sent again on the next sync
+
+    Args:
+        object_type (str): one of "CONTACT", "DEAL", "PRODUCT", "LINE_ITEM"
+        integrator_object_id (str): The formatted hubspot id of the object
+    """
+    HubspotSyncFingerprint.objects.filter(
+        object_type=object_type, integrator_object_id=integrator_object_id
+    ).delete()
+
+
 def paged_sync_errors(limit=200, offset=0):
     """
     Query the Ubspot API for errors that have occurred during sync
@@ -223,6 +344,29 @@ def exists_in_hubspot(object_type, object_id):
         return sync_status["hubspotId"] is not None
 
 
+def get_existing_hubspot_objects(object_type, object_ids):
+    """
+    Check which objects exist in hubspot, making up to HUBSPOT_MAX_CONCURRENT_REQUESTS requests at once
+
+    Args:
+        object_type (str): The hubspot object_type
+        object_ids (iterable of ID): The IDs of the objects to check
+
+    Returns:
+        set: The IDs of the objects which exist in hubspot
+    """
+    object_ids = list(object_ids)
+    if not object_ids:
+        return set()
+    with ThreadPoolExecutor(
+        max_workers=settings.HUBSPOT_MAX_CONCURRENT_REQUESTS
+    ) as executor:
+        results = executor.map(
+            lambda object_id: exists_in_hubspot(object_type, object_id), object_ids
+        )
+        return {object_id for object_id, exists in zip(object_ids, results) if exists}
+
+
 def make_contact_sync_message(user_id):
     """
     Create the body of a sync message for a contact.
@@ -233,12 +377,12 @@ def make_contact_sync_message(user_id):
     Returns:
         list: dict containing serializable sync-message data
     """
-    from profiles.serializers import UserSerializer
+    from profiles.api import get_serialized_user
 
-    user = User.objects.get(id=user_id)
+    user = User.objects.select_related("profile").get(id=user_id)
     if not hasattr(user, "profile"):
         return [{}]
-    properties = UserSerializer(user).data
+    properties = dict(get_serialized_user(user))
     properties.update(properties.pop("legal_address") or {})
     properties.update(properties.pop("profile") or {})
     properties["work_experience"] = properties.pop("years_experience", None)
@@ -294,17 +438,12 @@ def make_line_sync_message(application_id):
     return [make_sync_message(application.integration_id, properties)]
 
 
-def sync_object_property(object_type, property_dict):
+def _clean_object_property(property_dict):
     """
-    Create or update a new object property
-
+    Check that a property has the required attributes, and replace None values with empty strings
 
     Args:
-        object_type (str): The object type of the property (ie "deals")
         property_dict (dict): The attributes of the property
-
-    Returns:
-        dict:  The new/updated property attributes
     """
     required_fields = {"name", "label", "groupName"}
 
@@ -320,162 +459,220 @@ def sync_object_property(object_type, property_dict):
         if property_dict[key] is None:
             property_dict[key] = ""
 
-    exists = object_property_exists(object_type, property_dict["name"])
 
-    if exists:
-        method = "PUT"
-        endpoint = f"named/{property_dict['name']}"
-    else:
-        method = "POST"
-        endpoint = ""
-
-    response = send_hubspot_request(
-        endpoint, f"/properties/v1/{object_type}/properties", method, body=property_dict
-    )
-    response.raise_for_status()
-    return response.json()
-
-
-def get_object_property(object_type, property_name):
+def get_object_properties(object_type):
     """
-    Get a Hubspot object property.
+    Get all properties for an object type with a single request
 
     Args:
-        object_type (str): The object type of the property (ie "deals")
-        property_name (str): The property name
+        object_type (str): The object type (ie "deals")
 
     Returns:
-        dict:  the property attributes
+        dict: Property names mapped to their attributes
     """
     response = send_hubspot_request(
-        property_name, f"/properties/v1/{object_type}/properties/named", "GET"
+        "", f"/properties/v1/{object_type}/properties", "GET"
     )
     response.raise_for_status()
-    return response.json()
-
-
-def object_property_exists(object_type, property_name):
-    """
-    Return True if the specified property exists, False otherwise
-
-    Args:
-        object_type (str): The object type of the property (ie "deals")
-        property_name (str): The property name
-
-    Returns:
-        boolean:  True if the property exists otherwise False
-    """
-    try:
-        get_object_property(object_type, property_name)
-        return True
-    except requests.HTTPError:
-        return False
+    return {obj_property["name"]: obj_property for obj_property in response.json()}
 
 
-def delete_object_property(object_type, property_name):
+def get_property_groups(object_type):
     """
-    Delete a property from Hubspot
+    Get all property groups for an object type with a single request
 
     Args:
-        object_type (str): The object type of the property (ie "deals")
-        property_name (str): The property name
+        object_type (str): The object type (ie "deals")
 
     Returns:
-        dict:  the result of the delete request in JSON format
+        dict: Group names mapped to their attributes
     """
-    response = send_hubspot_request(
-        "",
-        "/properties/v1/{}/properties/named/{}".format(
-            object_type.lower(), property_name
-        ),
-        "DELETE",
-    )
+    response = send_hubspot_request("", f"/properties/v1/{object_type}/groups", "GET")
     response.raise_for_status()
-    return response.json()
+    return {group["name"]: group for group in response.json()}
 
 
-def get_property_group(object_type, group_name):
-    """
-    Get a Hubspot property group.
+def _normalize_field(key, value):
+    """Returns a property or group attribute in a form which can be compared with the same one from Hubspot"""
+    if key == "options":
+        # Hubspot adds attributes like displayOrder and hidden to each option
+        return [(option.get("label"), option.get("value")) for option in value or []]
+    return "" if value is None else value
 
-    Args:
-        object_type (str): The object type of the group (ie "deals")
-        group_name (str): The group name
 
-    Returns:
-        dict:  The group attributes
+def _get_changed_fields(existing, desired, managed_fields):
     """
-    response = send_hubspot_request(
-        group_name, f"/properties/v1/{object_type}/groups/named", "GET"
+    Returns:
+        list of str: The names of the managed attributes in desired which have a different value in existing
+    """
+    return sorted(
+        key
+        for key in managed_fields
+        if key in desired
+        and _normalize_field(key, existing.get(key))
+        != _normalize_field(key, desired[key])
     )
-    response.raise_for_status()
-    return response.json()
 
 
-def property_group_exists(object_type, group_name):
+def plan_property_changes(
+    object_type, groups, properties, uninstall=False
+):  # pylint: disable=too-many-branches
     """
-    Return True if the specified group exists (status=200), False otherwise
+    Compare the desired groups and properties for an object type with those in Hubspot, and work out
+    which creates, updates or deletes are needed to reconcile them. Hubspot is only queried once for
+    groups and once for properties.
 
     Args:
-        object_type (str): The object type of the group (ie "deals")
-        group_name (str): The group name
+        object_type (str): The object type (ie "deals")
+        groups (list of dict): The desired groups, each with a name and label
+        properties (list of dict): The desired property attributes
+        uninstall (bool): If True, plan to delete the groups and properties instead
 
     Returns:
-        boolean:  True if the group exists otherwise False
-    """
-    try:
-        get_property_group(object_type, group_name)
-        return True
-    except requests.HTTPError:
-        return False
+        list of PropertyChange: The changes which are needed
+    """
+    existing_groups = get_property_groups(object_type)
+    existing_properties = get_object_properties(object_type)
+    changes = []
+
+    if uninstall:
+        for obj_property in properties:
+            if obj_property["name"] in existing_properties:
+                changes.append(
+                    PropertyChange(
+                        PROPERTY_CHANGE_DELETE,
+                        object_type,
+                        KIND_PROPERTY,
+                        obj_property["name"],
+                        None,
+                        [],
+                    )
+                )
+        for group in groups:
+            if group["name"] in existing_groups:
+                changes.append(
+                    PropertyChange(
+                        PROPERTY_CHANGE_DELETE,
+                        object_type,
+                        KIND_GROUP,
+                        group["name"],
+                        None,
+                        [],
+                    )
+                )
+        return changes
+
+    for group in groups:
+        body = {"name": group["name"], "displayName": group["label"]}
+        existing = existing_groups.get(group["name"])
+        if existing is None:
+            changes.append(
+                PropertyChange(
+                    PROPERTY_CHANGE_CREATE,
+                    object_type,
+                    KIND_GROUP,
+                    group["name"],
+                    body,
+                    sorted(body),
+                )
+            )
+        else:
+            changed_fields = _get_changed_fields(existing, body, MANAGED_GROUP_FIELDS)
+            if changed_fields:
+                changes.append(
+                    PropertyChange(
+                        PROPERTY_CHANGE_UPDATE,
+                        object_type,
+                        KIND_GROUP,
+                        group["name"],
+                        body,
+                        changed_fields,
+                    )
+                )
+
+    for obj_property in properties:
+        body = dict(obj_property)
+        _clean_object_property(body)
+        existing = existing_properties.get(body["name"])
+        if existing is None:
+            changes.append(
+                PropertyChange(
+                    PROPERTY_CHANGE_CREATE,
+                    object_type,
+                    KIND_PROPERTY,
+                    body["name"],
+                    body,
+                    sorted(body),
+                )
+            )
+        else:
+            changed_fields = _get_changed_fields(
+                existing, body, MANAGED_PROPERTY_FIELDS
+            )
+            if changed_fields:
+                changes.append(
+                    PropertyChange(
+                        PROPERTY_CHANGE_UPDATE,
+                        object_type,
+                        KIND_PROPERTY,
+                        body["name"],
+                        body,
+                        changed_fields,
+                    )
+                )
+    return changes
 
 
-def sync_property_group(object_type, name, label):
+def _apply_property_change(change):
     """
-    Create or update a property group for an object type
+    Send the request for a single PropertyChange to Hubspot
 
     Args:
-        object_type (str): The object type of the group (ie "deals")
-        name (str): The group name
-        label (str): The group label
+        change (PropertyChange): The change to make
 
     Returns:
-        dict:  the new/updated group attributes
-
+        requests.Response: The response from Hubspot
     """
-    body = {"name": name, "displayName": label}
-
-    exists = property_group_exists(object_type, name)
-
-    if exists:
-        method = "PUT"
-        endpoint = f"named/{name}"
-    else:
-        method = "POST"
-        endpoint = ""
-
-    response = send_hubspot_request(
-        endpoint, f"/properties/v1/{object_type}/groups", method, body=body
+    api_url = "/properties/v1/{}/{}".format(
+        change.object_type.lower(),
+        "groups" if change.kind == KIND_GROUP else "properties",
     )
+    if change.action == PROPERTY_CHANGE_CREATE:
+        response = send_hubspot_request("", api_url, "POST", body=change.body)
+    elif change.action == PROPERTY_CHANGE_UPDATE:
+        response = send_hubspot_request(
+            f"named/{change.name}", api_url, "PUT", body=change.body
+        )
+    else:
+        response = send_hubspot_request(f"named/{change.name}", api_url, "DELETE")
     response.raise_for_status()
-    return response.json()
+    return response
 
 
-def delete_property_group(object_type, group_name):
+def apply_property_changes(changes):
     """
-    Delete a group from Hubspot
+    Make the changes returned by plan_property_changes, with up to HUBSPOT_MAX_CONCURRENT_REQUESTS requests at once.
+    Groups are created and updated before the properties which might belong to them, and deleted after them.
 
     Args:
-        object_type (str): The object type of the group (ie "deals")
-        group_name (str): The group name
-
-    Returns:
-        dict:  The result of the delete command in JSON format
-    """
-    response = send_hubspot_request(
-        "",
-        "/properties/v1/{}/groups/named/{}".format(object_type.lower(), group_name),
-        "DELETE",
-    )
-    response.raise_for_status()
-    return response.json()
+        changes (list of PropertyChange): The changes to make
+    """
+    phases = [
+        [
+            change
+            for change in changes
+            if change.kind == KIND_GROUP and change.action != PROPERTY_CHANGE_DELETE
+        ],
+        [change for change in changes if change.kind == KIND_PROPERTY],
+        [
+            change
+            for change in changes
+            if change.kind == KIND_GROUP and change.action == PROPERTY_CHANGE_DELETE
+        ],
+    ]
+    with ThreadPoolExecutor(
+        max_workers=settings.HUBSPOT_MAX_CONCURRENT_REQUESTS
+    ) as executor:
+        for phase in phases:
+            # Consuming the results waits for the phase to finish and raises the first error
+            list(executor.map(_apply_property_change, phase))
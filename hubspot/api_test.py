@@ -139,6 +139,39 @@ def test_make_sync_message():
     )
 
 
+def test_hash_sync_message():
+    """hash_sync_message should only depend on the properties in the message"""
+    message = api.make_sync_message(1, {"a": 1, "b": "two"})
+    same_properties = {
+        **api.make_sync_message(2, {"b": "two", "a": 1}),
+        "changeOccurredTimestamp": 0,
+    }
+    assert api.hash_sync_message(message) == api.hash_sync_message(same_properties)
+    assert api.hash_sync_message(message) != api.hash_sync_message(
+        api.make_sync_message(1, {"a": 2, "b": "two"})
+    )
+
+
+@pytest.mark.django_db
+def test_sync_fingerprints():
+    """Messages should be filtered out if the same properties were last sent for the object"""
+    messages = [api.make_sync_message(object_id, {"a": 1}) for object_id in range(3)]
+    assert api.filter_changed_sync_messages("DEAL", messages) == messages
+
+    api.record_sync_fingerprints("DEAL", messages[:2])
+    assert api.filter_changed_sync_messages("DEAL", messages) == messages[2:]
+    assert api.filter_changed_sync_messages("LINE_ITEM", messages) == messages
+
+    changed = api.make_sync_message(0, {"a": 2})
+    assert api.filter_changed_sync_messages("DEAL", [changed]) == [changed]
+    api.record_sync_fingerprints("DEAL", [changed, messages[2]])
+    assert api.filter_changed_sync_messages("DEAL", [changed, *messages[1:]]) == []
+    assert api.filter_changed_sync_messages("DEAL", messages[:1]) == messages[:1]
+
+    api.clear_sync_fingerprint("DEAL", messages[1]["integratorObjectId"])
+    assert api.filter_changed_sync_messages("DEAL", messages[1:]) == messages[1:2]
+
+
 @pytest.mark.django_db
 def test_make_contact_sync_message():
     """Test make_contact_sync_message serializes a profile and returns a properly formatted sync message"""
@@ -236,131 +269,187 @@ def test_exists_in_hubspot(mocker, sync_status, exists):
     mock_get_sync_status.assert_called_once_with("OBJECT", 1)
 
 
-@pytest.mark.parametrize(
-    "property_status, exists",
-    [
-        [HTTPError(response=HttpResponse(status=400)), False],
-        [HttpResponse(status=200), True],
-    ],
-)
-def test_object_property_exists(mocker, property_status, exists):
-    """Test that object_property_exists returns True if the property exists and False otherwise"""
-    mock_get_object_property = mocker.patch(
-        "hubspot.api.get_object_property", side_effect=property_status
+def test_get_object_properties(mock_hubspot_api_request):
+    """get_object_properties should fetch every property for an object type in one request"""
+    mock_hubspot_api_request.return_value.json.return_value = [
+        {"name": "a", "label": "A"},
+        {"name": "b", "label": "B"},
+    ]
+    assert api.get_object_properties(test_object_type) == {
+        "a": {"name": "a", "label": "A"},
+        "b": {"name": "b", "label": "B"},
+    }
+    mock_hubspot_api_request.assert_called_once_with(
+        "", f"/properties/v1/{test_object_type}/properties", "GET"
     )
-    assert api.object_property_exists("deals", "my_property") == exists
-    mock_get_object_property.assert_called_once_with("deals", "my_property")
 
 
-@pytest.mark.parametrize(
-    "group_status, exists",
-    [
-        [HTTPError(response=HttpResponse(status=400)), False],
-        [HttpResponse(status=200), True],
-    ],
-)
-def test_property_group_exists(mocker, group_status, exists):
-    """Test that property_group_exists returns True if the group exists and False otherwise"""
-    mock_get_property_group = mocker.patch(
-        "hubspot.api.get_property_group", side_effect=group_status
+def test_get_property_groups(mock_hubspot_api_request, property_group):
+    """get_property_groups should fetch every group for an object type in one request"""
+    mock_hubspot_api_request.return_value.json.return_value = [property_group]
+    assert api.get_property_groups(test_object_type) == {
+        property_group["name"]: property_group
+    }
+    mock_hubspot_api_request.assert_called_once_with(
+        "", f"/properties/v1/{test_object_type}/groups", "GET"
     )
-    assert api.property_group_exists("deals", "my_group") == exists
-    mock_get_property_group.assert_called_once_with("deals", "my_group")
 
 
-def test_get_property_group(mock_hubspot_api_request, property_group):
-    """ get_property_group should call send_hubspot_request with the correct arguments"""
-    group_name = property_group["name"]
-    api.get_property_group(test_object_type, group_name)
-    assert mock_hubspot_api_request.called_with(
-        group_name, f"/properties/v1/{test_object_type}/groups/named", "GET"
+@pytest.fixture
+def existing_properties(mocker):
+    """Mock the groups and properties which exist in hubspot"""
+    mocker.patch(
+        "hubspot.api.get_property_groups",
+        return_value={
+            "same_group": {"name": "same_group", "displayName": "Same"},
+            "changed_group": {"name": "changed_group", "displayName": "Old"},
+        },
+    )
+    mocker.patch(
+        "hubspot.api.get_object_properties",
+        return_value={
+            "same": {
+                "name": "same",
+                "label": "Same",
+                "groupName": "same_group",
+                "description": "",
+                "readOnlyValue": False,
+                "displayOrder": -1,
+                "options": [
+                    {"label": "Yes", "value": "yes", "displayOrder": 0, "hidden": False}
+                ],
+            },
+            "changed": {
+                "name": "changed",
+                "label": "Old",
+                "groupName": "same_group",
+                "description": "",
+            },
+        },
     )
 
 
-def test_get_object_property(mock_hubspot_api_request):
-    """ get_object_property should call send_hubspot_request with the correct arguments"""
-    property_name = "y"
-    api.get_object_property(test_object_type, property_name)
-    assert mock_hubspot_api_request.called_with(
-        f"named/{property_name}", f"/properties/v1/{test_object_type}/properties", "GET"
+@pytest.mark.usefixtures("existing_properties")
+def test_plan_property_changes():
+    """plan_property_changes should only return changes for groups and properties which differ from hubspot"""
+    groups = [
+        {"name": "same_group", "label": "Same"},
+        {"name": "changed_group", "label": "New"},
+        {"name": "new_group", "label": "New Group"},
+    ]
+    properties = [
+        {
+            "name": "same",
+            "label": "Same",
+            "groupName": "same_group",
+            "description": None,
+            "options": [{"label": "Yes", "value": "yes"}],
+            "formField": True,
+        },
+        {
+            "name": "changed",
+            "label": "New",
+            "groupName": "same_group",
+            "options": [{"label": "No", "value": "no"}],
+        },
+        {"name": "new", "label": "New", "groupName": "new_group"},
+    ]
+    changes = api.plan_property_changes(test_object_type, groups, properties)
+    assert [
+        (change.action, change.kind, change.name, change.changed_fields)
+        for change in changes
+    ] == [
+        (api.PROPERTY_CHANGE_UPDATE, api.KIND_GROUP, "changed_group", ["displayName"]),
+        (
+            api.PROPERTY_CHANGE_CREATE,
+            api.KIND_GROUP,
+            "new_group",
+            ["displayName", "name"],
+        ),
+        (
+            api.PROPERTY_CHANGE_UPDATE,
+            api.KIND_PROPERTY,
+            "changed",
+            ["label", "options"],
+        ),
+        (
+            api.PROPERTY_CHANGE_CREATE,
+            api.KIND_PROPERTY,
+            "new",
+            ["groupName", "label", "name"],
+        ),
+    ]
+    assert changes[1].body == {"name": "new_group", "displayName": "New Group"}
+    assert properties[0]["description"] is None
+
+
+@pytest.mark.usefixtures("existing_properties")
+def test_plan_property_changes_uninstall():
+    """plan_property_changes should only delete groups and properties which exist in hubspot"""
+    changes = api.plan_property_changes(
+        test_object_type,
+        [{"name": "same_group", "label": "Same"}, {"name": "gone", "label": "Gone"}],
+        [{"name": "changed", "label": "New", "groupName": "same_group"}],
+        uninstall=True,
     )
+    assert [(change.action, change.kind, change.name) for change in changes] == [
+        (api.PROPERTY_CHANGE_DELETE, api.KIND_PROPERTY, "changed"),
+        (api.PROPERTY_CHANGE_DELETE, api.KIND_GROUP, "same_group"),
+    ]
 
 
-@pytest.mark.parametrize("is_valid", [True, False])
-@pytest.mark.parametrize("object_exists", [True, False])
-def test_sync_object_property(
-    mocker, mock_hubspot_api_request, object_exists, is_valid
-):
-    """sync_object_property should call send_hubspot_request with the correct arguments"""
-    mocker.patch("hubspot.api.object_property_exists", return_value=object_exists)
-    mock_property = {
-        "name": "property_name",
-        "label": "Property Label",
-        "groupName": "Property Group",
-        "description": "Property description",
-        "field_type": "text",
-        "type": "string",
-    }
-
-    if not is_valid:
-        mock_property.pop("name")
-        with pytest.raises(KeyError):
-            api.sync_object_property(test_object_type, mock_property)
-    else:
-        api.sync_object_property(test_object_type, mock_property)
-        if object_exists:
-            assert mock_hubspot_api_request.called_with(
-                f"named/{mock_property['name']}",
-                f"/properties/v1/{test_object_type}/properties",
-                "PUT",
-                mock_property,
-            )
-        else:
-            assert mock_hubspot_api_request.called_with(
-                "",
-                f"/properties/v1/{test_object_type}/properties",
-                "POST",
-                mock_property,
-            )
-
-
-@pytest.mark.parametrize("object_exists", [True, False])
-def test_sync_property_group(
-    mocker, mock_hubspot_api_request, object_exists, property_group
-):
-    """sync_object_property should call send_hubspot_request with the correct arguments"""
-    mocker.patch("hubspot.api.object_property_exists", return_value=object_exists)
-    group_name = property_group["name"]
-    group_label = property_group["label"]
-    api.sync_property_group(test_object_type, group_name, group_label)
-    if object_exists:
-        assert mock_hubspot_api_request.called_with(
-            f"named/{group_name}",
-            f"/properties/v1/{test_object_type}/groups",
+def test_apply_property_changes(mocker, mock_hubspot_api_request, settings):
+    """apply_property_changes should create groups before properties and delete them after"""
+    settings.HUBSPOT_MAX_CONCURRENT_REQUESTS = 1
+    changes = [
+        api.PropertyChange(
+            api.PROPERTY_CHANGE_DELETE, "deals", api.KIND_GROUP, "old_group", None, []
+        ),
+        api.PropertyChange(
+            api.PROPERTY_CHANGE_UPDATE,
+            "deals",
+            api.KIND_PROPERTY,
+            "prop",
+            {"name": "prop"},
+            ["label"],
+        ),
+        api.PropertyChange(
+            api.PROPERTY_CHANGE_CREATE,
+            "deals",
+            api.KIND_GROUP,
+            "new_group",
+            {"name": "new_group"},
+            ["name"],
+        ),
+    ]
+    api.apply_property_changes(changes)
+    assert mock_hubspot_api_request.call_args_list == [
+        mocker.call(
+            "", "/properties/v1/deals/groups", "POST", body={"name": "new_group"}
+        ),
+        mocker.call(
+            "named/prop",
+            "/properties/v1/deals/properties",
             "PUT",
-            property_group,
-        )
-    else:
-        assert mock_hubspot_api_request.called_with(
-            "", f"/properties/v1/{test_object_type}/groups", "POST", property_group
-        )
-
-
-def test_delete_property_group(mock_hubspot_api_request, property_group):
-    """ delete_property_group should call send_hubspot_request with the correct arguments"""
-    api.delete_object_property(test_object_type, property_group["name"])
-    assert mock_hubspot_api_request.called_with(
-        f"named/{property_group['name']}",
-        f"/properties/v1/{test_object_type}/groups",
-        "DELETE",
-    )
+            body={"name": "prop"},
+        ),
+        mocker.call("named/old_group", "/properties/v1/deals/groups", "DELETE"),
+    ]
 
 
-def test_delete_object_property(mock_hubspot_api_request, property_group):
-    """ delete_object_property should call send_hubspot_request with the correct arguments"""
-    api.delete_object_property(test_object_type, property_group["name"])
-    assert mock_hubspot_api_request.called_with(
-        f"named/{ property_group['name']}",
-        f"/properties/v1/{test_object_type}/groups",
-        "DELETE",
-    )
+def test_apply_property_changes_error(mock_hubspot_api_request):
+    """apply_property_changes should raise an error if hubspot rejects a change"""
+    mock_hubspot_api_request.return_value.raise_for_status.side_effect = HTTPError
+    with pytest.raises(HTTPError):
+        api.apply_property_changes(
+            [
+                api.PropertyChange(
+                    api.PROPERTY_CHANGE_DELETE,
+                    "deals",
+                    api.KIND_PROPERTY,
+                    "prop",
+                    None,
+                    [],
+                )
+            ]
+        )
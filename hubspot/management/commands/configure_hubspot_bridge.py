@@ -7,12 +7,10 @@ from django.core.management import BaseCommand
 
 from hubspot.api import (
     send_hubspot_request,
-    property_group_exists,
-    sync_property_group,
-    sync_object_property,
-    delete_object_property,
-    delete_property_group,
-    object_property_exists,
+    plan_property_changes,
+    apply_property_changes,
+    PROPERTY_CHANGE_CREATE,
+    PROPERTY_CHANGE_UPDATE,
 )
 
 # Hubspot ecommerce settings define which hubspot properties are mapped with which
@@ -513,24 +511,68 @@ def configure_hubspot_settings():
     return response
 
 
+def get_custom_property_changes(uninstall=False):
+    """
+    Work out which changes are needed to make the custom properties and groups in Hubspot match
+    CUSTOM_ECOMMERCE_PROPERTIES
+
+    Args:
+        uninstall (bool): If True, plan to delete all custom properties and groups instead
+
+    Returns:
+        list of PropertyChange: The changes which are needed
+    """
+    changes = []
+    for object_type, config in CUSTOM_ECOMMERCE_PROPERTIES.items():
+        changes.extend(
+            plan_property_changes(
+                object_type, config["groups"], config["properties"], uninstall=uninstall
+            )
+        )
+    return changes
+
+
+def format_property_change(change):
+    """
+    Describe a PropertyChange for printing
+
+    Args:
+        change (PropertyChange): The change
+
+    Returns:
+        str: A one line description of the change
+    """
+    symbol = {PROPERTY_CHANGE_CREATE: "+", PROPERTY_CHANGE_UPDATE: "~"}.get(
+        change.action, "-"
+    )
+    description = (
+        f"{symbol} {change.action} {change.kind} {change.object_type}.{change.name}"
+    )
+    if change.action == PROPERTY_CHANGE_UPDATE:
+        description = f"{description} ({', '.join(change.changed_fields)})"
+    return description
+
+
+def print_property_changes(changes):
+    """Print a description of each change, or a note that nothing needs to change"""
+    if not changes:
+        print("Custom groups and properties are up to date")
+    for change in changes:
+        print(format_property_change(change))
+
+
 def install_custom_properties():
-    """Create or update all custom properties and groups"""
-    for object_type in CUSTOM_ECOMMERCE_PROPERTIES:
-        for group in CUSTOM_ECOMMERCE_PROPERTIES[object_type]["groups"]:
-            sync_property_group(object_type, group["name"], group["label"])
-        for obj_property in CUSTOM_ECOMMERCE_PROPERTIES[object_type]["properties"]:
-            sync_object_property(object_type, obj_property)
+    """Create or update the custom properties and groups which differ from those in Hubspot"""
+    changes = get_custom_property_changes()
+    print_property_changes(changes)
+    apply_property_changes(changes)
 
 
 def uninstall_custom_properties():
-    """Delete all custom properties and groups"""
-    for object_type in CUSTOM_ECOMMERCE_PROPERTIES:
-        for obj_property in CUSTOM_ECOMMERCE_PROPERTIES[object_type]["properties"]:
-            if object_property_exists(object_type, obj_property):
-                delete_object_property(object_type, obj_property)
-        for group in CUSTOM_ECOMMERCE_PROPERTIES[object_type]["groups"]:
-            if property_group_exists(object_type, group):
-                delete_property_group(object_type, group)
+    """Delete all custom properties and groups which exist in Hubspot"""
+    changes = get_custom_property_changes(uninstall=True)
+    print_property_changes(changes)
+    apply_property_changes(changes)
 
 
 def get_hubspot_settings():
@@ -566,7 +608,18 @@ class Command(BaseCommand):
             help="Get the current status of the Ecommerce Bridge installation",
         )
 
+        parser.add_argument(
+            "--plan",
+            action="store_true",
+            help="Print the changes to custom groups and properties which would be made, without making them",
+        )
+
     def handle(self, *args, **options):
+        if options["plan"]:
+            print_property_changes(
+                get_custom_property_changes(uninstall=options["uninstall"])
+            )
+            return
         print(
             "Checking Hubspot Ecommerce Bridge installation for given Hubspot API Key..."
         )
@@ -26,8 +26,9 @@ class Command(BaseCommand):
         "must be configured with configure_hubspot_settings"
     )
 
-    @staticmethod
-    def bulk_sync_model(objects, make_object_sync_message, object_type, **kwargs):
+    force = False
+
+    def bulk_sync_model(self, objects, make_object_sync_message, object_type, **kwargs):
         """
         Sync all database objects of a certain type with hubspot
         Args:
@@ -41,6 +42,7 @@ class Command(BaseCommand):
             make_object_sync_message,
             object_type,
             print_to_console=True,
+            force=self.force,
             **kwargs,
         )
 
@@ -112,9 +114,15 @@ class Command(BaseCommand):
             action="store_true",
             help="Sync all orders",
         )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Send every object, including those which haven't changed since they were last synced",
+        )
 
     def handle(self, *args, **options):
         print("Syncing with hubspot...")
+        self.force = options["force"]
         if not (
             options["sync_contacts"]
             or options["sync_products"]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("hubspot", "0003_line_resync_application")]
+
+    operations = [
+        migrations.CreateModel(
+            name="HubspotSyncFingerprint",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("object_type", models.CharField(max_length=20)),
+                ("integrator_object_id", models.CharField(max_length=255)),
+                ("properties_hash", models.CharField(max_length=64)),
+                ("synced_on", models.DateTimeField()),
+            ],
+            options={"unique_together": {("object_type", "integrator_object_id")}},
+        )
+    ]
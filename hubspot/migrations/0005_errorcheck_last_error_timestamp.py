@@ -0,0 +1,16 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("hubspot", "0004_hubspotsyncfingerprint")]
+
+    operations = [
+        migrations.AddField(
+            model_name="hubspoterrorcheck",
+            name="last_error_timestamp",
+            field=models.BigIntegerField(blank=True, null=True),
+        )
+    ]
@@ -10,6 +10,8 @@ class HubspotErrorCheck(models.Model):
     """
 
     checked_on = models.DateTimeField()
+    # The errorTimestamp of the newest error seen so far. Older errors have already been handled.
+    last_error_timestamp = models.BigIntegerField(null=True, blank=True)
 
 
 class HubspotLineResync(models.Model):
@@ -20,3 +22,20 @@ class HubspotLineResync(models.Model):
     application = models.ForeignKey(
         BootcampApplication, null=True, on_delete=models.CASCADE
     )
+
+
+class HubspotSyncFingerprint(models.Model):
+    """
+    A hash of the properties most recently sent to Hubspot for an object, so unchanged objects aren't sent again
+    """
+
+    object_type = models.CharField(max_length=20)
+    integrator_object_id = models.CharField(max_length=255)
+    properties_hash = models.CharField(max_length=64)
+    synced_on = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("object_type", "integrator_object_id")
+
+    def __str__(self):
+        return f"Hubspot fingerprint for {self.object_type} {self.integrator_object_id}"
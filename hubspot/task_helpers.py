@@ -4,6 +4,7 @@ import logging
 from django.conf import settings
 
 from hubspot import tasks
+from outbox.api import enqueue_task
 
 
 log = logging.getLogger(__name__)
@@ -22,13 +23,34 @@ def sync_hubspot_user(user):
 
 def sync_hubspot_application(application):
     """
-    Trigger celery task to sync a deal to Hubspot
+    Request a celery task to sync a deal to Hubspot once the current transaction commits
 
     Args:
         application (BootcampApplication): The BootcampApplication to sync
     """
     if settings.HUBSPOT_API_KEY:
-        tasks.sync_application_with_hubspot.delay(application.id)
+        enqueue_task(
+            tasks.sync_application_with_hubspot,
+            args=[application.id],
+            aggregate=application,
+            deduplicate=True,
+        )
+
+
+def sync_hubspot_applications(applications):
+    """
+    Request a single celery task to sync many deals to Hubspot once the current transaction commits
+
+    Args:
+        applications (iterable of BootcampApplication): The BootcampApplications to sync
+    """
+    application_ids = sorted({application.id for application in applications})
+    if settings.HUBSPOT_API_KEY and application_ids:
+        enqueue_task(
+            tasks.sync_applications_with_hubspot,
+            args=[application_ids],
+            deduplicate=True,
+        )
 
 
 def sync_hubspot_application_from_order(order):
@@ -46,10 +68,15 @@ def sync_hubspot_application_from_order(order):
 
 def sync_hubspot_product(bootcamp_run):
     """
-    Trigger celery task to sync a Bootcamp to Hubspot
+    Request a celery task to sync a Bootcamp to Hubspot once the current transaction commits
 
     Args:
         bootcamp_run (BootcampRun): The BootcampRun to sync
     """
     if settings.HUBSPOT_API_KEY:
-        tasks.sync_product_with_hubspot.delay(bootcamp_run.id)
+        enqueue_task(
+            tasks.sync_product_with_hubspot,
+            args=[bootcamp_run.id],
+            aggregate=bootcamp_run,
+            deduplicate=True,
+        )
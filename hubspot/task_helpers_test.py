@@ -8,6 +8,7 @@ from ecommerce.models import Order
 from hubspot.task_helpers import (
     sync_hubspot_application,
     sync_hubspot_application_from_order,
+    sync_hubspot_applications,
     sync_hubspot_user,
     sync_hubspot_product,
 )
@@ -24,32 +25,69 @@ def mock_hubspot(mocker):
     return mocker.patch("hubspot.task_helpers.tasks", autospec=True)
 
 
+@pytest.fixture
+def mock_enqueue_task(mocker):
+    """Mock the function which writes tasks to the outbox"""
+    return mocker.patch("hubspot.task_helpers.enqueue_task")
+
+
 @pytest.mark.parametrize("hubspot_key", [None, "abc"])
-def test_sync_hubspot_application(settings, mock_hubspot, hubspot_key):
-    """ sync_hubspot_application task helper should call tasks if an API key is present """
+def test_sync_hubspot_application(
+    settings, mock_hubspot, mock_enqueue_task, hubspot_key
+):
+    """ sync_hubspot_application task helper should request a task if an API key is present """
     settings.HUBSPOT_API_KEY = hubspot_key
     application = BootcampApplication()
     sync_hubspot_application(application)
     if hubspot_key is not None:
-        mock_hubspot.sync_application_with_hubspot.delay.assert_called_once_with(
-            application.id
+        mock_enqueue_task.assert_called_once_with(
+            mock_hubspot.sync_application_with_hubspot,
+            args=[application.id],
+            aggregate=application,
+            deduplicate=True,
+        )
+    else:
+        mock_enqueue_task.assert_not_called()
+
+
+@pytest.mark.parametrize("hubspot_key", [None, "abc"])
+def test_sync_hubspot_applications(
+    settings, mock_hubspot, mock_enqueue_task, hubspot_key
+):
+    """ sync_hubspot_applications task helper should request one task for all of the applications """
+    settings.HUBSPOT_API_KEY = hubspot_key
+    sync_hubspot_applications(
+        [
+            BootcampApplication(id=3),
+            BootcampApplication(id=1),
+            BootcampApplication(id=3),
+        ]
+    )
+    if hubspot_key is not None:
+        mock_enqueue_task.assert_called_once_with(
+            mock_hubspot.sync_applications_with_hubspot, args=[[1, 3]], deduplicate=True
         )
     else:
-        mock_hubspot.sync_application_with_hubspot.delay.assert_not_called()
+        mock_enqueue_task.assert_not_called()
 
 
 @pytest.mark.parametrize("hubspot_key", [None, "abc"])
-def test_sync_hubspot_application_from_order(settings, mock_hubspot, hubspot_key):
-    """ sync_hubspot_application_from_order task helper should call tasks if an API key is present """
+def test_sync_hubspot_application_from_order(
+    settings, mock_hubspot, mock_enqueue_task, hubspot_key
+):
+    """ sync_hubspot_application_from_order task helper should request a task if an API key is present """
     settings.HUBSPOT_API_KEY = hubspot_key
     order = Order(application=BootcampApplication())
     sync_hubspot_application_from_order(order)
     if hubspot_key is not None:
-        mock_hubspot.sync_application_with_hubspot.delay.assert_called_once_with(
-            order.application.id
+        mock_enqueue_task.assert_called_once_with(
+            mock_hubspot.sync_application_with_hubspot,
+            args=[order.application.id],
+            aggregate=order.application,
+            deduplicate=True,
         )
     else:
-        mock_hubspot.sync_application_with_hubspot.delay.assert_not_called()
+        mock_enqueue_task.assert_not_called()
 
 
 def test_sync_hubspot_application_from_order_no_application(settings, mocker):
@@ -75,14 +113,17 @@ def test_sync_hubspot_user(settings, mock_hubspot, hubspot_key, user):
 
 
 @pytest.mark.parametrize("hubspot_key", [None, "abc"])
-def test_sync_hubspot_product(settings, mock_hubspot, hubspot_key):
-    """ sync_hubspot_product helper should call task if an API key is present """
+def test_sync_hubspot_product(settings, mock_hubspot, mock_enqueue_task, hubspot_key):
+    """ sync_hubspot_product helper should request a task if an API key is present """
     bootcamp_run = BootcampRunFactory.create()
     settings.HUBSPOT_API_KEY = hubspot_key
     sync_hubspot_product(bootcamp_run)
     if hubspot_key is not None:
-        mock_hubspot.sync_product_with_hubspot.delay.assert_called_once_with(
-            bootcamp_run.id
+        mock_enqueue_task.assert_called_once_with(
+            mock_hubspot.sync_product_with_hubspot,
+            args=[bootcamp_run.id],
+            aggregate=bootcamp_run,
+            deduplicate=True,
         )
     else:
-        mock_hubspot.sync_product_with_hubspot.delay.assert_not_called()
+        mock_enqueue_task.assert_not_called()
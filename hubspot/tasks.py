@@ -12,8 +12,13 @@ from requests import HTTPError
 
 from applications.models import BootcampApplication
 from main.celery import app
+from main.semaphore import IntegrationTask
 
 from hubspot.api import (
+    clear_sync_fingerprint,
+    filter_changed_sync_messages,
+    get_existing_hubspot_objects,
+    record_sync_fingerprints,
     send_hubspot_request,
     make_contact_sync_message,
     get_sync_errors,
@@ -22,7 +27,6 @@ from hubspot.api import (
     make_product_sync_message,
     make_deal_sync_message,
     make_line_sync_message,
-    exists_in_hubspot,
 )
 from hubspot.models import HubspotErrorCheck, HubspotLineResync
 
@@ -32,23 +36,43 @@ HUBSPOT_SYNC_URL = "/extensions/ecomm/v1/sync-messages"
 ASSOCIATED_DEAL_RE = re.compile(r"\[hs_assoc__deal_id: (.+)\]")
 
 
-@app.task
-def sync_contact_with_hubspot(user_id):
+def send_sync_messages(object_type, messages, force=False):
+    """
+    Send sync-messages to hubspot, skipping objects whose properties haven't changed since they were last sent
+
+    Args:
+        object_type (str): one of "CONTACT", "DEAL", "PRODUCT", "LINE_ITEM"
+        messages (list of dict): Sync messages
+        force (bool): If True, send the messages even if they haven't changed
+
+    Returns:
+        int: The number of messages sent
+    """
+    if not force:
+        messages = filter_changed_sync_messages(object_type, messages)
+    if not messages:
+        return 0
+    response = send_hubspot_request(object_type, HUBSPOT_SYNC_URL, "PUT", body=messages)
+    response.raise_for_status()
+    record_sync_fingerprints(object_type, messages)
+    return len(messages)
+
+
+@app.task(base=IntegrationTask, integration="hubspot")
+def sync_contact_with_hubspot(user_id, force=False):
     """Send a sync-message to sync a user with a hubspot contact"""
     body = make_contact_sync_message(user_id)
     if not body[0].get("propertyNameToValues", {}).get("email"):
         return  # Skip if message is missing required field
 
-    response = send_hubspot_request("CONTACT", HUBSPOT_SYNC_URL, "PUT", body=body)
-    response.raise_for_status()
+    send_sync_messages("CONTACT", body, force=force)
 
 
-@app.task
-def sync_product_with_hubspot(bootcamp_run_id):
+@app.task(base=IntegrationTask, integration="hubspot")
+def sync_product_with_hubspot(bootcamp_run_id, force=False):
     """Send a sync-message to sync a BootcampRun with a hubspot product"""
     body = make_product_sync_message(bootcamp_run_id)
-    response = send_hubspot_request("PRODUCT", HUBSPOT_SYNC_URL, "PUT", body=body)
-    response.raise_for_status()
+    send_sync_messages("PRODUCT", body, force=force)
 
 
 @app.task(
@@ -63,20 +87,28 @@ def sync_application_with_hubspot(application_id):
     return celery.chain(tasks)()
 
 
-@app.task
-def sync_deal_with_hubspot(application_id):
+@app.task(base=IntegrationTask, integration="hubspot")
+def sync_deal_with_hubspot(application_id, force=False):
     """Send a sync-message to sync a personal price with a hubspot deal"""
     body = make_deal_sync_message(application_id)
-    response = send_hubspot_request("DEAL", HUBSPOT_SYNC_URL, "PUT", body=body)
-    response.raise_for_status()
+    send_sync_messages("DEAL", body, force=force)
 
 
-@app.task
-def sync_line_with_hubspot(application_id):
+@app.task(base=IntegrationTask, integration="hubspot")
+def sync_line_with_hubspot(application_id, force=False):
     """Send a sync-message to sync a personal price with a hubspot line"""
     body = make_line_sync_message(application_id)
-    response = send_hubspot_request("LINE_ITEM", HUBSPOT_SYNC_URL, "PUT", body=body)
-    response.raise_for_status()
+    send_sync_messages("LINE_ITEM", body, force=force)
+
+
+@app.task(base=IntegrationTask, integration="hubspot")
+def sync_applications_with_hubspot(application_ids):
+    """Sync many applications to hubspot deals and lines, sending the messages in batches"""
+    applications = BootcampApplication.objects.filter(id__in=application_ids).order_by(
+        "id"
+    )
+    sync_bulk_with_hubspot(applications, make_deal_sync_message, "DEAL")
+    sync_bulk_with_hubspot(applications, make_line_sync_message, "LINE_ITEM")
 
 
 @app.task
@@ -88,64 +120,123 @@ def check_hubspot_api_errors():
     last_check, _ = HubspotErrorCheck.objects.get_or_create(
         defaults={"checked_on": curr_time}
     )
-    last_timestamp = hubspot_timestamp(last_check.checked_on)
+    high_water_mark = last_check.last_error_timestamp or hubspot_timestamp(
+        last_check.checked_on
+    )
+    newest_timestamp = high_water_mark
 
+    line_association_errors = {}
     for error in get_sync_errors():
         error_timestamp = error.get("errorTimestamp")
-        if error_timestamp > last_timestamp:
-            obj_type = (error.get("objectType", "N/A"),)
-            obj_id = parse_hubspot_deal_id(error.get("integratorObjectId", ""))
-            error_type = error.get("type", "N/A")
-            details = error.get("details", "")
-
-            if (
-                obj_id is not None
-                and "LINE_ITEM" in obj_type
-                and error_type == "INVALID_ASSOCIATION_PROPERTY"
-                and ASSOCIATED_DEAL_RE.search(details) is not None
-            ):
-                try:
-                    application = BootcampApplication.objects.get(id=obj_id)
-                except ObjectDoesNotExist:
-                    pass
-                else:
-                    HubspotLineResync.objects.get_or_create(application=application)
-                    continue
-
-            log.error(
-                "Hubspot error %s for %s id %s: %s",
-                error_type,
-                obj_type,
-                str(obj_id),
-                details,
-            )
-        else:
+        if error_timestamp <= high_water_mark:
+            # Errors are returned newest first, so the rest have already been handled
             break
+        newest_timestamp = max(newest_timestamp, error_timestamp)
+        # The object didn't sync, so it shouldn't be skipped as unchanged next time
+        clear_sync_fingerprint(error.get("objectType"), error.get("integratorObjectId"))
+        obj_id = parse_hubspot_deal_id(error.get("integratorObjectId", ""))
+        if (
+            obj_id is not None
+            and error.get("objectType") == "LINE_ITEM"
+            and error.get("type") == "INVALID_ASSOCIATION_PROPERTY"
+            and ASSOCIATED_DEAL_RE.search(error.get("details", "")) is not None
+        ):
+            line_association_errors.setdefault(obj_id, []).append(error)
+        else:
+            _log_sync_error(error, obj_id)
+
+    application_ids = set(
+        BootcampApplication.objects.filter(
+            id__in=list(line_association_errors)
+        ).values_list("id", flat=True)
+    )
+    for obj_id, errors in line_association_errors.items():
+        if obj_id not in application_ids:
+            for error in errors:
+                _log_sync_error(error, obj_id)
+    resync_application_ids = application_ids - set(
+        HubspotLineResync.objects.filter(
+            application_id__in=application_ids
+        ).values_list("application_id", flat=True)
+    )
+    HubspotLineResync.objects.bulk_create(
+        [
+            HubspotLineResync(application_id=application_id)
+            for application_id in resync_application_ids
+        ]
+    )
 
     retry_invalid_line_associations()
     last_check.checked_on = curr_time
+    last_check.last_error_timestamp = newest_timestamp
     last_check.save()
 
 
+def _log_sync_error(error, obj_id):
+    """Log an error reported by Hubspot"""
+    log.error(
+        "Hubspot error %s for %s id %s: %s",
+        error.get("type", "N/A"),
+        error.get("objectType", "N/A"),
+        str(obj_id),
+        error.get("details", ""),
+    )
+
+
 def retry_invalid_line_associations():
     """
-    Check lines that have errored and retry them if their orders have synced
+    Check lines that have errored and retry them if their orders have synced. Sync statuses are checked
+    concurrently, and the deals and lines which need to be sent again are sent in batches.
     """
-    for hubspot_line_resync in HubspotLineResync.objects.all():
-        if exists_in_hubspot(
-            "LINE_ITEM", hubspot_line_resync.application.integration_id
-        ):
-            hubspot_line_resync.delete()
-            continue
+    resyncs = list(
+        HubspotLineResync.objects.filter(application__isnull=False).select_related(
+            "application"
+        )
+    )
+    if not resyncs:
+        return
 
-        if exists_in_hubspot("DEAL", hubspot_line_resync.application.integration_id):
-            sync_line_with_hubspot(hubspot_line_resync.application.id)
-        else:
-            sync_application_with_hubspot(hubspot_line_resync.application.id)
+    synced_lines = get_existing_hubspot_objects(
+        "LINE_ITEM", {resync.application.integration_id for resync in resyncs}
+    )
+    HubspotLineResync.objects.filter(
+        id__in=[
+            resync.id
+            for resync in resyncs
+            if resync.application.integration_id in synced_lines
+        ]
+    ).delete()
+
+    applications = [
+        resync.application
+        for resync in resyncs
+        if resync.application.integration_id not in synced_lines
+    ]
+    synced_deals = get_existing_hubspot_objects(
+        "DEAL", {application.integration_id for application in applications}
+    )
+    sync_bulk_with_hubspot(
+        [
+            application
+            for application in applications
+            if application.integration_id not in synced_deals
+        ],
+        make_deal_sync_message,
+        "DEAL",
+        force=True,
+    )
+    sync_bulk_with_hubspot(
+        applications, make_line_sync_message, "LINE_ITEM", force=True
+    )
 
 
 def sync_bulk_with_hubspot(
-    objects, make_object_sync_message, object_type, print_to_console=False, **kwargs
+    objects,
+    make_object_sync_message,
+    object_type,
+    print_to_console=False,
+    force=False,
+    **kwargs,
 ):
     """
     Sync all database objects of a certain type with hubspot
@@ -155,6 +246,7 @@ def sync_bulk_with_hubspot(
             returns a sync message for that model
         object_type (str) one of "CONTACT", "DEAL", "PRODUCT", "LINE_ITEM"
         print_to_console (bool) whether to print status messages to console
+        force (bool) whether to send objects which haven't changed since they were last synced
     """
     sync_messages = [make_object_sync_message(obj.id, **kwargs)[0] for obj in objects]
 
@@ -166,9 +258,18 @@ def sync_bulk_with_hubspot(
             if message.get("propertyNameToValues", {}).get("email")
         ]
 
+    unchanged = 0
     while len(sync_messages) > 0:
         staged_messages = sync_messages[0:200]
         sync_messages = sync_messages[200:]
+        if not force:
+            changed_messages = filter_changed_sync_messages(
+                object_type, staged_messages
+            )
+            unchanged += len(staged_messages) - len(changed_messages)
+            staged_messages = changed_messages
+            if not staged_messages:
+                continue
 
         if print_to_console:
             print("    Sending sync message...")
@@ -186,3 +287,8 @@ def sync_bulk_with_hubspot(
                 )
             else:
                 log.exception("Bulk sync failed for %s", object_type)
+        else:
+            record_sync_fingerprints(object_type, staged_messages)
+
+    if print_to_console and unchanged:
+        print(f"    Skipped {unchanged} unchanged objects")
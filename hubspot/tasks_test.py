@@ -6,9 +6,11 @@ from unittest.mock import ANY, Mock
 
 import pytest
 
+from django.utils import timezone
 from faker import Faker
 from requests import HTTPError
 
+from applications.constants import INTEGRATION_PREFIX
 from applications.factories import BootcampApplicationFactory
 from hubspot.api import (
     make_contact_sync_message,
@@ -16,9 +18,9 @@ from hubspot.api import (
     make_deal_sync_message,
     make_line_sync_message,
 )
-from hubspot.conftest import TIMESTAMPS, FAKE_OBJECT_ID
+from hubspot.conftest import TIMESTAMPS, FAKE_OBJECT_ID, error_response_json
 from hubspot.factories import HubspotErrorCheckFactory, HubspotLineResyncFactory
-from hubspot.models import HubspotErrorCheck, HubspotLineResync
+from hubspot.models import HubspotErrorCheck, HubspotLineResync, HubspotSyncFingerprint
 from hubspot.tasks import (
     sync_contact_with_hubspot,
     HUBSPOT_SYNC_URL,
@@ -28,6 +30,7 @@ from hubspot.tasks import (
     sync_line_with_hubspot,
     sync_bulk_with_hubspot,
     sync_application_with_hubspot,
+    sync_applications_with_hubspot,
     retry_invalid_line_associations,
 )
 from klasses.factories import InstallmentFactory, BootcampRunFactory
@@ -73,6 +76,31 @@ def test_sync_product_with_hubspot(mock_hubspot_request):
     )
 
 
+@pytest.mark.parametrize("force", [True, False])
+def test_sync_product_unchanged(mock_hubspot_request, force):
+    """A product shouldn't be sent again if it hasn't changed, unless the sync is forced"""
+    bootcamp_run = BootcampRunFactory.create()
+    sync_product_with_hubspot(bootcamp_run.id)
+    sync_product_with_hubspot(bootcamp_run.id, force=force)
+    assert mock_hubspot_request.call_count == (2 if force else 1)
+
+    bootcamp_run.title = "A new title"
+    bootcamp_run.save()
+    sync_product_with_hubspot(bootcamp_run.id)
+    assert mock_hubspot_request.call_count == (3 if force else 2)
+
+
+def test_sync_failure_not_recorded(mock_hubspot_request):
+    """If hubspot returns an error, the object should be sent again next time"""
+    bootcamp_run = BootcampRunFactory.create()
+    mock_hubspot_request.return_value.raise_for_status.side_effect = HTTPError
+    with pytest.raises(HTTPError):
+        sync_product_with_hubspot(bootcamp_run.id)
+    mock_hubspot_request.return_value.raise_for_status.side_effect = None
+    sync_product_with_hubspot(bootcamp_run.id)
+    assert mock_hubspot_request.call_count == 2
+
+
 def test_sync_application_with_hubspot(mocker):
     """Test that both sync_deal and sync_line tasks are called from sync_application"""
     mock_deal_sync = mocker.patch("hubspot.tasks.sync_deal_with_hubspot.si")
@@ -108,6 +136,19 @@ def test_sync_line_with_hubspot(mock_hubspot_request):
     )
 
 
+def test_sync_applications_with_hubspot(mocker):
+    """sync_applications_with_hubspot should sync deals and then lines for the applications in bulk"""
+    mock_bulk_sync = mocker.patch("hubspot.tasks.sync_bulk_with_hubspot")
+    applications = BootcampApplicationFactory.create_batch(3)
+    sync_applications_with_hubspot([application.id for application in applications])
+    assert [call[0][1:] for call in mock_bulk_sync.call_args_list] == [
+        (make_deal_sync_message, "DEAL"),
+        (make_line_sync_message, "LINE_ITEM"),
+    ]
+    for call in mock_bulk_sync.call_args_list:
+        assert list(call[0][0]) == applications
+
+
 def test_sync_errors_first_run(settings, mock_hubspot_errors, mock_logger):
     """Test that HubspotErrorCheck is created on 1st run and nothing is logged"""
     settings.HUBSPOT_API_KEY = "dkfjKJ2jfd"
@@ -150,30 +191,97 @@ def test_sync_errors_new_errors(
     assert mock_retry.call_count == 1
 
 
-@pytest.mark.parametrize("deal_exists", [True, False])
-@pytest.mark.parametrize("line_exists", [True, False])
-def test_retry_invalid_line_associations(mocker, deal_exists, line_exists):
+def test_sync_errors_clear_fingerprints(settings, mocker, mock_hubspot_errors):
+    """Objects which had a sync error should be sent again on the next sync"""
+    mocker.patch("hubspot.tasks.retry_invalid_line_associations")
+    HubspotErrorCheckFactory.create(checked_on=TIMESTAMPS[0])
+    settings.HUBSPOT_API_KEY = "dkfjKJ2jfd"
+    errored_id = f"{settings.HUBSPOT_ID_PREFIX}-{INTEGRATION_PREFIX}{FAKE_OBJECT_ID}"
+    for object_type in ["DEAL", "PRODUCT"]:
+        HubspotSyncFingerprint.objects.create(
+            object_type=object_type,
+            integrator_object_id=errored_id,
+            properties_hash="abc",
+            synced_on=timezone.now(),
+        )
+    check_hubspot_api_errors()
+    assert list(
+        HubspotSyncFingerprint.objects.values_list("object_type", flat=True)
+    ) == ["PRODUCT"]
+
+
+def test_retry_invalid_line_associations(mocker):
     """
-    Test that a HubspotLineResync is deleted if the line exists on Hubspot,
-    and sync_line_with_hubspot otherwise if the deal is on hubspot
+    Resyncs should be deleted for lines which exist on Hubspot. Other lines should be sent again in a batch,
+    along with their deals if those don't exist on Hubspot either.
     """
-    mock_line_task = mocker.patch("hubspot.tasks.sync_line_with_hubspot")
-    mock_application_task = mocker.patch("hubspot.tasks.sync_application_with_hubspot")
-    mock_exists = mocker.patch(
-        "hubspot.tasks.exists_in_hubspot", side_effect=[line_exists, deal_exists]
+    mock_bulk_sync = mocker.patch("hubspot.tasks.sync_bulk_with_hubspot")
+    line_synced, deal_synced, neither_synced = HubspotLineResyncFactory.create_batch(3)
+    mock_existing = mocker.patch(
+        "hubspot.tasks.get_existing_hubspot_objects",
+        side_effect=[
+            {line_synced.application.integration_id},
+            {deal_synced.application.integration_id},
+        ],
     )
-    resync = HubspotLineResyncFactory.create()
     retry_invalid_line_associations()
-    mock_exists.assert_any_call("LINE_ITEM", resync.application.integration_id)
-    if not line_exists:
-        mock_exists.assert_any_call("DEAL", resync.application.integration_id)
-    assert HubspotLineResync.objects.filter(application=resync.application).count() == (
-        1 if not line_exists else 0
+
+    assert mock_existing.call_args_list[0][0] == (
+        "LINE_ITEM",
+        {
+            resync.application.integration_id
+            for resync in [line_synced, deal_synced, neither_synced]
+        },
+    )
+    assert mock_existing.call_args_list[1][0] == (
+        "DEAL",
+        {
+            deal_synced.application.integration_id,
+            neither_synced.application.integration_id,
+        },
     )
-    assert mock_line_task.call_count == (1 if (deal_exists and not line_exists) else 0)
-    assert mock_application_task.call_count == (
-        1 if (not line_exists and not deal_exists) else 0
+    assert set(HubspotLineResync.objects.values_list("application_id", flat=True)) == {
+        deal_synced.application_id,
+        neither_synced.application_id,
+    }
+    deal_call, line_call = mock_bulk_sync.call_args_list
+    assert deal_call[0][0] == [neither_synced.application]
+    assert deal_call[0][1:] == (make_deal_sync_message, "DEAL")
+    assert sorted(line_call[0][0], key=lambda application: application.id) == [
+        deal_synced.application,
+        neither_synced.application,
+    ]
+    assert line_call[0][1:] == (make_line_sync_message, "LINE_ITEM")
+    assert deal_call[1] == line_call[1] == {"force": True}
+
+
+def test_retry_invalid_line_associations_none(mocker):
+    """No requests should be made if there are no lines to resync"""
+    mock_existing = mocker.patch("hubspot.tasks.get_existing_hubspot_objects")
+    retry_invalid_line_associations()
+    mock_existing.assert_not_called()
+
+
+def test_sync_errors_high_water_mark(settings, mocker, mock_hubspot_errors):
+    """Errors which were already seen should not be handled again, even if they're newer than the last check"""
+    mocker.patch("hubspot.tasks.retry_invalid_line_associations")
+    mock_log = mocker.patch("hubspot.tasks._log_sync_error")
+    settings.HUBSPOT_API_KEY = "dkfjKJ2jfd"
+    HubspotErrorCheckFactory.create(checked_on=TIMESTAMPS[0])
+    check_hubspot_api_errors()
+    error_check = HubspotErrorCheck.objects.get()
+    assert error_check.last_error_timestamp == max(
+        error["errorTimestamp"] for error in error_response_json
     )
+    logged = mock_log.call_count
+    assert logged > 0
+
+    mock_hubspot_errors.side_effect = [
+        error_response_json[0:2],
+        error_response_json[2:],
+    ]
+    check_hubspot_api_errors()
+    assert mock_log.call_count == logged
 
 
 def test_skip_error_checks(settings, mock_hubspot_errors):
@@ -191,6 +299,21 @@ def test_sync_bulk(mocker):
     mock_request.assert_called_once()
 
 
+@pytest.mark.parametrize("force", [True, False])
+def test_sync_bulk_unchanged(mocker, force):
+    """The bulk sync should only send objects which have changed, unless it's forced"""
+    mock_request = mocker.patch("hubspot.tasks.send_hubspot_request")
+    profiles = ProfileFactory.create_batch(3)
+    users = [profile.user for profile in profiles]
+    sync_bulk_with_hubspot(users[:2], make_contact_sync_message, "CONTACT")
+    sync_bulk_with_hubspot(users, make_contact_sync_message, "CONTACT", force=force)
+    assert mock_request.call_count == 2
+    assert len(mock_request.call_args[1]["body"]) == (3 if force else 1)
+
+    sync_bulk_with_hubspot(users, make_contact_sync_message, "CONTACT")
+    assert mock_request.call_count == 2
+
+
 def test_sync_bulk_logs_errors(mocker):
     """Test that hubspot bulk sync correctly logs errors"""
     mock_request = mocker.patch(
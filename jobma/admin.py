@@ -4,10 +4,11 @@ Admin views for jobma
 
 from django.contrib import admin
 
-from jobma.models import Interview, Job
+from jobma.models import Interview, InterviewWebhookEvent, Job
+from main.admin import EstimatedCountModelAdmin
 
 
-class InterviewAdmin(admin.ModelAdmin):
+class InterviewAdmin(EstimatedCountModelAdmin):
     """Admin for Interview"""
 
     model = Interview
@@ -66,5 +67,24 @@ class JobAdmin(admin.ModelAdmin):
     get_run_display_title.admin_order_field = "run__title"
 
 
+class InterviewWebhookEventAdmin(admin.ModelAdmin):
+    """Admin for InterviewWebhookEvent"""
+
+    model = InterviewWebhookEvent
+
+    list_display = (
+        "id",
+        "interview_id",
+        "status",
+        "created_on",
+        "processed_on",
+        "attempts",
+    )
+    raw_id_fields = ("interview",)
+    list_filter = ("status",)
+    readonly_fields = ("idempotency_key", "data", "last_error")
+
+
 admin.site.register(Interview, InterviewAdmin)
 admin.site.register(Job, JobAdmin)
+admin.site.register(InterviewWebhookEvent, InterviewWebhookEventAdmin)
@@ -1,15 +1,33 @@
 """functions relating to Jobma"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import json
 import logging
 from urllib.parse import urljoin
 
 from django.conf import settings
+from django.db import transaction
+from django.db.models import F
 from django.urls import reverse
+from django_fsm import TransitionNotAllowed
 from requests import Session
+from requests.adapters import HTTPAdapter
 
+from applications.constants import (
+    SUBMISSION_STATUS_PENDING,
+    SUBMISSION_STATUS_SUBMITTED,
+)
+from applications.models import ApplicationStepSubmission
+from jobma.constants import JOBMA_COMPLETED_INTERVIEW_STATUSES
+from jobma.models import Interview, InterviewAudit, InterviewWebhookEvent
+from main.utils import group_into_dict, now_in_utc
 from profiles.api import get_first_and_last_names
 
 log = logging.getLogger(__name__)
 
+# Webhook events which have failed to apply this many times are left unprocessed for someone to look at
+WEBHOOK_EVENT_MAX_ATTEMPTS = 5
+
 
 def get_jobma_client():
     """
@@ -23,41 +41,70 @@ def get_jobma_client():
     session.headers[
         "User-Agent"
     ] = f"BootcampEcommerceBot/{settings.VERSION} ({settings.SITE_BASE_URL})"
+    # Keep enough pooled connections around for every concurrent request we make with this session
+    adapter = HTTPAdapter(pool_maxsize=settings.JOBMA_MAX_CONCURRENT_REQUESTS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
     return session
 
 
-def create_interview_in_jobma(interview):
+def _get_interview_payload(interview):
     """
-    Create a new interview on Jobma
+    Build the request body used to create an interview on Jobma
 
     Args:
         interview (Interview): An interview object
+
+    Returns:
+        dict: The JSON payload for the Jobma interviews API
     """
-    client = get_jobma_client()
-    url = urljoin(settings.JOBMA_BASE_URL, "interviews")
     job = interview.job
     first_name, last_name = get_first_and_last_names(interview.applicant)
-    response = client.post(
-        url,
-        json={
-            "interview_template_id": str(job.interview_template_id),
-            "job_id": str(job.job_id),
-            "job_code": job.job_code,
-            "job_title": job.job_title,
-            "callback_url": urljoin(
-                settings.SITE_BASE_URL,
-                reverse("jobma-webhook", kwargs={"pk": interview.id}),
-            ),
-            "candidate": {
-                "first_name": first_name,
-                "last_name": last_name,
-                "phone": "",
-                "email": interview.applicant.email,
-            },
+    return {
+        "interview_template_id": str(job.interview_template_id),
+        "job_id": str(job.job_id),
+        "job_code": job.job_code,
+        "job_title": job.job_title,
+        "callback_url": urljoin(
+            settings.SITE_BASE_URL,
+            reverse("jobma-webhook", kwargs={"pk": interview.id}),
+        ),
+        "candidate": {
+            "first_name": first_name,
+            "last_name": last_name,
+            "phone": "",
+            "email": interview.applicant.email,
         },
-    )
+    }
+
+
+def _post_interview(client, payload):
+    """
+    Send an interview payload to Jobma. This makes no database queries so it is safe to run in a worker thread.
+
+    Args:
+        client (Session): A Jobma session object
+        payload (dict): The JSON payload for the Jobma interviews API
+
+    Returns:
+        dict: The parsed response from Jobma
+    """
+    response = client.post(urljoin(settings.JOBMA_BASE_URL, "interviews"), json=payload)
     response.raise_for_status()
-    result = response.json()
+    return response.json()
+
+
+def _update_interview_from_result(interview, result):
+    """
+    Update the interview link and token from a Jobma response. The interview is not saved.
+
+    Args:
+        interview (Interview): An interview object
+        result (dict): The parsed response from Jobma
+
+    Returns:
+        str: The interview link, or None if it was missing from the response
+    """
     interview_link = result.get("interview_link")
     if interview_link is not None:
         interview.interview_url = interview_link
@@ -67,6 +114,234 @@ def create_interview_in_jobma(interview):
     interview_token = result.get("interview_token")
     if interview_token is not None:
         interview.interview_token = interview_token
+    return interview_link
+
 
+def create_interview_in_jobma(interview):
+    """
+    Create a new interview on Jobma
+
+    Args:
+        interview (Interview): An interview object
+    """
+    client = get_jobma_client()
+    result = _post_interview(client, _get_interview_payload(interview))
+    interview_link = _update_interview_from_result(interview, result)
     interview.save_and_log(None)
     return interview_link
+
+
+def create_interviews_in_jobma(interviews):
+    """
+    Create new interviews on Jobma concurrently over one pooled session, then save the new links and tokens
+    with a single bulk update. Interviews should have job, applicant__profile and applicant__legal_address
+    loaded already.
+
+    Args:
+        interviews (iterable of Interview): Interview objects
+
+    Returns:
+        (list of Interview, list of Interview):
+            The interviews which were updated, paired with the interviews for which the Jobma request failed
+    """
+    # Payloads are built up front so the worker threads never touch the database
+    payloads = [
+        (interview, interview.to_dict(), _get_interview_payload(interview))
+        for interview in interviews
+    ]
+    if not payloads:
+        return [], []
+
+    client = get_jobma_client()
+    updated, failed, audits = [], [], []
+    with ThreadPoolExecutor(
+        max_workers=settings.JOBMA_MAX_CONCURRENT_REQUESTS
+    ) as executor:
+        futures = {
+            executor.submit(_post_interview, client, payload): (interview, data_before)
+            for interview, data_before, payload in payloads
+        }
+        for future in as_completed(futures):
+            interview, data_before = futures[future]
+            try:
+                _update_interview_from_result(interview, future.result())
+            except Exception:  # pylint: disable=broad-except
+                # An error for one interview, including an unexpected response, shouldn't stop the interviews
+                # which were already created in Jobma from being saved
+                log.exception("Unable to create interview %d in Jobma", interview.id)
+                failed.append(interview)
+                continue
+            updated.append(interview)
+            audits.append(
+                InterviewAudit(
+                    interview=interview,
+                    acting_user=None,
+                    data_before=data_before,
+                    data_after=interview.to_dict(),
+                )
+            )
+
+    with transaction.atomic():
+        Interview.objects.bulk_update(updated, ["interview_url", "interview_token"])
+        InterviewAudit.objects.bulk_create(audits)
+    return updated, failed
+
+
+def get_webhook_idempotency_key(interview_id, data):
+    """
+    Compute a key which is the same for every delivery of the same webhook payload for an interview
+
+    Args:
+        interview_id (int): The interview id from the webhook URL
+        data (dict): The webhook payload
+
+    Returns:
+        str: A hex digest identifying the event
+    """
+    serialized = json.dumps({"interview": interview_id, "data": data}, sort_keys=True)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def record_webhook_event(interview, data):
+    """
+    Store a Jobma webhook payload so it can be applied later. Redelivered payloads are not stored twice.
+
+    Args:
+        interview (Interview): The interview which the webhook is for
+        data (dict): The webhook payload
+
+    Returns:
+        (InterviewWebhookEvent, bool): The event paired with a flag indicating whether it was newly created
+    """
+    return InterviewWebhookEvent.objects.get_or_create(
+        idempotency_key=get_webhook_idempotency_key(interview.id, data),
+        defaults={
+            "interview": interview,
+            "status": data["status"],
+            "results_url": data.get("results_url"),
+            "data": data,
+        },
+    )
+
+
+def _is_stale_event(interview, event):
+    """
+    Returns True if applying the event would move an interview from a final status back to an earlier one,
+    which happens when Jobma delivers events out of order
+    """
+    return (
+        interview.status in JOBMA_COMPLETED_INTERVIEW_STATUSES
+        and event.status not in JOBMA_COMPLETED_INTERVIEW_STATUSES
+    )
+
+
+def _complete_pending_submissions(interview_ids):
+    """
+    Mark pending submissions for the given interviews as submitted and move their applications along
+
+    Args:
+        interview_ids (iterable of int): Ids of interviews which Jobma reported as finished
+    """
+    submitted_ids = []
+    for submission in ApplicationStepSubmission.objects.filter(
+        videointerviews__interview__in=interview_ids,
+        submission_status=SUBMISSION_STATUS_PENDING,
+    ).select_related("bootcamp_application"):
+        application = submission.bootcamp_application
+        try:
+            application.complete_submission()
+        except TransitionNotAllowed:
+            log.exception(
+                "Unable to complete submission %d for application %d in state %s",
+                submission.id,
+                application.id,
+                application.state,
+            )
+            continue
+        application.save()
+        submitted_ids.append(submission.id)
+    ApplicationStepSubmission.objects.filter(id__in=submitted_ids).update(
+        submission_status=SUBMISSION_STATUS_SUBMITTED
+    )
+
+
+def _apply_webhook_event(interview, event):
+    """
+    Apply the latest webhook event for an interview, unless it would move the interview back from a final status
+
+    Args:
+        interview (Interview): The interview
+        event (InterviewWebhookEvent): The most recent unprocessed event for the interview
+    """
+    if _is_stale_event(interview, event):
+        log.info(
+            "Skipping out of order Jobma event %d (%s) for interview %d (%s)",
+            event.id,
+            event.status,
+            interview.id,
+            interview.status,
+        )
+        return
+    if interview.status != event.status or interview.results_url != event.results_url:
+        interview.status = event.status
+        interview.results_url = event.results_url
+        interview.save_and_log(None)
+    if event.status in JOBMA_COMPLETED_INTERVIEW_STATUSES:
+        _complete_pending_submissions([interview.id])
+
+
+def process_webhook_events(batch_size):
+    """
+    Apply a batch of unprocessed Jobma webhook events. Only the most recent event for each interview is applied,
+    and events which would move an interview back from a final status are skipped. Each interview's events are
+    applied in their own savepoint, so an error only holds back that interview. Failed events are retried after
+    newer ones, up to WEBHOOK_EVENT_MAX_ATTEMPTS times.
+
+    Args:
+        batch_size (int): The maximum number of events to process
+
+    Returns:
+        int: The number of events processed
+    """
+    with transaction.atomic():
+        events = list(
+            InterviewWebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(processed_on__isnull=True, attempts__lt=WEBHOOK_EVENT_MAX_ATTEMPTS)
+            .order_by("attempts", "created_on", "id")[:batch_size]
+        )
+        if not events:
+            return 0
+
+        # Every unprocessed event for these interviews is included, so an older event which failed earlier
+        # is never applied after a newer one
+        events_by_interview = group_into_dict(
+            InterviewWebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(
+                processed_on__isnull=True,
+                interview_id__in={event.interview_id for event in events},
+            )
+            .order_by("created_on", "id"),
+            key_fn=lambda event: event.interview_id,
+        )
+        interviews = Interview.objects.in_bulk(list(events_by_interview.keys()))
+        processed = 0
+        for interview_id, interview_events in events_by_interview.items():
+            event_ids = [event.id for event in interview_events]
+            try:
+                with transaction.atomic():
+                    _apply_webhook_event(interviews[interview_id], interview_events[-1])
+                    InterviewWebhookEvent.objects.filter(id__in=event_ids).update(
+                        processed_on=now_in_utc()
+                    )
+            except Exception as exc:  # pylint: disable=broad-except
+                log.exception(
+                    "Unable to apply Jobma webhook events %s for interview %d",
+                    event_ids,
+                    interview_id,
+                )
+                InterviewWebhookEvent.objects.filter(id__in=event_ids).update(
+                    attempts=F("attempts") + 1, last_error=str(exc)
+                )
+                continue
+            processed += len(event_ids)
+    return processed
@@ -3,9 +3,25 @@ from urllib.parse import urljoin
 
 from django.urls import reverse
 import pytest
+from requests import HTTPError
 
-from jobma.api import create_interview_in_jobma, get_jobma_client
+from applications.constants import (
+    AppStates,
+    SUBMISSION_STATUS_PENDING,
+    SUBMISSION_STATUS_SUBMITTED,
+)
+from applications.factories import ApplicationStepSubmissionFactory
+from jobma.api import (
+    create_interview_in_jobma,
+    create_interviews_in_jobma,
+    get_jobma_client,
+    process_webhook_events,
+    record_webhook_event,
+    WEBHOOK_EVENT_MAX_ATTEMPTS,
+)
+from jobma.constants import COMPLETED, PENDING
 from jobma.factories import InterviewFactory
+from jobma.models import InterviewAudit
 
 
 pytestmark = pytest.mark.django_db
@@ -77,3 +93,134 @@ def test_create_interview(
 
     assert interview.interview_url == expected_url
     assert interview.interview_token == expected_token
+
+
+@pytest.mark.parametrize("failure", ["http_error", "invalid_json", "unexpected_result"])
+def test_create_interviews_in_jobma(mocker, settings, failure):
+    """create_interviews_in_jobma should create interviews on Jobma and save the results in bulk"""
+    settings.JOBMA_MAX_CONCURRENT_REQUESTS = 2
+    interviews = InterviewFactory.create_batch(3, interview_url=None)
+    failing_interview = interviews[1]
+
+    def _post(url, json):  # pylint: disable=unused-argument,redefined-outer-name
+        """Fake Jobma responses which fail for one interview"""
+        interview_id = int(json["callback_url"].rstrip("/").split("/")[-1])
+        response = mocker.Mock(
+            json=mocker.Mock(
+                return_value={
+                    "interview_link": f"http://interview/{interview_id}",
+                    "interview_token": f"token-{interview_id}",
+                }
+            )
+        )
+        if interview_id == failing_interview.id:
+            if failure == "http_error":
+                response.raise_for_status.side_effect = HTTPError()
+            elif failure == "invalid_json":
+                response.json.side_effect = ValueError()
+            else:
+                response.json.return_value = ["not", "a", "dict"]
+        return response
+
+    client_mock = mocker.patch("jobma.api.get_jobma_client")
+    client_mock.return_value.post.side_effect = _post
+
+    updated, failed = create_interviews_in_jobma(interviews)
+    assert client_mock.call_count == 1
+    assert client_mock.return_value.post.call_count == 3
+    assert failed == [failing_interview]
+    assert {interview.id for interview in updated} == {
+        interviews[0].id,
+        interviews[2].id,
+    }
+    for interview in interviews:
+        interview.refresh_from_db()
+        if interview == failing_interview:
+            assert interview.interview_url is None
+            assert not InterviewAudit.objects.filter(interview=interview).exists()
+        else:
+            assert interview.interview_url == f"http://interview/{interview.id}"
+            assert interview.interview_token == f"token-{interview.id}"
+            audit = InterviewAudit.objects.get(interview=interview)
+            assert audit.data_before["interview_url"] is None
+            assert audit.data_after["interview_url"] == interview.interview_url
+
+
+def test_create_interviews_in_jobma_empty(mocker):
+    """create_interviews_in_jobma should not make a client if there are no interviews"""
+    client_mock = mocker.patch("jobma.api.get_jobma_client")
+    assert create_interviews_in_jobma([]) == ([], [])
+    client_mock.assert_not_called()
+
+
+def test_process_webhook_events():
+    """process_webhook_events should apply the latest event per interview and complete pending submissions"""
+    submission = ApplicationStepSubmissionFactory.create(
+        bootcamp_application__state=AppStates.AWAITING_USER_SUBMISSIONS.value,
+        submission_status=SUBMISSION_STATUS_PENDING,
+    )
+    interview = submission.content_object.interview
+    interview.status = PENDING
+    interview.save()
+    record_webhook_event(interview, {"status": PENDING})
+    record_webhook_event(interview, {"status": COMPLETED, "results_url": "http://a"})
+
+    assert process_webhook_events(10) == 2
+    assert process_webhook_events(10) == 0
+    interview.refresh_from_db()
+    submission.refresh_from_db()
+    assert interview.status == COMPLETED
+    assert interview.results_url == "http://a"
+    assert submission.submission_status == SUBMISSION_STATUS_SUBMITTED
+    assert (
+        submission.bootcamp_application.state
+        == AppStates.AWAITING_SUBMISSION_REVIEW.value
+    )
+    assert not interview.webhook_events.filter(processed_on__isnull=True).exists()
+
+
+def test_process_webhook_events_out_of_order():
+    """process_webhook_events should not move a finished interview back to pending"""
+    interview = InterviewFactory.create(status=COMPLETED)
+    _, created = record_webhook_event(interview, {"status": PENDING})
+    assert created is True
+    _, created = record_webhook_event(interview, {"status": PENDING})
+    assert created is False
+
+    assert process_webhook_events(10) == 1
+    interview.refresh_from_db()
+    assert interview.status == COMPLETED
+
+
+def test_process_webhook_events_error(mocker):
+    """An error applying one interview's events should be recorded without holding back other interviews"""
+    failing_interview, interview = InterviewFactory.create_batch(2, status=PENDING)
+
+    def _complete(interview_ids):
+        """Fail for one interview"""
+        if interview_ids == [failing_interview.id]:
+            raise Exception("error")
+
+    mocker.patch("jobma.api._complete_pending_submissions", side_effect=_complete)
+    failing_event, _ = record_webhook_event(failing_interview, {"status": COMPLETED})
+    record_webhook_event(interview, {"status": COMPLETED})
+
+    assert process_webhook_events(10) == 1
+    failing_interview.refresh_from_db()
+    interview.refresh_from_db()
+    failing_event.refresh_from_db()
+    # The failed interview's changes are rolled back, but the other interview is updated
+    assert failing_interview.status == PENDING
+    assert interview.status == COMPLETED
+    assert failing_event.processed_on is None
+    assert failing_event.attempts == 1
+    assert failing_event.last_error == "error"
+
+    for _ in range(WEBHOOK_EVENT_MAX_ATTEMPTS - 1):
+        assert process_webhook_events(10) == 0
+    failing_event.refresh_from_db()
+    assert failing_event.attempts == WEBHOOK_EVENT_MAX_ATTEMPTS
+    # Events which have failed too many times aren't retried
+    assert process_webhook_events(10) == 0
+    failing_event.refresh_from_db()
+    assert failing_event.attempts == WEBHOOK_EVENT_MAX_ATTEMPTS
@@ -0,0 +1,56 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("jobma", "0007_interview_interview_token")]
+
+    operations = [
+        migrations.CreateModel(
+            name="InterviewWebhookEvent",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+                ("updated_on", models.DateTimeField(auto_now=True)),
+                ("idempotency_key", models.CharField(max_length=64, unique=True)),
+                (
+                    "status",
+                    models.TextField(
+                        choices=[
+                            ("pending", "pending"),
+                            ("completed", "completed"),
+                            ("rejected", "rejected"),
+                            ("expired", "expired"),
+                        ]
+                    ),
+                ),
+                ("results_url", models.TextField(blank=True, null=True)),
+                ("data", django.contrib.postgres.fields.jsonb.JSONField()),
+                (
+                    "processed_on",
+                    models.DateTimeField(blank=True, db_index=True, null=True),
+                ),
+                (
+                    "interview",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="webhook_events",
+                        to="jobma.Interview",
+                    ),
+                ),
+            ],
+            options={"abstract": False},
+        )
+    ]
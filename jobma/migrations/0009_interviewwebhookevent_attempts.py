@@ -0,0 +1,21 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("jobma", "0008_interviewwebhookevent")]
+
+    operations = [
+        migrations.AddField(
+            model_name="interviewwebhookevent",
+            name="attempts",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="interviewwebhookevent",
+            name="last_error",
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("jobma", "0009_interviewwebhookevent_attempts")]
+
+    operations = [
+        migrations.AddField(
+            model_name="interview",
+            name="link_refreshed_on",
+            field=models.DateTimeField(blank=True, null=True),
+        )
+    ]
@@ -1,10 +1,11 @@
 """jobma models"""
 from django.conf import settings
+from django.contrib.postgres.fields import JSONField
 from django.db import models
 
 from jobma.constants import JOBMA_INTERVIEW_STATUSES, PENDING
 from klasses.models import BootcampRun
-from main.models import AuditableModel, AuditModel
+from main.models import AuditableModel, AuditModel, TimestampedModel
 from main.utils import serialize_model_object
 
 
@@ -51,6 +52,8 @@ class Interview(AuditableModel):
         choices=[(status, status) for status in JOBMA_INTERVIEW_STATUSES],
     )
     interview_token = models.TextField(blank=True, null=True)
+    # Set when the interview is recreated in Jobma because its link expired
+    link_refreshed_on = models.DateTimeField(blank=True, null=True)
 
     @classmethod
     def get_audit_class(cls):
@@ -71,3 +74,23 @@ class InterviewAudit(AuditModel):
     @classmethod
     def get_related_field_name(cls):
         return "interview"
+
+
+class InterviewWebhookEvent(TimestampedModel):
+    """A status update for an interview which was posted to us by Jobma and is waiting to be applied"""
+
+    interview = models.ForeignKey(
+        Interview, on_delete=models.CASCADE, related_name="webhook_events"
+    )
+    idempotency_key = models.CharField(max_length=64, unique=True)
+    status = models.TextField(
+        choices=[(status, status) for status in JOBMA_INTERVIEW_STATUSES]
+    )
+    results_url = models.TextField(blank=True, null=True)
+    data = JSONField()
+    processed_on = models.DateTimeField(null=True, blank=True, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Webhook event {self.status} for interview {self.interview_id}"
@@ -0,0 +1,20 @@
+"""Tasks for Jobma"""
+import logging
+
+from django.conf import settings
+
+from jobma import api
+from main.celery import app
+
+log = logging.getLogger(__name__)
+
+
+@app.task
+def process_webhook_events():
+    """Apply pending Jobma webhook events in batches until there are none left"""
+    total = 0
+    processed = api.process_webhook_events(settings.JOBMA_WEBHOOK_BATCH_SIZE)
+    while processed:
+        total += processed
+        processed = api.process_webhook_events(settings.JOBMA_WEBHOOK_BATCH_SIZE)
+    return total
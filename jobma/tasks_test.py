@@ -0,0 +1,13 @@
+"""Tests for Jobma tasks"""
+from jobma.tasks import process_webhook_events
+
+
+def test_process_webhook_events(mocker, settings):
+    """process_webhook_events should keep applying batches until none are left"""
+    settings.JOBMA_WEBHOOK_BATCH_SIZE = 5
+    process_mock = mocker.patch(
+        "jobma.tasks.api.process_webhook_events", side_effect=[5, 2, 0]
+    )
+    assert process_webhook_events.delay().get() == 7
+    assert process_mock.call_count == 3
+    process_mock.assert_called_with(5)
@@ -4,11 +4,8 @@ import logging
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 
-from applications.constants import (
-    SUBMISSION_STATUS_PENDING,
-    SUBMISSION_STATUS_SUBMITTED,
-)
-from jobma.constants import JOBMA_COMPLETED_INTERVIEW_STATUSES
+from jobma import tasks
+from jobma.api import record_webhook_event
 from jobma.models import Interview
 from jobma.permissions import JobmaWebhookPermission
 
@@ -24,25 +21,12 @@ class JobmaWebhookView(GenericAPIView):
     queryset = Interview.objects.all()
 
     def put(self, request, *args, **kwargs):
-        """Update the Jobma interview status result"""
-        status = request.data["status"]
-        results_url = request.data.get("results_url")
-
+        """Store the Jobma interview status result so it can be applied asynchronously"""
         interview = self.get_object()
-        interview.status = status
-        interview.results_url = results_url
-        interview.save_and_log(None)
-
-        if status in JOBMA_COMPLETED_INTERVIEW_STATUSES:
-            for (
-                submission
-            ) in interview.videointerviewsubmission.app_step_submissions.filter(
-                submission_status=SUBMISSION_STATUS_PENDING
-            ):
-                submission.bootcamp_application.complete_submission()
-                submission.bootcamp_application.save()
-
-                submission.submission_status = SUBMISSION_STATUS_SUBMITTED
-                submission.save()
+        _, created = record_webhook_event(interview, request.data)
+        if created:
+            tasks.process_webhook_events.delay()
+        else:
+            log.debug("Ignoring duplicate Jobma webhook for interview %d", interview.id)
 
         return Response(status=200)
@@ -6,6 +6,7 @@ from rest_framework import status
 from applications.constants import AppStates
 from applications.factories import ApplicationStepSubmissionFactory
 from jobma.constants import COMPLETED, EXPIRED, PENDING, REJECTED
+from jobma.models import InterviewWebhookEvent
 
 
 pytestmark = pytest.mark.django_db
@@ -43,3 +44,24 @@ def test_jobma_webhook(client, mocker, jobma_status, expected_state_change):
         if expected_state_change
         else AppStates.AWAITING_USER_SUBMISSIONS.value
     )
+
+
+def test_jobma_webhook_duplicate(client, mocker):
+    """A redelivered webhook should not be stored or processed twice"""
+    submission = ApplicationStepSubmissionFactory.create(
+        bootcamp_application__state=AppStates.AWAITING_USER_SUBMISSIONS.value
+    )
+    interview = submission.content_object.interview
+    mocker.patch(
+        "jobma.permissions.JobmaWebhookPermission.has_permission", return_value=True
+    )
+    process_mock = mocker.patch("jobma.views.tasks.process_webhook_events.delay")
+    for _ in range(2):
+        response = client.put(
+            reverse("jobma-webhook", kwargs={"pk": interview.id}),
+            content_type="application/json",
+            data={"status": COMPLETED, "results_url": "http://path/to/a/url"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+    process_mock.assert_called_once_with()
+    assert InterviewWebhookEvent.objects.filter(interview=interview).count() == 1
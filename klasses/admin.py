@@ -36,6 +36,7 @@ class BootcampRunAdmin(admin.ModelAdmin):
 
     model = models.BootcampRun
     list_display = ("display_title", "novoed_course_stub", "start_date", "end_date")
+    list_select_related = ("bootcamp",)
     raw_id_fields = ("bootcamp",)
     inlines = [InstallmentInline]
 
@@ -13,6 +13,7 @@ from klasses.constants import DATE_RANGE_MONTH_FMT
 from klasses.models import BootcampRun, BootcampRunEnrollment
 from main import features
 from novoed import tasks as novoed_tasks
+from outbox.api import enqueue_task
 
 
 log = logging.getLogger(__name__)
@@ -50,9 +51,13 @@ def deactivate_run_enrollment(
         features.is_enabled(features.NOVOED_INTEGRATION)
         and run_enrollment.bootcamp_run.novoed_course_stub
     ):
-        novoed_tasks.unenroll_user_from_novoed_course.delay(
-            user_id=run_enrollment.user.id,
-            novoed_course_stub=run_enrollment.bootcamp_run.novoed_course_stub,
+        enqueue_task(
+            novoed_tasks.unenroll_user_from_novoed_course,
+            kwargs={
+                "user_id": run_enrollment.user.id,
+                "novoed_course_stub": run_enrollment.bootcamp_run.novoed_course_stub,
+            },
+            aggregate=run_enrollment,
         )
     return run_enrollment
 
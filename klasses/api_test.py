@@ -65,13 +65,16 @@ def test_deactivate_run_enrollment_novoed(mocker, settings):
     """deactivate_run_enrollment should run a task to unenroll users in NovoEd if the bootcamp run is NovoEd-enabled"""
     settings.FEATURES[NOVOED_INTEGRATION] = True
     patched_novoed_tasks = mocker.patch("klasses.api.novoed_tasks")
+    patched_enqueue_task = mocker.patch("klasses.api.enqueue_task")
     novoed_stub = "novoed-course"
     enrollment = BootcampRunEnrollmentFactory.create(
         bootcamp_run__novoed_course_stub=novoed_stub
     )
     deactivate_run_enrollment(run_enrollment=enrollment, change_status=None)
-    patched_novoed_tasks.unenroll_user_from_novoed_course.delay.assert_called_once_with(
-        user_id=enrollment.user.id, novoed_course_stub=novoed_stub
+    patched_enqueue_task.assert_called_once_with(
+        patched_novoed_tasks.unenroll_user_from_novoed_course,
+        kwargs={"user_id": enrollment.user.id, "novoed_course_stub": novoed_stub},
+        aggregate=enrollment,
     )
 
 
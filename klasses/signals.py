@@ -13,7 +13,7 @@ def sync_bootcamp_run(
     sender, instance, created, **kwargs
 ):  # pylint:disable=unused-argument
     """Sync bootcamp run to hubspot"""
-    on_commit(lambda: sync_hubspot_product(instance))
+    sync_hubspot_product(instance)
 
 
 @receiver(post_save, sender=PersonalPrice, dispatch_uid="personal_price_post_save")
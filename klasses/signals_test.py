@@ -11,21 +11,20 @@ pytestmark = pytest.mark.django_db
 
 def test_bootcamp_run_signal(mocker):
     """Test that hubspot is synced whenever a Bootcamp is created/updated"""
-    mock_on_commit = mocker.patch("klasses.signals.on_commit")
+    mock_sync = mocker.patch("klasses.signals.sync_hubspot_product")
     bootcamp = BootcampRunFactory.create()
     bootcamp.save()
     bootcamp.save()
-    assert mock_on_commit.call_count == 3  # Once for creation, twice for updates
+    assert mock_sync.call_count == 3  # Once for creation, twice for updates
 
 
 def test_personal_price_save_signal(mocker):
     """An API method to update a bootcamp application should be called after a personal price is created/saved"""
     mock_on_commit = mocker.patch("klasses.signals.on_commit")
     personal_price = PersonalPriceFactory.create()
-    # This signal is called twice when the record is created (as opposed to just being saved)
-    assert mock_on_commit.call_count == 2
+    assert mock_on_commit.call_count == 1
     personal_price.save()
-    assert mock_on_commit.call_count == 3
+    assert mock_on_commit.call_count == 2
     # Test the function call from the signal handler
     patched_adjust_app = mocker.patch("klasses.signals.adjust_app_state_for_new_price")
     personal_price_post_save(mocker.Mock(), personal_price, False)
@@ -1,6 +1,7 @@
 """Utility functions for Klasses"""
 
 from klasses.models import BootcampRunCertificate, BootcampRunEnrollment
+from profiles.api import find_users
 
 
 def generate_single_certificate(user, bootcamp_run):
@@ -161,9 +162,10 @@ def manage_user_certificate_blocking(users, block_state, bootcamp_run):
     """Block users for getting certificates in all bootcamp run enrollments"""
     result = {"updated": False}
     if users:
+        found_users, _ = find_users(users)
         run_enrollments = BootcampRunEnrollment.objects.filter(
-            user__email__in=users, bootcamp_run=bootcamp_run
-        )
+            user__in=found_users, bootcamp_run=bootcamp_run
+        ).select_related("user")
 
         if not run_enrollments:
             result[
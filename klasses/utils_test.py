@@ -10,6 +10,7 @@ from klasses.factories import (
 from klasses.utils import (
     generate_batch_certificates,
     generate_single_certificate,
+    manage_user_certificate_blocking,
     revoke_certificate,
     unrevoke_certificate,
 )
@@ -145,3 +146,41 @@ def test_unrevoke_certificate():
             certificate.link, user.email, bootcamp_run
         ),
     }
+
+
+@pytest.mark.parametrize("block_state", [True, False])
+def test_manage_user_certificate_blocking(block_state):
+    """manage_user_certificate_blocking should update enrollments for users matched case-insensitively by email"""
+    users = UserFactory.create_batch(
+        2, email=factory.Iterator(["a@example.com", "b@example.com"])
+    )
+    bootcamp_run = BootcampRunFactory()
+    enrollments = BootcampRunEnrollmentFactory.create_batch(
+        2,
+        bootcamp_run=bootcamp_run,
+        user=factory.Iterator(users),
+        user_certificate_is_blocked=not block_state,
+    )
+    other_enrollment = BootcampRunEnrollmentFactory.create(
+        user=users[0], user_certificate_is_blocked=not block_state
+    )
+
+    result = manage_user_certificate_blocking(
+        ["A@example.com", "missing@example.com"], block_state, bootcamp_run
+    )
+    assert result["updated"] is True
+    for enrollment, expected in [
+        (enrollments[0], block_state),
+        (enrollments[1], not block_state),
+        (other_enrollment, not block_state),
+    ]:
+        enrollment.refresh_from_db()
+        assert enrollment.user_certificate_is_blocked is expected
+
+
+def test_manage_user_certificate_blocking_no_match():
+    """manage_user_certificate_blocking should not update anything if no enrollments match"""
+    result = manage_user_certificate_blocking(
+        ["missing@example.com"], True, BootcampRunFactory()
+    )
+    assert result["updated"] is False
@@ -28,6 +28,10 @@ class SeedResult:
         """Adds to the count of created object types"""
         self.created[obj.__class__.__name__] += 1
 
+    def add_bulk_created(self, model_cls, count):
+        """Adds to the count of created objects of a type which were inserted in bulk"""
+        self.created[model_cls.__name__] += count
+
     def add_updated(self, obj):
         """Adds to the count of updated object types"""
         self.updated[obj.__class__.__name__] += 1
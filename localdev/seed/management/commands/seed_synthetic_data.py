@@ -0,0 +1,78 @@
+"""Management command to create a large volume of synthetic data for benchmarks and load testing"""
+from django.core.management.base import BaseCommand, CommandError
+
+from localdev.seed.synthetic_data_api import (
+    create_synthetic_data,
+    delete_synthetic_data,
+    synthetic_data_exists,
+)
+
+
+class Command(BaseCommand):
+    """Creates a large volume of synthetic users, applications, submissions, orders and certificates"""
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=1000, help="The number of users to create"
+        )
+        parser.add_argument(
+            "--applications",
+            type=int,
+            default=2000,
+            help="The number of applications to create",
+        )
+        parser.add_argument(
+            "--bootcamps", type=int, default=5, help="The number of bootcamps to create"
+        )
+        parser.add_argument(
+            "--runs-per-bootcamp",
+            type=int,
+            default=4,
+            help="The number of runs to create for each bootcamp",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed for the random number generator. The same seed always produces the same data.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="The number of rows to insert at a time",
+        )
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Delete all synthetic data instead of creating it",
+        )
+
+    def handle(self, *args, **options):
+        if options["delete"]:
+            results = delete_synthetic_data()
+        else:
+            if synthetic_data_exists(options["seed"]):
+                raise CommandError(
+                    f"Synthetic data already exists for seed {options['seed']}. "
+                    "Use a different seed, or run with --delete first."
+                )
+            try:
+                results = create_synthetic_data(
+                    users=options["users"],
+                    applications=options["applications"],
+                    bootcamps=options["bootcamps"],
+                    runs_per_bootcamp=options["runs_per_bootcamp"],
+                    seed=options["seed"],
+                    batch_size=options["batch_size"],
+                )
+            except ValueError as exc:
+                raise CommandError(str(exc))
+
+        if not results.has_results:
+            self.stdout.write(self.style.WARNING("No results logged."))
+        else:
+            self.stdout.write(self.style.SUCCESS("RESULTS"))
+            self.stdout.write(results.report)
@@ -0,0 +1,616 @@
+"""API functionality for generating large volumes of synthetic data for benchmarks and load testing"""
+import random
+import uuid
+from collections import namedtuple
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from applications.constants import (
+    AppStates,
+    REVIEW_STATUS_APPROVED,
+    REVIEW_STATUS_PENDING,
+    REVIEW_STATUS_REJECTED,
+    SUBMISSION_QUIZ,
+    SUBMISSION_STATUS_PENDING,
+    SUBMISSION_STATUS_SUBMITTED,
+    SUBMISSION_VIDEO,
+)
+from applications.models import (
+    ApplicationStep,
+    ApplicationStepSubmission,
+    BootcampApplication,
+    BootcampRunApplicationStep,
+    QuizSubmission,
+    VideoInterviewSubmission,
+)
+from ecommerce.api import make_reference_id
+from ecommerce.constants import CYBERSOURCE_DECISION_ACCEPT
+from ecommerce.models import Line, Order, Receipt, WireTransferReceipt
+from jobma.constants import COMPLETED
+from jobma.models import Interview, Job
+from klasses.constants import ENROLL_CHANGE_STATUS_REFUNDED
+from klasses.models import (
+    Bootcamp,
+    BootcampRun,
+    BootcampRunCertificate,
+    BootcampRunEnrollment,
+    Installment,
+)
+from localdev.seed.api import SeedResult
+from localdev.seed.app_state_api import (
+    DUMMY_INTERVIEW_RESULTS_URL,
+    DUMMY_LINKEDIN_URL,
+    INTERVIEW_TEMPLATE_ID,
+    LEGAL_ADDRESS_CHOICES,
+    PROFILE_CHOICES,
+)
+from localdev.seed.config import DateRangeOption
+from localdev.seed.utils import get_date_range, seed_prefixed
+from main.utils import now_in_utc
+from profiles.models import LegalAddress, Profile
+
+User = get_user_model()
+
+SYNTHETIC_USERNAME_PREFIX = "synthetic-"
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.example.com"
+SYNTHETIC_BOOTCAMP_TITLE_PREFIX = seed_prefixed("Synthetic Bootcamp ")
+SYNTHETIC_RUN_KEY_OFFSET = 1_000_000
+SYNTHETIC_RUN_KEYS_PER_SEED = 100_000
+DUMMY_CARD_NUMBER = "xxxxxxxxxxxx1111"
+VISA_CARD_TYPE = "001"
+
+FIRST_NAMES = (
+    "Ada",
+    "Grace",
+    "Alan",
+    "Katherine",
+    "Dorothy",
+    "Mary",
+    "Claude",
+    "Barbara",
+    "Edsger",
+    "Frances",
+    "John",
+    "Radia",
+)
+LAST_NAMES = (
+    "Lovelace",
+    "Hopper",
+    "Turing",
+    "Johnson",
+    "Vaughan",
+    "Jackson",
+    "Shannon",
+    "Liskov",
+    "Dijkstra",
+    "Allen",
+    "Backus",
+    "Perlman",
+)
+# Most applicants stop early in the application process, so states are weighted towards the start of it
+APP_STATE_WEIGHTS = {
+    AppStates.AWAITING_PROFILE_COMPLETION.value: 20,
+    AppStates.AWAITING_RESUME.value: 20,
+    AppStates.AWAITING_USER_SUBMISSIONS.value: 15,
+    AppStates.AWAITING_SUBMISSION_REVIEW.value: 10,
+    AppStates.AWAITING_PAYMENT.value: 12,
+    AppStates.COMPLETE.value: 12,
+    AppStates.REJECTED.value: 9,
+    AppStates.REFUNDED.value: 2,
+}
+SUBMISSION_REVIEW_STATUSES = {
+    AppStates.AWAITING_SUBMISSION_REVIEW.value: REVIEW_STATUS_PENDING,
+    AppStates.AWAITING_PAYMENT.value: REVIEW_STATUS_APPROVED,
+    AppStates.COMPLETE.value: REVIEW_STATUS_APPROVED,
+    AppStates.REJECTED.value: REVIEW_STATUS_REJECTED,
+    AppStates.REFUNDED.value: REVIEW_STATUS_APPROVED,
+}
+RESUME_UPLOADED_STATES = set(SUBMISSION_REVIEW_STATUSES) | {
+    AppStates.AWAITING_USER_SUBMISSIONS.value
+}
+ENROLLED_STATES = {AppStates.COMPLETE.value, AppStates.REFUNDED.value}
+RUN_PRICES = (Decimal("7500.00"), Decimal("9500.00"), Decimal("12500.00"))
+INSTALLMENTS_PER_RUN = 3
+PARTIAL_PAYMENT_RATE = 0.4
+WIRE_TRANSFER_RATE = 0.1
+CERTIFICATE_RATE = 0.8
+
+SyntheticRun = namedtuple("SyntheticRun", ["run", "run_steps", "job", "price"])
+
+
+def _split_amount(amount, parts):
+    """Split an amount of money into a number of payments which add up to it"""
+    part = (amount / parts).quantize(Decimal("0.01"))
+    return [part] * (parts - 1) + [amount - part * (parts - 1)]
+
+
+def _create_bootcamp_runs(
+    rng, *, seed, bootcamps, runs_per_bootcamp, seed_result
+):  # pylint: disable=too-many-locals
+    """
+    Create bootcamps with runs in the past, present and future, each with installments, application steps
+    and a Jobma job
+
+    Returns:
+        list of SyntheticRun: the runs which were created
+    """
+    synthetic_runs = []
+    for bootcamp_index in range(bootcamps):
+        bootcamp = Bootcamp.objects.create(
+            title=f"{SYNTHETIC_BOOTCAMP_TITLE_PREFIX}{seed}-{bootcamp_index}"
+        )
+        app_steps = ApplicationStep.objects.bulk_create(
+            [
+                ApplicationStep(
+                    bootcamp=bootcamp, step_order=1, submission_type=SUBMISSION_VIDEO
+                ),
+                ApplicationStep(
+                    bootcamp=bootcamp, step_order=2, submission_type=SUBMISSION_QUIZ
+                ),
+            ]
+        )
+        seed_result.add_created(bootcamp)
+        seed_result.add_bulk_created(ApplicationStep, len(app_steps))
+
+        for run_index in range(runs_per_bootcamp):
+            date_range_choice = rng.choice(list(DateRangeOption)).value
+            start_date, end_date = get_date_range(
+                date_range_choice=date_range_choice, series_index=run_index
+            )
+            run_key = (
+                SYNTHETIC_RUN_KEY_OFFSET
+                + seed * SYNTHETIC_RUN_KEYS_PER_SEED
+                + bootcamp_index * runs_per_bootcamp
+                + run_index
+            )
+            run = BootcampRun.objects.create(
+                bootcamp=bootcamp,
+                title=seed_prefixed(f"Synthetic Run {run_key}"),
+                run_key=run_key,
+                start_date=start_date,
+                end_date=end_date,
+            )
+            price = rng.choice(RUN_PRICES)
+            # Installments are due at regular intervals leading up to the start of the run
+            installment_interval = (end_date - start_date) / 4
+            installments = Installment.objects.bulk_create(
+                [
+                    Installment(
+                        bootcamp_run=run,
+                        amount=amount,
+                        deadline=start_date
+                        - (INSTALLMENTS_PER_RUN - installment_index)
+                        * installment_interval,
+                    )
+                    for installment_index, amount in enumerate(
+                        _split_amount(price, INSTALLMENTS_PER_RUN)
+                    )
+                ]
+            )
+            run_steps = BootcampRunApplicationStep.objects.bulk_create(
+                [
+                    BootcampRunApplicationStep(
+                        application_step=app_step, bootcamp_run=run, due_date=start_date
+                    )
+                    for app_step in app_steps
+                ]
+            )
+            job = Job.objects.create(
+                run=run,
+                job_id=run.id,
+                job_code=f"job_run_{run.id}",
+                job_title=run.title,
+                interview_template_id=INTERVIEW_TEMPLATE_ID,
+            )
+            seed_result.add_created(run)
+            seed_result.add_created(job)
+            seed_result.add_bulk_created(Installment, len(installments))
+            seed_result.add_bulk_created(BootcampRunApplicationStep, len(run_steps))
+            synthetic_runs.append(
+                SyntheticRun(run=run, run_steps=run_steps, job=job, price=price)
+            )
+    return synthetic_runs
+
+
+def _create_users(rng, *, seed, count, batch_size, seed_result):
+    """
+    Create users with complete profiles and legal addresses
+
+    Returns:
+        list of int: ids of the users which were created
+    """
+    password = make_password(None)
+    user_ids = []
+    for start in range(0, count, batch_size):
+        with transaction.atomic():
+            users = User.objects.bulk_create(
+                [
+                    User(
+                        username=username,
+                        email=f"{username}@{SYNTHETIC_EMAIL_DOMAIN}",
+                        password=password,
+                    )
+                    for username in (
+                        f"{SYNTHETIC_USERNAME_PREFIX}{seed}-{index}"
+                        for index in range(start, min(start + batch_size, count))
+                    )
+                ]
+            )
+            profiles, legal_addresses = [], []
+            for user in users:
+                first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                profiles.append(
+                    Profile(
+                        user=user,
+                        name=f"{first_name} {last_name}",
+                        **{
+                            field_name: rng.choice(values)
+                            for field_name, values in PROFILE_CHOICES.items()
+                            if field_name != "name"
+                        },
+                    )
+                )
+                legal_addresses.append(
+                    LegalAddress(
+                        user=user,
+                        first_name=first_name,
+                        last_name=last_name,
+                        **{
+                            field_name: rng.choice(values)
+                            for field_name, values in LEGAL_ADDRESS_CHOICES.items()
+                        },
+                    )
+                )
+            Profile.objects.bulk_create(profiles)
+            LegalAddress.objects.bulk_create(legal_addresses)
+        seed_result.add_bulk_created(User, len(users))
+        seed_result.add_bulk_created(Profile, len(profiles))
+        seed_result.add_bulk_created(LegalAddress, len(legal_addresses))
+        user_ids.extend(user.id for user in users)
+    return user_ids
+
+
+def _pick_applicant(rng, user_ids, synthetic_runs, used_pairs):
+    """Pick a user and a run which the user has not applied to yet"""
+    while True:
+        user_id = rng.choice(user_ids)
+        synthetic_run = rng.choice(synthetic_runs)
+        if (user_id, synthetic_run.run.id) not in used_pairs:
+            used_pairs.add((user_id, synthetic_run.run.id))
+            return user_id, synthetic_run
+
+
+def _create_submissions(
+    rng, applications, seed_result
+):  # pylint: disable=too-many-locals
+    """Create video interview and quiz submissions for applications which have progressed far enough"""
+    now = now_in_utc()
+    planned = []
+    for application, synthetic_run in applications:
+        if application.state == AppStates.AWAITING_USER_SUBMISSIONS.value:
+            # The applicant has started the first step but hasn't finished it
+            run_steps = synthetic_run.run_steps[:1]
+            submission_status, review_status = (
+                SUBMISSION_STATUS_PENDING,
+                REVIEW_STATUS_PENDING,
+            )
+        elif application.state in SUBMISSION_REVIEW_STATUSES:
+            run_steps = synthetic_run.run_steps
+            submission_status, review_status = (
+                SUBMISSION_STATUS_SUBMITTED,
+                SUBMISSION_REVIEW_STATUSES[application.state],
+            )
+        else:
+            continue
+        for run_step in run_steps:
+            planned.append(
+                (application, synthetic_run, run_step, submission_status, review_status)
+            )
+
+    video_plans, quiz_plans = [], []
+    for plan in planned:
+        if plan[2].application_step.submission_type == SUBMISSION_VIDEO:
+            video_plans.append(plan)
+        else:
+            quiz_plans.append(plan)
+    interviews = Interview.objects.bulk_create(
+        [
+            Interview(
+                job=synthetic_run.job,
+                applicant_id=application.user_id,
+                status=COMPLETED,
+                interview_url=f"http://example.com/video/{application.id}",
+                results_url=DUMMY_INTERVIEW_RESULTS_URL,
+                interview_token=uuid.UUID(int=rng.getrandbits(128), version=4).hex,
+            )
+            for application, synthetic_run, _, _, _ in video_plans
+        ]
+    )
+    videos = VideoInterviewSubmission.objects.bulk_create(
+        [VideoInterviewSubmission(interview=interview) for interview in interviews]
+    )
+    quizzes = QuizSubmission.objects.bulk_create(
+        [QuizSubmission(started_date=now) for _ in quiz_plans]
+    )
+
+    video_content_type = ContentType.objects.get_for_model(VideoInterviewSubmission)
+    quiz_content_type = ContentType.objects.get_for_model(QuizSubmission)
+    step_submissions = []
+    for content_type, plans, content_objects in [
+        (video_content_type, video_plans, videos),
+        (quiz_content_type, quiz_plans, quizzes),
+    ]:
+        for plan, content_object in zip(plans, content_objects):
+            application, _, run_step, submission_status, review_status = plan
+            step_submissions.append(
+                ApplicationStepSubmission(
+                    bootcamp_application=application,
+                    run_application_step=run_step,
+                    submitted_date=now,
+                    submission_status=submission_status,
+                    review_status=review_status,
+                    review_status_date=(
+                        None if review_status == REVIEW_STATUS_PENDING else now
+                    ),
+                    content_type=content_type,
+                    object_id=content_object.id,
+                )
+            )
+    ApplicationStepSubmission.objects.bulk_create(step_submissions)
+    seed_result.add_bulk_created(Interview, len(interviews))
+    seed_result.add_bulk_created(VideoInterviewSubmission, len(videos))
+    seed_result.add_bulk_created(QuizSubmission, len(quizzes))
+    seed_result.add_bulk_created(ApplicationStepSubmission, len(step_submissions))
+
+
+def _get_payment_amounts(rng, application, synthetic_run):
+    """Returns the amounts which the applicant paid for their application"""
+    if application.state == AppStates.AWAITING_PAYMENT.value:
+        if rng.random() < PARTIAL_PAYMENT_RATE:
+            return _split_amount(synthetic_run.price, INSTALLMENTS_PER_RUN)[:1]
+        return []
+    if application.state in ENROLLED_STATES:
+        return _split_amount(synthetic_run.price, rng.choice((1, 1, 2, 3)))
+    return []
+
+
+def _create_payments(rng, applications, seed_result):
+    """Create orders, lines and receipts for applications which have been paid for, along with refunds"""
+    planned = []
+    for application, synthetic_run in applications:
+        for amount in _get_payment_amounts(rng, application, synthetic_run):
+            payment_type = (
+                Order.WIRE_TRANSFER_TYPE
+                if rng.random() < WIRE_TRANSFER_RATE
+                else Order.CYBERSOURCE_TYPE
+            )
+            planned.append((application, synthetic_run, amount, payment_type))
+        if application.state == AppStates.REFUNDED.value:
+            planned.append(
+                (application, synthetic_run, -synthetic_run.price, Order.REFUND_TYPE)
+            )
+
+    orders = Order.objects.bulk_create(
+        [
+            Order(
+                user_id=application.user_id,
+                application=application,
+                status=Order.FULFILLED,
+                total_price_paid=amount,
+                payment_type=payment_type,
+            )
+            for application, _, amount, payment_type in planned
+        ]
+    )
+    lines = Line.objects.bulk_create(
+        [
+            Line(
+                order=order,
+                bootcamp_run=synthetic_run.run,
+                price=amount,
+                description=(
+                    f"Refund for {synthetic_run.run.title}"
+                    if payment_type == Order.REFUND_TYPE
+                    else f"Payment for {synthetic_run.run.title}"
+                ),
+            )
+            for order, (_, synthetic_run, amount, payment_type) in zip(orders, planned)
+        ]
+    )
+    now = now_in_utc()
+    receipts = []
+    for order in orders:
+        if order.payment_type != Order.CYBERSOURCE_TYPE:
+            continue
+        transaction_uuid = uuid.UUID(int=rng.getrandbits(128), version=4).hex
+        receipts.append(
+            Receipt(
+                order=order,
+                transaction_uuid=transaction_uuid,
+                processed_on=now,
+                data={
+                    "decision": CYBERSOURCE_DECISION_ACCEPT,
+                    "req_amount": str(order.total_price_paid),
+                    "req_card_number": DUMMY_CARD_NUMBER,
+                    "req_card_type": VISA_CARD_TYPE,
+                    "req_payment_method": "card",
+                    "req_reference_number": make_reference_id(order),
+                    "req_transaction_uuid": transaction_uuid,
+                },
+            )
+        )
+    Receipt.objects.bulk_create(receipts)
+    wire_transfer_receipts = WireTransferReceipt.objects.bulk_create(
+        [
+            WireTransferReceipt(
+                order=order,
+                wire_transfer_id=order.id,
+                data={"amount": str(order.total_price_paid)},
+            )
+            for order in orders
+            if order.payment_type == Order.WIRE_TRANSFER_TYPE
+        ]
+    )
+    seed_result.add_bulk_created(Order, len(orders))
+    seed_result.add_bulk_created(Line, len(lines))
+    seed_result.add_bulk_created(Receipt, len(receipts))
+    seed_result.add_bulk_created(WireTransferReceipt, len(wire_transfer_receipts))
+
+
+def _create_enrollments(rng, applications, seed_result):
+    """Create enrollments for paid applications, and certificates for completed runs which have ended"""
+    now = now_in_utc()
+    enrolled = [
+        (application, synthetic_run)
+        for application, synthetic_run in applications
+        if application.state in ENROLLED_STATES
+    ]
+    enrollments = BootcampRunEnrollment.objects.bulk_create(
+        [
+            BootcampRunEnrollment(
+                user_id=application.user_id,
+                bootcamp_run=synthetic_run.run,
+                active=application.state == AppStates.COMPLETE.value,
+                change_status=(
+                    ENROLL_CHANGE_STATUS_REFUNDED
+                    if application.state == AppStates.REFUNDED.value
+                    else None
+                ),
+            )
+            for application, synthetic_run in enrolled
+        ]
+    )
+    certificates = BootcampRunCertificate.objects.bulk_create(
+        [
+            BootcampRunCertificate(
+                user_id=application.user_id, bootcamp_run=synthetic_run.run
+            )
+            for application, synthetic_run in enrolled
+            if application.state == AppStates.COMPLETE.value
+            and synthetic_run.run.end_date < now
+            and rng.random() < CERTIFICATE_RATE
+        ]
+    )
+    seed_result.add_bulk_created(BootcampRunEnrollment, len(enrollments))
+    seed_result.add_bulk_created(BootcampRunCertificate, len(certificates))
+
+
+def _create_applications(
+    rng, *, user_ids, synthetic_runs, count, batch_size, seed_result
+):  # pylint: disable=too-many-locals
+    """Create applications in batches, along with the submissions, payments and enrollments for them"""
+    if count > len(user_ids) * len(synthetic_runs):
+        raise ValueError(
+            f"Cannot create {count} applications for {len(user_ids)} users and {len(synthetic_runs)} runs"
+        )
+    states = list(APP_STATE_WEIGHTS.keys())
+    weights = list(APP_STATE_WEIGHTS.values())
+    used_pairs = set()
+    now = now_in_utc()
+    for start in range(0, count, batch_size):
+        planned = []
+        for state in rng.choices(states, weights, k=min(batch_size, count - start)):
+            user_id, synthetic_run = _pick_applicant(
+                rng, user_ids, synthetic_runs, used_pairs
+            )
+            resume_uploaded = state in RESUME_UPLOADED_STATES
+            planned.append(
+                (
+                    BootcampApplication(
+                        user_id=user_id,
+                        bootcamp_run=synthetic_run.run,
+                        state=state,
+                        linkedin_url=DUMMY_LINKEDIN_URL if resume_uploaded else None,
+                        resume_upload_date=now if resume_uploaded else None,
+                    ),
+                    synthetic_run,
+                )
+            )
+        with transaction.atomic():
+            BootcampApplication.objects.bulk_create(
+                [application for application, _ in planned]
+            )
+            _create_submissions(rng, planned, seed_result)
+            _create_payments(rng, planned, seed_result)
+            _create_enrollments(rng, planned, seed_result)
+        seed_result.add_bulk_created(BootcampApplication, len(planned))
+
+
+def create_synthetic_data(
+    *, users, applications, bootcamps, runs_per_bootcamp, seed=0, batch_size=5000
+):
+    """
+    Create a large volume of realistic looking data with bulk inserts. The same seed always produces the same data.
+
+    Args:
+        users (int): The number of users to create
+        applications (int): The number of applications to create, spread across users and runs
+        bootcamps (int): The number of bootcamps to create
+        runs_per_bootcamp (int): The number of runs to create for each bootcamp
+        seed (int): The seed for the random number generator
+        batch_size (int): The number of rows to insert at a time
+
+    Returns:
+        SeedResult: The results of seeding
+    """
+    rng = random.Random(seed)
+    seed_result = SeedResult()
+    synthetic_runs = _create_bootcamp_runs(
+        rng,
+        seed=seed,
+        bootcamps=bootcamps,
+        runs_per_bootcamp=runs_per_bootcamp,
+        seed_result=seed_result,
+    )
+    user_ids = _create_users(
+        rng, seed=seed, count=users, batch_size=batch_size, seed_result=seed_result
+    )
+    _create_applications(
+        rng,
+        user_ids=user_ids,
+        synthetic_runs=synthetic_runs,
+        count=applications,
+        batch_size=batch_size,
+        seed_result=seed_result,
+    )
+    return seed_result
+
+
+def synthetic_data_exists(seed):
+    """Returns True if synthetic data has already been created with the given seed"""
+    return User.objects.filter(
+        username__startswith=f"{SYNTHETIC_USERNAME_PREFIX}{seed}-"
+    ).exists()
+
+
+def delete_synthetic_data():
+    """
+    Delete all synthetic data
+
+    Returns:
+        SeedResult: The results of unseeding
+    """
+    seed_result = SeedResult()
+    with transaction.atomic():
+        # Quiz submissions aren't linked to users by a foreign key, so they need to be deleted separately
+        quiz_ids = ApplicationStepSubmission.objects.filter(
+            bootcamp_application__user__username__startswith=SYNTHETIC_USERNAME_PREFIX,
+            content_type=ContentType.objects.get_for_model(QuizSubmission),
+        ).values_list("object_id", flat=True)
+        _, deleted_type_dict = QuizSubmission.objects.filter(
+            id__in=list(quiz_ids)
+        ).delete()
+        seed_result.add_deleted(deleted_type_dict)
+        _, deleted_type_dict = User.objects.filter(
+            username__startswith=SYNTHETIC_USERNAME_PREFIX
+        ).delete()
+        seed_result.add_deleted(deleted_type_dict)
+        _, deleted_type_dict = Bootcamp.objects.filter(
+            title__startswith=SYNTHETIC_BOOTCAMP_TITLE_PREFIX
+        ).delete()
+        seed_result.add_deleted(deleted_type_dict)
+    return seed_result
@@ -0,0 +1,112 @@
+"""Tests for synthetic data generation"""
+import pytest
+
+from applications.constants import AppStates
+from applications.models import ApplicationStepSubmission, BootcampApplication
+from ecommerce.models import Line, Order, Receipt
+from klasses.models import Bootcamp, BootcampRun, BootcampRunEnrollment
+from localdev.seed.synthetic_data_api import (
+    APP_STATE_WEIGHTS,
+    SYNTHETIC_USERNAME_PREFIX,
+    create_synthetic_data,
+    delete_synthetic_data,
+    synthetic_data_exists,
+)
+from profiles.models import LegalAddress, Profile
+from profiles.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _create(seed=0):
+    """Create a small volume of synthetic data"""
+    return create_synthetic_data(
+        users=20,
+        applications=60,
+        bootcamps=2,
+        runs_per_bootcamp=3,
+        seed=seed,
+        batch_size=25,
+    )
+
+
+def test_create_synthetic_data():
+    """create_synthetic_data should create the requested volumes of data, with consistent related objects"""
+    result = _create()
+    assert Bootcamp.objects.count() == 2
+    assert BootcampRun.objects.count() == 6
+    assert Profile.objects.count() == LegalAddress.objects.count() == 20
+    assert BootcampApplication.objects.count() == 60
+    assert result.created["User"] == 20
+    assert result.created["BootcampApplication"] == 60
+    assert set(BootcampApplication.objects.values_list("state", flat=True)) <= set(
+        APP_STATE_WEIGHTS
+    )
+    assert (
+        BootcampApplication.objects.values("user", "bootcamp_run").distinct().count()
+        == 60
+    )
+    assert not ApplicationStepSubmission.objects.filter(
+        bootcamp_application__state__in=[
+            AppStates.AWAITING_PROFILE_COMPLETION.value,
+            AppStates.AWAITING_RESUME.value,
+        ]
+    ).exists()
+    assert Line.objects.count() == Order.objects.count()
+    assert (
+        Receipt.objects.count()
+        == Order.objects.filter(payment_type=Order.CYBERSOURCE_TYPE).count()
+    )
+    assert (
+        BootcampRunEnrollment.objects.count()
+        == BootcampApplication.objects.filter(
+            state__in=[AppStates.COMPLETE.value, AppStates.REFUNDED.value]
+        ).count()
+    )
+    for application in BootcampApplication.objects.filter(
+        state=AppStates.COMPLETE.value
+    ):
+        assert application.total_paid == application.bootcamp_run.price
+
+
+def test_create_synthetic_data_deterministic():
+    """The same seed should produce the same data"""
+    _create()
+    first_run = list(
+        BootcampApplication.objects.order_by("id").values_list(
+            "user__username", "bootcamp_run__run_key", "state"
+        )
+    )
+    delete_synthetic_data()
+    _create()
+    assert (
+        list(
+            BootcampApplication.objects.order_by("id").values_list(
+                "user__username", "bootcamp_run__run_key", "state"
+            )
+        )
+        == first_run
+    )
+
+
+def test_create_too_many_applications():
+    """An error should be raised if there aren't enough users and runs for the number of applications"""
+    with pytest.raises(ValueError):
+        create_synthetic_data(users=2, applications=5, bootcamps=1, runs_per_bootcamp=2)
+
+
+def test_delete_synthetic_data():
+    """delete_synthetic_data should delete synthetic data and leave everything else alone"""
+    other_user = UserFactory.create()
+    _create(seed=3)
+    assert synthetic_data_exists(3) is True
+    assert synthetic_data_exists(4) is False
+
+    result = delete_synthetic_data()
+    assert result.deleted["auth.User"] == 20
+    assert synthetic_data_exists(3) is False
+    assert not BootcampApplication.objects.filter(
+        user__username__startswith=SYNTHETIC_USERNAME_PREFIX
+    ).exists()
+    assert Bootcamp.objects.count() == 0
+    other_user.refresh_from_db()
@@ -10,6 +10,7 @@ class EmailDebuggerForm(forms.Form):
             ("verification", "Verify Email"),
             ("password_reset", "Password Reset"),
             ("receipt", "Receipt"),
+            ("installment_reminder", "Installment Reminder"),
         ),
         widget=forms.Select(attrs={"class": "form-control m-2"}),
     )
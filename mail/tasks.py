@@ -0,0 +1,25 @@
+"""Mail celery tasks"""
+from mail.v2 import api
+from mail.v2.exceptions import TransientEmailError
+from main.celery import app
+
+
+@app.task(
+    bind=True,
+    acks_late=True,
+    autoretry_for=(TransientEmailError,),
+    retry_backoff=10,
+    max_retries=5,
+)
+def send_template_email(self, template_name, recipient, extra_context):
+    """
+    Task to render and send an email. The delivery status is stored as the task result. If the ESP is
+    unavailable the task is retried with a backoff, and the email is only reported as failed once it's out of
+    retries.
+    """
+    return api.send_template_email(
+        template_name,
+        recipient,
+        extra_context,
+        raise_transient_errors=self.request.retries < self.max_retries,
+    )
@@ -0,0 +1,79 @@
+"""Tests for mail tasks"""
+from types import SimpleNamespace
+
+import pytest
+from celery.exceptions import Retry
+
+from mail.tasks import send_template_email
+from mail.v2.constants import EMAIL_STATUS_FAILED, EMAIL_STATUS_SENT
+from mail.v2.exceptions import TransientEmailError
+
+pytestmark = pytest.mark.django_db
+
+# pylint: disable=redefined-outer-name,no-value-for-parameter
+
+
+@pytest.fixture
+def patched_retries(mocker):
+    """Make the task look like it's being run by a worker, with a number of retries"""
+    request = SimpleNamespace(id="task-id", is_eager=False, retries=0)
+    # The task is a proxy, and its __class__ is the class of the task itself
+    mocker.patch.object(
+        send_template_email.__class__,
+        "request",
+        new_callable=mocker.PropertyMock,
+        return_value=request,
+    )
+    return request
+
+
+@pytest.fixture
+def patched_retry(mocker):
+    """Patch retry so the task isn't sent again"""
+    return mocker.patch.object(send_template_email, "retry", side_effect=Retry)
+
+
+def test_send_template_email(mailoutbox):
+    """send_template_email should send the email and return its status"""
+    assert (
+        send_template_email.delay(
+            "sample", "a@example.com", {"url": "https://example.com"}
+        ).get()
+        == EMAIL_STATUS_SENT
+    )
+    assert len(mailoutbox) == 1
+
+
+def test_send_template_email_transient_error(mocker, patched_retries, patched_retry):
+    """send_template_email should be retried with a backoff if the ESP is unavailable"""
+    mocker.patch("mail.v2.api.AnymailMessage.send", side_effect=ConnectionError)
+    patched_retries.retries = 2
+    with pytest.raises(Retry):
+        send_template_email("sample", "a@example.com", {"url": "https://example.com"})
+    retry_kwargs = patched_retry.call_args[1]
+    assert isinstance(retry_kwargs["exc"], TransientEmailError)
+    assert 0 <= retry_kwargs["countdown"] <= 40
+
+
+@pytest.mark.usefixtures("patched_retry")
+def test_send_template_email_out_of_retries(mocker, patched_retries):
+    """send_template_email should report a failure once it's out of retries"""
+    mocker.patch("mail.v2.api.AnymailMessage.send", side_effect=ConnectionError)
+    patched_retries.retries = send_template_email.max_retries
+    patched_log = mocker.patch("mail.v2.api.log")
+    assert (
+        send_template_email("sample", "a@example.com", {"url": "https://example.com"})
+        == EMAIL_STATUS_FAILED
+    )
+    patched_log.exception.assert_called_once()
+
+
+@pytest.mark.usefixtures("patched_retries")
+def test_send_template_email_permanent_error(mocker, patched_retry):
+    """send_template_email should report a failure without retrying if the error won't go away"""
+    mocker.patch("mail.v2.api.AnymailMessage.send", side_effect=ValueError)
+    assert (
+        send_template_email("sample", "a@example.com", {"url": "https://example.com"})
+        == EMAIL_STATUS_FAILED
+    )
+    patched_retry.assert_not_called()
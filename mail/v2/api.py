@@ -21,9 +21,11 @@ send_messages(messages)
 from email.utils import formataddr
 import logging
 import re
+import smtplib
 from collections import namedtuple
 from urllib.parse import urlparse
 
+from anymail.exceptions import AnymailRequestsAPIError
 from anymail.message import AnymailMessage
 from bs4 import BeautifulSoup
 from django.conf import settings
@@ -36,7 +38,12 @@ from wagtail.core.models import Site
 from wagtail.core.sites import get_site_for_hostname
 
 from cms.utils import get_resource_page_urls
-from mail.v2.exceptions import MultiEmailValidationError
+from mail.v2.constants import (
+    EMAIL_STATUS_FAILED,
+    EMAIL_STATUS_QUEUED,
+    EMAIL_STATUS_SENT,
+)
+from mail.v2.exceptions import MultiEmailValidationError, TransientEmailError
 
 log = logging.getLogger()
 
@@ -333,6 +340,82 @@ def send_message(message):
     send_messages([message])
 
 
+def is_transient_send_error(exc):
+    """
+    Returns:
+        bool: True if an error raised while sending an email might not happen if it's sent again
+    """
+    if isinstance(exc, AnymailRequestsAPIError):
+        # No status code means the ESP couldn't be reached at all
+        status_code = getattr(exc, "status_code", None)
+        return status_code is None or status_code == 429 or status_code >= 500
+    return isinstance(
+        exc,
+        (
+            ConnectionError,
+            TimeoutError,
+            smtplib.SMTPConnectError,
+            smtplib.SMTPServerDisconnected,
+        ),
+    )
+
+
+def send_template_email(
+    template_name, recipient, extra_context, raise_transient_errors=False
+):
+    """
+    Renders and sends a single email
+
+    Args:
+        template_name (str): name of the template, this should match a directory in mail/templates
+        recipient (str): Recipient email address
+        extra_context (dict): Context variables for the template, in addition to the base context
+        raise_transient_errors (bool): If True, raise a TransientEmailError instead of reporting a failure if
+            the email might be sent successfully by trying again
+
+    Returns:
+        str: EMAIL_STATUS_SENT, or EMAIL_STATUS_FAILED if the message couldn't be sent
+    """
+    message = message_for_recipient(
+        recipient, context_for_user(extra_context=extra_context), template_name
+    )
+    try:
+        message.send()
+    except Exception as exc:  # pylint: disable=broad-except
+        if raise_transient_errors and is_transient_send_error(exc):
+            raise TransientEmailError(
+                f"Error sending email '{message.subject}' to {message.to}"
+            ) from exc
+        log.exception("Error sending email '%s' to %s", message.subject, message.to)
+        return EMAIL_STATUS_FAILED
+    return EMAIL_STATUS_SENT
+
+
+def queue_template_email(template_name, recipient, extra_context):
+    """
+    Queues an email to be rendered and sent by a worker, so the request doesn't wait for template rendering or
+    the ESP. If the task can't be queued, the email is sent right away instead.
+
+    Args:
+        template_name (str): name of the template, this should match a directory in mail/templates
+        recipient (str): Recipient email address
+        extra_context (dict): Context variables for the template. These must be JSON serializable.
+
+    Returns:
+        str: EMAIL_STATUS_QUEUED, or the status of sending the email if it couldn't be queued
+    """
+    from mail import tasks
+
+    try:
+        tasks.send_template_email.delay(template_name, recipient, extra_context)
+    except Exception:  # pylint: disable=broad-except
+        log.exception(
+            "Unable to queue email '%s' to %s, sending it now", template_name, recipient
+        )
+        return send_template_email(template_name, recipient, extra_context)
+    return EMAIL_STATUS_QUEUED
+
+
 def validate_email_addresses(email_addresses):
     """
     Validates a group of email addresses. A single exception is raised with the list of all invalid
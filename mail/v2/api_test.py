@@ -1,5 +1,8 @@
 """API tests"""
 from email.utils import formataddr
+import smtplib
+
+from anymail.exceptions import AnymailRequestsAPIError
 import pytest
 
 from mail.v2.api import (
@@ -11,9 +14,18 @@ from mail.v2.api import (
     build_messages,
     build_user_specific_messages,
     build_message,
+    is_transient_send_error,
+    queue_template_email,
+    send_template_email,
     UserMessageProps,
     EmailMetadata,
 )
+from mail.v2.constants import (
+    EMAIL_STATUS_FAILED,
+    EMAIL_STATUS_QUEUED,
+    EMAIL_STATUS_SENT,
+)
+from mail.v2.exceptions import TransientEmailError
 from main.test_utils import any_instance_of
 from profiles.factories import UserFactory
 
@@ -281,3 +293,85 @@ def test_send_message_failure(mocker):
 
     assert sendmail.call_count == len(users)
     assert patched_logger.exception.call_count == len(users)
+
+
+def test_send_template_email(mailoutbox):
+    """send_template_email should render and send an email and report that it was sent"""
+    assert (
+        send_template_email("sample", "a@example.com", {"url": "https://example.com"})
+        == EMAIL_STATUS_SENT
+    )
+    assert len(mailoutbox) == 1
+    assert mailoutbox[0].to == ["a@example.com"]
+
+
+def test_send_template_email_failure(mocker):
+    """send_template_email should log an error and report a failure if the email can't be sent"""
+    mocker.patch("mail.v2.api.AnymailMessage.send", side_effect=ConnectionError)
+    patched_logger = mocker.patch("mail.v2.api.log")
+    assert (
+        send_template_email("sample", "a@example.com", {"url": "https://example.com"})
+        == EMAIL_STATUS_FAILED
+    )
+    patched_logger.exception.assert_called_once()
+
+
+def test_send_template_email_raise_transient_errors(mocker, mailoutbox):
+    """send_template_email should raise an error instead of reporting a failure if retrying might work"""
+    mocker.patch("mail.v2.api.AnymailMessage.send", side_effect=ConnectionError)
+    with pytest.raises(TransientEmailError):
+        send_template_email(
+            "sample",
+            "a@example.com",
+            {"url": "https://example.com"},
+            raise_transient_errors=True,
+        )
+    assert len(mailoutbox) == 0
+
+
+@pytest.mark.parametrize(
+    "status_code, is_transient",
+    [[None, True], [429, True], [503, True], [400, False], [401, False]],
+)
+def test_is_transient_send_error_anymail(status_code, is_transient):
+    """is_transient_send_error should only be True for ESP errors which might not happen again"""
+    exc = AnymailRequestsAPIError("error")
+    exc.status_code = status_code
+    assert is_transient_send_error(exc) is is_transient
+
+
+@pytest.mark.parametrize(
+    "exc, is_transient",
+    [
+        [ConnectionError(), True],
+        [TimeoutError(), True],
+        [smtplib.SMTPServerDisconnected(), True],
+        [smtplib.SMTPRecipientsRefused({}), False],
+        [ValueError(), False],
+    ],
+)
+def test_is_transient_send_error(exc, is_transient):
+    """is_transient_send_error should be True for connection errors"""
+    assert is_transient_send_error(exc) is is_transient
+
+
+def test_queue_template_email(mocker):
+    """queue_template_email should queue a task to send the email"""
+    patched_task = mocker.patch("mail.tasks.send_template_email")
+    assert (
+        queue_template_email("sample", "a@example.com", {"url": "https://example.com"})
+        == EMAIL_STATUS_QUEUED
+    )
+    patched_task.delay.assert_called_once_with(
+        "sample", "a@example.com", {"url": "https://example.com"}
+    )
+
+
+def test_queue_template_email_broker_down(mocker, mailoutbox):
+    """queue_template_email should send the email right away if the task can't be queued"""
+    mocker.patch("mail.tasks.send_template_email.delay", side_effect=ConnectionError)
+    assert (
+        queue_template_email("sample", "a@example.com", {"url": "https://example.com"})
+        == EMAIL_STATUS_SENT
+    )
+    assert len(mailoutbox) == 1
@@ -4,14 +4,21 @@ EMAIL_VERIFICATION = "verification"
 EMAIL_PW_RESET = "password_reset"
 EMAIL_CHANGE_EMAIL = "change_email"
 EMAIL_RECEIPT = "receipt"
+EMAIL_INSTALLMENT_REMINDER = "installment_reminder"
 
 EMAIL_TYPE_DESCRIPTIONS = {
     EMAIL_VERIFICATION: "Verify Email",
     EMAIL_PW_RESET: "Password Reset",
     EMAIL_CHANGE_EMAIL: "Change Email",
     EMAIL_RECEIPT: "Receipt Email",
+    EMAIL_INSTALLMENT_REMINDER: "Installment Reminder",
 }
 
+# Delivery statuses for transactional emails
+EMAIL_STATUS_QUEUED = "queued"
+EMAIL_STATUS_SENT = "sent"
+EMAIL_STATUS_FAILED = "failed"
+
 MAILGUN_API_DOMAIN = "api.mailgun.net"
 
 MAILGUN_DELIVERED = "delivered"
@@ -14,3 +14,10 @@ class MultiEmailValidationError(Exception):
         """
         self.invalid_emails = invalid_emails
         super().__init__(msg)
+
+
+class TransientEmailError(Exception):
+    """
+    Exception for a failure to send an email which might succeed if it's tried again, for example because the
+    ESP was unavailable
+    """
@@ -18,6 +18,9 @@ def send_verification_email(
         backend (social_core.backends.base.BaseAuth): the backend being used to authenticate
         code (social_django.models.Code): the confirmation code used to confirm the email address
         partial_token (str): token used to resume a halted pipeline
+
+    Returns:
+        str: The delivery status of the email
     """
     url = "{}?verification_code={}&partial_token={}&backend=email".format(
         strategy.build_absolute_uri(reverse("register-confirm")),
@@ -25,12 +28,8 @@ def send_verification_email(
         quote_plus(partial_token),
     )
 
-    api.send_message(
-        api.message_for_recipient(
-            code.email,
-            api.context_for_user(extra_context={"confirmation_url": url}),
-            EMAIL_VERIFICATION,
-        )
+    return api.queue_template_email(
+        EMAIL_VERIFICATION, code.email, {"confirmation_url": url}
     )
 
 
@@ -40,6 +39,9 @@ def send_verify_email_change_email(request, change_request):
     Args:
         request (django.http.Request): the http request we're sending this email for
         change_request (ChangeEmailRequest): the change request to send the confirmation for
+
+    Returns:
+        str: The delivery status of the email
     """
 
     url = "{}?verification_code={}".format(
@@ -47,16 +49,6 @@ def send_verify_email_change_email(request, change_request):
         quote_plus(change_request.code),
     )
 
-    api.send_messages(
-        list(
-            api.messages_for_recipients(
-                [
-                    (
-                        change_request.new_email,
-                        api.context_for_user(extra_context={"confirmation_url": url}),
-                    )
-                ],
-                EMAIL_CHANGE_EMAIL,
-            )
-        )
+    return api.queue_template_email(
+        EMAIL_CHANGE_EMAIL, change_request.new_email, {"confirmation_url": url}
     )
@@ -7,7 +7,12 @@ from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 
 from mail.v2 import api
-from mail.v2.constants import EMAIL_RECEIPT, EMAIL_PW_RESET, EMAIL_VERIFICATION
+from mail.v2.constants import (
+    EMAIL_INSTALLMENT_REMINDER,
+    EMAIL_RECEIPT,
+    EMAIL_PW_RESET,
+    EMAIL_VERIFICATION,
+)
 from mail.forms import EmailDebuggerForm
 from main.utils import now_in_utc
 
@@ -75,6 +80,17 @@ def _render_email(email_type):
                 )
             }
         )
+    elif email_type == EMAIL_INSTALLMENT_REMINDER:
+        context.update(
+            {
+                "name": "Jane Doe",
+                "bootcamp_run_title": "Artificial Intelligence",
+                "deadline": drf_datetime(now_in_utc() + timedelta(days=7)),
+                "amount_due": "3000.00",
+                "total_paid": "1000.00",
+                "balance_due": "2000.00",
+            }
+        )
 
     return api.render_email_templates(email_type, context)
 
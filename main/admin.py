@@ -1,11 +1,25 @@
 """
 Admin for the bootcamp app
 """
+from functools import reduce
+import operator
+
 from django.contrib import admin
+from django.contrib.admin.utils import lookup_needs_distinct
+from django.contrib.admin.views.main import SEARCH_VAR
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
 from rest_framework.authtoken.admin import TokenAdmin
 
+from profiles.api import get_user_search_rank, search_users
+
 TokenAdmin.raw_id_fields = ("user",)
 
+# Changelists for large tables stop counting objects after this many
+CHANGELIST_COUNT_LIMIT = 10000
+
 
 class AuditableModelAdmin(admin.ModelAdmin):
     """A ModelAdmin which will save and log"""
@@ -65,3 +79,100 @@ class TimestampedModelAdmin(admin.ModelAdmin):
     def get_exclude(self, request, obj=None):
         exclude = tuple(super().get_exclude(request, obj=obj) or ())
         return self._join_and_dedupe(exclude, ("created_on", "updated_on"))
+
+
+class UserSearchModelAdmin(admin.ModelAdmin):
+    """
+    A ModelAdmin which searches the user an object belongs to by email, username and name with the trigram
+    indexes on those columns, and lists the best matches first. search_fields under user_search_path are
+    replaced by the user search, and any other search_fields are matched as usual.
+    """
+
+    user_search_path = "user"
+    # Don't count every object on each search just to show the total
+    show_full_result_count = False
+
+    @staticmethod
+    def _get_search_term(request):
+        """Returns the changelist search term"""
+        return request.GET.get(SEARCH_VAR, "").strip()
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        search_term = self._get_search_term(request)
+        if not search_term:
+            return queryset
+        return queryset.annotate(
+            search_rank=get_user_search_rank(search_term, self.user_search_path)
+        )
+
+    def get_ordering(self, request):
+        ordering = tuple(super().get_ordering(request) or ())
+        if not self._get_search_term(request):
+            return ordering
+        return ("-search_rank",) + ordering
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+
+        user_prefix = f"{self.user_search_path}__"
+        other_fields = [
+            field
+            for field in self.get_search_fields(request)
+            if not field.startswith(user_prefix)
+        ]
+        search_filter = Q(**{f"{self.user_search_path}__in": search_users(search_term)})
+        if other_fields:
+            search_filter |= reduce(
+                operator.and_,
+                [
+                    reduce(
+                        operator.or_,
+                        [Q(**{f"{field}__icontains": bit}) for field in other_fields],
+                    )
+                    for bit in search_term.split()
+                ],
+            )
+        use_distinct = any(
+            lookup_needs_distinct(self.opts, field) for field in other_fields
+        )
+        return queryset.filter(search_filter), use_distinct
+
+
+def _get_estimated_count(model):
+    """
+    Returns postgres' estimate of the number of rows in a model's table, which is updated whenever the table
+    is vacuumed or analyzed, or None if the table hasn't been analyzed yet
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table],  # pylint: disable=protected-access
+        )
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A paginator which avoids counting every row of a large table. Unfiltered lists use postgres' estimate of
+    the table size once it's over CHANGELIST_COUNT_LIMIT, and filtered lists stop counting at that limit.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = _get_estimated_count(queryset.model)
+            if estimate is not None and estimate > CHANGELIST_COUNT_LIMIT:
+                return estimate
+        return queryset.order_by()[:CHANGELIST_COUNT_LIMIT].count()
+
+
+class EstimatedCountModelAdmin(admin.ModelAdmin):
+    """A ModelAdmin for large tables whose changelist doesn't count every row on each page view"""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,35 @@
+"""Tests for admin utilities"""
+import pytest
+
+from ecommerce.factories import OrderFactory
+from ecommerce.models import Order
+from main.admin import EstimatedCountPaginator
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize(
+    "estimate, expected_count", [(None, 2), (2, 2), (50000, 50000)]
+)
+def test_estimated_count_paginator_unfiltered(mocker, estimate, expected_count):
+    """Unfiltered lists should use the table estimate when it's over the limit, and a capped count otherwise"""
+    mocker.patch("main.admin.CHANGELIST_COUNT_LIMIT", 2)
+    mock_estimate = mocker.patch(
+        "main.admin._get_estimated_count", return_value=estimate
+    )
+    OrderFactory.create_batch(3)
+    paginator = EstimatedCountPaginator(Order.objects.order_by("id"), 10)
+    assert paginator.count == expected_count
+    mock_estimate.assert_called_once_with(Order)
+
+
+def test_estimated_count_paginator_filtered(mocker):
+    """Filtered lists should stop counting at the limit without using the table estimate"""
+    mocker.patch("main.admin.CHANGELIST_COUNT_LIMIT", 2)
+    mock_estimate = mocker.patch("main.admin._get_estimated_count")
+    orders = OrderFactory.create_batch(4)
+    paginator = EstimatedCountPaginator(
+        Order.objects.filter(id__in=[order.id for order in orders[:3]]), 10
+    )
+    assert paginator.count == 2
+    mock_estimate.assert_not_called()
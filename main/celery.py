@@ -15,3 +15,6 @@ app = Celery("bootcamp")
 # pickle the object when using Windows.
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()  # pragma: no cover
+
+# Connect the signal handlers which record task telemetry
+import main.task_telemetry  # pylint: disable=unused-import,wrong-import-position
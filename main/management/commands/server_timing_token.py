@@ -0,0 +1,21 @@
+"""Prints a signed token which enables Server-Timing headers on requests which send it"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main.middleware import SERVER_TIMING_TOKEN_HEADER
+from main.request_metrics import make_debug_token
+
+
+class Command(BaseCommand):
+    """Prints a signed token which enables Server-Timing headers on requests which send it"""
+
+    help = __doc__
+
+    def handle(self, *args, **options):
+        header_name = (
+            SERVER_TIMING_TOKEN_HEADER[len("HTTP_") :].replace("_", "-").title()
+        )
+        self.stdout.write(f"{header_name}: {make_debug_token()}")
+        self.stdout.write(
+            f"The token is valid for {settings.SERVER_TIMING_TOKEN_MAX_AGE} seconds"
+        )
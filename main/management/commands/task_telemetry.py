@@ -0,0 +1,46 @@
+"""Shows the aggregated Celery task telemetry"""
+import json
+
+from django.core.management.base import BaseCommand
+
+from main.task_telemetry import get_task_telemetry, reset_task_telemetry
+
+
+class Command(BaseCommand):
+    """Shows the aggregated Celery task telemetry"""
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--json", action="store_true", help="Print the full telemetry as JSON"
+        )
+        parser.add_argument(
+            "--reset", action="store_true", help="Delete all recorded telemetry"
+        )
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            reset_task_telemetry()
+            self.stdout.write(self.style.SUCCESS("Task telemetry was reset"))
+            return
+
+        telemetry = get_task_telemetry()
+        if options["json"]:
+            self.stdout.write(json.dumps(telemetry, indent=2))
+            return
+        if not telemetry:
+            self.stdout.write(self.style.WARNING("No task telemetry recorded."))
+            return
+
+        self.stdout.write(
+            f"{'task':<60} {'runs':>8} {'latency p95':>12} {'runtime p95':>12} "
+            f"{'queries p95':>12} {'retries':>8}"
+        )
+        for task_name, metrics in telemetry.items():
+            self.stdout.write(
+                f"{task_name:<60} {metrics['runtime_ms']['count']:>8} "
+                f"{str(metrics['queue_latency_ms']['p95']):>12} "
+                f"{str(metrics['runtime_ms']['p95']):>12} "
+                f"{str(metrics['queries']['p95']):>12} {metrics['retries']:>8}"
+            )
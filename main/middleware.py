@@ -1,7 +1,21 @@
 """ Middleware classes for the main app"""
+import json
+import logging
+
 from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 
+from main.request_metrics import (
+    collect_metrics,
+    instrument_outbound_calls,
+    is_valid_debug_token,
+)
+
+log = logging.getLogger(__name__)
+
+SERVER_TIMING_TOKEN_HEADER = "HTTP_X_SERVER_TIMING_TOKEN"
+SLOW_REQUEST_FINGERPRINT_LIMIT = 5
+
 
 class CachelessAPIMiddleware(MiddlewareMixin):
     """ Add Cache-Control header to API responses"""
@@ -13,3 +27,62 @@ class CachelessAPIMiddleware(MiddlewareMixin):
         elif request.path.startswith("/api/"):
             response["Cache-Control"] = "private, no-store"
         return response
+
+
+class RequestMetricsMiddleware:
+    """
+    Count queries and time database access, outbound HTTP requests and cache lookups for each request.
+    The results are added as a Server-Timing header for staff users or requests with a signed debug token,
+    and slow requests are logged along with their most repeated queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_outbound_calls()
+
+    def __call__(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+
+        with collect_metrics() as metrics:
+            response = self.get_response(request)
+
+        if self._should_expose(request):
+            response["Server-Timing"] = metrics.server_timing()
+        total_ms = metrics.total_ms
+        if total_ms >= settings.SLOW_REQUEST_THRESHOLD_MS:
+            log.warning(
+                "Slow request: %s",
+                json.dumps(
+                    {
+                        "method": request.method,
+                        "path": request.path,
+                        "status": response.status_code,
+                        "total_ms": round(total_ms, 1),
+                        "db_ms": round(metrics.db_ms, 1),
+                        "queries": metrics.query_count,
+                        "http_ms": round(metrics.http_ms, 1),
+                        "http_requests": metrics.http_count,
+                        "cache_hits": metrics.cache_hits,
+                        "cache_misses": metrics.cache_misses,
+                        "repeated_queries": [
+                            {"sql": fingerprint, "count": count}
+                            for fingerprint, count in metrics.repeated_queries(
+                                SLOW_REQUEST_FINGERPRINT_LIMIT
+                            )
+                        ],
+                    }
+                ),
+            )
+        return response
+
+    @staticmethod
+    def _should_expose(request):
+        """Returns True if the metrics should be added to the response headers"""
+        user = getattr(request, "user", None)
+        if user is not None and user.is_staff:
+            return True
+        token = request.META.get(SERVER_TIMING_TOKEN_HEADER)
+        return bool(token) and is_valid_debug_token(
+            token, settings.SERVER_TIMING_TOKEN_MAX_AGE
+        )
@@ -1,9 +1,13 @@
 """ Tests for main.middleware """
+import json
+
 import pytest
 from django.test import override_settings
 from django.urls import reverse
 
+from applications.factories import BootcampApplicationFactory
 from main.middleware import CachelessAPIMiddleware
+from main.request_metrics import make_debug_token
 
 
 @pytest.mark.parametrize(
@@ -32,3 +36,63 @@ def test_cacheless_api_middleware(
             middleware.process_response(request, {}).get("Cache-Control", None)
             == cacheable_endpoints_cache_value
         )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("is_staff", [True, False])
+def test_request_metrics_server_timing(client, user, is_staff):
+    """Staff users should get a Server-Timing header with the query count and timings"""
+    user.is_staff = is_staff
+    user.save()
+    client.force_login(user)
+    response = client.get(reverse("applications_api-list"))
+    assert response.status_code == 200
+    if is_staff:
+        assert "db;dur=" in response["Server-Timing"]
+        assert "total;dur=" in response["Server-Timing"]
+    else:
+        assert not response.has_header("Server-Timing")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("valid", [True, False])
+def test_request_metrics_debug_token(client, user, valid):
+    """A signed debug token should enable the Server-Timing header for anyone"""
+    client.force_login(user)
+    token = make_debug_token() if valid else "not-a-token"
+    response = client.get(
+        reverse("applications_api-list"), HTTP_X_SERVER_TIMING_TOKEN=token
+    )
+    assert response.has_header("Server-Timing") is valid
+
+
+@pytest.mark.django_db
+def test_request_metrics_disabled(
+    settings, client, staff_user, user
+):  # pylint: disable=unused-argument
+    """No metrics should be collected if they are disabled"""
+    settings.REQUEST_METRICS_ENABLED = False
+    client.force_login(user)
+    response = client.get(reverse("applications_api-list"))
+    assert not response.has_header("Server-Timing")
+
+
+@pytest.mark.django_db
+def test_request_metrics_slow_request(mocker, settings, client, user):
+    """Slow requests should be logged with their repeated queries"""
+    settings.SLOW_REQUEST_THRESHOLD_MS = 0
+    BootcampApplicationFactory.create_batch(2, user=user)
+    patched_log = mocker.patch("main.middleware.log")
+    mocker.patch(
+        "main.request_metrics.RequestMetrics.repeated_queries",
+        return_value=[("SELECT ?", 2)],
+    )
+    client.force_login(user)
+    client.get(reverse("applications_api-list"))
+
+    patched_log.warning.assert_called_once()
+    logged = json.loads(patched_log.warning.call_args[0][1])
+    assert logged["path"] == reverse("applications_api-list")
+    assert logged["status"] == 200
+    assert logged["queries"] > 0
+    assert logged["repeated_queries"] == [{"sql": "SELECT ?", "count": 2}]
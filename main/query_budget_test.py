@@ -0,0 +1,144 @@
+"""
+Query budget tests for API endpoints. Each endpoint is requested with fixtures seeded at a small and at a larger
+scale, and the number of queries must not grow with the amount of data. Query counts, wall time and payload size
+are also compared against main/perf_baselines.json, which is regenerated by running these tests with
+--update-perf-baselines.
+"""
+from datetime import timedelta
+
+from django.test import Client
+from django.urls import reverse
+import pytest
+
+from applications.constants import AppStates
+from applications.factories import (
+    ApplicationStepSubmissionFactory,
+    BootcampApplicationFactory,
+)
+from backends.edxorg import EdxOrgOAuth2
+from ecommerce.factories import LineFactory, OrderFactory, ReceiptFactory
+from ecommerce.models import Order
+from klasses.factories import BootcampRunEnrollmentFactory, InstallmentFactory
+from main.test_utils import (
+    assert_within_perf_baseline,
+    measure_request,
+    save_perf_baseline,
+)
+from main.utils import now_in_utc
+from profiles.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+SCALES = (1, 5)
+
+
+def _create_fulfilled_order(application):
+    """Create a fulfilled order for an application"""
+    return OrderFactory.create(
+        application=application,
+        user=application.user,
+        status=Order.FULFILLED,
+        payment_type=Order.CYBERSOURCE_TYPE,
+    )
+
+
+def seed_application_list(scale):
+    """Create applications for a user, each with an installment, a fulfilled order and an enrollment"""
+    user = UserFactory.create()
+    for _ in range(scale):
+        application = BootcampApplicationFactory.create(user=user)
+        InstallmentFactory.create(bootcamp_run=application.bootcamp_run)
+        _create_fulfilled_order(application)
+        BootcampRunEnrollmentFactory.create(
+            user=user, bootcamp_run=application.bootcamp_run
+        )
+    return user, reverse("applications_api-list")
+
+
+def seed_application_detail(scale):
+    """Create an application with a submission and several paid orders"""
+    application = BootcampApplicationFactory.create()
+    InstallmentFactory.create(bootcamp_run=application.bootcamp_run)
+    ApplicationStepSubmissionFactory.create(bootcamp_application=application)
+    for _ in range(scale):
+        ReceiptFactory.create(order=_create_fulfilled_order(application))
+    return (
+        application.user,
+        reverse("applications_api-detail", kwargs={"pk": application.id}),
+    )
+
+
+def seed_checkout_data(scale):
+    """Create an application awaiting payment which has several partial payments"""
+    application = BootcampApplicationFactory.create(
+        state=AppStates.AWAITING_PAYMENT.value
+    )
+    InstallmentFactory.create(bootcamp_run=application.bootcamp_run)
+    for _ in range(scale):
+        LineFactory.create(
+            order=_create_fulfilled_order(application),
+            bootcamp_run=application.bootcamp_run,
+        )
+    return (
+        application.user,
+        f"{reverse('checkout-data-detail')}?application={application.id}",
+    )
+
+
+def seed_user_bootcamp_runs(scale):
+    """Create applications for a user, each with an installment and a payment"""
+    user = UserFactory.create()
+    user.social_auth.create(provider=EdxOrgOAuth2.name, uid=user.username)
+    for _ in range(scale):
+        application = BootcampApplicationFactory.create(user=user)
+        InstallmentFactory.create(bootcamp_run=application.bootcamp_run)
+        LineFactory.create(
+            order=_create_fulfilled_order(application),
+            bootcamp_run=application.bootcamp_run,
+        )
+    return user, reverse("bootcamp-run-list", kwargs={"username": user.username})
+
+
+def seed_review_submissions(scale):
+    """Create video interview submissions which are ready for review"""
+    for _ in range(scale):
+        ApplicationStepSubmissionFactory.create(
+            is_review_ready=True,
+            bootcamp_application__bootcamp_run__end_date=now_in_utc()
+            + timedelta(days=30),
+        )
+    return UserFactory.create(is_staff=True), reverse("submissions_api-list")
+
+
+@pytest.mark.parametrize(
+    "name,seed",
+    [
+        ("applications-list", seed_application_list),
+        ("applications-detail", seed_application_detail),
+        ("checkout-data", seed_checkout_data),
+        ("user-bootcamp-runs", seed_user_bootcamp_runs),
+        ("review-submissions", seed_review_submissions),
+    ],
+)
+def test_query_budget(pytestconfig, settings, name, seed):
+    """The number of queries made by an endpoint should not grow with the amount of data it returns"""
+    # ReceiptFactory signs its fake receipt data
+    settings.CYBERSOURCE_SECURITY_KEY = "fake"
+    measurements = []
+    for scale in SCALES:
+        user, url = seed(scale)
+        client = Client()
+        client.force_login(user)
+        measurement = measure_request(client, "get", url)
+        assert measurement.response.status_code == 200
+        measurements.append(measurement)
+
+    smallest, largest = measurements[0], measurements[-1]
+    assert largest.query_count <= smallest.query_count, (
+        f"{name} made {smallest.query_count} queries at scale {SCALES[0]} "
+        f"but {largest.query_count} queries at scale {SCALES[-1]}"
+    )
+    if pytestconfig.getoption("update_perf_baselines"):
+        save_perf_baseline(name, largest)
+    else:
+        assert_within_perf_baseline(name, largest)
@@ -0,0 +1,228 @@
+"""Collection of per-request database, HTTP and cache metrics"""
+from collections import Counter
+from contextlib import contextmanager, ExitStack
+import functools
+import re
+import threading
+import time
+
+from django.core import signing
+from django.core.cache import caches
+from django.db import connections
+from requests import Session
+
+DEBUG_TOKEN_SALT = "main.request_metrics.debug"
+# Fingerprints use the SQL with parameter placeholders, but literals and IN lists of varying length
+# are collapsed too so that queries built by hand or with variable numbers of ids group together.
+_IN_LIST_RE = re.compile(r"\bIN \((?:[^()]*)\)", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_CACHE_MISS = object()
+_local = threading.local()
+_instrumentation_lock = threading.Lock()
+_instrumented = set()
+
+
+class RequestMetrics:  # pylint: disable=too-many-instance-attributes
+    """Database, HTTP and cache timings for a single request"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.query_count = 0
+        self.db_ms = 0.0
+        self.fingerprints = Counter()
+        self.http_count = 0
+        self.http_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_ms = 0.0
+
+    @property
+    def total_ms(self):
+        """Milliseconds since the request started"""
+        return (time.perf_counter() - self.start) * 1000
+
+    def record_query(self, sql, elapsed_ms):
+        """Record a database query"""
+        self.query_count += 1
+        self.db_ms += elapsed_ms
+        self.fingerprints[sql_fingerprint(sql)] += 1
+
+    def record_http(self, elapsed_ms):
+        """Record an outbound HTTP request"""
+        self.http_count += 1
+        self.http_ms += elapsed_ms
+
+    def record_cache(self, hit, elapsed_ms):
+        """Record a cache lookup"""
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+        self.cache_ms += elapsed_ms
+
+    def repeated_queries(self, limit):
+        """
+        Get the queries which were run more than once, most frequent first
+
+        Args:
+            limit (int): The maximum number of fingerprints to return
+
+        Returns:
+            list of (str, int): SQL fingerprints paired with the number of times they were run
+        """
+        return [
+            (fingerprint, count)
+            for fingerprint, count in self.fingerprints.most_common(limit)
+            if count > 1
+        ]
+
+    def server_timing(self):
+        """
+        Format the metrics as a Server-Timing header value
+
+        Returns:
+            str: The header value
+        """
+        return ", ".join(
+            [
+                f'db;dur={self.db_ms:.1f};desc="{self.query_count} queries"',
+                f'http;dur={self.http_ms:.1f};desc="{self.http_count} requests"',
+                f'cache;dur={self.cache_ms:.1f};desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+                f"total;dur={self.total_ms:.1f}",
+            ]
+        )
+
+
+def sql_fingerprint(sql):
+    """
+    Normalize a SQL statement so that queries which differ only by their parameters are grouped together
+
+    Args:
+        sql (str): A SQL statement
+
+    Returns:
+        str: The normalized statement
+    """
+    sql = _STRING_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    return _NUMBER_RE.sub("?", sql)
+
+
+def get_current_metrics():
+    """
+    Returns:
+        RequestMetrics: The metrics for the request being handled in this thread, or None
+    """
+    return getattr(_local, "metrics", None)
+
+
+def _query_wrapper(
+    metrics, execute, sql, params, many, context
+):  # pylint: disable=too-many-arguments
+    """Database execute wrapper which records how long each query took"""
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, (time.perf_counter() - start) * 1000)
+
+
+@contextmanager
+def collect_metrics():
+    """
+    Collect metrics for everything done within the context on this thread
+
+    Yields:
+        RequestMetrics: The metrics being collected
+    """
+    metrics = RequestMetrics()
+    wrapper = functools.partial(_query_wrapper, metrics)
+    _local.metrics = metrics
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(wrapper))
+            yield metrics
+    finally:
+        _local.metrics = None
+
+
+def _instrument_once(name, patch):
+    """Apply a patch if it hasn't been applied yet"""
+    with _instrumentation_lock:
+        if name not in _instrumented:
+            patch()
+            _instrumented.add(name)
+
+
+def _patch_http():
+    """Time every request sent with the requests library"""
+    original_send = Session.send
+
+    @functools.wraps(original_send)
+    def send(self, request, **kwargs):
+        metrics = get_current_metrics()
+        if metrics is None:
+            return original_send(self, request, **kwargs)
+        start = time.perf_counter()
+        try:
+            return original_send(self, request, **kwargs)
+        finally:
+            metrics.record_http((time.perf_counter() - start) * 1000)
+
+    Session.send = send
+
+
+def _patch_cache():
+    """Time lookups in the default cache and count hits and misses"""
+    cache_cls = type(caches["default"])
+    original_get = cache_cls.get
+
+    @functools.wraps(original_get)
+    def get(self, key, default=None, **kwargs):
+        metrics = get_current_metrics()
+        if metrics is None:
+            return original_get(self, key, default=default, **kwargs)
+        start = time.perf_counter()
+        value = original_get(self, key, default=_CACHE_MISS, **kwargs)
+        metrics.record_cache(
+            value is not _CACHE_MISS, (time.perf_counter() - start) * 1000
+        )
+        return default if value is _CACHE_MISS else value
+
+    cache_cls.get = get
+
+
+def instrument_outbound_calls():
+    """Start timing outbound HTTP requests and cache lookups made while metrics are being collected"""
+    _instrument_once("http", _patch_http)
+    _instrument_once("cache", _patch_cache)
+
+
+def make_debug_token():
+    """
+    Create a signed token which enables Server-Timing headers when sent with a request
+
+    Returns:
+        str: The token
+    """
+    return signing.dumps("server-timing", salt=DEBUG_TOKEN_SALT)
+
+
+def is_valid_debug_token(token, max_age):
+    """
+    Check a token created by make_debug_token
+
+    Args:
+        token (str): The token sent with a request
+        max_age (int): The number of seconds a token is valid for
+
+    Returns:
+        bool: True if the token is valid and unexpired
+    """
+    try:
+        signing.loads(token, salt=DEBUG_TOKEN_SALT, max_age=max_age)
+    except signing.BadSignature:
+        return False
+    return True
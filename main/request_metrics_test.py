@@ -0,0 +1,63 @@
+"""Tests for per-request metrics"""
+from django.contrib.auth.models import User
+from django.core import signing
+import pytest
+
+from main.request_metrics import (
+    collect_metrics,
+    get_current_metrics,
+    is_valid_debug_token,
+    make_debug_token,
+    sql_fingerprint,
+)
+
+
+@pytest.mark.parametrize(
+    "sql, expected",
+    [
+        [
+            'SELECT "id" FROM "auth_user" WHERE "id" = %s',
+            'SELECT "id" FROM "auth_user" WHERE "id" = %s',
+        ],
+        [
+            'SELECT "id" FROM "auth_user" WHERE "id" IN (%s, %s, %s) LIMIT 21',
+            'SELECT "id" FROM "auth_user" WHERE "id" IN (...) LIMIT ?',
+        ],
+        [
+            "SELECT 1 FROM \"auth_user\" WHERE \"username\" = 'it''s'",
+            'SELECT ? FROM "auth_user" WHERE "username" = ?',
+        ],
+    ],
+)
+def test_sql_fingerprint(sql, expected):
+    """sql_fingerprint should collapse literals and IN lists"""
+    assert sql_fingerprint(sql) == expected
+
+
+@pytest.mark.django_db
+def test_collect_metrics():
+    """collect_metrics should count queries and group them by fingerprint"""
+    assert get_current_metrics() is None
+    with collect_metrics() as metrics:
+        assert get_current_metrics() is metrics
+        User.objects.filter(id=1).exists()
+        User.objects.filter(id=2).exists()
+        User.objects.count()
+    assert get_current_metrics() is None
+
+    assert metrics.query_count == 3
+    assert metrics.db_ms > 0
+    assert len(metrics.repeated_queries(5)) == 1
+    assert metrics.repeated_queries(5)[0][1] == 2
+    assert 'desc="3 queries"' in metrics.server_timing()
+
+
+def test_debug_token(mocker):
+    """Debug tokens should be valid until they expire"""
+    token = make_debug_token()
+    assert is_valid_debug_token(token, 60) is True
+    assert is_valid_debug_token(token + "x", 60) is False
+    mocker.patch(
+        "main.request_metrics.signing.loads", side_effect=signing.SignatureExpired
+    )
+    assert is_valid_debug_token(token, 60) is False
@@ -0,0 +1,134 @@
+"""Distributed concurrency limits for Celery tasks which call external integrations"""
+import logging
+import random
+import time
+import uuid
+
+from celery import Task
+from celery.exceptions import Retry
+from django.conf import settings
+from django_redis import get_redis_connection
+
+log = logging.getLogger(__name__)
+
+SEMAPHORE_KEY_PREFIX = "semaphore:"
+# Leases expire so that a worker which dies while holding one can't reduce the limit forever
+SEMAPHORE_LEASE_SECONDS = 15 * 60
+# The number of times a task has waited for a slot is passed in this keyword argument, which is removed before
+# the task runs
+SLOT_WAITS_KWARG = "_integration_slot_waits"
+# Drop expired leases, then take a new one if there is room. Runs atomically in redis.
+_ACQUIRE_SCRIPT = """
+redis.call("zremrangebyscore", KEYS[1], "-inf", ARGV[2])
+if redis.call("zcard", KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call("zadd", KEYS[1], ARGV[2] + ARGV[3], ARGV[4])
+    redis.call("expire", KEYS[1], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+class RedisSemaphore:
+    """A counting semaphore shared by every worker through redis"""
+
+    def __init__(self, name, limit, lease_seconds=SEMAPHORE_LEASE_SECONDS):
+        self.key = f"{SEMAPHORE_KEY_PREFIX}{name}"
+        self.limit = limit
+        self.lease_seconds = lease_seconds
+
+    def acquire(self):
+        """
+        Try to take a slot in the semaphore without blocking
+
+        Returns:
+            str: A token to pass to release(), or None if every slot is taken
+        """
+        token = uuid.uuid4().hex
+        conn = get_redis_connection("default")
+        acquired = conn.eval(
+            _ACQUIRE_SCRIPT,
+            1,
+            self.key,
+            self.limit,
+            time.time(),
+            self.lease_seconds,
+            token,
+        )
+        return token if acquired else None
+
+    def release(self, token):
+        """
+        Give up a slot taken by acquire()
+
+        Args:
+            token (str): The token returned by acquire()
+        """
+        get_redis_connection("default").zrem(self.key, token)
+
+    def holders(self):
+        """
+        Returns:
+            int: The number of unexpired slots which are currently taken
+        """
+        conn = get_redis_connection("default")
+        conn.zremrangebyscore(self.key, "-inf", time.time())
+        return conn.zcard(self.key)
+
+
+class IntegrationTask(Task):  # pylint: disable=abstract-method
+    """
+    Base class for tasks which call an external integration. Only INTEGRATION_TASK_CONCURRENCY[integration]
+    of these tasks run at once across all workers, and the rest are retried after a short delay so they don't
+    hold a worker slot while they wait.
+
+    Usage:
+        @app.task(base=IntegrationTask, integration="hubspot")
+    """
+
+    integration = None
+
+    def __call__(self, *args, **kwargs):
+        slot_waits = kwargs.pop(SLOT_WAITS_KWARG, 0)
+        limit = settings.INTEGRATION_TASK_CONCURRENCY.get(self.integration)
+        # Tasks which are called directly or run eagerly aren't taking up a worker slot
+        if self.request.id is None or self.request.is_eager or not limit:
+            return super().__call__(*args, **kwargs)
+
+        semaphore = RedisSemaphore(self.integration, limit)
+        try:
+            token = semaphore.acquire()
+        except Exception:  # pylint: disable=broad-except
+            # Redis being unavailable shouldn't stop integration tasks from running
+            log.exception(
+                "Unable to acquire the %s semaphore, running %s anyway",
+                self.integration,
+                self.name,
+            )
+            return super().__call__(*args, **kwargs)
+
+        if token is None:
+            delay = settings.INTEGRATION_TASK_RETRY_DELAY
+            countdown = random.uniform(delay, delay * 2)
+            # The task is sent again with the same retry count instead of being retried, so waiting for a slot
+            # doesn't use up the retries the task has for its own errors
+            self.signature_from_request(
+                args=args,
+                kwargs={**kwargs, SLOT_WAITS_KWARG: slot_waits + 1},
+                countdown=countdown,
+                retries=self.request.retries,
+            ).apply_async()
+            log.info(
+                "Every %s slot is taken, %s has waited %d times",
+                self.integration,
+                self.name,
+                slot_waits + 1,
+            )
+            raise Retry(f"Waiting for a {self.integration} slot", when=countdown)
+        try:
+            return super().__call__(*args, **kwargs)
+        finally:
+            try:
+                semaphore.release(token)
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Unable to release the %s semaphore", self.integration)
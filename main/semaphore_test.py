@@ -0,0 +1,134 @@
+"""Tests for integration concurrency limits"""
+from types import SimpleNamespace
+
+import pytest
+from celery.exceptions import Retry
+
+from main.celery import app
+from main.semaphore import (
+    IntegrationTask,
+    RedisSemaphore,
+    SEMAPHORE_KEY_PREFIX,
+    SLOT_WAITS_KWARG,
+)
+
+
+@app.task(base=IntegrationTask, integration="test_integration")
+def limited_task(value):
+    """A task which is limited by the test integration semaphore"""
+    return value * 2
+
+
+@pytest.fixture
+def limits(settings):
+    """Configure a limit for the test integration"""
+    settings.INTEGRATION_TASK_CONCURRENCY = {"test_integration": 1}
+    settings.INTEGRATION_TASK_RETRY_DELAY = 10
+
+
+@pytest.fixture
+def worker_request(mocker):
+    """Make the task look like it's being run by a worker rather than eagerly"""
+    request = SimpleNamespace(id="task-id", is_eager=False, retries=2)
+    mocker.patch.object(
+        IntegrationTask,
+        "request",
+        new_callable=mocker.PropertyMock,
+        return_value=request,
+    )
+    return request
+
+
+def test_semaphore_acquire(mocker):
+    """acquire should run the script with the limit and return a token only if a slot was taken"""
+    conn = mocker.patch("main.semaphore.get_redis_connection").return_value
+    conn.eval.return_value = 1
+    semaphore = RedisSemaphore("hubspot", 3, lease_seconds=60)
+    token = semaphore.acquire()
+    assert token is not None
+    args = conn.eval.call_args[0]
+    assert args[1:4] == (1, f"{SEMAPHORE_KEY_PREFIX}hubspot", 3)
+    assert args[5:] == (60, token)
+
+    semaphore.release(token)
+    conn.zrem.assert_called_once_with(f"{SEMAPHORE_KEY_PREFIX}hubspot", token)
+
+    conn.eval.return_value = 0
+    assert semaphore.acquire() is None
+
+
+@pytest.mark.usefixtures("limits", "worker_request")
+def test_integration_task_acquired(mocker):
+    """The task should run inside the semaphore and release its slot afterwards"""
+    patched_semaphore = mocker.patch("main.semaphore.RedisSemaphore")
+    semaphore = patched_semaphore.return_value
+    semaphore.acquire.return_value = "token"
+    assert limited_task(3) == 6
+    patched_semaphore.assert_called_once_with("test_integration", 1)
+    semaphore.release.assert_called_once_with("token")
+
+
+@pytest.mark.usefixtures("limits", "worker_request")
+@pytest.mark.parametrize("slot_waits", [0, 4])
+def test_integration_task_over_limit(mocker, slot_waits):
+    """The task should be sent again later, without using up a retry, if every slot is taken"""
+    patched_semaphore = mocker.patch("main.semaphore.RedisSemaphore")
+    patched_semaphore.return_value.acquire.return_value = None
+    patched_signature = mocker.patch.object(limited_task, "signature_from_request")
+    kwargs = {SLOT_WAITS_KWARG: slot_waits} if slot_waits else {}
+    with pytest.raises(Retry):
+        limited_task(3, **kwargs)  # pylint: disable=unexpected-keyword-arg
+    patched_signature.assert_called_once()
+    call_kwargs = patched_signature.call_args[1]
+    assert call_kwargs["args"] == (3,)
+    assert call_kwargs["kwargs"] == {SLOT_WAITS_KWARG: slot_waits + 1}
+    # The retry count is passed on unchanged
+    assert call_kwargs["retries"] == 2
+    assert 10 <= call_kwargs["countdown"] <= 20
+    patched_signature.return_value.apply_async.assert_called_once_with()
+    patched_semaphore.return_value.release.assert_not_called()
+
+
+@pytest.mark.usefixtures("limits", "worker_request")
+def test_integration_task_slot_waits_removed(mocker):
+    """The slot wait count shouldn't be passed to the task itself"""
+    patched_semaphore = mocker.patch("main.semaphore.RedisSemaphore")
+    patched_semaphore.return_value.acquire.return_value = "token"
+    # IntegrationTask strips the slot wait count before calling the task function
+    kwargs = {SLOT_WAITS_KWARG: 2}
+    assert limited_task(3, **kwargs) == 6  # pylint: disable=unexpected-keyword-arg
+
+
+@pytest.mark.usefixtures("limits", "worker_request")
+def test_integration_task_redis_error(mocker):
+    """The task should still run if redis is unavailable"""
+    patched_semaphore = mocker.patch("main.semaphore.RedisSemaphore")
+    patched_semaphore.return_value.acquire.side_effect = ConnectionError
+    patched_log = mocker.patch("main.semaphore.log")
+    assert limited_task(3) == 6
+    patched_log.exception.assert_called_once()
+
+
+@pytest.mark.usefixtures("limits")
+def test_integration_task_eager(mocker):
+    """The semaphore shouldn't be used for eager tasks"""
+    patched_semaphore = mocker.patch("main.semaphore.RedisSemaphore")
+    assert limited_task.delay(3).get() == 6
+    patched_semaphore.assert_not_called()
+
+
+@pytest.mark.usefixtures("worker_request")
+def test_integration_task_no_limit(mocker, settings):
+    """The semaphore shouldn't be used for integrations without a limit"""
+    settings.INTEGRATION_TASK_CONCURRENCY = {}
+    patched_semaphore = mocker.patch("main.semaphore.RedisSemaphore")
+    assert limited_task(3) == 6
+    patched_semaphore.assert_not_called()
+
+
+@pytest.mark.usefixtures("limits")
+def test_integration_task_called_directly(mocker):
+    """The semaphore shouldn't be used when a task is called as a function"""
+    patched_semaphore = mocker.patch("main.semaphore.RedisSemaphore")
+    assert limited_task(3) == 6
+    patched_semaphore.assert_not_called()
@@ -1,3 +1,4 @@
+# pylint: disable=too-many-lines
 """
 Django settings for ui pp. This is just a harness type
 project for testing and interacting with the app.
@@ -16,6 +17,7 @@ import platform
 from urllib.parse import urljoin, urlparse
 
 from celery.schedules import crontab
+from kombu import Queue
 from django.core.exceptions import ImproperlyConfigured
 from django.core.files.temp import NamedTemporaryFile
 import dj_database_url
@@ -147,6 +149,8 @@ INSTALLED_APPS = (
     "compliance",
     "jobma",
     "novoed",
+    "outbox",
+    "archive",
 )
 
 DISABLE_WEBPACK_LOADER_STATS = get_bool(
@@ -161,6 +165,8 @@ if ENVIRONMENT not in ("production", "prod"):
 
 MIDDLEWARE = (
     "django.middleware.security.SecurityMiddleware",
+    # Near the top so the session, authentication and other middleware are included in the timings
+    "main.middleware.RequestMetricsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -173,6 +179,22 @@ MIDDLEWARE = (
     "main.middleware.CachelessAPIMiddleware",
 )
 
+REQUEST_METRICS_ENABLED = get_bool(
+    "REQUEST_METRICS_ENABLED",
+    True,
+    description="Count queries and time database, HTTP and cache access for each request",
+)
+SLOW_REQUEST_THRESHOLD_MS = get_int(
+    "SLOW_REQUEST_THRESHOLD_MS",
+    2000,
+    description="Requests which take at least this many milliseconds are logged along with their repeated queries",
+)
+SERVER_TIMING_TOKEN_MAX_AGE = get_int(
+    "SERVER_TIMING_TOKEN_MAX_AGE",
+    60 * 60,
+    description="The number of seconds a signed token for enabling Server-Timing headers is valid for",
+)
+
 # enable the nplusone profiler only in debug mode
 if DEBUG:
     INSTALLED_APPS += ("nplusone.ext.django",)
@@ -335,6 +357,12 @@ LOGIN_URL = "/signin/"
 LOGIN_ERROR_URL = "/"
 LOGOUT_REDIRECT_URL = "/"
 
+USER_CACHE_TIMEOUT = get_int(
+    "USER_CACHE_TIMEOUT",
+    60 * 60,
+    description="Seconds to cache each user's serialized profile, or 0 to disable the cache",
+)
+
 AUTH_CHANGE_EMAIL_TTL_IN_MINUTES = get_int(
     "AUTH_CHANGE_EMAIL_TTL_IN_MINUTES",
     60 * 24,
@@ -722,11 +750,88 @@ CELERY_BEAT_SCHEDULE = {
             description="How often in seconds to check for hubspot errors",
         ),
     },
+    "process-jobma-webhook-events": {
+        "task": "jobma.tasks.process_webhook_events",
+        "schedule": get_int(
+            "JOBMA_WEBHOOK_PROCESSING_FREQUENCY",
+            300,
+            description="How often in seconds to apply any Jobma webhook events that are still pending",
+        ),
+    },
+    "relay-outbox-messages": {
+        "task": "outbox.tasks.relay_outbox_messages",
+        "schedule": get_int(
+            "OUTBOX_RELAY_FREQUENCY",
+            30,
+            description="How often in seconds to publish any outbox messages which weren't published right after their transaction committed",
+        ),
+    },
+    "delete-dispatched-outbox-messages": {
+        "task": "outbox.tasks.delete_dispatched_outbox_messages",
+        "schedule": crontab(minute=30, hour=4),
+    },
+    "archive-old-rows": {
+        "task": "archive.tasks.archive_old_rows",
+        "schedule": crontab(minute=0, hour=3),
+    },
+    "send-installment-reminders": {
+        "task": "ecommerce.tasks.send_installment_reminders",
+        "schedule": crontab(minute=0, hour=14),
+    },
     "recreate-stale-interview-links": {
         "task": "applications.tasks.refresh_pending_interview_links",
         "schedule": crontab(minute=0, hour=5),
     },
 }
+TASK_TELEMETRY_ENABLED = get_bool(
+    "TASK_TELEMETRY_ENABLED",
+    True,
+    description="Record queue latency, runtime, retries, query counts and payload size for Celery tasks in Redis",
+)
+# Workers consume queues in this order, so latency-critical mail is always picked up first. The default
+# queue keeps Celery's "celery" name so that messages already queued when this is deployed aren't stranded.
+CELERY_TASK_DEFAULT_QUEUE = "celery"
+CELERY_TASK_QUEUES = [
+    Queue("mail"),
+    Queue(CELERY_TASK_DEFAULT_QUEUE),
+    Queue("jobma"),
+    Queue("novoed"),
+    Queue("hubspot"),
+]
+CELERY_BROKER_TRANSPORT_OPTIONS = {"queue_order_strategy": "priority"}
+CELERY_TASK_ROUTES = {
+    "applications.tasks.create_and_send_applicant_letter": {"queue": "mail"},
+    "ecommerce.tasks.send_receipt_email": {"queue": "mail"},
+    "ecommerce.tasks.send_installment_reminders": {"queue": "mail"},
+    "mail.tasks.send_template_email": {"queue": "mail"},
+    "applications.tasks.populate_interviews_in_jobma": {"queue": "jobma"},
+    "applications.tasks.refresh_pending_interview_links": {"queue": "jobma"},
+    "jobma.tasks.*": {"queue": "jobma"},
+    "novoed.tasks.*": {"queue": "novoed"},
+    "hubspot.tasks.*": {"queue": "hubspot"},
+}
+INTEGRATION_TASK_CONCURRENCY = {
+    "hubspot": get_int(
+        "HUBSPOT_TASK_CONCURRENCY",
+        4,
+        description="The maximum number of HubSpot tasks which can run at once across all workers",
+    ),
+    "jobma": get_int(
+        "JOBMA_TASK_CONCURRENCY",
+        2,
+        description="The maximum number of Jobma tasks which can run at once across all workers",
+    ),
+    "novoed": get_int(
+        "NOVOED_TASK_CONCURRENCY",
+        2,
+        description="The maximum number of NovoEd tasks which can run at once across all workers",
+    ),
+}
+INTEGRATION_TASK_RETRY_DELAY = get_int(
+    "INTEGRATION_TASK_RETRY_DELAY",
+    10,
+    description="Minimum number of seconds to wait before retrying an integration task which is over its concurrency limit",
+)
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_ACCEPT_CONTENT = ["json"]
@@ -832,6 +937,11 @@ if DEBUG:
     MIDDLEWARE = ("debug_toolbar.middleware.DebugToolbarMiddleware",) + MIDDLEWARE
 
 HUBSPOT_API_KEY = get_string("HUBSPOT_API_KEY", "", description="API key for Hubspot")
+HUBSPOT_MAX_CONCURRENT_REQUESTS = get_int(
+    "HUBSPOT_MAX_CONCURRENT_REQUESTS",
+    4,
+    description="The maximum number of concurrent requests made to Hubspot when checking sync statuses or configuring properties",
+)
 HUBSPOT_ID_PREFIX = get_string(
     "HUBSPOT_ID_PREFIX", "bootcamp", description="Hub spot id prefix."
 )
@@ -861,6 +971,41 @@ RECAPTCHA_SITE_KEY = get_string(
 RECAPTCHA_SECRET_KEY = get_string(
     "RECAPTCHA_SECRET_KEY", "", description="The ReCaptcha secret key"
 )
+RECAPTCHA_CONNECT_TIMEOUT_MS = get_int(
+    "RECAPTCHA_CONNECT_TIMEOUT_MS",
+    1000,
+    description="Milliseconds to wait for a connection to the ReCaptcha verification API",
+)
+RECAPTCHA_READ_TIMEOUT_MS = get_int(
+    "RECAPTCHA_READ_TIMEOUT_MS",
+    3000,
+    description="Milliseconds to wait for a response from the ReCaptcha verification API",
+)
+RECAPTCHA_POOL_SIZE = get_int(
+    "RECAPTCHA_POOL_SIZE",
+    10,
+    description="The number of connections to the ReCaptcha verification API kept open by each process",
+)
+RECAPTCHA_BREAKER_FAILURE_THRESHOLD = get_int(
+    "RECAPTCHA_BREAKER_FAILURE_THRESHOLD",
+    5,
+    description="The number of consecutive ReCaptcha verification failures after which verification requests are paused",
+)
+RECAPTCHA_BREAKER_RESET_SECONDS = get_int(
+    "RECAPTCHA_BREAKER_RESET_SECONDS",
+    30,
+    description="Seconds to pause ReCaptcha verification requests for after repeated failures",
+)
+RECAPTCHA_FAIL_OPEN = get_bool(
+    "RECAPTCHA_FAIL_OPEN",
+    False,
+    description="Allow registrations when ReCaptcha responses can't be verified, instead of rejecting them",
+)
+RECAPTCHA_STATS_LOG_SECONDS = get_int(
+    "RECAPTCHA_STATS_LOG_SECONDS",
+    300,
+    description="How often in seconds each process logs its ReCaptcha verification counts and latencies, or 0 to disable",
+)
 
 JOBMA_BASE_URL = get_string(
     "JOBMA_BASE_URL", "", description="The base URL for accessing Jobma"
@@ -880,6 +1025,76 @@ JOBMA_LINK_EXPIRATION_DAYS = get_int(
     29,
     description="The number of days for Jobma links to expire",
 )
+JOBMA_MAX_CONCURRENT_REQUESTS = get_int(
+    "JOBMA_MAX_CONCURRENT_REQUESTS",
+    8,
+    description="The maximum number of concurrent requests made to Jobma when refreshing interviews",
+)
+JOBMA_WEBHOOK_BATCH_SIZE = get_int(
+    "JOBMA_WEBHOOK_BATCH_SIZE",
+    100,
+    description="The maximum number of Jobma webhook events applied in one transaction",
+)
+
+OUTBOX_BATCH_SIZE = get_int(
+    "OUTBOX_BATCH_SIZE",
+    100,
+    description="The maximum number of outbox messages published to Celery in one batch",
+)
+OUTBOX_MAX_ATTEMPTS = get_int(
+    "OUTBOX_MAX_ATTEMPTS",
+    10,
+    description="The number of times to try publishing an outbox message before marking it as failed",
+)
+
+ARCHIVE_ENABLED = get_bool(
+    "ARCHIVE_ENABLED",
+    False,
+    description="Move old rows from the audit, receipt and compliance tables into archive files every night",
+)
+ARCHIVE_AFTER_DAYS = get_int(
+    "ARCHIVE_AFTER_DAYS",
+    730,
+    description="The age in days after which audit, receipt and compliance rows are archived",
+)
+ARCHIVE_BATCH_SIZE = get_int(
+    "ARCHIVE_BATCH_SIZE",
+    5000,
+    description="The maximum number of rows written to each archive file",
+)
+ARCHIVE_STORAGE_BUCKET_NAME = get_string(
+    "ARCHIVE_STORAGE_BUCKET_NAME",
+    None,
+    description="The private S3 bucket for archive files. This must not be the public AWS_STORAGE_BUCKET_NAME.",
+)
+ARCHIVE_URL_EXPIRE_SECONDS = get_int(
+    "ARCHIVE_URL_EXPIRE_SECONDS",
+    300,
+    description="The number of seconds a signed URL for an archive file is valid for",
+)
+ARCHIVE_ROOT = get_string(
+    "ARCHIVE_ROOT",
+    os.path.join(BASE_DIR, "archive_files"),
+    description="The directory for archive files when S3 isn't used",
+    dev_only=True,
+)
+if BOOTCAMP_ECOMMERCE_USE_S3 and ARCHIVE_ENABLED and not ARCHIVE_STORAGE_BUCKET_NAME:
+    raise ImproperlyConfigured(
+        "ARCHIVE_STORAGE_BUCKET_NAME is required to archive rows when S3 is used"
+    )
+if (
+    ARCHIVE_STORAGE_BUCKET_NAME
+    and ARCHIVE_STORAGE_BUCKET_NAME == AWS_STORAGE_BUCKET_NAME
+):
+    raise ImproperlyConfigured(
+        "ARCHIVE_STORAGE_BUCKET_NAME must be a private bucket, not the public AWS_STORAGE_BUCKET_NAME"
+    )
+
+INSTALLMENT_REMINDER_DAYS = get_int(
+    "INSTALLMENT_REMINDER_DAYS",
+    7,
+    description="The number of days before an installment deadline that applicants who haven't paid enough are reminded",
+)
 
 NOVOED_API_KEY = get_string("NOVOED_API_KEY", None, description="The NovoEd API key")
 NOVOED_API_SECRET = get_string(
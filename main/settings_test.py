@@ -10,9 +10,11 @@ from unittest import mock
 from django.conf import settings
 from django.core import mail
 from django.test import TestCase
+import pytest
 import semantic_version
 
 from main import envs
+from main.celery import app
 
 
 def cleanup_settings():
@@ -122,3 +124,32 @@ class TestSettings(TestCase):
         assert json.dumps(app_json, sort_keys=True, indent=2) == json.dumps(
             generated_app_json, sort_keys=True, indent=2
         ), "Generated app.json does not match the app.json file. Please use the 'generate_app_json' management command to update app.json"
+
+
+@pytest.mark.parametrize(
+    "task_name,queue",
+    [
+        ["ecommerce.tasks.send_receipt_email", "mail"],
+        ["applications.tasks.create_and_send_applicant_letter", "mail"],
+        ["mail.tasks.send_template_email", "mail"],
+        ["ecommerce.tasks.fulfill_order", "celery"],
+        ["applications.tasks.populate_interviews_in_jobma", "jobma"],
+        ["applications.tasks.refresh_pending_interview_links", "jobma"],
+        ["jobma.tasks.process_webhook_events", "jobma"],
+        ["novoed.tasks.enroll_users_in_novoed_course", "novoed"],
+        ["hubspot.tasks.sync_contact_with_hubspot", "hubspot"],
+        ["hubspot.tasks.check_hubspot_api_errors", "hubspot"],
+    ],
+)
+def test_task_routes(task_name, queue):
+    """Tasks should be routed to the queue for their integration, or to the mail or default queue"""
+    assert app.amqp.router.route({}, task_name)["queue"].name == queue
+
+
+def test_task_routes_declared():
+    """Every task should be routed to a queue which workers consume"""
+    declared = {queue.name for queue in settings.CELERY_TASK_QUEUES}
+    app.loader.import_default_modules()
+    for task_name in app.tasks:
+        assert app.amqp.router.route({}, task_name)["queue"].name in declared
+    assert set(settings.INTEGRATION_TASK_CONCURRENCY) <= declared
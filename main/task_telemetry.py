@@ -0,0 +1,183 @@
+"""Celery task telemetry: queue latency, runtime, retries, query counts and payload size per task name"""
+import json
+import logging
+import time
+
+from celery.signals import before_task_publish, task_postrun, task_prerun, task_retry
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from main.request_metrics import collect_metrics
+
+log = logging.getLogger(__name__)
+
+PUBLISHED_AT_HEADER = "published_at"
+TELEMETRY_KEY_PREFIX = "task_telemetry:"
+TELEMETRY_TASKS_KEY = f"{TELEMETRY_KEY_PREFIX}tasks"
+METRIC_QUEUE_LATENCY = "queue_latency_ms"
+METRIC_RUNTIME = "runtime_ms"
+METRIC_QUERIES = "queries"
+METRIC_PAYLOAD_SIZE = "payload_bytes"
+METRIC_RETRIES = "retries"
+# Upper bounds of the histogram buckets for each metric. Anything larger goes into the "+Inf" bucket.
+HISTOGRAM_BUCKETS = {
+    METRIC_QUEUE_LATENCY: (10, 100, 500, 1000, 5000, 30000, 60000, 300_000, 900_000),
+    METRIC_RUNTIME: (10, 50, 100, 250, 500, 1000, 5000, 30000, 60000, 300_000),
+    METRIC_QUERIES: (0, 1, 5, 10, 25, 50, 100, 500, 1000),
+    METRIC_PAYLOAD_SIZE: (128, 512, 1024, 4096, 16384, 65536, 262_144, 1_048_576),
+}
+INF_BUCKET = "+Inf"
+
+# Metrics for tasks which are running in this worker process, by task id
+_running = {}
+
+
+def _get_task_key(task_name):
+    """Returns the redis key for a task's telemetry"""
+    return f"{TELEMETRY_KEY_PREFIX}{task_name}"
+
+
+def _get_bucket(metric, value):
+    """Returns the name of the histogram bucket for a value"""
+    for upper_bound in HISTOGRAM_BUCKETS[metric]:
+        if value <= upper_bound:
+            return str(upper_bound)
+    return INF_BUCKET
+
+
+def record_task_metrics(task_name, values):
+    """
+    Add values to the histograms for a task. Redis errors are logged rather than raised since telemetry
+    should never cause a task to fail.
+
+    Args:
+        task_name (str): The name of the task
+        values (dict): Metric names mapped to the values observed. Retries are only counted.
+    """
+    if not settings.TASK_TELEMETRY_ENABLED:
+        return
+    key = _get_task_key(task_name)
+    try:
+        pipe = get_redis_connection("default").pipeline(transaction=False)
+        pipe.sadd(TELEMETRY_TASKS_KEY, task_name)
+        for metric, value in values.items():
+            pipe.hincrby(key, f"{metric}:count", 1)
+            if metric in HISTOGRAM_BUCKETS:
+                pipe.hincrbyfloat(key, f"{metric}:sum", value)
+                pipe.hincrby(key, f"{metric}:{_get_bucket(metric, value)}", 1)
+        pipe.execute()
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Unable to record telemetry for task %s", task_name)
+
+
+def _summarize_histogram(metric, fields):
+    """Build a summary of a metric's histogram from the fields stored in redis"""
+    count = int(fields.get(f"{metric}:count", 0))
+    total = float(fields.get(f"{metric}:sum", 0))
+    buckets = {
+        bucket: int(fields.get(f"{metric}:{bucket}", 0))
+        for bucket in [str(bound) for bound in HISTOGRAM_BUCKETS[metric]] + [INF_BUCKET]
+    }
+    return {
+        "count": count,
+        "mean": total / count if count else None,
+        "p50": _estimate_percentile(buckets, count, 0.5),
+        "p95": _estimate_percentile(buckets, count, 0.95),
+        "buckets": buckets,
+    }
+
+
+def _estimate_percentile(buckets, count, percentile):
+    """Returns the upper bound of the bucket which contains the given percentile"""
+    if not count:
+        return None
+    seen = 0
+    for bucket, bucket_count in buckets.items():
+        seen += bucket_count
+        if seen >= count * percentile:
+            return bucket
+    return INF_BUCKET
+
+
+def get_task_telemetry():
+    """
+    Get the aggregated telemetry for every task
+
+    Returns:
+        dict: Task names mapped to summaries of each of their metrics
+    """
+    conn = get_redis_connection("default")
+    task_names = sorted(name.decode() for name in conn.smembers(TELEMETRY_TASKS_KEY))
+    telemetry = {}
+    for task_name in task_names:
+        fields = {
+            field.decode(): value.decode()
+            for field, value in conn.hgetall(_get_task_key(task_name)).items()
+        }
+        telemetry[task_name] = {
+            **{
+                metric: _summarize_histogram(metric, fields)
+                for metric in HISTOGRAM_BUCKETS
+            },
+            METRIC_RETRIES: int(fields.get(f"{METRIC_RETRIES}:count", 0)),
+        }
+    return telemetry
+
+
+def reset_task_telemetry():
+    """Delete all recorded task telemetry"""
+    conn = get_redis_connection("default")
+    task_names = [name.decode() for name in conn.smembers(TELEMETRY_TASKS_KEY)]
+    conn.delete(TELEMETRY_TASKS_KEY, *[_get_task_key(name) for name in task_names])
+
+
+@before_task_publish.connect
+def on_before_task_publish(
+    sender=None, body=None, headers=None, **kwargs
+):  # pylint: disable=unused-argument
+    """Stamp the publish time on the message and record the size of the task arguments"""
+    if headers is not None:
+        headers[PUBLISHED_AT_HEADER] = time.time()
+    record_task_metrics(
+        sender, {METRIC_PAYLOAD_SIZE: len(json.dumps(body, default=str))}
+    )
+
+
+@task_prerun.connect
+def on_task_prerun(
+    task_id=None, task=None, **kwargs
+):  # pylint: disable=unused-argument
+    """Start collecting metrics for a task"""
+    if task.request.is_eager:
+        return
+    metrics_context = collect_metrics()
+    _running[task_id] = (metrics_context, metrics_context.__enter__())
+
+
+@task_postrun.connect
+def on_task_postrun(
+    task_id=None, task=None, **kwargs
+):  # pylint: disable=unused-argument
+    """Record the queue latency, runtime and query count for a task"""
+    running = _running.pop(task_id, None)
+    if running is None:
+        return
+    metrics_context, metrics = running
+    metrics_context.__exit__(None, None, None)
+    values = {METRIC_RUNTIME: metrics.total_ms, METRIC_QUERIES: metrics.query_count}
+    published_at = getattr(task.request, PUBLISHED_AT_HEADER, None)
+    if published_at is not None:
+        # The start time is derived from the runtime so both use the same clock reading
+        started_at = time.time() - metrics.total_ms / 1000
+        values[METRIC_QUEUE_LATENCY] = max(0, (started_at - published_at) * 1000)
+    record_task_metrics(task.name, values)
+
+
+@task_retry.connect
+def on_task_retry(
+    sender=None, request=None, **kwargs
+):  # pylint: disable=unused-argument
+    """Count a retry for a task"""
+    if request is not None and request.is_eager:
+        return
+    record_task_metrics(sender.name, {METRIC_RETRIES: 1})
@@ -0,0 +1,154 @@
+"""Tests for Celery task telemetry"""
+# pylint: disable=redefined-outer-name
+from types import SimpleNamespace
+
+import pytest
+
+from main import task_telemetry
+from main.task_telemetry import (
+    INF_BUCKET,
+    METRIC_PAYLOAD_SIZE,
+    METRIC_QUERIES,
+    METRIC_QUEUE_LATENCY,
+    METRIC_RETRIES,
+    METRIC_RUNTIME,
+    TELEMETRY_TASKS_KEY,
+    get_task_telemetry,
+    on_task_postrun,
+    on_task_prerun,
+    on_task_retry,
+    record_task_metrics,
+)
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the sets and hashes used by telemetry"""
+
+    def __init__(self):
+        self.sets = {}
+        self.hashes = {}
+
+    def pipeline(self, transaction=True):  # pylint: disable=unused-argument
+        """Commands are applied immediately"""
+        return self
+
+    def execute(self):
+        """Nothing to do since commands are applied immediately"""
+
+    def sadd(self, key, value):
+        """Add to a set"""
+        self.sets.setdefault(key, set()).add(value.encode())
+
+    def smembers(self, key):
+        """Get a set"""
+        return self.sets.get(key, set())
+
+    def hincrby(self, key, field, amount):
+        """Increment a hash field"""
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = fields.get(field, 0) + amount
+
+    hincrbyfloat = hincrby
+
+    def hgetall(self, key):
+        """Get a hash"""
+        return {
+            field.encode(): str(value).encode()
+            for field, value in self.hashes.get(key, {}).items()
+        }
+
+
+@pytest.fixture
+def fake_redis(mocker, settings):
+    """Patch the redis connection used for telemetry"""
+    settings.TASK_TELEMETRY_ENABLED = True
+    redis = FakeRedis()
+    mocker.patch("main.task_telemetry.get_redis_connection", return_value=redis)
+    return redis
+
+
+@pytest.mark.parametrize(
+    "metric,value,expected",
+    [
+        [METRIC_RUNTIME, 5, "10"],
+        [METRIC_RUNTIME, 10, "10"],
+        [METRIC_RUNTIME, 11, "50"],
+        [METRIC_QUERIES, 0, "0"],
+        [METRIC_PAYLOAD_SIZE, 10 ** 9, INF_BUCKET],
+    ],
+)
+def test_get_bucket(metric, value, expected):
+    """_get_bucket should return the smallest bucket which the value fits in"""
+    # pylint: disable=protected-access
+    assert task_telemetry._get_bucket(metric, value) == expected
+
+
+def test_get_task_telemetry(fake_redis):
+    """Recorded values should be summarized per task"""
+    for runtime in [5, 20, 40, 200]:
+        record_task_metrics("a.task", {METRIC_RUNTIME: runtime, METRIC_QUERIES: 3})
+    record_task_metrics("a.task", {METRIC_RETRIES: 1})
+    record_task_metrics("b.task", {METRIC_PAYLOAD_SIZE: 100})
+    assert fake_redis.smembers(TELEMETRY_TASKS_KEY) == {b"a.task", b"b.task"}
+
+    telemetry = get_task_telemetry()
+    assert list(telemetry) == ["a.task", "b.task"]
+    runtime = telemetry["a.task"][METRIC_RUNTIME]
+    assert runtime["count"] == 4
+    assert runtime["mean"] == 66.25
+    assert runtime["p50"] == "50"
+    assert runtime["p95"] == "250"
+    assert runtime["buckets"]["50"] == 2
+    assert telemetry["a.task"][METRIC_QUERIES]["p95"] == "5"
+    latency = telemetry["a.task"][METRIC_QUEUE_LATENCY]
+    assert latency["count"] == 0
+    assert latency["mean"] is None
+    assert latency["p95"] is None
+    assert telemetry["a.task"][METRIC_RETRIES] == 1
+    assert telemetry["b.task"][METRIC_PAYLOAD_SIZE]["p50"] == "128"
+
+
+def test_record_task_metrics_disabled(fake_redis, settings):
+    """Nothing should be recorded if telemetry is disabled"""
+    settings.TASK_TELEMETRY_ENABLED = False
+    record_task_metrics("a.task", {METRIC_RUNTIME: 5})
+    assert fake_redis.sets == {}
+
+
+def test_record_task_metrics_error(mocker, settings):
+    """Redis errors should be logged instead of raised"""
+    settings.TASK_TELEMETRY_ENABLED = True
+    mocker.patch(
+        "main.task_telemetry.get_redis_connection", side_effect=ConnectionError
+    )
+    patched_log = mocker.patch("main.task_telemetry.log")
+    record_task_metrics("a.task", {METRIC_RUNTIME: 5})
+    patched_log.exception.assert_called_once()
+
+
+def test_task_signals(mocker, fake_redis):  # pylint: disable=unused-argument
+    """Queue latency, runtime and queries should be recorded for tasks run by a worker"""
+    patched_record = mocker.patch("main.task_telemetry.record_task_metrics")
+    mocker.patch("main.task_telemetry.time.time", return_value=1000)
+    task = SimpleNamespace(
+        name="a.task", request=SimpleNamespace(is_eager=False, published_at=990)
+    )
+    on_task_prerun(task_id="abc", task=task)
+    on_task_postrun(task_id="abc", task=task)
+
+    patched_record.assert_called_once()
+    task_name, values = patched_record.call_args[0]
+    assert task_name == "a.task"
+    assert values[METRIC_QUERIES] == 0
+    assert values[METRIC_RUNTIME] >= 0
+    assert 0 <= values[METRIC_QUEUE_LATENCY] <= 10000
+
+
+def test_task_signals_eager(mocker):
+    """Nothing should be recorded for tasks run eagerly"""
+    patched_record = mocker.patch("main.task_telemetry.record_task_metrics")
+    task = SimpleNamespace(name="a.task", request=SimpleNamespace(is_eager=True))
+    on_task_prerun(task_id="abc", task=task)
+    on_task_postrun(task_id="abc", task=task)
+    on_task_retry(sender=task, request=task.request)
+    patched_record.assert_not_called()
@@ -2,6 +2,9 @@
 import sys
 import abc
 import json
+import os
+from time import perf_counter
+from collections import namedtuple
 from contextlib import contextmanager
 import traceback
 from unittest.mock import Mock
@@ -11,6 +14,8 @@ from importlib import reload, import_module
 
 import pytest
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls.base import clear_url_caches
 
 from rest_framework.renderers import JSONRenderer
@@ -202,3 +207,105 @@ def patched_feature_enabled(patch_dict):
         return features.is_enabled(*args, **kwargs)
 
     return _patched
+
+
+PERF_BASELINES_PATH = os.path.join(os.path.dirname(__file__), "perf_baselines.json")
+# Wall time and payload size vary between machines and with randomized factory data, so they only fail
+# when they go well past the recorded baseline. Query counts must never exceed it.
+PERF_ELAPSED_TOLERANCE = 5
+PERF_ELAPSED_SLACK_MS = 250
+PERF_PAYLOAD_TOLERANCE = 1.5
+
+EndpointMeasurement = namedtuple(
+    "EndpointMeasurement", ["response", "query_count", "elapsed_ms", "payload_bytes"]
+)
+
+
+def measure_request(client, method, url, **kwargs):
+    """
+    Make a request with a test client, recording the number of queries, the wall time and the size of the response
+
+    Args:
+        client (django.test.Client): A test client
+        method (str): The lowercase HTTP method, for example "get"
+        url (str): The URL to request
+        kwargs (dict): Extra arguments for the client method
+
+    Returns:
+        EndpointMeasurement: The response along with the measurements for it
+    """
+    with CaptureQueriesContext(connection) as captured:
+        start = perf_counter()
+        response = getattr(client, method)(url, **kwargs)
+        elapsed_ms = (perf_counter() - start) * 1000
+    return EndpointMeasurement(
+        response=response,
+        query_count=len(captured.captured_queries),
+        elapsed_ms=elapsed_ms,
+        payload_bytes=len(response.content),
+    )
+
+
+def load_perf_baselines():
+    """
+    Load the recorded endpoint baselines
+
+    Returns:
+        dict: Baselines keyed by endpoint name
+    """
+    if not os.path.exists(PERF_BASELINES_PATH):
+        return {}
+    with open(PERF_BASELINES_PATH) as f:
+        return json.load(f)
+
+
+def save_perf_baseline(name, measurement):
+    """
+    Record a measurement as the new baseline for an endpoint
+
+    Args:
+        name (str): The endpoint name
+        measurement (EndpointMeasurement): The measurement to record
+    """
+    baselines = load_perf_baselines()
+    baselines[name] = {
+        "queries": measurement.query_count,
+        "elapsed_ms": round(measurement.elapsed_ms, 2),
+        "payload_bytes": measurement.payload_bytes,
+    }
+    with open(PERF_BASELINES_PATH, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def assert_within_perf_baseline(name, measurement):
+    """
+    Assert that a measurement has not regressed compared to the recorded baseline for an endpoint.
+    Endpoints without a recorded baseline fail, so a missing baselines file can't make the check pass silently.
+
+    Args:
+        name (str): The endpoint name
+        measurement (EndpointMeasurement): The measurement to check
+    """
+    baseline = load_perf_baselines().get(name)
+    assert baseline is not None, (
+        f"No performance baseline is recorded for {name}. Run the query budget tests with "
+        f"--update-perf-baselines and commit main/perf_baselines.json"
+    )
+    assert measurement.query_count <= baseline["queries"], (
+        f"{name} made {measurement.query_count} queries, "
+        f"the baseline is {baseline['queries']}"
+    )
+    assert (
+        measurement.payload_bytes <= baseline["payload_bytes"] * PERF_PAYLOAD_TOLERANCE
+    ), (
+        f"{name} returned {measurement.payload_bytes} bytes, "
+        f"the baseline is {baseline['payload_bytes']}"
+    )
+    assert (
+        measurement.elapsed_ms
+        <= baseline["elapsed_ms"] * PERF_ELAPSED_TOLERANCE + PERF_ELAPSED_SLACK_MS
+    ), (
+        f"{name} took {measurement.elapsed_ms:.2f}ms, "
+        f"the baseline is {baseline['elapsed_ms']}ms"
+    )
@@ -13,7 +13,12 @@ from wagtail.core import urls as wagtail_urls
 from wagtail.documents import urls as wagtaildocs_urls
 from wagtail.images.views.serve import ServeView
 
-from main.views import react, BackgroundImagesCSSView, cms_login_redirect_view
+from main.views import (
+    react,
+    BackgroundImagesCSSView,
+    TaskTelemetryView,
+    cms_login_redirect_view,
+)
 
 root_urlpatterns = [url("", include(wagtail_urls))]
 
@@ -31,6 +36,7 @@ urlpatterns = (
         path("", include("klasses.urls")),
         url("", include("jobma.urls")),
         url(r"^logout/$", auth_views.LogoutView.as_view(), name="logout"),
+        path("api/task-telemetry/", TaskTelemetryView.as_view(), name="task-telemetry"),
         url(
             r"^background-images\.css$",
             BackgroundImagesCSSView.as_view(),
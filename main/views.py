@@ -8,7 +8,12 @@ from django.contrib.auth.views import redirect_to_login
 from django.shortcuts import render, redirect, reverse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import TemplateView
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from main.task_telemetry import get_task_telemetry
 from main.utils import has_all_keys
 
 
@@ -105,3 +110,14 @@ def cms_login_redirect_view(request):
     Redirects cms login page to site's login page
     """
     return redirect_to_login(reverse("wagtailadmin_home"), login_url=settings.LOGIN_URL)
+
+
+class TaskTelemetryView(APIView):
+    """Aggregated Celery task telemetry for staff"""
+
+    authentication_classes = (SessionAuthentication,)
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, *args, **kwargs):  # pylint: disable=unused-argument
+        """Return the histograms for every task which has recorded telemetry"""
+        return Response(get_task_telemetry())
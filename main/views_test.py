@@ -70,3 +70,22 @@ def test_cms_login_redirection(client, settings):
     """
     response = client.get("/cms", follow=True)
     assert response.request["PATH_INFO"] == settings.LOGIN_URL
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("is_staff", [True, False])
+def test_task_telemetry(mocker, client, user, is_staff):
+    """The task telemetry endpoint should only be available to staff"""
+    user.is_staff = is_staff
+    user.save()
+    client.force_login(user)
+    telemetry = {"a.task": {"retries": 2}}
+    patched_get = mocker.patch("main.views.get_task_telemetry", return_value=telemetry)
+    resp = client.get(reverse("task-telemetry"))
+    if is_staff:
+        assert resp.status_code == 200
+        assert resp.json() == telemetry
+        patched_get.assert_called_once_with()
+    else:
+        assert resp.status_code == 403
+        patched_get.assert_not_called()
@@ -4,13 +4,14 @@ import logging
 from django.contrib.auth import get_user_model
 
 from main.celery import app
+from main.semaphore import IntegrationTask
 from novoed import api
 
 log = logging.getLogger(__name__)
 User = get_user_model()
 
 
-@app.task
+@app.task(base=IntegrationTask, integration="novoed")
 def enroll_users_in_novoed_course(*, user_ids, novoed_course_stub):
     """
     Enrolls a group of users in a NovoEd course
@@ -40,7 +41,7 @@ def enroll_users_in_novoed_course(*, user_ids, novoed_course_stub):
     return results
 
 
-@app.task
+@app.task(base=IntegrationTask, integration="novoed")
 def unenroll_user_from_novoed_course(*, user_id, novoed_course_stub):
     """
     Unenrolls a user from a NovoEd course
@@ -59,3 +60,29 @@ def unenroll_user_from_novoed_course(*, user_id, novoed_course_stub):
             novoed_course_stub,
         )
         return user.email, False
+
+
+@app.task(base=IntegrationTask, integration="novoed")
+def unenroll_users_from_novoed_course(*, user_ids, novoed_course_stub):
+    """
+    Unenrolls a group of users from a NovoEd course
+
+    Returns:
+        dict: A dict containing the number of users unenrolled and the number that failed
+    """
+    users = User.objects.select_related("profile", "legal_address").filter(
+        id__in=user_ids
+    )
+    results = {"unenrolled": 0, "failed": 0}
+    for user in users:
+        try:
+            api.unenroll_from_novoed_course(user, novoed_course_stub)
+            results["unenrolled"] += 1
+        except:  # pylint: disable=bare-except
+            results["failed"] += 1
+            log.exception(
+                "User unenrollment from NovoEd failed (%s, %s)",
+                user.email,
+                novoed_course_stub,
+            )
+    return results
@@ -2,7 +2,11 @@
 """NovoEd task tests"""
 import pytest
 
-from novoed.tasks import enroll_users_in_novoed_course, unenroll_user_from_novoed_course
+from novoed.tasks import (
+    enroll_users_in_novoed_course,
+    unenroll_user_from_novoed_course,
+    unenroll_users_from_novoed_course,
+)
 from profiles.factories import UserFactory
 
 pytestmark = pytest.mark.django_db
@@ -38,3 +42,22 @@ def test_unenroll_user_from_novoed_course(patched_novoed_api):
     patched_novoed_api.unenroll_from_novoed_course.assert_called_once_with(
         user, FAKE_COURSE_STUB
     )
+
+
+def test_unenroll_users_from_novoed_course(patched_novoed_api):
+    """unenroll_users_from_novoed_course should unenroll each user and count the failures"""
+    users = UserFactory.create_batch(3)
+    patched_novoed_api.unenroll_from_novoed_course.side_effect = [
+        None,
+        Exception("error"),
+        None,
+    ]
+    result = unenroll_users_from_novoed_course.delay(
+        user_ids=[user.id for user in users], novoed_course_stub=FAKE_COURSE_STUB
+    ).get()
+    assert result == {"unenrolled": 2, "failed": 1}
+    assert patched_novoed_api.unenroll_from_novoed_course.call_count == len(users)
+    for user in users:
+        patched_novoed_api.unenroll_from_novoed_course.assert_any_call(
+            user, FAKE_COURSE_STUB
+        )
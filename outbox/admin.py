@@ -0,0 +1,40 @@
+"""
+Admin views for the outbox
+"""
+
+from django.contrib import admin
+
+from outbox.models import OutboxMessage
+
+
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """Admin for OutboxMessage"""
+
+    model = OutboxMessage
+
+    list_display = (
+        "id",
+        "task_name",
+        "aggregate",
+        "created_on",
+        "dispatched_on",
+        "attempts",
+        "next_attempt_at",
+        "failed_on",
+    )
+    list_filter = ("task_name", "failed_on")
+    search_fields = ("aggregate",)
+    readonly_fields = ("dedupe_key", "last_error")
+    actions = ["retry_failed_messages"]
+
+    def retry_failed_messages(self, request, queryset):
+        """Admin action to let the relay try publishing failed messages again"""
+        updated = queryset.filter(
+            dispatched_on__isnull=True, failed_on__isnull=False
+        ).update(failed_on=None, next_attempt_at=None, attempts=0)
+        self.message_user(request, f"{updated} message(s) will be retried")
+
+    retry_failed_messages.short_description = "Retry selected failed messages"
+
+
+admin.site.register(OutboxMessage, OutboxMessageAdmin)
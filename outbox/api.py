@@ -0,0 +1,249 @@
+"""API for the transactional outbox"""
+from datetime import timedelta
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+
+from main.celery import app
+from main.utils import now_in_utc
+from outbox.models import OutboxMessage
+
+log = logging.getLogger(__name__)
+
+# Key for the postgres advisory lock which ensures that only one relay claims messages at a time
+RELAY_LOCK_ID = 7_210_334
+# How long a relay has to publish the messages it claimed before another relay may publish them
+CLAIM_TIMEOUT = timedelta(minutes=5)
+DISPATCHED_MESSAGE_RETENTION = timedelta(days=7)
+# A message which can't be published is retried after 30 seconds, then 1 minute, 2 minutes... up to an hour
+RETRY_BACKOFF_SECONDS = 30
+RETRY_BACKOFF_MAX_SECONDS = 60 * 60
+
+
+def get_aggregate_label(obj):
+    """
+    Returns:
+        str: A label identifying a model object, e.g. "applications.bootcampapplication:12"
+    """
+    return f"{obj._meta.label_lower}:{obj.pk}"  # pylint: disable=protected-access
+
+
+def _make_dedupe_key(task_name, args, kwargs):
+    """Returns a hash which is the same for every request to run a task with the same arguments"""
+    serialized = json.dumps([task_name, args, kwargs], sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def enqueue_task(task, *, args=None, kwargs=None, aggregate=None, deduplicate=False):
+    """
+    Write a request to run a Celery task to the outbox. The task is published once the current transaction
+    commits, so it's never sent for changes which are rolled back and isn't lost if the broker is unavailable.
+
+    Args:
+        task (celery.Task): The task to run
+        args (Optional[list]): Positional arguments for the task. These must be JSON serializable.
+        kwargs (Optional[dict]): Keyword arguments for the task. These must be JSON serializable.
+        aggregate (Optional[django.db.models.Model]): The object the task is about. Tasks for the same object are
+            published in the order they were requested.
+        deduplicate (bool): If True, the task is only published once for every request with the same arguments
+            which has committed by the time the relay publishes it
+    """
+    args = list(args or [])
+    kwargs = kwargs or {}
+    message = OutboxMessage(
+        task_name=task.name,
+        args=args,
+        kwargs=kwargs,
+        aggregate=get_aggregate_label(aggregate) if aggregate is not None else None,
+        dedupe_key=_make_dedupe_key(task.name, args, kwargs) if deduplicate else None,
+    )
+    # Duplicates are always written and collapsed by the relay. Skipping the insert while another request was
+    # pending would lose this one if the pending message was published before this transaction committed.
+    message.save()
+    # One relay publishes everything the transaction wrote, so it only needs to be requested once
+    if not any(func is request_relay for _, func in connection.run_on_commit):
+        transaction.on_commit(request_relay)
+
+
+def request_relay():
+    """Ask a worker to publish outbox messages now, rather than on the next scheduled run of the relay"""
+    from outbox import tasks
+
+    try:
+        tasks.relay_outbox_messages.delay()
+    except Exception:  # pylint: disable=broad-except
+        log.exception(
+            "Unable to request an outbox relay, messages will be published on the next scheduled run"
+        )
+
+
+def _publish(message):
+    """Send the task for an outbox message to the broker"""
+    app.signature(
+        message.task_name, args=message.args, kwargs=message.kwargs
+    ).apply_async()
+
+
+def _get_ready_messages(now):
+    """
+    Returns:
+        QuerySet: Pending messages which aren't waiting to be retried or claimed by another relay, and aren't held
+            back by a message for the same aggregate which is
+    """
+    pending = OutboxMessage.objects.filter(
+        dispatched_on__isnull=True, failed_on__isnull=True
+    )
+    holding = pending.filter(
+        Q(next_attempt_at__gt=now) | Q(claimed_until__gt=now), aggregate__isnull=False
+    )
+    return pending.filter(
+        Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now),
+        Q(claimed_until__isnull=True) | Q(claimed_until__lte=now),
+    ).exclude(aggregate__in=holding.values("aggregate"))
+
+
+def _get_pending_duplicates(ready_messages, messages):
+    """
+    Returns:
+        list of OutboxMessage: Ready messages with the same dedupe key as any of the given messages
+    """
+    dedupe_keys = {
+        message.dedupe_key for message in messages if message.dedupe_key is not None
+    }
+    if not dedupe_keys:
+        return []
+    return list(
+        ready_messages.filter(dedupe_key__in=dedupe_keys)
+        .exclude(id__in=[message.id for message in messages])
+        .only("id", "aggregate", "dedupe_key")
+    )
+
+
+def _claim_batch(batch_size):
+    """
+    Claim a batch of ready messages and their pending duplicates, so other relays skip them while they're being
+    published. Claims are made one relay at a time, in a transaction which commits before anything is published.
+
+    Returns:
+        tuple of (list of OutboxMessage, list of OutboxMessage): The messages to publish, in order, and their
+            pending duplicates
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [RELAY_LOCK_ID])
+        now = now_in_utc()
+        ready_messages = _get_ready_messages(now)
+        messages = list(ready_messages.order_by("id")[:batch_size])
+        # Looked up before publishing, so requests which commit afterwards are published again
+        duplicates = _get_pending_duplicates(ready_messages, messages)
+        OutboxMessage.objects.filter(
+            id__in=[message.id for message in messages + duplicates]
+        ).update(claimed_until=now + CLAIM_TIMEOUT)
+    return messages, duplicates
+
+
+def _record_failure(message, exc):
+    """
+    Record a failed attempt to publish a message, and schedule the next attempt or give up on it
+
+    Args:
+        message (OutboxMessage): The message which couldn't be published
+        exc (Exception): The error raised while publishing it
+    """
+    attempts = message.attempts + 1
+    now = now_in_utc()
+    if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        log.error(
+            "Giving up on outbox message %d for %s after %d attempts",
+            message.id,
+            message.task_name,
+            attempts,
+        )
+        updates = {"failed_on": now}
+    else:
+        backoff = min(
+            RETRY_BACKOFF_SECONDS * 2 ** message.attempts, RETRY_BACKOFF_MAX_SECONDS
+        )
+        updates = {"next_attempt_at": now + timedelta(seconds=backoff)}
+    OutboxMessage.objects.filter(id=message.id).update(
+        attempts=attempts, last_error=str(exc), claimed_until=None, **updates
+    )
+
+
+def relay_messages(batch_size):
+    """
+    Publish a batch of pending outbox messages to Celery in the order they were written. The batch is claimed in
+    one short transaction, published outside of a transaction so a slow broker doesn't hold one open, and the
+    results are recorded in a second short transaction. Nothing is held on the connection between them, so this
+    works behind pgbouncer's transaction pooling. A claim expires after CLAIM_TIMEOUT, so messages claimed by a
+    relay which died before recording its results are published again.
+
+    If a message can't be published it's retried with an exponential backoff, and messages for the same
+    aggregate are held back until it's published so they aren't published out of order. After
+    OUTBOX_MAX_ATTEMPTS failures the message is marked as failed and no longer holds anything back.
+
+    A deduplicated task is published once, and every pending message with the same dedupe key is marked as
+    dispatched along with it.
+
+    Args:
+        batch_size (int): The maximum number of messages to publish
+
+    Returns:
+        int: The number of messages published
+    """
+    messages, duplicates = _claim_batch(batch_size)
+    dispatched_ids = []
+    failures = []
+    published_keys = set()
+    blocked_aggregates = set()
+    for message in messages:
+        if message.aggregate in blocked_aggregates:
+            continue
+        if message.dedupe_key is None or message.dedupe_key not in published_keys:
+            try:
+                _publish(message)
+            except Exception as exc:  # pylint: disable=broad-except
+                log.exception("Unable to publish outbox message %d", message.id)
+                failures.append((message, exc))
+                if message.aggregate is not None:
+                    blocked_aggregates.add(message.aggregate)
+                continue
+            if message.dedupe_key is not None:
+                published_keys.add(message.dedupe_key)
+        dispatched_ids.append(message.id)
+
+    collapsed_ids = {
+        duplicate.id
+        for duplicate in duplicates
+        if duplicate.dedupe_key in published_keys
+        and duplicate.aggregate not in blocked_aggregates
+    }
+    with transaction.atomic():
+        for message, exc in failures:
+            _record_failure(message, exc)
+        OutboxMessage.objects.filter(id__in=collapsed_ids.union(dispatched_ids)).update(
+            dispatched_on=now_in_utc(), claimed_until=None, attempts=F("attempts") + 1
+        )
+        # Release the claim on messages which were held back or whose duplicate couldn't be published
+        OutboxMessage.objects.filter(
+            id__in=[message.id for message in messages + duplicates],
+            dispatched_on__isnull=True,
+        ).update(claimed_until=None)
+    return len(dispatched_ids)
+
+
+def delete_dispatched_messages():
+    """
+    Delete messages which were published more than DISPATCHED_MESSAGE_RETENTION ago
+
+    Returns:
+        int: The number of messages deleted
+    """
+    deleted, _ = OutboxMessage.objects.filter(
+        dispatched_on__lt=now_in_utc() - DISPATCHED_MESSAGE_RETENTION
+    ).delete()
+    return deleted
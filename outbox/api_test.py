@@ -0,0 +1,311 @@
+"""Tests for the outbox API"""
+from datetime import timedelta
+
+from django.db import connection, transaction
+import pytest
+
+from klasses.factories import BootcampRunFactory
+from main.utils import now_in_utc
+from outbox.api import (
+    CLAIM_TIMEOUT,
+    DISPATCHED_MESSAGE_RETENTION,
+    RETRY_BACKOFF_MAX_SECONDS,
+    RETRY_BACKOFF_SECONDS,
+    delete_dispatched_messages,
+    enqueue_task,
+    get_aggregate_label,
+    relay_messages,
+    request_relay,
+)
+from outbox.models import OutboxMessage
+from outbox.tasks import relay_outbox_messages
+
+pytestmark = pytest.mark.django_db
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture
+def patched_on_commit(mocker):
+    """Patch on_commit so the relay isn't requested"""
+    return mocker.patch("outbox.api.transaction.on_commit")
+
+
+@pytest.fixture
+def patched_publish(mocker):
+    """Patch the function which sends tasks to the broker"""
+    return mocker.patch("outbox.api._publish")
+
+
+def test_enqueue_task(patched_on_commit):
+    """enqueue_task should write the task to the outbox and request a relay after the transaction commits"""
+    bootcamp_run = BootcampRunFactory.create()
+    enqueue_task(
+        relay_outbox_messages, args=[1], kwargs={"a": "b"}, aggregate=bootcamp_run
+    )
+    message = OutboxMessage.objects.get()
+    assert message.task_name == "outbox.tasks.relay_outbox_messages"
+    assert message.args == [1]
+    assert message.kwargs == {"a": "b"}
+    assert message.aggregate == f"klasses.bootcamprun:{bootcamp_run.id}"
+    assert message.aggregate == get_aggregate_label(bootcamp_run)
+    assert message.dedupe_key is None
+    assert message.dispatched_on is None
+    patched_on_commit.assert_called_once_with(request_relay)
+
+
+def test_enqueue_task_request_relay_once():
+    """The relay should only be requested once per transaction, however many tasks are enqueued"""
+
+    def relay_requests():
+        """Returns the number of relay requests waiting for the transaction to commit"""
+        return [func for _, func in connection.run_on_commit].count(request_relay)
+
+    enqueue_task(relay_outbox_messages, args=[1])
+    enqueue_task(relay_outbox_messages, args=[2])
+    assert relay_requests() == 1
+
+    connection.run_on_commit.clear()
+    with pytest.raises(ZeroDivisionError):
+        with transaction.atomic():
+            enqueue_task(relay_outbox_messages, args=[3])
+            assert relay_requests() == 1
+            raise ZeroDivisionError
+    assert relay_requests() == 0
+    enqueue_task(relay_outbox_messages, args=[4])
+    assert relay_requests() == 1
+
+
+@pytest.mark.usefixtures("patched_on_commit")
+def test_enqueue_task_deduplicate(patched_publish):
+    """A deduplicated task should be published once for all of the requests which were pending"""
+    for _ in range(2):
+        enqueue_task(relay_outbox_messages, args=[1], deduplicate=True)
+        enqueue_task(relay_outbox_messages, args=[2], deduplicate=True)
+        enqueue_task(relay_outbox_messages, args=[1])
+    assert OutboxMessage.objects.count() == 6
+
+    assert relay_messages(10) == 6
+    assert [call[0][0].args for call in patched_publish.call_args_list] == [
+        [1],
+        [2],
+        [1],
+        [1],
+    ]
+    assert not OutboxMessage.objects.filter(dispatched_on__isnull=True).exists()
+
+    enqueue_task(relay_outbox_messages, args=[1], deduplicate=True)
+    assert relay_messages(10) == 1
+    assert patched_publish.call_count == 5
+
+
+@pytest.mark.usefixtures("patched_on_commit")
+def test_relay_messages_deduplicate_outside_batch(patched_publish):
+    """Pending duplicates after the end of the batch should be dispatched along with the one which was published"""
+    enqueue_task(relay_outbox_messages, args=[1], deduplicate=True)
+    enqueue_task(relay_outbox_messages, args=[2])
+    enqueue_task(relay_outbox_messages, args=[1], deduplicate=True)
+
+    assert relay_messages(2) == 2
+    assert patched_publish.call_count == 2
+    assert not OutboxMessage.objects.filter(dispatched_on__isnull=True).exists()
+
+
+@pytest.mark.usefixtures("patched_on_commit")
+def test_relay_messages_deduplicate_error(patched_publish):
+    """If a deduplicated task can't be published, none of its pending messages should be marked as dispatched"""
+    bootcamp_run = BootcampRunFactory.create()
+    for _ in range(2):
+        enqueue_task(
+            relay_outbox_messages, args=[1], aggregate=bootcamp_run, deduplicate=True
+        )
+    patched_publish.side_effect = ConnectionError("broker unavailable")
+
+    assert relay_messages(10) == 0
+    assert OutboxMessage.objects.filter(dispatched_on__isnull=True).count() == 2
+
+
+@pytest.mark.usefixtures("patched_on_commit")
+def test_relay_messages(patched_publish):
+    """relay_messages should publish pending messages in order and mark them as dispatched"""
+    for value in range(5):
+        enqueue_task(relay_outbox_messages, args=[value])
+
+    assert relay_messages(3) == 3
+    assert relay_messages(3) == 2
+    assert relay_messages(3) == 0
+    assert [call[0][0].args for call in patched_publish.call_args_list] == [
+        [0],
+        [1],
+        [2],
+        [3],
+        [4],
+    ]
+    assert not OutboxMessage.objects.filter(dispatched_on__isnull=True).exists()
+    assert set(OutboxMessage.objects.values_list("attempts", flat=True)) == {1}
+
+
+@pytest.mark.usefixtures("patched_on_commit")
+def test_relay_messages_error(mocker, patched_publish):
+    """
+    If a message can't be published it should be retried after a backoff, and later messages for the same
+    aggregate should wait for it
+    """
+    first_run, second_run = BootcampRunFactory.create_batch(2)
+    enqueue_task(relay_outbox_messages, args=["fails"], aggregate=first_run)
+    enqueue_task(relay_outbox_messages, args=["held back"], aggregate=first_run)
+    enqueue_task(relay_outbox_messages, args=["other"], aggregate=second_run)
+    enqueue_task(relay_outbox_messages, args=["no aggregate"])
+    patched_publish.side_effect = [ConnectionError("broker unavailable"), None, None]
+    now = now_in_utc()
+    mocker.patch("outbox.api.now_in_utc", return_value=now)
+
+    assert relay_messages(10) == 2
+    failed = OutboxMessage.objects.get(args=["fails"])
+    assert failed.dispatched_on is None
+    assert failed.attempts == 1
+    assert failed.last_error == "broker unavailable"
+    assert failed.next_attempt_at == now + timedelta(seconds=RETRY_BACKOFF_SECONDS)
+    assert OutboxMessage.objects.get(args=["held back"]).dispatched_on is None
+    assert OutboxMessage.objects.get(args=["other"]).dispatched_on is not None
+
+    patched_publish.side_effect = None
+    enqueue_task(relay_outbox_messages, args=["later"])
+    assert relay_messages(10) == 1
+    assert patched_publish.call_args[0][0].args == ["later"]
+
+    mocker.patch(
+        "outbox.api.now_in_utc",
+        return_value=now + timedelta(seconds=RETRY_BACKOFF_SECONDS),
+    )
+    assert relay_messages(10) == 2
+    assert [call[0][0].args for call in patched_publish.call_args_list[-2:]] == [
+        ["fails"],
+        ["held back"],
+    ]
+
+
+@pytest.mark.usefixtures("patched_on_commit")
+@pytest.mark.parametrize(
+    "attempts, expected_backoff",
+    [[0, 30], [1, 60], [3, 240], [7, RETRY_BACKOFF_MAX_SECONDS]],
+)
+def test_relay_messages_backoff(mocker, patched_publish, attempts, expected_backoff):
+    """The time before a message is retried should double after each failure, up to a limit"""
+    enqueue_task(relay_outbox_messages)
+    OutboxMessage.objects.update(attempts=attempts)
+    patched_publish.side_effect = ConnectionError
+    now = now_in_utc()
+    mocker.patch("outbox.api.now_in_utc", return_value=now)
+
+    assert relay_messages(10) == 0
+    message = OutboxMessage.objects.get()
+    assert message.attempts == attempts + 1
+    assert message.next_attempt_at == now + timedelta(seconds=expected_backoff)
+    assert message.failed_on is None
+
+
+@pytest.mark.usefixtures("patched_on_commit")
+def test_relay_messages_max_attempts(mocker, settings, patched_publish):
+    """A message should be marked as failed after too many attempts, and stop holding back its aggregate"""
+    settings.OUTBOX_MAX_ATTEMPTS = 3
+    bootcamp_run = BootcampRunFactory.create()
+    enqueue_task(relay_outbox_messages, args=["fails"], aggregate=bootcamp_run)
+    enqueue_task(relay_outbox_messages, args=["held back"], aggregate=bootcamp_run)
+    OutboxMessage.objects.filter(args=["fails"]).update(attempts=2)
+    patched_publish.side_effect = [ConnectionError("broker unavailable"), None]
+    patched_log = mocker.patch("outbox.api.log")
+
+    assert relay_messages(10) == 0
+    failed = OutboxMessage.objects.get(args=["fails"])
+    assert failed.attempts == 3
+    assert failed.failed_on is not None
+    assert failed.next_attempt_at is None
+    patched_log.error.assert_called_once()
+
+    assert relay_messages(10) == 1
+    assert patched_publish.call_args[0][0].args == ["held back"]
+    assert OutboxMessage.objects.get(args=["fails"]).dispatched_on is None
+
+
+@pytest.mark.usefixtures("patched_on_commit")
+def test_relay_messages_outside_transaction(patched_publish):
+    """Messages should be claimed before they're published, and published outside of the claim's transaction"""
+    enqueue_task(relay_outbox_messages)
+    savepoints = len(connection.savepoint_ids)
+
+    def publish(message):
+        """Check that the message was claimed, and that the claim's transaction has finished"""
+        assert len(connection.savepoint_ids) == savepoints
+        assert OutboxMessage.objects.get(id=message.id).claimed_until > now_in_utc()
+
+    patched_publish.side_effect = publish
+
+    assert relay_messages(10) == 1
+    patched_publish.assert_called_once()
+    message = OutboxMessage.objects.get()
+    assert message.dispatched_on is not None
+    assert message.claimed_until is None
+
+
+@pytest.mark.usefixtures("patched_on_commit")
+def test_relay_messages_claimed(patched_publish):
+    """Messages claimed by another relay, and later messages for the same aggregate, should be skipped"""
+    first_run, second_run = BootcampRunFactory.create_batch(2)
+    enqueue_task(relay_outbox_messages, args=["claimed"], aggregate=first_run)
+    enqueue_task(relay_outbox_messages, args=["held back"], aggregate=first_run)
+    enqueue_task(relay_outbox_messages, args=["expired"], aggregate=second_run)
+    now = now_in_utc()
+    OutboxMessage.objects.filter(args=["claimed"]).update(
+        claimed_until=now + CLAIM_TIMEOUT
+    )
+    OutboxMessage.objects.filter(args=["expired"]).update(
+        claimed_until=now - timedelta(seconds=1)
+    )
+
+    assert relay_messages(10) == 1
+    assert patched_publish.call_args[0][0].args == ["expired"]
+    assert OutboxMessage.objects.get(args=["held back"]).claimed_until is None
+
+
+@pytest.mark.usefixtures("patched_on_commit")
+def test_relay_messages_release_claims(patched_publish):
+    """Messages which weren't published should be released for the next relay"""
+    bootcamp_run = BootcampRunFactory.create()
+    enqueue_task(relay_outbox_messages, args=["fails"], aggregate=bootcamp_run)
+    enqueue_task(relay_outbox_messages, args=["held back"], aggregate=bootcamp_run)
+    patched_publish.side_effect = ConnectionError
+
+    assert relay_messages(10) == 0
+    assert list(OutboxMessage.objects.values_list("claimed_until", flat=True)) == [
+        None,
+        None,
+    ]
+
+
+def test_request_relay_error(mocker):
+    """request_relay should log an error instead of raising if the broker is unavailable"""
+    mocker.patch(
+        "outbox.tasks.relay_outbox_messages.delay", side_effect=ConnectionError
+    )
+    patched_log = mocker.patch("outbox.api.log")
+    request_relay()
+    patched_log.exception.assert_called_once()
+
+
+@pytest.mark.usefixtures("patched_on_commit")
+def test_delete_dispatched_messages():
+    """delete_dispatched_messages should only delete messages which were published a while ago"""
+    now = now_in_utc()
+    for dispatched_on in [
+        None,
+        now,
+        now - DISPATCHED_MESSAGE_RETENTION + timedelta(hours=1),
+        now - DISPATCHED_MESSAGE_RETENTION - timedelta(hours=1),
+    ]:
+        enqueue_task(relay_outbox_messages)
+        OutboxMessage.objects.filter(id=OutboxMessage.objects.latest("id").id).update(
+            dispatched_on=dispatched_on
+        )
+    assert delete_dispatched_messages() == 1
+    assert OutboxMessage.objects.count() == 3
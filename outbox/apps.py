@@ -0,0 +1,8 @@
+"""App config for the outbox"""
+from django.apps import AppConfig
+
+
+class OutboxConfig(AppConfig):
+    """AppConfig for outbox"""
+
+    name = "outbox"
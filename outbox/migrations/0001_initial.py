@@ -0,0 +1,67 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxMessage",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+                ("updated_on", models.DateTimeField(auto_now=True)),
+                ("task_name", models.CharField(max_length=255)),
+                (
+                    "args",
+                    django.contrib.postgres.fields.jsonb.JSONField(
+                        blank=True, default=list
+                    ),
+                ),
+                (
+                    "kwargs",
+                    django.contrib.postgres.fields.jsonb.JSONField(
+                        blank=True, default=dict
+                    ),
+                ),
+                ("aggregate", models.CharField(blank=True, max_length=255, null=True)),
+                ("dedupe_key", models.CharField(blank=True, max_length=64, null=True)),
+                (
+                    "dispatched_on",
+                    models.DateTimeField(blank=True, db_index=True, null=True),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="outboxmessage",
+            index=models.Index(
+                condition=models.Q(dispatched_on__isnull=True),
+                fields=["id"],
+                name="outbox_pending_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="outboxmessage",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(dispatched_on__isnull=True),
+                fields=("dedupe_key",),
+                name="outbox_pending_dedupe_key",
+            ),
+        ),
+    ]
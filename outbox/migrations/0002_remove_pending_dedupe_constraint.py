@@ -0,0 +1,22 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("outbox", "0001_initial")]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="outboxmessage", name="outbox_pending_dedupe_key"
+        ),
+        migrations.AddIndex(
+            model_name="outboxmessage",
+            index=models.Index(
+                condition=models.Q(dispatched_on__isnull=True),
+                fields=["dedupe_key"],
+                name="outbox_pending_dedupe_idx",
+            ),
+        ),
+    ]
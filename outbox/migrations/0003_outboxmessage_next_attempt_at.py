@@ -0,0 +1,21 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("outbox", "0002_remove_pending_dedupe_constraint")]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="next_attempt_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="failed_on",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("outbox", "0003_outboxmessage_next_attempt_at")]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="claimed_until",
+            field=models.DateTimeField(blank=True, null=True),
+        )
+    ]
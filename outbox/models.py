@@ -0,0 +1,48 @@
+"""Models for the transactional outbox"""
+from django.contrib.postgres.fields import JSONField
+from django.db import models
+
+from main.models import TimestampedModel
+
+
+class OutboxMessage(TimestampedModel):
+    """
+    A Celery task which was requested inside a database transaction. It's written in the same transaction as
+    the change which caused it, and published to the broker by the relay once that transaction has committed.
+    """
+
+    task_name = models.CharField(max_length=255)
+    args = JSONField(default=list, blank=True)
+    kwargs = JSONField(default=dict, blank=True)
+    # Identifies the object the message is about, e.g. "applications.bootcampapplication:12". Messages for the
+    # same aggregate are published in the order they were written.
+    aggregate = models.CharField(max_length=255, blank=True, null=True)
+    # Set for tasks which only need to run once no matter how many times they were requested before publishing.
+    # The relay publishes one of the pending messages with the same key and marks the rest as dispatched.
+    dedupe_key = models.CharField(max_length=64, blank=True, null=True)
+    dispatched_on = models.DateTimeField(null=True, blank=True, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    # Set after a failed attempt to publish the message, which isn't retried before then
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    # Set while a relay is publishing the message, so other relays skip it until then
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    # Set when the relay gives up on publishing the message after OUTBOX_MAX_ATTEMPTS failures
+    failed_on = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(dispatched_on__isnull=True),
+                name="outbox_pending_idx",
+            ),
+            models.Index(
+                fields=["dedupe_key"],
+                condition=models.Q(dispatched_on__isnull=True),
+                name="outbox_pending_dedupe_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Outbox message {self.id} for {self.task_name}"
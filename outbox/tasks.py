@@ -0,0 +1,27 @@
+"""Tasks for the transactional outbox"""
+import logging
+
+from django.conf import settings
+
+from main.celery import app
+from outbox import api
+
+log = logging.getLogger(__name__)
+
+
+@app.task
+def relay_outbox_messages():
+    """Publish pending outbox messages in batches until none are left"""
+    total = 0
+    published = api.relay_messages(settings.OUTBOX_BATCH_SIZE)
+    while published == settings.OUTBOX_BATCH_SIZE:
+        total += published
+        published = api.relay_messages(settings.OUTBOX_BATCH_SIZE)
+    return total + published
+
+
+@app.task
+def delete_dispatched_outbox_messages():
+    """Delete outbox messages which were published a while ago"""
+    deleted = api.delete_dispatched_messages()
+    log.info("Deleted %d dispatched outbox messages", deleted)
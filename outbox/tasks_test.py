@@ -0,0 +1,11 @@
+"""Tests for outbox tasks"""
+from outbox.tasks import relay_outbox_messages
+
+
+def test_relay_outbox_messages(mocker, settings):
+    """relay_outbox_messages should keep publishing batches until one isn't full"""
+    settings.OUTBOX_BATCH_SIZE = 5
+    relay_mock = mocker.patch("outbox.tasks.api.relay_messages", side_effect=[5, 5, 2])
+    assert relay_outbox_messages.delay().get() == 12
+    assert relay_mock.call_count == 3
+    relay_mock.assert_called_with(5)
@@ -0,0 +1,2 @@
+"""Initialize profiles app"""
+default_app_config = "profiles.apps.ProfilesConfig"
@@ -1,19 +1,30 @@
 """Users api"""
+import logging
 import re
-from functools import reduce
-import operator
-
-from django.db.models import Q
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import transaction
+from django.db.models import DecimalField, Max, Q
+from django.db.models.functions import Cast, Greatest, Lower, Substr
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 from django.contrib.auth import get_user_model
 
-from main.utils import first_or_none, unique, unique_ignore_case, max_or_none
+from main.utils import first_or_none, unique, unique_ignore_case
 from profiles.constants import USERNAME_MAX_LEN
 
 User = get_user_model()
 
+log = logging.getLogger(__name__)
+
 CASE_INSENSITIVE_SEARCHABLE_FIELDS = {"email"}
+# Bump this when the output of UserSerializer changes so that users aren't served stale data after a deploy
+SERIALIZED_USER_CACHE_VERSION = 1
+# The maximum number of users a search returns
+USER_SEARCH_LIMIT = 1000
 
 
 def get_user_by_id(user_id):
@@ -61,6 +72,80 @@ def _determine_filter_field(user_property):
             return "username"
 
 
+def _normalize_lookup_value(filter_field, value, ignore_case):
+    """
+    Normalizes a value, or a User's field value, so that values which match each other are equal
+
+    Args:
+        filter_field (str): The User field name being searched
+        value (Union[str, int]): The value
+        ignore_case (bool): If True, the value is being matched case-insensitively
+    Returns:
+        Union[str, int]: The normalized value
+    """
+    if _is_case_insensitive_searchable(filter_field) and ignore_case:
+        return str(value).lower()
+    if filter_field == "id":
+        return int(value)
+    return value
+
+
+def _user_lookup(filter_field, filter_values, ignore_case):
+    """
+    Builds a query for Users matching any of some values of a field. Case-insensitive lookups compare
+    LOWER(field) with an IN list so that the functional index on LOWER(email) can be used.
+
+    Args:
+        filter_field (str): The User field name to filter on
+        filter_values (iterable of Union[str, int]): The values to match
+        ignore_case (bool): If True, the values are matched case-insensitively
+    Returns:
+        QuerySet: Users matching any of the values
+    """
+    lookup_values = {
+        _normalize_lookup_value(filter_field, value, ignore_case)
+        for value in filter_values
+    }
+    if _is_case_insensitive_searchable(filter_field) and ignore_case:
+        lowered_field = f"{filter_field}_lower"
+        return User.objects.annotate(**{lowered_field: Lower(filter_field)}).filter(
+            **{f"{lowered_field}__in": lookup_values}
+        )
+    return User.objects.filter(**{f"{filter_field}__in": lookup_values})
+
+
+def find_users(filter_values, ignore_case=True):
+    """
+    Finds Users matching a set of ids, emails, or usernames in a single query, and reports which
+    values didn't match any User. The property being searched is determined by the first value.
+
+    Args:
+        filter_values (list of Union[str, int]): The ids, emails, or usernames of the target Users
+        ignore_case (bool): If True, emails are matched case-insensitively
+    Returns:
+        (list of User, list of Union[str, int]): The Users which were found, and the values which
+            didn't match a User
+    """
+    first_user_property = first_or_none(filter_values)
+    if not first_user_property:
+        return [], []
+    filter_field = _determine_filter_field(first_user_property)
+    users = list(_user_lookup(filter_field, filter_values, ignore_case))
+    found_values = {
+        _normalize_lookup_value(filter_field, getattr(user, filter_field), ignore_case)
+        for user in users
+    }
+    return (
+        users,
+        [
+            value
+            for value in filter_values
+            if _normalize_lookup_value(filter_field, value, ignore_case)
+            not in found_values
+        ],
+    )
+
+
 def fetch_user(filter_value, ignore_case=True):
     """
     Attempts to fetch a user based on several properties
@@ -72,13 +157,8 @@ def fetch_user(filter_value, ignore_case=True):
         User: A user that matches the given property
     """
     filter_field = _determine_filter_field(filter_value)
-
-    if _is_case_insensitive_searchable(filter_field) and ignore_case:
-        query = {"{}__iexact".format(filter_field): filter_value}
-    else:
-        query = {filter_field: filter_value}
     try:
-        return User.objects.get(**query)
+        return _user_lookup(filter_field, [filter_value], ignore_case).get()
     except User.DoesNotExist as e:
         raise User.DoesNotExist(
             "Could not find User with {}={} ({})".format(
@@ -99,7 +179,7 @@ def fetch_users(filter_values, ignore_case=True):
         filter_values (iterable of Union[str, int]): The ids, emails, or usernames of the target Users
         ignore_case (bool): If True, the User query will be case-insensitive
     Returns:
-        User queryset or None: Users that match the given properties
+        list of User or None: Users that match the given properties
     """
 
     first_user_property = first_or_none(filter_values)
@@ -120,22 +200,8 @@ def fetch_users(filter_values, ignore_case=True):
             )
         )
 
-    if is_case_insensitive_searchable and ignore_case:
-        query = reduce(
-            operator.or_,
-            (
-                Q(**{"{}__iexact".format(filter_field): filter_value})
-                for filter_value in filter_values
-            ),
-        )
-        user_qset = User.objects.filter(query)
-    else:
-        user_qset = User.objects.filter(
-            **{"{}__in".format(filter_field): filter_values}
-        )
-    if not user_qset.count() == len(filter_values):
-        valid_values = user_qset.values_list(filter_field, flat=True)
-        invalid_values = set(filter_values) - set(valid_values)
+    users, invalid_values = find_users(filter_values, ignore_case=ignore_case)
+    if invalid_values:
         raise User.DoesNotExist(
             "Could not find Users with these '{}' values ({}): {}".format(
                 filter_field,
@@ -143,7 +209,45 @@ def fetch_users(filter_values, ignore_case=True):
                 sorted(list(invalid_values)),
             )
         )
-    return user_qset
+    return users
+
+
+def get_suffixed_usernames(username_base):
+    """
+    Returns a queryset of users whose username is the username base followed by digits
+
+    Args:
+        username_base (str): The username base
+    Returns:
+        QuerySet: Users with a suffixed username
+    """
+    return User.objects.filter(
+        username__startswith=username_base,
+        username__regex=r"^{}[0-9]+$".format(re.escape(username_base)),
+    )
+
+
+def get_max_username_suffix(username_base):
+    """
+    Finds the largest numeric suffix among usernames which are the username base followed by digits.
+    The prefix match can use the varchar_pattern_ops index postgres has on auth_user.username, so
+    only usernames starting with the base are scanned, and the maximum is computed in the database.
+
+    Args:
+        username_base (str): The username base
+    Returns:
+        int or None: The largest suffix, or None if no usernames have a suffix
+    """
+    suffix = Cast(
+        Substr("username", len(username_base) + 1),
+        output_field=DecimalField(
+            max_digits=User._meta.get_field("username").max_length, decimal_places=0
+        ),
+    )
+    max_suffix = get_suffixed_usernames(username_base).aggregate(
+        max_suffix=Max(suffix)
+    )["max_suffix"]
+    return int(max_suffix) if max_suffix is not None else None
 
 
 def find_available_username(initial_username_base):
@@ -181,13 +285,7 @@ def find_available_username(initial_username_base):
         username_base = initial_username_base[
             0 : len(initial_username_base) - letters_to_truncate
         ]
-        # Find usernames that match the username base and have a numerical suffix, then find the max suffix
-        existing_usernames = User.objects.filter(
-            username__regex=r"{username_base}[0-9]+".format(username_base=username_base)
-        ).values_list("username", flat=True)
-        max_suffix = max_or_none(
-            int(re.search(r"\d+$", username).group()) for username in existing_usernames
-        )
+        max_suffix = get_max_username_suffix(username_base)
         if max_suffix is None:
             return "".join([username_base, str(current_min_suffix)])
         else:
@@ -256,3 +354,130 @@ def is_user_info_complete(user):
         and hasattr(user, "legal_address")
         and user.legal_address.is_complete
     )
+
+
+def get_user_search_rank(text, user_path=None):
+    """
+    Returns an expression for how closely a user's email, username or name matches some search text
+
+    Args:
+        text (str): The search text
+        user_path (Optional[str]): The path to the user from the model being queried, e.g. "order__user"
+
+    Returns:
+        Func: The highest trigram similarity between the text and the user's email, username and name
+    """
+    prefix = f"{user_path}__" if user_path else ""
+    return Greatest(
+        TrigramSimilarity(f"{prefix}email", text),
+        TrigramSimilarity(f"{prefix}username", text),
+        TrigramSimilarity(f"{prefix}profile__name", text),
+    )
+
+
+def search_users(text, limit=USER_SEARCH_LIMIT):
+    """
+    Finds the users whose email, username or name contains some text, best matches first. Each of those
+    columns has a trigram index that postgres uses for the case-insensitive substring match. Users are
+    matched by name in a separate query so that the query on auth_user can combine its own indexes rather
+    than scanning the table.
+
+    Args:
+        text (str): The search text
+        limit (int): The maximum number of users to return
+
+    Returns:
+        list of int: The ids of the matching users, best match first
+    """
+    text = text.strip()
+    if not text:
+        return []
+    name_matches = User.objects.filter(profile__name__icontains=text).values_list(
+        "id", flat=True
+    )[:limit]
+    return list(
+        User.objects.filter(
+            Q(email__icontains=text)
+            | Q(username__icontains=text)
+            | Q(id__in=list(name_matches))
+        )
+        .annotate(search_rank=get_user_search_rank(text))
+        .order_by("-search_rank", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+
+
+def _serialized_user_version_key(user_id):
+    """Returns the cache key for the current version of a user's serialized data"""
+    return f"serialized_user_version:{user_id}"
+
+
+def _serialized_user_key(user_id, version):
+    """Returns the cache key for a version of a user's serialized data"""
+    return f"serialized_user:{SERIALIZED_USER_CACHE_VERSION}:{user_id}:{version}"
+
+
+def _get_serialized_user_version(user_id):
+    """Returns the current version of a user's serialized data, creating one if there isn't one yet"""
+    version_key = _serialized_user_version_key(user_id)
+    version = cache.get(version_key)
+    if version is None:
+        # If another request creates a version at the same time, theirs is kept and used here too
+        cache.add(version_key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(version_key)
+    return version
+
+
+def get_serialized_user(user):
+    """
+    Serializes a user with UserSerializer, using a per-user cache. The cached data is versioned, and changing
+    the version on invalidation means a request which read the user before a change can't overwrite the
+    cache with stale data afterwards. If the cache is unavailable the user is serialized directly.
+
+    Args:
+        user (Union[User, AnonymousUser]): The user to serialize
+
+    Returns:
+        dict: The serialized user
+    """
+    from profiles.serializers import UserSerializer
+
+    if user.is_anonymous or not settings.USER_CACHE_TIMEOUT:
+        return UserSerializer(user).data
+
+    try:
+        key = _serialized_user_key(user.id, _get_serialized_user_version(user.id))
+        data = cache.get(key)
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Unable to read the cached serialized user %d", user.id)
+        return UserSerializer(user).data
+
+    if data is None:
+        data = dict(UserSerializer(user).data)
+        try:
+            cache.set(key, data, timeout=settings.USER_CACHE_TIMEOUT)
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Unable to cache the serialized user %d", user.id)
+    return data
+
+
+def _change_serialized_user_version(user_id):
+    """Give a user's serialized data a new version so that previously cached data is no longer used"""
+    try:
+        cache.set(_serialized_user_version_key(user_id), uuid.uuid4().hex, timeout=None)
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Unable to invalidate the cached serialized user %d", user_id)
+
+
+def invalidate_serialized_user(user_id):
+    """
+    Invalidate a user's cached serialized data. This happens immediately and again once the current transaction
+    commits, since a request could cache the uncommitted data from before the change in the meantime.
+
+    Args:
+        user_id (int): The user id
+    """
+    if not settings.USER_CACHE_TIMEOUT:
+        return
+    _change_serialized_user_version(user_id)
+    transaction.on_commit(lambda: _change_serialized_user_version(user_id))
@@ -8,10 +8,16 @@ from profiles.api import (
     get_user_by_id,
     fetch_user,
     fetch_users,
+    find_users,
     find_available_username,
+    get_max_username_suffix,
+    get_serialized_user,
+    invalidate_serialized_user,
     get_first_and_last_names,
     is_user_info_complete,
+    search_users,
 )
+from profiles.serializers import UserSerializer
 from profiles.utils import usernameify
 from profiles.factories import UserFactory, LegalAddressFactory, ProfileFactory
 
@@ -117,6 +123,35 @@ def test_fetch_users_fail(prop, existing_values, missing_values):
         fetch_users(fetch_users_values)
 
 
+@pytest.mark.django_db
+def test_find_users(django_assert_num_queries):
+    """find_users should return the matching Users and the values which didn't match in one query"""
+    users = UserFactory.create_batch(
+        2, email=factory.Iterator(["abc@example.com", "Def@Example.com"])
+    )
+    values = ["ABC@example.com", "missing@example.com", "def@example.COM"]
+    with django_assert_num_queries(1):
+        found_users, missing_values = find_users(values)
+    assert set(found_users) == set(users)
+    assert missing_values == ["missing@example.com"]
+
+    found_users, missing_values = find_users(values, ignore_case=False)
+    assert found_users == []
+    assert missing_values == values
+
+
+@pytest.mark.django_db
+def test_find_users_by_id():
+    """find_users should match ids given as strings or ints"""
+    user = UserFactory.create()
+    assert find_users([str(user.id), user.id + 1000]) == ([user], [user.id + 1000])
+
+
+def test_find_users_empty():
+    """find_users should not query for an empty list of values"""
+    assert find_users([]) == ([], [])
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize(
     "username_base,suffixed_to_create,expected_available_username",
@@ -156,6 +191,47 @@ def test_find_available_username(
     assert available_username == expected_available_username
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "username_base,existing_usernames,expected_suffix",
+    [
+        ["someuser", [], None],
+        ["someuser", ["someuser", "someuser-1", "someuser1a", "xsomeuser5"], None],
+        ["someuser", ["someuser2", "someuser10", "someuser9"], 10],
+        ["someuser", ["someuser007", "someuser12345678901234"], 12_345_678_901_234],
+        ["some.user", ["someXuser5", "some.user3"], 3],
+    ],
+)
+def test_get_max_username_suffix(username_base, existing_usernames, expected_suffix):
+    """get_max_username_suffix should return the largest suffix of usernames which are the base followed by digits"""
+    for username in existing_usernames:
+        UserFactory.create(username=username)
+    assert get_max_username_suffix(username_base) == expected_suffix
+
+
+@pytest.mark.django_db
+def test_search_users():
+    """search_users should find users by email, username or name, best matches first"""
+    best_match = UserFactory.create(
+        email="jane.doe@example.com", username="janedoe", profile__name="Jane Doe"
+    )
+    name_match = UserFactory.create(
+        email="someone@example.com", username="someone", profile__name="Janet Smith"
+    )
+    email_match = UserFactory.create(
+        email="xjanex@example.org", username="other", profile__name="Other Person"
+    )
+    UserFactory.create(
+        email="nobody@example.com", username="nobody", profile__name="No Body"
+    )
+
+    results = search_users(" JANE ")
+    assert results[0] == best_match.id
+    assert sorted(results) == sorted([best_match.id, name_match.id, email_match.id])
+    assert search_users("jane", limit=1) == [best_match.id]
+    assert search_users("  ") == []
+
+
 @pytest.mark.django_db
 def test_full_username_creation():
     """
@@ -201,3 +277,48 @@ def test_is_user_info_complete():
     ProfileFactory.create(user=user)
     LegalAddressFactory.create(user=user)
     assert is_user_info_complete(user) is True
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("user_cache")
+def test_get_serialized_user(django_assert_num_queries):
+    """get_serialized_user should cache the serialized user until it's invalidated"""
+    user = UserFactory.create()
+    expected = UserSerializer(user).data
+    user.refresh_from_db()
+    assert get_serialized_user(user) == expected
+
+    user.refresh_from_db()
+    with django_assert_num_queries(0):
+        assert get_serialized_user(user) == expected
+
+    user.profile.name = "New Name"
+    user.profile.save()
+    user.refresh_from_db()
+    assert get_serialized_user(user)["profile"]["name"] == "New Name"
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("user_cache")
+def test_get_serialized_user_stale_version():
+    """Data cached under a version from before an invalidation should not be used"""
+    user = UserFactory.create()
+    get_serialized_user(user)
+    invalidate_serialized_user(user.id)
+    user.email = "new@example.com"
+    assert get_serialized_user(user)["email"] == "new@example.com"
+
+
+@pytest.mark.django_db
+def test_get_serialized_user_disabled(mocker, user):
+    """get_serialized_user should serialize the user directly if the cache is disabled"""
+    mock_cache = mocker.patch("profiles.api.cache")
+    assert get_serialized_user(user) == UserSerializer(user).data
+    mock_cache.get.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_get_serialized_user_cache_error(user_cache, mocker, user):
+    """get_serialized_user should serialize the user directly if the cache is unavailable"""
+    mocker.patch.object(user_cache, "get", side_effect=ConnectionError)
+    assert get_serialized_user(user) == UserSerializer(user).data
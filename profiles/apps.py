@@ -4,7 +4,11 @@ Django App
 from django.apps import AppConfig
 
 
-class EcommerceConfig(AppConfig):
+class ProfilesConfig(AppConfig):
     """AppConfig for Profiles"""
 
     name = "profiles"
+
+    def ready(self):
+        """Application is ready"""
+        import profiles.signals  # pylint:disable=unused-import, unused-variable
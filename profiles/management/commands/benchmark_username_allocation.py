@@ -0,0 +1,122 @@
+"""Management command to benchmark username allocation against a large users table"""
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from profiles.api import find_available_username, get_suffixed_usernames
+
+User = get_user_model()
+
+BENCHMARK_USERNAME_PREFIX = "benchmark-"
+
+
+class Command(BaseCommand):
+    """
+    Times find_available_username with a users table of the given size. Users are created inside a
+    transaction which is rolled back afterwards, so the database is left unchanged.
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=1_000_000,
+            help="The total number of users to benchmark against",
+        )
+        parser.add_argument(
+            "--bases",
+            nargs="+",
+            default=["john-smith", "maria-garcia"],
+            help="The username bases to allocate usernames for",
+        )
+        parser.add_argument(
+            "--collisions",
+            type=int,
+            default=100,
+            help="The number of existing suffixed usernames for each base",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="The number of times to allocate each username",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="The number of users to insert at a time",
+        )
+
+    def _create_users(self, usernames, batch_size):
+        """Bulk create users with the given usernames"""
+        password = make_password(None)
+        for start in range(0, len(usernames), batch_size):
+            User.objects.bulk_create(
+                [
+                    User(username=username, password=password)
+                    for username in usernames[start : start + batch_size]
+                ]
+            )
+
+    def _time(self, func, iterations):
+        """Returns the mean and maximum milliseconds that func takes to run"""
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.mean(timings), max(timings)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            usernames = []
+            for base in options["bases"]:
+                usernames.append(base)
+                usernames.extend(
+                    f"{base}{suffix}" for suffix in range(1, options["collisions"] + 1)
+                )
+            filler_count = max(
+                0, options["users"] - User.objects.count() - len(usernames)
+            )
+            usernames.extend(
+                f"{BENCHMARK_USERNAME_PREFIX}{index}" for index in range(filler_count)
+            )
+            self.stdout.write(f"Creating {len(usernames)} users...")
+            self._create_users(usernames, options["batch_size"])
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE auth_user")
+            self.stdout.write(f"Benchmarking with {User.objects.count()} users")
+
+            for base in options["bases"]:
+                mean_ms, max_ms = self._time(
+                    lambda base=base: find_available_username(base),
+                    options["iterations"],
+                )
+                regex_mean_ms, regex_max_ms = self._time(
+                    lambda base=base: list(
+                        User.objects.filter(
+                            username__regex=f"{base}[0-9]+"
+                        ).values_list("username", flat=True)
+                    ),
+                    options["iterations"],
+                )
+                self.stdout.write(
+                    self.style.SUCCESS(f"{base} -> {find_available_username(base)}")
+                )
+                self.stdout.write(
+                    f"  find_available_username: mean {mean_ms:.2f}ms, max {max_ms:.2f}ms"
+                )
+                self.stdout.write(
+                    f"  unanchored regex scan:   mean {regex_mean_ms:.2f}ms, max {regex_max_ms:.2f}ms"
+                )
+                self.stdout.write(
+                    get_suffixed_usernames(base).only("username").explain()
+                )
+            transaction.set_rollback(True)
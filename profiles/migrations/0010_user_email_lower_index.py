@@ -0,0 +1,22 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Indexes can only be created concurrently outside of a transaction
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("profiles", "0009_remove_profile_leadership_level"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS auth_user_email_lower_idx "
+            "ON auth_user (LOWER(email));",
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS auth_user_email_lower_idx;",
+        )
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.13 on 2026-10-19 12:00
+
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Django matches icontains lookups with UPPER(column::text) LIKE UPPER(...), so the indexes are on that
+# expression to be usable for admin and reviewer searches
+TRIGRAM_INDEXES = [
+    ("auth_user_email_upper_trgm_idx", "auth_user", "email"),
+    ("auth_user_username_upper_trgm_idx", "auth_user", "username"),
+    ("profiles_profile_name_upper_trgm_idx", "profiles_profile", "name"),
+]
+
+
+class Migration(migrations.Migration):
+    # Indexes can only be created concurrently outside of a transaction
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("profiles", "0010_user_email_lower_index"),
+    ]
+
+    operations = [TrigramExtension()] + [
+        migrations.RunSQL(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+            f"ON {table} USING gin (UPPER({column}::text) gin_trgm_ops);",
+            reverse_sql=f"DROP INDEX CONCURRENTLY IF EXISTS {index_name};",
+        )
+        for index_name, table, column in TRIGRAM_INDEXES
+    ]
@@ -0,0 +1,30 @@
+"""Signals for user profiles"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from profiles.api import invalidate_serialized_user
+from profiles.models import LegalAddress, Profile
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User, dispatch_uid="user_post_save_serialized_user")
+def user_post_save(sender, instance, **kwargs):  # pylint:disable=unused-argument
+    """Invalidate the cached serialized user"""
+    invalidate_serialized_user(instance.id)
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=Profile,
+    dispatch_uid="profile_changed_serialized_user",
+)
+@receiver(
+    [post_save, post_delete],
+    sender=LegalAddress,
+    dispatch_uid="legal_address_changed_serialized_user",
+)
+def user_details_changed(sender, instance, **kwargs):  # pylint:disable=unused-argument
+    """Invalidate the cached serialized user when their profile or legal address changes"""
+    invalidate_serialized_user(instance.user_id)
@@ -0,0 +1,24 @@
+"""Tests for profiles signals"""
+import pytest
+
+from profiles.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize("model_name", ["user", "profile", "legal_address"])
+def test_changes_invalidate_serialized_user(mocker, model_name):
+    """Saving a user, their profile or their legal address should invalidate their cached serialized data"""
+    user = UserFactory.create()
+    patched_invalidate = mocker.patch("profiles.signals.invalidate_serialized_user")
+    instance = user if model_name == "user" else getattr(user, model_name)
+    instance.save()
+    patched_invalidate.assert_called_once_with(user.id)
+
+
+def test_delete_profile_invalidates_serialized_user(mocker):
+    """Deleting a profile should invalidate the user's cached serialized data"""
+    user = UserFactory.create()
+    patched_invalidate = mocker.patch("profiles.signals.invalidate_serialized_user")
+    user.profile.delete()
+    patched_invalidate.assert_called_once_with(user.id)
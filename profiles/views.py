@@ -7,6 +7,7 @@ from rest_framework.response import Response
 
 from main.permissions import UserIsOwnerPermission
 from main.utils import now_in_utc
+from profiles.api import get_serialized_user
 from profiles.models import ChangeEmailRequest
 from profiles.serializers import (
     UserSerializer,
@@ -41,6 +42,10 @@ class CurrentUserRetrieveUpdateViewSet(
         # NOTE: this may be a logged in or anonymous user
         return self.request.user
 
+    def retrieve(self, request, *args, **kwargs):
+        """Returns the serialized current user, from the cache if possible"""
+        return Response(get_serialized_user(self.get_object()))
+
 
 class ChangeEmailRequestViewSet(
     mixins.CreateModelMixin, mixins.UpdateModelMixin, viewsets.GenericViewSet
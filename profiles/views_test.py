@@ -105,6 +105,18 @@ def test_get_user_by_me(user_client, user):
     }
 
 
+@pytest.mark.usefixtures("user_cache")
+def test_get_user_by_me_cached(user_client, user):
+    """The current user endpoint should serve the cached user until the user's profile changes"""
+    resp = user_client.get(reverse("users_api-me"))
+    assert resp.json()["profile"]["name"] == user.profile.name
+
+    user.profile.name = "Updated Name"
+    user.profile.save()
+    resp = user_client.get(reverse("users_api-me"))
+    assert resp.json()["profile"]["name"] == "Updated Name"
+
+
 @pytest.mark.django_db
 def test_countries_states_view(client):
     """Test that a list of countries and states is returned"""